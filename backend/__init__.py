@@ -3,6 +3,9 @@ Backend package initializer.
 
 In test environments we may not have optional Flask extensions installed; fall back to lightweight
 stubs so importing this package does not fail.
+
+``create_app`` is resolved lazily so that importing ``backend`` (or any submodule such as
+``backend.models``) does not pull in Flask, every blueprint, and the database bootstrap.
 """
 
 import sys
@@ -79,4 +82,10 @@ except ModuleNotFoundError:
     sys.modules["sqlalchemy"] = sqlalchemy
     sys.modules["sqlalchemy.exc"] = exc_module
 
-from backend.app import create_app  # noqa: E402,F401
+
+def __getattr__(name: str):
+    if name == "create_app":
+        from backend.app import create_app
+
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
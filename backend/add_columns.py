@@ -5,6 +5,14 @@ Run this once after pulling changes that add new columns or tables.
 
 from backend.app import create_app
 from backend.models import db
+from backend.repositories import (
+    activity_repository,
+    progress_repository,
+    question_repository,
+    question_stats_repository,
+    response_repository,
+    sketch_repository,
+)
 
 app = create_app()
 
@@ -51,6 +59,62 @@ with app.app_context():
             conn.execute(db.text("ALTER TABLE student_responses ADD COLUMN class_id INTEGER REFERENCES classes(id)"))
             conn.commit()
 
+        if 'question_id' not in response_cols:
+            print("Adding question_id to student_responses...")
+            conn.execute(db.text("ALTER TABLE student_responses ADD COLUMN question_id INTEGER REFERENCES questions(id)"))
+            conn.commit()
+
+        # The question text now lives only in questions; rebuild the table so
+        # the legacy copies can be NULL (SQLite can't drop NOT NULL in place)
+        response_ddl = conn.execute(
+            db.text("SELECT sql FROM sqlite_master WHERE name='student_responses'")
+        ).scalar() or ""
+        if "question_code TEXT NOT NULL" in response_ddl:
+            print("Recreating student_responses with optional question text...")
+            conn.execute(db.text("""
+                CREATE TABLE student_responses_new (
+                    id INTEGER NOT NULL PRIMARY KEY,
+                    user_id INTEGER NOT NULL REFERENCES users(id),
+                    class_id INTEGER REFERENCES classes(id),
+                    topic VARCHAR(100) NOT NULL REFERENCES topics(id),
+                    question_id INTEGER REFERENCES questions(id),
+                    subtopic_type VARCHAR(100) NOT NULL,
+                    question_code TEXT,
+                    student_answer TEXT,
+                    correct_answer TEXT,
+                    is_correct BOOLEAN NOT NULL,
+                    status VARCHAR(20),
+                    time_spent INTEGER,
+                    attempted_at DATETIME
+                )
+            """))
+            conn.execute(db.text("""
+                INSERT INTO student_responses_new
+                    (id, user_id, class_id, topic, question_id, subtopic_type, question_code,
+                     student_answer, correct_answer, is_correct, status, time_spent, attempted_at)
+                SELECT id, user_id, class_id, topic, question_id, subtopic_type, question_code,
+                       student_answer, correct_answer, is_correct, status, time_spent, attempted_at
+                FROM student_responses
+            """))
+            # Drops the old indexes too; they are recreated below
+            conn.execute(db.text("DROP TABLE student_responses"))
+            conn.execute(db.text("ALTER TABLE student_responses_new RENAME TO student_responses"))
+            conn.commit()
+
+        conn.execute(db.text(
+            "CREATE INDEX IF NOT EXISTS ix_student_responses_question_user "
+            "ON student_responses (question_id, user_id)"
+        ))
+        conn.execute(db.text(
+            "CREATE INDEX IF NOT EXISTS ix_student_responses_user_attempted "
+            "ON student_responses (user_id, attempted_at, id)"
+        ))
+        conn.execute(db.text(
+            "CREATE INDEX IF NOT EXISTS ix_student_responses_class_attempted "
+            "ON student_responses (class_id, attempted_at)"
+        ))
+        conn.commit()
+
     # ── student_progress ─────────────────────────────────────────────────────
     progress_cols = [col['name'] for col in inspector.get_columns('student_progress')]
     print(f"student_progress columns: {progress_cols}")
@@ -61,6 +125,12 @@ with app.app_context():
             conn.execute(db.text("ALTER TABLE student_progress ADD COLUMN class_id INTEGER REFERENCES classes(id)"))
             conn.commit()
 
+        conn.execute(db.text(
+            "CREATE INDEX IF NOT EXISTS ix_student_progress_class_topic "
+            "ON student_progress (class_id, topic)"
+        ))
+        conn.commit()
+
     # ── fix roster_students unique constraint ────────────────────────────────
     # Old schema had UNIQUE(email); new schema needs UNIQUE(email, class_id)
     # SQLite can't drop constraints, so recreate the table if needed.
@@ -100,7 +170,84 @@ with app.app_context():
             conn.commit()
             print("roster_students recreated with UNIQUE(email, class_id).")
 
+    # ── question_stats keyed by class: recreated and rebuilt below ───────────
+    if inspector.has_table('question_stats'):
+        stats_cols = [col['name'] for col in inspector.get_columns('question_stats')]
+        if 'class_id' not in stats_cols:
+            print("Recreating question_stats with per-class counters...")
+            with db.engine.connect() as conn:
+                conn.execute(db.text("DROP TABLE question_stats"))
+                conn.commit()
+
     # ── create any new tables (classes, upload_history, etc.) ────────────────
     db.create_all()
 
+    # ── questions: normalized templates for grouped analytics ────────────────
+    question_cols = [col['name'] for col in db.inspect(db.engine).get_columns('questions')]
+    with db.engine.connect() as conn:
+        if 'template_hash' not in question_cols:
+            print("Adding template and template_hash to questions...")
+            conn.execute(db.text("ALTER TABLE questions ADD COLUMN template TEXT"))
+            conn.execute(db.text("ALTER TABLE questions ADD COLUMN template_hash VARCHAR(64)"))
+        conn.execute(db.text(
+            "CREATE INDEX IF NOT EXISTS ix_questions_template_hash ON questions (template_hash)"
+        ))
+        # (topic, times_shown) replaces the topic-only index on question_stats
+        conn.execute(db.text(
+            "CREATE INDEX IF NOT EXISTS ix_question_stats_topic_shown "
+            "ON question_stats (topic, times_shown)"
+        ))
+        conn.execute(db.text("DROP INDEX IF EXISTS ix_question_stats_topic"))
+        conn.commit()
+
+    # ── case-insensitive email lookups behind every roster join ──────────────
+    with db.engine.connect() as conn:
+        conn.execute(db.text(
+            "CREATE INDEX IF NOT EXISTS ix_users_email_lower ON users (lower(email))"
+        ))
+        conn.execute(db.text(
+            "CREATE INDEX IF NOT EXISTS ix_roster_students_email_lower "
+            "ON roster_students (lower(email))"
+        ))
+        conn.commit()
+
+    # ── deduplicate question text into the questions table ───────────────────
+    backfilled = question_repository.backfill_responses()
+    if backfilled:
+        print(f"Linked {backfilled} responses to their questions.")
+
+    templated = question_repository.backfill_templates()
+    if templated:
+        print(f"Computed templates for {templated} questions.")
+
+    # ── responses reference the question text instead of copying it ──────────
+    stripped = response_repository.strip_question_text()
+    if stripped:
+        print(f"Dropped the copied question text from {stripped} responses; compacting...")
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(db.text("VACUUM"))
+
+    # ── stamp class ids on rows written before writes carried them ───────────
+    stamped = response_repository.backfill_class_ids()
+    if stamped:
+        print(f"Stamped {stamped} responses with their class.")
+    stamped_progress = progress_repository.backfill_class_ids()
+    if stamped_progress:
+        print(f"Stamped {stamped_progress} progress records with their class.")
+
+    # ── precomputed per-question stats ───────────────────────────────────────
+    has_stats = db.session.execute(db.text("SELECT 1 FROM question_stats LIMIT 1")).first()
+    has_viewers = db.session.execute(db.text("SELECT 1 FROM question_viewers LIMIT 1")).first()
+    if backfilled or not has_stats or not has_viewers:
+        print(f"Rebuilt stats for {question_stats_repository.rebuild()} questions.")
+
+    # ── activity buckets behind the time-series reports ──────────────────────
+    has_buckets = db.session.execute(db.text("SELECT 1 FROM activity_buckets LIMIT 1")).first()
+    if stamped or not has_buckets:
+        hourly = app.config["ACTIVITY_HOURLY_BUCKETS"]
+        print(f"Rebuilt {activity_repository.rebuild(hourly=hourly)} activity buckets.")
+
+    if app.config["DISTINCT_COUNT_MODE"] == "approximate":
+        print(f"Rebuilt {sketch_repository.rebuild()} distinct-count sketches.")
+
     print("Database schema updated successfully!")
@@ -0,0 +1,359 @@
+"""
+Optional NumPy analytics engine for class-level reports.
+
+With ``ANALYTICS_ENGINE=numpy`` the class overview and topic report stop
+pulling ``StudentResponse`` rows into Python objects. Instead each class's
+responses are loaded once into compact column arrays (dictionary-encoded
+topic, subtopic, status and student codes) and every aggregate is a handful
+of vectorised group-bys (``np.bincount``/``np.unique``).
+
+Arrays are cached per class (LRU, ``ANALYTICS_ENGINE_MAX_CLASSES``). On each
+report the engine re-reads the class roster and fetches only responses with
+an id above the cached high-water mark, appending them to the arrays; a
+roster change reloads the class. Responses are insert-only, so nothing else
+can make a cached class stale -- call ``invalidate()`` after manual data
+fixes.
+
+A cached ``ClassFrame`` is never modified: appending builds a new frame and
+swaps it in, so a report still aggregating the previous one reads columns of
+a single generation. Loads hold a lock per class, so one slow class does not
+hold up the others.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import func
+
+from backend.models import RosterStudent, StudentResponse, User, db
+
+try:  # numpy is an optional dependency
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover
+    np = None
+
+EXTENSION_KEY = "bytepath_analytics_engine"
+STATUS_CODES = {"correct": 0, "incorrect": 1, "skipped": 2}
+SKIPPED = STATUS_CODES["skipped"]
+LOAD_BATCH = 50_000
+MIN_RANKED_ANSWERS = 5
+
+logger = logging.getLogger(__name__)
+
+
+class Categories:
+    """Append-only dictionary encoding of strings (or ids) to dense int codes."""
+
+    def __init__(self) -> None:
+        self.codes: Dict = {}
+        self.values: List = []
+        self._lock = threading.Lock()
+
+    def encode(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self.codes.get(value)
+                if code is None:
+                    code = self.codes[value] = len(self.values)
+                    self.values.append(value)
+        return code
+
+    def copy(self) -> "Categories":
+        copied = Categories()
+        copied.codes = dict(self.codes)
+        copied.values = list(self.values)
+        return copied
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class ClassFrame:
+    """The response columns of one class's rostered students; read-only once cached."""
+
+    COLUMNS = ("user", "topic", "subtopic", "status", "is_correct", "time_spent", "attempted")
+
+    def __init__(self, roster: frozenset) -> None:
+        self.roster = roster
+        self.last_id = 0
+        self.users = Categories()
+        self.user = np.empty(0, dtype=np.int32)
+        self.topic = np.empty(0, dtype=np.int32)
+        self.subtopic = np.empty(0, dtype=np.int32)
+        self.status = np.empty(0, dtype=np.int8)
+        self.is_correct = np.empty(0, dtype=np.bool_)
+        self.time_spent = np.empty(0, dtype=np.float64)  # NaN where not reported
+        self.attempted = np.empty(0, dtype="datetime64[us]")
+
+    def __len__(self) -> int:
+        return len(self.user)
+
+    def extended(
+        self, chunks: List[Dict[str, "np.ndarray"]], last_id: int, users: Categories
+    ) -> "ClassFrame":
+        """A new frame with ``chunks`` appended; ``self`` is left untouched."""
+
+        frame = ClassFrame(self.roster)
+        frame.users = users
+        frame.last_id = last_id
+        for name in self.COLUMNS:
+            parts = [getattr(self, name)] + [chunk[name] for chunk in chunks]
+            setattr(frame, name, np.concatenate(parts))
+        return frame
+
+
+class AnalyticsEngine:
+    """Per-class cache of response arrays plus the vectorised report aggregates."""
+
+    def __init__(self, max_classes: int = 32) -> None:
+        self.max_classes = max_classes
+        self.topics = Categories()
+        self.subtopics = Categories()
+        self._frames: "OrderedDict[Optional[int], ClassFrame]" = OrderedDict()
+        # Guards _frames, _loading and _generation; never held during a query
+        self._lock = threading.Lock()
+        self._loading: Dict[Optional[int], threading.Lock] = {}
+        # Bumped by invalidate(), so a load that started before it is not cached
+        self._generation = 0
+
+    # ── cache ────────────────────────────────────────────────────────────
+
+    def invalidate(self, class_id: Optional[int] = None, *, everything: bool = False) -> None:
+        with self._lock:
+            self._generation += 1
+            if everything:
+                self._frames.clear()
+            else:
+                self._frames.pop(class_id, None)
+
+    def frame(self, class_id: Optional[int]) -> ClassFrame:
+        """Return the up-to-date arrays for ``class_id`` (``None``: every rostered student)."""
+
+        roster_query = _roster_query(class_id)
+        roster = frozenset(db.session.execute(roster_query).scalars())
+        with self._lock:
+            loading = self._loading.setdefault(class_id, threading.Lock())
+        with loading:
+            with self._lock:
+                frame = self._frames.get(class_id)
+                generation = self._generation
+            if frame is None or frame.roster != roster:
+                frame = ClassFrame(roster)
+            frame = self._load_new_rows(frame, roster_query, class_id)
+            with self._lock:
+                if generation == self._generation:
+                    self._frames[class_id] = frame
+                    self._frames.move_to_end(class_id)
+                    while len(self._frames) > self.max_classes:
+                        self._frames.popitem(last=False)
+            return frame
+
+    def _load_new_rows(
+        self, frame: ClassFrame, roster_query, class_id: Optional[int]
+    ) -> ClassFrame:
+        """``frame`` extended with the responses above its ``last_id``."""
+
+        scope = [StudentResponse.id > frame.last_id, StudentResponse.user_id.in_(roster_query)]
+        if class_id is not None:
+            scope.append(StudentResponse.class_id == class_id)
+        result = db.session.execute(
+            db.select(
+                StudentResponse.id,
+                StudentResponse.user_id,
+                StudentResponse.topic,
+                StudentResponse.subtopic_type,
+                StudentResponse.status,
+                StudentResponse.is_correct,
+                StudentResponse.time_spent,
+                StudentResponse.attempted_at,
+            )
+            .filter(*scope)
+            .order_by(StudentResponse.id)
+            .execution_options(yield_per=LOAD_BATCH)
+        )
+        users_seen = frame.users.copy()
+        chunks = []
+        last_id = frame.last_id
+        for rows in result.partitions():
+            ids, users, topics, subtopics, statuses, correct, times, attempted = zip(*rows)
+            chunks.append(
+                {
+                    "user": np.fromiter(map(users_seen.encode, users), np.int32, len(rows)),
+                    "topic": np.fromiter(map(self.topics.encode, topics), np.int32, len(rows)),
+                    "subtopic": np.fromiter(
+                        map(self.subtopics.encode, subtopics), np.int32, len(rows)
+                    ),
+                    "status": np.fromiter(
+                        (STATUS_CODES.get(status, 1) for status in statuses), np.int8, len(rows)
+                    ),
+                    "is_correct": np.array(correct, dtype=np.bool_),
+                    "time_spent": np.array(
+                        [np.nan if value is None else value for value in times], dtype=np.float64
+                    ),
+                    "attempted": np.array(attempted, dtype="datetime64[us]"),
+                }
+            )
+            last_id = ids[-1]
+        if not chunks:
+            return frame
+        return frame.extended(chunks, last_id, users_seen)
+
+    # ── aggregates ───────────────────────────────────────────────────────
+
+    def class_overview(self, class_id: Optional[int], *, since: datetime) -> Dict:
+        """
+        The response-derived parts of the class overview: active students since
+        ``since``, totals, accuracy, per-topic accuracy/time/counts and the best and
+        worst students with at least ``MIN_RANKED_ANSWERS`` answered questions.
+        """
+
+        frame = self.frame(class_id)
+        answered = frame.status != SKIPPED
+        answered_count = int(answered.sum())
+        correct = frame.is_correct & answered
+
+        topic_count, topic_correct, topic_time = _grouped(
+            frame.topic[answered], correct[answered], frame.time_spent[answered], len(self.topics)
+        )
+        topic_stats = {
+            self.topics.values[code]: (
+                topic_correct[code] / topic_count[code] * 100,
+                topic_time[code],
+                int(topic_count[code]),
+                int(topic_correct[code]),
+            )
+            for code in np.flatnonzero(topic_count)
+        }
+
+        user_ids = np.array(frame.users.values, dtype=np.int64)
+        user_count = np.bincount(frame.user[answered], minlength=len(frame.users))
+        user_correct = np.bincount(
+            frame.user[answered], weights=correct[answered], minlength=len(frame.users)
+        )
+        ranked = np.flatnonzero(user_count >= MIN_RANKED_ANSWERS)
+        accuracy = user_correct[ranked] / user_count[ranked] * 100
+
+        def students(order) -> List[Dict]:
+            return [
+                {
+                    "id": int(user_ids[ranked[index]]),
+                    "questions_answered": int(user_count[ranked[index]]),
+                    "accuracy": float(accuracy[index]),
+                }
+                for index in order[:5]
+            ]
+
+        recent = frame.attempted >= np.datetime64(since, "us")
+        return {
+            "active_last_week": int(np.unique(frame.user[recent]).size),
+            "total_questions": len(frame),
+            "answered": answered_count,
+            "correct": int(correct.sum()),
+            "class_avg_accuracy": int(correct.sum()) / answered_count * 100
+            if answered_count
+            else 0,
+            "topic_stats": topic_stats,
+            "top_performers": students(np.lexsort((user_ids[ranked], -accuracy))),
+            "struggling_students": students(np.lexsort((user_ids[ranked], accuracy))),
+        }
+
+    def topic_summary(self, topic_id: str, class_id: Optional[int] = None) -> Dict:
+        """
+        The response-derived parts of a topic report over every rostered
+        student (or ``class_id``'s): attempts, distinct students,
+        accuracy/time and per-subtopic difficulty ordered from hardest to
+        easiest.
+        """
+
+        frame = self.frame(class_id)
+        code = self.topics.codes.get(topic_id)
+        in_topic = frame.topic == code if code is not None else np.zeros(len(frame), np.bool_)
+        answered = in_topic & (frame.status != SKIPPED)
+        answered_count = int(answered.sum())
+        times = frame.time_spent[answered]
+
+        subtopic = frame.subtopic[answered]
+        subtopic_count, subtopic_correct, subtopic_time = _grouped(
+            subtopic, frame.is_correct[answered], times, len(self.subtopics)
+        )
+        pairs = np.unique(subtopic.astype(np.int64) * max(len(frame.users), 1) + frame.user[answered])
+        subtopic_students = np.bincount(
+            pairs // max(len(frame.users), 1), minlength=len(self.subtopics)
+        )
+        subtopic_stats = [
+            {
+                "subtopic_type": self.subtopics.values[code],
+                "attempts": int(subtopic_count[code]),
+                "unique_students": int(subtopic_students[code]),
+                "success_rate": subtopic_correct[code] / subtopic_count[code] * 100,
+                "avg_time": subtopic_time[code],
+            }
+            for code in np.flatnonzero(subtopic_count)
+        ]
+        subtopic_stats.sort(key=lambda stat: (stat["success_rate"], stat["subtopic_type"]))
+
+        return {
+            "total_attempts": int(in_topic.sum()),
+            "students_started": int(np.unique(frame.user[in_topic]).size),
+            "avg_accuracy": int(frame.is_correct[answered].sum()) / answered_count * 100
+            if answered_count
+            else 0,
+            # Matches the SQL path: unreported times count as zero in the mean
+            "avg_time": float(np.where(times > 0, times, 0).sum()) / answered_count
+            if answered_count
+            else 0,
+            "subtopic_stats": subtopic_stats,
+        }
+
+
+def _grouped(codes, correct, times, size):
+    """Per-code answer counts, correct counts and mean reported time (``None`` if none)."""
+
+    count = np.bincount(codes, minlength=size)
+    correct_count = np.bincount(codes, weights=correct, minlength=size)
+    reported = ~np.isnan(times)
+    time_total = np.bincount(codes[reported], weights=times[reported], minlength=size)
+    time_samples = np.bincount(codes[reported], minlength=size)
+    mean_time = [
+        float(time_total[code] / time_samples[code]) if time_samples[code] else None
+        for code in range(size)
+    ]
+    return count, correct_count, mean_time
+
+
+def _roster_query(class_id: Optional[int]):
+    roster_filter = [User.role == "student", RosterStudent.deleted_at.is_(None)]
+    if class_id is not None:
+        roster_filter.append(RosterStudent.class_id == class_id)
+    return (
+        db.select(User.id)
+        .join(RosterStudent, func.lower(RosterStudent.email) == func.lower(User.email))
+        .filter(*roster_filter)
+    )
+
+
+def init_app(app: Flask) -> Optional[AnalyticsEngine]:
+    """Create the engine for ``app`` when ``ANALYTICS_ENGINE=numpy`` and numpy is installed."""
+
+    if app.config.get("ANALYTICS_ENGINE", "sql") != "numpy":
+        return None
+    if np is None:
+        logger.warning("ANALYTICS_ENGINE=numpy but numpy is not installed; using SQL reports")
+        return None
+
+    engine = AnalyticsEngine(max_classes=app.config.get("ANALYTICS_ENGINE_MAX_CLASSES", 32))
+    app.extensions[EXTENSION_KEY] = engine
+    return engine
+
+
+def get_engine() -> Optional[AnalyticsEngine]:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get(EXTENSION_KEY)
@@ -16,23 +16,18 @@ except ModuleNotFoundError:  # pragma: no cover
 from backend.config import get_config
 from backend.models import db, Class, RosterStudent, Topic, UploadHistory  # Import models so SQLAlchemy discovers them
 from backend.topic_definitions import TOPIC_DEFINITIONS
-from backend.routes import (
-    auth_bp,
-    classes_bp,
-    progress_bp,
-    reports_bp,
-    responses_bp,
-    students_bp,
-    topics_bp,
-)
-
-
-def create_app(config_name: Optional[str] = None) -> Flask:
+
+
+def create_app(
+    config_name: Optional[str] = None, overrides: Optional[dict] = None
+) -> Flask:
     """
     Application factory for the BytePath backend.
 
     Initializes Flask extensions, applies configuration, registers routes,
-    and sets up error handlers.
+    and sets up error handlers. ``overrides`` are applied on top of the
+    selected config class before any extension is initialised (e.g. to point
+    tooling at a different database).
     """
 
     app = Flask(__name__)
@@ -41,10 +36,14 @@ def create_app(config_name: Optional[str] = None) -> Flask:
         config_name = os.environ.get("FLASK_ENV", "development")
     config_class = get_config(config_name)
     app.config.from_object(config_class)
+    if overrides:
+        app.config.update(overrides)
 
     _configure_extensions(app)
+    _configure_instrumentation(app)
     _register_routes(app)
     _register_error_handlers(app)
+    _start_background_jobs(app)
 
     return app
 
@@ -54,9 +53,17 @@ def _configure_extensions(app: Flask) -> None:
 
     db.init_app(app)
 
-    with app.app_context():
-        db.create_all()
-        _seed_topics_if_empty()
+    from backend import analytics_engine, identity_cache, live_updates, session_store
+
+    analytics_engine.init_app(app)
+    identity_cache.init_app(app)
+    live_updates.init_app(app)
+    session_store.init_app(app)
+
+    if app.config.get("AUTO_CREATE_SCHEMA", True):
+        with app.app_context():
+            db.create_all()
+            _seed_topics_if_empty()
 
     origins = app.config.get("CORS_ORIGINS", ["http://localhost:5173"])
     CORS(
@@ -68,16 +75,35 @@ def _configure_extensions(app: Flask) -> None:
     )
 
 
+def _configure_instrumentation(app: Flask) -> None:
+    """Attach request metrics (/metrics) and the slow-query recorder."""
+
+    from backend import instrumentation, slow_queries
+
+    if app.config.get("METRICS_ENABLED", True):
+        instrumentation.init_app(app)
+    slow_queries.init_app(app)
+
+
+def _start_background_jobs(app: Flask) -> None:
+    """Start opt-in in-process jobs (periodic insights refresh, ingest flusher)."""
+
+    from backend import ingest_buffer
+    from backend.services import insight_service
+
+    insight_service.start_scheduler(app)
+    ingest_buffer.start(app)
+
+
 def _register_routes(app: Flask) -> None:
     """Register core routes for health checks and diagnostics."""
 
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(classes_bp)
-    app.register_blueprint(progress_bp)
-    app.register_blueprint(reports_bp)
-    app.register_blueprint(responses_bp)
-    app.register_blueprint(students_bp)
-    app.register_blueprint(topics_bp)
+    # Imported here so that importing this module stays cheap; blueprints (and
+    # their dependencies) are only loaded when an application is built.
+    from backend import routes
+
+    for name in routes.BLUEPRINT_MODULES:
+        app.register_blueprint(getattr(routes, name))
 
     @app.get("/")
     def root():
@@ -133,8 +159,7 @@ def _seed_topics_if_empty() -> None:
         # In test environments without SQLAlchemy installed, skip seeding.
         return
 
-    existing_count = db.session.query(Topic).count()
-    if existing_count > 0:
+    if db.session.execute(db.select(Topic.id).limit(1)).first() is not None:
         return
 
     for topic in TOPIC_DEFINITIONS:
@@ -150,8 +175,25 @@ def _seed_topics_if_empty() -> None:
     logging.info("Seeded default topics into empty database.")
 
 
-# Application instance for Gunicorn
-application = create_app()
+_application: Optional[Flask] = None
+
+
+def __getattr__(name: str):
+    """
+    Build the WSGI ``application`` only when something asks for it.
+
+    Gunicorn should point at ``backend.wsgi:application``; this hook keeps the
+    older ``backend.app:application`` target working without paying for an
+    application build on every ``import backend.app``.
+    """
+
+    global _application
+    if name == "application":
+        if _application is None:
+            _application = create_app()
+        return _application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
-    application.run(host="0.0.0.0", port=5000)
+    create_app().run(host="0.0.0.0", port=5000)
@@ -0,0 +1,8 @@
+"""
+Reproducible performance benchmarks for the BytePath backend.
+
+Run ``python -m backend.benchmarks.run --scale smoke`` for a quick pass or
+``--scale 1k|10k|100k`` for realistic class sizes (``sections``: one
+instructor with 20 sections of 300 students). Results are written as
+JSON and can be compared against a previous run with ``--compare``.
+"""
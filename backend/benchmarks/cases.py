@@ -0,0 +1,260 @@
+"""
+Benchmark cases.
+
+Each case receives a :class:`BenchmarkContext` and returns a zero-argument
+callable that performs one timed iteration. Setup done in the case body
+(picking ids, building payloads) is not timed.
+"""
+
+from __future__ import annotations
+
+import itertools
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from flask import Flask
+from flask.testing import FlaskClient
+
+from backend import ingest_buffer, live_updates
+from backend.models import StudentProgress, User, db
+from backend.services.report_service import ReportService
+from backend.services.response_service import ResponseService
+from backend.topic_definitions import TOPIC_DEFINITIONS
+
+CaseFactory = Callable[["BenchmarkContext"], Callable[[], None]]
+
+CASES: Dict[str, CaseFactory] = {}
+
+
+@dataclass
+class BenchmarkContext:
+    app: Flask
+    client: FlaskClient
+    seed: int
+    counter: itertools.count = field(default_factory=itertools.count)
+    # Run (newest first) once the current case's iterations are done
+    cleanups: List[Callable[[], None]] = field(default_factory=list)
+
+    @property
+    def topic_id(self) -> str:
+        return TOPIC_DEFINITIONS[0]["id"]
+
+    def sample_student_id(self) -> int:
+        # Deterministic "middle of the roster" student
+        ids = db.session.execute(
+            db.select(User.id).filter(User.role == "student").order_by(User.id)
+        ).scalars().all()
+        return ids[len(ids) // 2]
+
+
+def case(name: str):
+    def register(factory: CaseFactory) -> CaseFactory:
+        CASES[name] = factory
+        return factory
+
+    return register
+
+
+@case("reports.class_overview")
+def class_overview(ctx: BenchmarkContext):
+    return lambda: ReportService.get_class_overview()
+
+
+@case("reports.class_overview_scoped")
+def class_overview_scoped(ctx: BenchmarkContext):
+    return lambda: ReportService.get_class_overview(class_id=1)
+
+
+@case("reports.topic_report")
+def topic_report(ctx: BenchmarkContext):
+    return lambda: ReportService.get_topic_report(ctx.topic_id)
+
+
+@case("reports.topic_report_scoped")
+def topic_report_scoped(ctx: BenchmarkContext):
+    return lambda: ReportService.get_topic_report(ctx.topic_id, class_id=1)
+
+
+@case("reports.instructor_rollup")
+def instructor_rollup(ctx: BenchmarkContext):
+    instructor_id = db.session.execute(
+        db.select(User.id).filter(User.role == "instructor").order_by(User.id).limit(1)
+    ).scalar_one()
+    return lambda: ReportService.get_instructor_rollup(instructor_id)
+
+
+@case("reports.student_report")
+def student_report(ctx: BenchmarkContext):
+    student_id = ctx.sample_student_id()
+    return lambda: ReportService.get_student_report(student_id)
+
+
+@case("reports.question_analytics")
+def question_analytics(ctx: BenchmarkContext):
+    return lambda: ReportService.get_question_analytics(ctx.topic_id)
+
+
+@case("reports.question_analytics_scoped")
+def question_analytics_scoped(ctx: BenchmarkContext):
+    return lambda: ReportService.get_question_analytics(ctx.topic_id, class_id=1)
+
+
+@case("reports.question_analytics_hardest")
+def question_analytics_hardest(ctx: BenchmarkContext):
+    """The 20 lowest success rates, then the page after them."""
+
+    def run():
+        page = ReportService.get_question_analytics(ctx.topic_id, sort="success_rate", limit=20)
+        return ReportService.get_question_analytics(
+            ctx.topic_id, sort="success_rate", limit=20, cursor=page["next_cursor"]
+        )
+
+    return run
+
+
+@case("reports.question_templates_rostered")
+def question_templates_rostered(ctx: BenchmarkContext):
+    return lambda: ReportService.get_question_analytics(
+        ctx.topic_id, class_id=1, rostered=True, group_by="template"
+    )
+
+
+@case("auth.session_profile")
+def session_profile(ctx: BenchmarkContext):
+    """Per-request session overhead: load the session and serve the profile."""
+
+    email = db.session.get(User, ctx.sample_student_id()).email
+    login = ctx.client.post("/api/auth/login", json={"email": email})
+    assert login.status_code == 200, login.get_data(as_text=True)
+
+    def run():
+        response = ctx.client.get("/api/auth/profile")
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    return run
+
+
+def _response_payload() -> dict:
+    progress = db.session.execute(
+        db.select(StudentProgress).order_by(StudentProgress.id).limit(1)
+    ).scalar_one()
+    return {
+        "user_id": progress.user_id,
+        "class_id": progress.class_id,
+        "topic": progress.topic,
+        "subtopic_type": "BenchmarkSubtopic",
+        "question_code": "value = 21\nanswer = value * 2\nanswer",
+        "student_answer": "42",
+        "correct_answer": "42",
+        "is_correct": True,
+        "status": "correct",
+        "time_spent": 30,
+    }
+
+
+@case("ingest.post_response")
+def post_response(ctx: BenchmarkContext):
+    payload = _response_payload()
+
+    def run():
+        response = ctx.client.post("/api/responses", json=payload)
+        assert response.status_code in (201, 202), response.get_data(as_text=True)
+
+    return run
+
+
+LIVE_DASHBOARDS = 50
+
+
+@case("ingest.post_response_live")
+def post_response_live(ctx: BenchmarkContext):
+    """Ingest with dashboards streaming the class; each reads its event."""
+
+    payload = _response_payload()
+    broker = live_updates.get_broker()
+    dashboards = [broker.subscribe(payload["class_id"]) for _ in range(LIVE_DASHBOARDS)]
+    for dashboard in dashboards:
+        ctx.cleanups.append(lambda dashboard=dashboard: broker.unsubscribe(dashboard))
+
+    def run():
+        response = ctx.client.post("/api/responses", json=payload)
+        assert response.status_code in (201, 202), response.get_data(as_text=True)
+        for dashboard in dashboards:
+            assert dashboard.next_frame(0) is not None
+
+    return run
+
+
+INGEST_BURST = 100
+
+
+@case("ingest.burst_sync")
+def burst_sync(ctx: BenchmarkContext):
+    """A lab-session burst written one request at a time."""
+
+    payload = _response_payload()
+
+    def run():
+        for _ in range(INGEST_BURST):
+            response = ctx.client.post("/api/responses", json=payload)
+            assert response.status_code == 201, response.get_data(as_text=True)
+
+    return run
+
+
+@case("ingest.burst_buffered")
+def burst_buffered(ctx: BenchmarkContext):
+    """The same burst through the write-behind buffer, then its one flush."""
+
+    payload = _response_payload()
+    journal = Path(tempfile.mkdtemp(prefix="bench-journal-"))
+    buffer = ingest_buffer.IngestBuffer(
+        ctx.app, journal, write_batch=ResponseService.record_batch, flush_interval_ms=0
+    )
+    ctx.app.extensions[ingest_buffer.EXTENSION_KEY] = buffer
+    ctx.cleanups.append(lambda: shutil.rmtree(journal, ignore_errors=True))
+    ctx.cleanups.append(lambda: ctx.app.extensions.pop(ingest_buffer.EXTENSION_KEY))
+
+    def run():
+        for _ in range(INGEST_BURST):
+            response = ctx.client.post("/api/responses", json=payload)
+            assert response.status_code == 202, response.get_data(as_text=True)
+        assert buffer.flush() == INGEST_BURST
+
+    return run
+
+
+ROSTER_BATCH = 100
+
+
+def _roster_csv(batch: int) -> bytes:
+    lines = ["first_name,last_name,email"]
+    lines.extend(
+        f"Roster,Batch{batch}x{i},roster{batch:04d}.{i:03d}@bench.bytepath.dev"
+        for i in range(ROSTER_BATCH)
+    )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@case("roster.csv_add_drop")
+def csv_add_drop(ctx: BenchmarkContext):
+    def run():
+        body = _roster_csv(next(ctx.counter))
+        added = ctx.client.post(
+            "/api/students/add",
+            data={"file": (BytesIO(body), "add.csv"), "class_id": "1"},
+            content_type="multipart/form-data",
+        )
+        assert added.status_code == 201, added.get_data(as_text=True)
+        dropped = ctx.client.post(
+            "/api/students/drop",
+            data={"file": (BytesIO(body), "drop.csv")},
+            content_type="multipart/form-data",
+        )
+        assert dropped.status_code == 200, dropped.get_data(as_text=True)
+
+    return run
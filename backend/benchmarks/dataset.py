@@ -0,0 +1,54 @@
+"""
+Synthetic benchmark datasets built from the ``init_db`` student archetypes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict
+
+from backend.scripts.generate_dataset import generate_dataset
+
+EMAIL_DOMAIN = "bench.bytepath.dev"
+
+
+@dataclass(frozen=True)
+class Scale:
+    name: str
+    students: int
+    responses_per_student: int
+    classes: int
+    days: int = 45
+
+    @property
+    def responses(self) -> int:
+        return self.students * self.responses_per_student
+
+
+SCALES: Dict[str, Scale] = {
+    "smoke": Scale("smoke", students=40, responses_per_student=10, classes=2),
+    "1k": Scale("1k", students=1_000, responses_per_student=50, classes=4),
+    "10k": Scale("10k", students=10_000, responses_per_student=20, classes=20),
+    # One instructor with 20 sections of 300 students
+    "sections": Scale("sections", students=6_000, responses_per_student=20, classes=20),
+    "100k": Scale("100k", students=100_000, responses_per_student=10, classes=100),
+}
+
+
+def build_dataset(scale: Scale, *, seed: int = 42, workers: int = 1) -> dict:
+    """
+    Populate an empty database with ``scale`` students and responses.
+
+    Delegates to the bulk generator; the same scale and seed always produce
+    the same dataset regardless of ``workers``.
+    """
+
+    return generate_dataset(
+        students=scale.students,
+        classes=scale.classes,
+        days=scale.days,
+        responses_per_student=scale.responses_per_student,
+        seed=seed,
+        workers=workers,
+        email_domain=EMAIL_DOMAIN,
+    )
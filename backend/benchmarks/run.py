@@ -0,0 +1,237 @@
+"""
+Benchmark runner.
+
+Usage::
+
+    python -m backend.benchmarks.run --scale 1k --repeat 5 --output bench.json
+    python -m backend.benchmarks.run --scale 1k --compare bench.json --threshold 0.2
+
+Datasets are generated once per (scale, seed) into ``--data-dir`` and copied
+to a scratch file for each run, so mutating cases (ingest, roster) never leak
+into the next run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from backend.app import create_app
+from backend.benchmarks import cases as case_registry
+from backend.benchmarks.dataset import SCALES, Scale, build_dataset
+from backend.models import db
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent / ".data"
+RESULT_SCHEMA = 1
+
+
+def _app_for(database_path: Path):
+    return create_app(
+        "production",
+        overrides={
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{database_path}",
+            "SLOW_QUERY_THRESHOLD_MS": None,
+            # The stream is off by default; the live ingest case opens its dashboards
+            "LIVE_UPDATES_QUEUE_SIZE": 100,
+            "LIVE_UPDATES_MAX_SUBSCRIBERS": case_registry.LIVE_DASHBOARDS,
+        },
+    )
+
+
+def prepare_database(scale: Scale, *, seed: int, data_dir: Path) -> Path:
+    """Return a pristine dataset file for ``scale``, generating it if needed."""
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    pristine = data_dir / f"bench-{scale.name}-seed{seed}.db"
+    if pristine.exists():
+        return pristine
+
+    building = pristine.with_suffix(".building")
+    if building.exists():
+        building.unlink()
+    app = _app_for(building)
+    with app.app_context():
+        build_dataset(scale, seed=seed)
+        db.engine.dispose()
+    building.rename(pristine)
+    return pristine
+
+
+def _summarise(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    p95_index = max(0, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "iterations": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p95_ms": round(ordered[p95_index], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def run_suite(
+    scale_name: str,
+    *,
+    repeat: int = 5,
+    warmup: int = 1,
+    seed: int = 42,
+    data_dir: Path = DEFAULT_DATA_DIR,
+    selected: Optional[Iterable[str]] = None,
+) -> dict:
+    """Time every (or every selected) case against the ``scale_name`` dataset."""
+
+    scale = SCALES[scale_name]
+    pristine = prepare_database(scale, seed=seed, data_dir=data_dir)
+    scratch = data_dir / f"run-{scale.name}-seed{seed}.db"
+    shutil.copyfile(pristine, scratch)
+
+    names = list(selected) if selected else list(case_registry.CASES)
+    results: Dict[str, dict] = {}
+
+    app = _app_for(scratch)
+    try:
+        with app.app_context():
+            ctx = case_registry.BenchmarkContext(app=app, client=app.test_client(), seed=seed)
+            for name in names:
+                iteration = case_registry.CASES[name](ctx)
+                samples = []
+                for index in range(warmup + repeat):
+                    started = time.perf_counter()
+                    iteration()
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    db.session.remove()
+                    if index >= warmup:
+                        samples.append(elapsed_ms)
+                results[name] = _summarise(samples)
+                while ctx.cleanups:
+                    ctx.cleanups.pop()()
+            db.engine.dispose()
+    finally:
+        scratch.unlink(missing_ok=True)
+
+    return {
+        "schema": RESULT_SCHEMA,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "seed": seed,
+        "scale": {
+            "name": scale.name,
+            "students": scale.students,
+            "classes": scale.classes,
+            "responses": scale.responses,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """
+    Return cases whose median got slower than ``baseline`` by more than
+    ``threshold`` (0.2 == 20%).
+    """
+
+    regressions = []
+    for name, result in current.get("results", {}).items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("median_ms"):
+            continue
+        ratio = result["median_ms"] / previous["median_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                {
+                    "case": name,
+                    "baseline_ms": previous["median_ms"],
+                    "current_ms": result["median_ms"],
+                    "ratio": round(ratio, 3),
+                }
+            )
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return (
+            subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=Path(__file__).resolve().parent,
+            ).stdout.strip()
+            or None
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run BytePath backend benchmarks.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="smoke")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed iterations per case.")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed iterations per case.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument(
+        "--case",
+        dest="cases",
+        action="append",
+        choices=sorted(case_registry.CASES),
+        help="Run only this case (repeatable).",
+    )
+    parser.add_argument("--output", type=Path, help="Write JSON results to this file.")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON results to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed median slowdown versus the baseline (0.2 = 20%%).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results = run_suite(
+        args.scale,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        seed=args.seed,
+        data_dir=args.data_dir,
+        selected=args.cases,
+    )
+
+    for name, summary in results["results"].items():
+        print(f"{name:32s} median {summary['median_ms']:10.2f} ms   p95 {summary['p95_ms']:10.2f} ms")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['case']}: {regression['baseline_ms']} ms -> "
+                f"{regression['current_ms']} ms (x{regression['ratio']})"
+            )
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
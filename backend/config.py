@@ -28,7 +28,112 @@ class Config:
         "GOOGLE_CLIENT_SECRETS_FILE",
         os.path.join(BASE_DIR, "credentials", "client_secret.json"),
     )
+    # Google endpoints used by the sign-in callback (overridable so tests and
+    # staging can point at a stand-in server). The token endpoint defaults to
+    # the token_uri in the client secrets file.
+    GOOGLE_TOKEN_URI = os.environ.get("GOOGLE_TOKEN_URI")
+    GOOGLE_CERTS_URI = os.environ.get(
+        "GOOGLE_CERTS_URI", "https://www.googleapis.com/oauth2/v1/certs"
+    )
+    GOOGLE_USERINFO_URI = os.environ.get(
+        "GOOGLE_USERINFO_URI", "https://openidconnect.googleapis.com/v1/userinfo"
+    )
+    # Per-call timeout and the total time one callback may spend talking to
+    # Google; HTTP connections are pooled (GOOGLE_HTTP_POOL_SIZE per host).
+    GOOGLE_HTTP_TIMEOUT_SECONDS = float(os.environ.get("GOOGLE_HTTP_TIMEOUT_SECONDS", "5"))
+    GOOGLE_LOGIN_DEADLINE_SECONDS = float(os.environ.get("GOOGLE_LOGIN_DEADLINE_SECONDS", "8"))
+    GOOGLE_HTTP_POOL_SIZE = int(os.environ.get("GOOGLE_HTTP_POOL_SIZE", "10"))
     FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://localhost:5173")
+    # Run db.create_all() and topic seeding inside create_app(). Deployments that
+    # manage the schema with init_db/add_columns can switch this off to speed up
+    # worker start.
+    AUTO_CREATE_SCHEMA = os.environ.get("AUTO_CREATE_SCHEMA", "true").lower() != "false"
+    # Per-endpoint latency/SQL histograms exposed on /metrics.
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() != "false"
+    # Log a structured "slow_request" record for requests at or above this many
+    # milliseconds; unset disables slow-request logging.
+    SLOW_REQUEST_THRESHOLD_MS = (
+        float(os.environ["SLOW_REQUEST_THRESHOLD_MS"])
+        if os.environ.get("SLOW_REQUEST_THRESHOLD_MS")
+        else None
+    )
+    # Statements at or above SLOW_QUERY_THRESHOLD_MS are recorded (with redacted
+    # parameters and originating service method); above the EXPLAIN threshold
+    # their query plan is captured too. Set the threshold env var to "off" to
+    # disable recording.
+    SLOW_QUERY_THRESHOLD_MS = (
+        None
+        if os.environ.get("SLOW_QUERY_THRESHOLD_MS", "").lower() == "off"
+        else float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", "200"))
+    )
+    SLOW_QUERY_EXPLAIN_THRESHOLD_MS = float(
+        os.environ.get("SLOW_QUERY_EXPLAIN_THRESHOLD_MS", "500")
+    )
+    SLOW_QUERY_BUFFER_SIZE = int(os.environ.get("SLOW_QUERY_BUFFER_SIZE", "200"))
+    SLOW_QUERY_LOG_FILE = os.environ.get("SLOW_QUERY_LOG_FILE")
+    SLOW_QUERY_LOG_MAX_BYTES = int(os.environ.get("SLOW_QUERY_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+    SLOW_QUERY_LOG_BACKUP_COUNT = int(os.environ.get("SLOW_QUERY_LOG_BACKUP_COUNT", "3"))
+    # "exact" runs COUNT(DISTINCT user_id) for report student counts; "approximate"
+    # maintains HyperLogLog sketches at ingest and answers from them (~1.6%
+    # standard error). Run rebuild_aggregates after switching to "approximate".
+    DISTINCT_COUNT_MODE = os.environ.get("DISTINCT_COUNT_MODE", "exact").lower()
+    # Daily activity buckets are always maintained at ingest; hourly ones are
+    # opt-in because they are ~10x the rows.
+    ACTIVITY_HOURLY_BUCKETS = os.environ.get("ACTIVITY_HOURLY_BUCKETS", "false").lower() == "true"
+    # Columnar analytics snapshots (see backend/scripts/snapshot_analytics.py).
+    # SNAPSHOT_FORMAT is "parquet" (needs pyarrow), "npz" (needs numpy) or
+    # "auto" to use whichever is installed.
+    SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", os.path.join(BASE_DIR, "snapshots"))
+    SNAPSHOT_FORMAT = os.environ.get("SNAPSHOT_FORMAT", "auto").lower()
+    # "numpy" serves the class overview and topic report from per-class NumPy
+    # arrays cached in memory (needs numpy; falls back to SQL without it).
+    ANALYTICS_ENGINE = os.environ.get("ANALYTICS_ENGINE", "sql").lower()
+    ANALYTICS_ENGINE_MAX_CLASSES = int(os.environ.get("ANALYTICS_ENGINE_MAX_CLASSES", "32"))
+    # Recompute leaderboards/at-risk insights in-process every N minutes
+    # (0 disables; prefer `python -m backend.scripts.compute_insights` from cron
+    # when running several workers).
+    INSIGHTS_REFRESH_MINUTES = int(os.environ.get("INSIGHTS_REFRESH_MINUTES", "0"))
+    # Per-process LRU of user identities used by login and session checks
+    # (0 disables). Writes in this process invalidate immediately; the TTL
+    # bounds how long other workers can serve a stale role or name.
+    IDENTITY_CACHE_SIZE = int(os.environ.get("IDENTITY_CACHE_SIZE", "10000"))
+    IDENTITY_CACHE_TTL_SECONDS = float(os.environ.get("IDENTITY_CACHE_TTL_SECONDS", "300"))
+    # Live dashboard stream (GET /api/reports/live): events queued per open
+    # dashboard before it is told to resync (0, the default, disables the
+    # stream), the most dashboards one process serves (keep it below the
+    # worker's --threads), the keep-alive interval and how often every stream
+    # is told to resync. Each worker process only streams the responses it
+    # handled itself; the periodic resync bounds the drift that causes.
+    LIVE_UPDATES_QUEUE_SIZE = int(os.environ.get("LIVE_UPDATES_QUEUE_SIZE", "0"))
+    LIVE_UPDATES_MAX_SUBSCRIBERS = int(os.environ.get("LIVE_UPDATES_MAX_SUBSCRIBERS", "8"))
+    LIVE_UPDATES_HEARTBEAT_SECONDS = float(
+        os.environ.get("LIVE_UPDATES_HEARTBEAT_SECONDS", "15")
+    )
+    LIVE_UPDATES_RESYNC_SECONDS = float(os.environ.get("LIVE_UPDATES_RESYNC_SECONDS", "60"))
+    # "buffered" answers POST /api/responses with 202 once the response is
+    # journaled and writes it from a background flusher, in batches of up to
+    # INGEST_FLUSH_MAX_ROWS every INGEST_FLUSH_INTERVAL_MS (0: only explicit
+    # flushes). Past INGEST_MAX_PENDING waiting rows, requests write
+    # synchronously. "sync" (default) writes every response in its request.
+    INGEST_MODE = os.environ.get("INGEST_MODE", "sync").lower()
+    INGEST_JOURNAL_DIR = os.environ.get(
+        "INGEST_JOURNAL_DIR", os.path.join(BASE_DIR, "ingest_journal")
+    )
+    INGEST_FLUSH_INTERVAL_MS = int(os.environ.get("INGEST_FLUSH_INTERVAL_MS", "200"))
+    INGEST_FLUSH_MAX_ROWS = int(os.environ.get("INGEST_FLUSH_MAX_ROWS", "500"))
+    INGEST_MAX_PENDING = int(os.environ.get("INGEST_MAX_PENDING", "10000"))
+    # "server" keeps session data (OAuth tokens, cached role/name) in the
+    # server_sessions table with only an opaque id in the cookie; "cookie"
+    # restores Flask's signed-cookie sessions.
+    SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "server").lower()
+    SESSION_CLEANUP_INTERVAL_SECONDS = float(
+        os.environ.get("SESSION_CLEANUP_INTERVAL_SECONDS", "3600")
+    )
+    # How long the role/name cached in a session is trusted before it is
+    # re-checked against the user record.
+    SESSION_IDENTITY_MAX_AGE_SECONDS = float(
+        os.environ.get("SESSION_IDENTITY_MAX_AGE_SECONDS", "60")
+    )
 
 
 class DevelopmentConfig(Config):
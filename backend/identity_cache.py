@@ -0,0 +1,230 @@
+"""
+Per-process identity cache for authenticated requests.
+
+Holds a read-only snapshot (id, email, name, role, class) of recently seen users,
+keyed by user id with a secondary index on the lower-cased email, in a
+bounded LRU whose entries also expire after ``IDENTITY_CACHE_TTL_SECONDS``.
+Logins populate it; session checks, ``instructor_required`` and the
+response/progress routes read from it instead of querying ``users``.
+
+Entries are dropped whenever a ``User`` or ``RosterStudent`` row is flushed
+or committed through the ORM, and the whole cache is cleared by bulk
+``UPDATE``/``DELETE`` statements against those tables. Other processes only
+see the change once their entry expires, so the TTL bounds cross-worker
+staleness.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.models import RosterStudent, User
+
+EXTENSION_KEY = "bytepath_identity_cache"
+WATCHED_TABLES = {User.__tablename__, RosterStudent.__tablename__}
+
+
+@dataclass(frozen=True)
+class Identity:
+    """Detached, immutable view of a user for authorization checks."""
+
+    id: int
+    email: str
+    name: str
+    role: str
+    # Class stamped on this user's responses/progress (newest roster entry)
+    class_id: Optional[int] = None
+
+    @classmethod
+    def from_row(cls, row) -> "Identity":
+        return cls(**row._mapping)
+
+
+class IdentityCache:
+    """Thread-safe LRU of ``Identity`` objects with a time-to-live."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[int, Tuple[Identity, float]]" = OrderedDict()
+        self._emails: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> Optional[Identity]:
+        with self._lock:
+            return self._lookup(user_id)
+
+    def get_by_email(self, email: str) -> Optional[Identity]:
+        with self._lock:
+            user_id = self._emails.get(email.lower())
+            if user_id is None:
+                self.misses += 1
+                return None
+            return self._lookup(user_id)
+
+    def put(self, identity: Identity) -> None:
+        with self._lock:
+            self._remove(identity.id)
+            self._entries[identity.id] = (identity, self._clock() + self.ttl_seconds)
+            self._emails[identity.email.lower()] = identity.id
+            while len(self._entries) > self.max_entries:
+                user_id, _ = next(iter(self._entries.items()))
+                self._remove(user_id)
+                self.evictions += 1
+
+    def invalidate(self, *, user_id: Optional[int] = None, email: Optional[str] = None) -> None:
+        with self._lock:
+            if email is not None:
+                mapped = self._emails.pop(email.lower(), None)
+                if mapped is not None and self._remove(mapped):
+                    self.invalidations += 1
+            if user_id is not None and self._remove(user_id):
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._emails.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def render_prometheus(self) -> str:
+        stats = self.stats()
+        lines = [
+            "# HELP bytepath_identity_cache_entries Identities currently cached.",
+            "# TYPE bytepath_identity_cache_entries gauge",
+            f"bytepath_identity_cache_entries {stats['size']}",
+        ]
+        for name in ("hits", "misses", "evictions", "invalidations"):
+            lines.append(f"# HELP bytepath_identity_cache_{name}_total Identity cache {name}.")
+            lines.append(f"# TYPE bytepath_identity_cache_{name}_total counter")
+            lines.append(f"bytepath_identity_cache_{name}_total {stats[name]}")
+        return "\n".join(lines) + "\n"
+
+    def _lookup(self, user_id: int) -> Optional[Identity]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        identity, expires_at = entry
+        if expires_at <= self._clock():
+            self._remove(user_id)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return identity
+
+    def _remove(self, user_id: int) -> bool:
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return False
+        email = entry[0].email.lower()
+        if self._emails.get(email) == user_id:
+            del self._emails[email]
+        return True
+
+
+def init_app(app: Flask) -> Optional[IdentityCache]:
+    """Create the cache for ``app`` unless ``IDENTITY_CACHE_SIZE`` is 0."""
+
+    max_entries = app.config.get("IDENTITY_CACHE_SIZE", 10_000)
+    if not max_entries:
+        return None
+
+    cache = IdentityCache(
+        max_entries=max_entries,
+        ttl_seconds=app.config.get("IDENTITY_CACHE_TTL_SECONDS", 300.0),
+    )
+    app.extensions[EXTENSION_KEY] = cache
+    _install_listeners()
+    return cache
+
+
+def get_cache() -> Optional[IdentityCache]:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get(EXTENSION_KEY)
+
+
+_listeners_installed = False
+_listeners_lock = threading.Lock()
+_PENDING_KEY = "bytepath_identity_invalidations"
+
+
+def _install_listeners() -> None:
+    global _listeners_installed
+    with _listeners_lock:
+        if _listeners_installed:
+            return
+        event.listen(Session, "after_flush", _after_flush)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
+        _listeners_installed = True
+
+
+def _after_flush(session, flush_context) -> None:
+    cache = get_cache()
+    if cache is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, User):
+            pending.add((instance.id, instance.email))
+        elif isinstance(instance, RosterStudent):
+            pending.add((None, instance.email))
+    # Drop now so this session's own reads miss, and again at commit so a
+    # concurrent request cannot re-cache the pre-commit row.
+    for user_id, email in pending:
+        cache.invalidate(user_id=user_id, email=email)
+
+
+def _after_commit(session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    cache = get_cache()
+    if cache is None or not pending:
+        return
+    for user_id, email in pending:
+        cache.invalidate(user_id=user_id, email=email)
+
+
+def _do_orm_execute(state) -> None:
+    if not (state.is_update or state.is_delete):
+        return
+    table = getattr(state.statement, "table", None)
+    if table is not None and getattr(table, "name", None) in WATCHED_TABLES:
+        cache = get_cache()
+        if cache is not None:
+            cache.clear()
@@ -0,0 +1,401 @@
+"""
+Write-behind buffer for ``POST /api/responses`` (``INGEST_MODE=buffered``).
+
+The route validates a response, appends it to the journal and answers 202.
+A flusher thread writes what has accumulated every
+``INGEST_FLUSH_INTERVAL_MS``, or as soon as ``INGEST_FLUSH_MAX_ROWS`` are
+waiting, with ``ResponseService.record_batch``: one transaction per batch,
+progress incremented once per student and topic.
+
+The journal is a directory (``INGEST_JOURNAL_DIR``) of append-only
+JSON-lines segments, one per batch. A response is on disk before the client
+hears back, so a crashed worker loses nothing it accepted (an OS crash can
+still lose the last writes: lines are not fsynced). Writing a batch also
+inserts an ``ingest_batches`` row named after its segment, in the same
+transaction; the segment file is deleted afterwards. Recovery, run when the
+buffer starts, replays segments without such a row and deletes the others,
+so every journaled response is written exactly once. Each process holds a
+lock on the segments it owns, so recovery skips those of live workers.
+
+A batch that fails on its data is retried one row at a time, each row with
+its own ``<segment>#<index>`` marker; rows that still fail are appended to
+``rejected/<segment>`` in the journal directory and logged, so one bad row
+cannot hold back the rows journaled after it. Database errors
+(``OperationalError``: locked, unreachable) leave the segment to be retried
+whole by the next flush.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy.exc import OperationalError
+
+from backend.models import db
+from backend.repositories import ingest_repository
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - Windows has no flock
+    fcntl = None
+
+EXTENSION_KEY = "bytepath_ingest_buffer"
+# Markers of deleted segments are normally dropped by the next flush; any left
+# behind by a crash are pruned at recovery once they are this old
+MARKER_RETENTION = timedelta(hours=1)
+
+logger = logging.getLogger(__name__)
+
+
+class Segment:
+    """One journal file, locked by the process appending to or replaying it."""
+
+    def __init__(self, path: Path, handle) -> None:
+        self.path = path
+        self.rows: List[Dict] = []
+        # Row markers committed so far, once the segment is written row by row
+        self.written_rows: Optional[Set[str]] = None
+        self._handle = handle
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @classmethod
+    def create(cls, directory: Path) -> "Segment":
+        # Millisecond prefix: recovery replays segments in the order they were written
+        name = f"{int(time.time() * 1000):013d}-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl"
+        path = directory / name
+        handle = open(path, "a", encoding="utf-8")
+        _lock(handle)
+        return cls(path, handle)
+
+    @classmethod
+    def take_over(cls, path: Path) -> Optional["Segment"]:
+        """Open an existing segment, or ``None`` if another process holds it."""
+
+        try:
+            handle = open(path, "r+", encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        if not _lock(handle, wait=False):
+            handle.close()
+            return None
+        segment = cls(path, handle)
+        try:
+            for line in handle:
+                if not line.endswith("\n"):
+                    break  # torn final write: the client never got its 202
+                segment.rows.append(json.loads(line))
+        except ValueError:
+            handle.close()
+            raise
+        return segment
+
+    def append(self, row: Dict) -> None:
+        self._handle.write(json.dumps(row, separators=(",", ":")) + "\n")
+        self._handle.flush()
+        self.rows.append(row)
+
+    def remove(self) -> None:
+        # Unlink while still locked, so nobody can take over a written segment
+        self.path.unlink(missing_ok=True)
+        self._handle.close()
+
+    def release(self) -> None:
+        """Unlock the segment and leave it on disk for a later recovery."""
+
+        self._handle.close()
+
+
+def _lock(handle, *, wait: bool = True) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+    except OSError:
+        return False
+    return True
+
+
+class IngestBuffer:
+    """Journaled queue of accepted responses, written in batches."""
+
+    def __init__(
+        self,
+        app: Flask,
+        journal_dir: Path,
+        *,
+        write_batch: Callable[[List[Dict]], object],
+        flush_interval_ms: int = 200,
+        max_rows: int = 500,
+        max_pending: int = 10_000,
+    ) -> None:
+        self.app = app
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_interval_ms = flush_interval_ms
+        self.max_rows = max_rows
+        self.max_pending = max_pending
+        self._write_batch = write_batch
+        self._active: Optional[Segment] = None
+        self._sealed: Deque[Segment] = deque()
+        # Segments written and deleted whose markers the next batch drops
+        self._written: List[str] = []
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.dead_lettered = 0
+
+    def submit(self, row: Dict) -> bool:
+        """
+        Journal ``row`` for the next batch. ``False`` when ``max_pending``
+        rows are already waiting (the caller should write it directly).
+        """
+
+        with self._lock:
+            if self._stop.is_set() or self._pending >= self.max_pending:
+                self.rejected += 1
+                return False
+            if self._active is None:
+                self._active = Segment.create(self.journal_dir)
+            self._active.append(row)
+            self._pending += 1
+            self.accepted += 1
+            full = len(self._active.rows) >= self.max_rows
+        if full:
+            self._wake.set()
+        return True
+
+    def flush(self) -> int:
+        """
+        Write every waiting row now; returns how many left the buffer
+        (rejected rows included).
+        """
+
+        with self._flush_lock:
+            with self._lock:
+                if self._active is not None:
+                    self._sealed.append(self._active)
+                    self._active = None
+            written = 0
+            while self._sealed:
+                segment = self._sealed[0]
+                try:
+                    markers = self._write_segment(segment)
+                except Exception:
+                    # Left sealed and journaled; the next flush retries it
+                    self.failures += 1
+                    logger.exception("ingest batch %s failed", segment.name)
+                    break
+                self._sealed.popleft()
+                segment.remove()
+                self._written.extend(markers)
+                written += len(segment.rows)
+                with self._lock:
+                    self._pending -= len(segment.rows)
+            return written
+
+    def recover(self) -> int:
+        """
+        Replay segments left by processes that stopped before writing them;
+        returns the number of responses replayed.
+        """
+
+        replayed = 0
+        with self._flush_lock:
+            owned = {segment.name for segment in self._sealed}
+            if self._active is not None:
+                owned.add(self._active.name)
+            for path in sorted(self.journal_dir.glob("*.jsonl")):
+                if path.name in owned:
+                    continue
+                try:
+                    segment = Segment.take_over(path)
+                except (OSError, ValueError):
+                    self.failures += 1
+                    logger.exception("ingest segment %s is unreadable; left in place", path.name)
+                    continue
+                if segment is None:
+                    continue
+                try:
+                    count, markers = self._replay(segment)
+                except Exception:
+                    # Kept on disk, so the next start tries it again
+                    self.failures += 1
+                    logger.exception("replaying ingest segment %s failed", segment.name)
+                    segment.release()
+                    continue
+                segment.remove()
+                self._written.extend(markers)
+                replayed += count
+            try:
+                with self.app.app_context():
+                    on_disk = [path.name for path in self.journal_dir.glob("*.jsonl")]
+                    ingest_repository.prune(on_disk, before=datetime.utcnow() - MARKER_RETENTION)
+                    db.session.remove()
+            except Exception:
+                logger.exception("pruning ingest markers failed")
+        if replayed:
+            logger.warning("replayed %d journaled responses", replayed)
+        return replayed
+
+    def start(self) -> None:
+        """Flush in a daemon thread; with an interval of 0, only ``flush()`` writes."""
+
+        if self._thread is not None or self.flush_interval_ms <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="ingest-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop accepting rows and write what is buffered."""
+
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = self._pending
+        return {
+            "pending": pending,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dead_lettered": self.dead_lettered,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval_ms / 1000)
+            self._wake.clear()
+            self.flush()
+
+    def _replay(self, segment: Segment) -> Tuple[int, List[str]]:
+        """
+        Write a segment left by another process unless it already was;
+        returns the rows replayed and the segment's markers.
+        """
+
+        with self.app.app_context():
+            already_written = ingest_repository.is_written(segment.name)
+            parts = ingest_repository.written_parts(segment.name)
+            db.session.remove()
+        if already_written or not segment.rows:
+            return 0, [segment.name]
+        if parts:
+            # A row-by-row write was interrupted: finish it the same way
+            segment.written_rows = parts
+        return len(segment.rows) - len(parts), self._write_segment(segment)
+
+    def _write_segment(self, segment: Segment) -> List[str]:
+        """Write ``segment`` and return the markers its deletion makes obsolete."""
+
+        if segment.written_rows is None:
+            try:
+                self._write(segment.name, segment.rows)
+                return [segment.name]
+            except OperationalError:
+                raise
+            except Exception:
+                logger.exception("ingest batch %s failed; writing it row by row", segment.name)
+                segment.written_rows = set()
+        for index, row in enumerate(segment.rows):
+            marker = f"{segment.name}#{index}"
+            if marker in segment.written_rows:
+                continue
+            try:
+                self._write(marker, [row])
+            except OperationalError:
+                raise
+            except Exception:
+                logger.exception("ingest row %s rejected", marker)
+                self._reject(segment, marker, row)
+            segment.written_rows.add(marker)
+        return sorted(segment.written_rows)
+
+    def _reject(self, segment: Segment, marker: str, row: Dict) -> None:
+        rejected = self.journal_dir / "rejected"
+        rejected.mkdir(exist_ok=True)
+        with open(rejected / segment.name, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(row, separators=(",", ":"), default=str) + "\n")
+        # A marker without responses, so a replay does not reject the row twice
+        self._write(marker, [], count=False)
+        self.dead_lettered += 1
+
+    def _write(self, marker: str, rows: List[Dict], *, count: bool = True) -> None:
+        with self.app.app_context():
+            try:
+                ingest_repository.forget(self._written)
+                ingest_repository.mark_written(marker, len(rows))
+                if rows:
+                    # Commits the marker (and dropped markers) with the responses
+                    self._write_batch(rows)
+                else:
+                    db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+        self._written = []
+        if count:
+            self.flushed += len(rows)
+            self.batches += 1
+
+
+def start(app: Flask) -> Optional[IngestBuffer]:
+    """
+    Create, recover and start the buffer when ``INGEST_MODE`` is
+    ``buffered``; ``None`` otherwise.
+    """
+
+    if app.config.get("INGEST_MODE", "sync") != "buffered":
+        return None
+
+    from backend.services.response_service import ResponseService
+
+    buffer = IngestBuffer(
+        app,
+        app.config["INGEST_JOURNAL_DIR"],
+        write_batch=ResponseService.record_batch,
+        flush_interval_ms=app.config.get("INGEST_FLUSH_INTERVAL_MS", 200),
+        max_rows=app.config.get("INGEST_FLUSH_MAX_ROWS", 500),
+        max_pending=app.config.get("INGEST_MAX_PENDING", 10_000),
+    )
+    buffer.recover()
+    buffer.start()
+    atexit.register(buffer.stop)
+    app.extensions[EXTENSION_KEY] = buffer
+    return buffer
+
+
+def get_buffer() -> Optional[IngestBuffer]:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get(EXTENSION_KEY)
@@ -3,15 +3,71 @@ from __future__ import annotations
 import argparse
 import random
 from datetime import datetime, timedelta, timezone
-from typing import Iterable
+from typing import Iterable, Sequence
 
 from sqlalchemy import func
 
 from backend.app import create_app
 from backend.models import StudentProgress, StudentResponse, Topic, User, db
+from backend.repositories import (
+    activity_repository,
+    question_repository,
+    question_stats_repository,
+)
 from backend.topic_definitions import DEFAULT_TOPICS, TOPIC_DEFINITIONS, TOPIC_META_BY_ID
 
 
+STUDENT_PROFILES = (
+    ("mia.hughes@bytepath.dev", "Mia Hughes", "strong"),
+    ("liam.patel@bytepath.dev", "Liam Patel", "strong"),
+    ("noah.smith@bytepath.dev", "Noah Smith", "strong"),
+    ("emma.jones@bytepath.dev", "Emma Jones", "strong"),
+    ("olivia.brown@bytepath.dev", "Olivia Brown", "average"),
+    ("ava.davis@bytepath.dev", "Ava Davis", "average"),
+    ("isabella.martinez@bytepath.dev", "Isabella Martinez", "average"),
+    ("sophia.garcia@bytepath.dev", "Sophia Garcia", "average"),
+    ("jackson.lee@bytepath.dev", "Jackson Lee", "average"),
+    ("logan.moore@bytepath.dev", "Logan Moore", "average"),
+    ("harper.clark@bytepath.dev", "Harper Clark", "struggling"),
+    ("elijah.thomas@bytepath.dev", "Elijah Thomas", "struggling"),
+    ("amelia.white@bytepath.dev", "Amelia White", "struggling"),
+    ("lucas.harris@bytepath.dev", "Lucas Harris", "struggling"),
+    ("zoe.king@bytepath.dev", "Zoe King", "inactive"),
+    ("aiden.scott@bytepath.dev", "Aiden Scott", "inactive"),
+)
+
+ARCHETYPE_CONFIG = {
+    "strong": {
+        "accuracy": (0.82, 0.95),
+        "questions": (70, 90),
+        "avg_time": 48,
+        "time_sd": 12,
+        "skip_rate": 0.02,
+    },
+    "average": {
+        "accuracy": (0.68, 0.8),
+        "questions": (55, 75),
+        "avg_time": 55,
+        "time_sd": 15,
+        "skip_rate": 0.04,
+    },
+    "struggling": {
+        "accuracy": (0.42, 0.65),
+        "questions": (40, 60),
+        "avg_time": 65,
+        "time_sd": 18,
+        "skip_rate": 0.07,
+    },
+    "inactive": {
+        "accuracy": (0.45, 0.7),
+        "questions": (5, 12),
+        "avg_time": 70,
+        "time_sd": 20,
+        "skip_rate": 0.1,
+    },
+}
+
+
 def _utc_now() -> datetime:
     """Return a naive datetime representing the current UTC time."""
 
@@ -67,6 +123,76 @@ def _seed_users() -> None:
             db.session.add(User(email=email, name=name, role=role))
 
 
+def build_response_row(
+    rng,
+    *,
+    user_id: int,
+    config: dict,
+    accuracy_target: float,
+    topic_ids: Sequence[str],
+    start_datetime: datetime,
+    days: int = 45,
+) -> dict:
+    """
+    Generate the column values for one synthetic response.
+
+    ``rng`` is anything with the ``random`` module API (the module itself or a
+    ``random.Random`` instance); draws happen in a fixed order so a seeded rng
+    reproduces the same rows.
+    """
+
+    topic_id = rng.choice(topic_ids)
+    topic_meta = TOPIC_META_BY_ID[topic_id]
+    subtopic = rng.choice(topic_meta["subtopics"])
+
+    base_value = rng.randint(2, 12)
+    question_code = (
+        "# BytePath auto-generated question\n"
+        f"# Topic: {topic_id}\n"
+        f"# Subtopic: {subtopic}\n"
+        f"value = {base_value}\n"
+        "answer = value * 2\n"
+        "answer"
+    )
+    correct_answer = str(base_value * 2)
+
+    is_correct = rng.random() < accuracy_target
+    skip = False
+    if not is_correct and rng.random() < config["skip_rate"]:
+        skip = True
+        status = "skipped"
+        student_answer = None
+        time_spent = rng.randint(5, 20)
+    else:
+        status = "correct" if is_correct else "incorrect"
+        student_answer = (
+            correct_answer if is_correct else str(base_value * 2 + rng.randint(1, 3))
+        )
+        time_raw = rng.gauss(config["avg_time"], config["time_sd"])
+        if is_correct:
+            time_raw *= rng.uniform(0.85, 1.05)
+        time_spent = max(8, min(240, int(time_raw)))
+
+    attempted_at = start_datetime + timedelta(
+        days=rng.randint(0, days),
+        seconds=rng.randint(0, 86_399),
+    )
+    attempted_at = min(attempted_at, _utc_now())
+
+    return {
+        "user_id": user_id,
+        "topic": topic_id,
+        "subtopic_type": subtopic,
+        "question_code": question_code,
+        "student_answer": student_answer,
+        "correct_answer": correct_answer,
+        "is_correct": is_correct and not skip,
+        "status": status,
+        "time_spent": time_spent,
+        "attempted_at": attempted_at,
+    }
+
+
 def seed_realistic_dataset() -> None:
     """Populate the database with a realistic set of users, responses, and progress."""
 
@@ -91,58 +217,8 @@ def seed_realistic_dataset() -> None:
         db.session.add(instructor)
         db.session.flush()
 
-    student_profiles = [
-        ("mia.hughes@bytepath.dev", "Mia Hughes", "strong"),
-        ("liam.patel@bytepath.dev", "Liam Patel", "strong"),
-        ("noah.smith@bytepath.dev", "Noah Smith", "strong"),
-        ("emma.jones@bytepath.dev", "Emma Jones", "strong"),
-        ("olivia.brown@bytepath.dev", "Olivia Brown", "average"),
-        ("ava.davis@bytepath.dev", "Ava Davis", "average"),
-        ("isabella.martinez@bytepath.dev", "Isabella Martinez", "average"),
-        ("sophia.garcia@bytepath.dev", "Sophia Garcia", "average"),
-        ("jackson.lee@bytepath.dev", "Jackson Lee", "average"),
-        ("logan.moore@bytepath.dev", "Logan Moore", "average"),
-        ("harper.clark@bytepath.dev", "Harper Clark", "struggling"),
-        ("elijah.thomas@bytepath.dev", "Elijah Thomas", "struggling"),
-        ("amelia.white@bytepath.dev", "Amelia White", "struggling"),
-        ("lucas.harris@bytepath.dev", "Lucas Harris", "struggling"),
-        ("zoe.king@bytepath.dev", "Zoe King", "inactive"),
-        ("aiden.scott@bytepath.dev", "Aiden Scott", "inactive"),
-    ]
-
-    archetype_config = {
-        "strong": {
-            "accuracy": (0.82, 0.95),
-            "questions": (70, 90),
-            "avg_time": 48,
-            "time_sd": 12,
-            "skip_rate": 0.02,
-        },
-        "average": {
-            "accuracy": (0.68, 0.8),
-            "questions": (55, 75),
-            "avg_time": 55,
-            "time_sd": 15,
-            "skip_rate": 0.04,
-        },
-        "struggling": {
-            "accuracy": (0.42, 0.65),
-            "questions": (40, 60),
-            "avg_time": 65,
-            "time_sd": 18,
-            "skip_rate": 0.07,
-        },
-        "inactive": {
-            "accuracy": (0.45, 0.7),
-            "questions": (5, 12),
-            "avg_time": 70,
-            "time_sd": 20,
-            "skip_rate": 0.1,
-        },
-    }
-
     students = []
-    for email, name, archetype in student_profiles:
+    for email, name, archetype in STUDENT_PROFILES:
         user = db.session.execute(db.select(User).filter_by(email=email)).scalar_one_or_none()
         if not user:
             user = User(email=email, name=name, role="student")
@@ -161,63 +237,27 @@ def seed_realistic_dataset() -> None:
 
     for student in students:
         archetype = student["archetype"]
-        config = archetype_config[archetype]
+        config = ARCHETYPE_CONFIG[archetype]
         user: User = student["user"]
 
         target_questions = random.randint(*config["questions"])
         accuracy_target = random.uniform(*config["accuracy"])
 
         for _ in range(target_questions):
-            topic_id = random.choice(topic_ids)
-            topic_meta = TOPIC_META_BY_ID[topic_id]
-            subtopic = random.choice(topic_meta["subtopics"])
-
-            base_value = random.randint(2, 12)
-            question_code = (
-                "# BytePath auto-generated question\n"
-                f"# Topic: {topic_id}\n"
-                f"# Subtopic: {subtopic}\n"
-                f"value = {base_value}\n"
-                "answer = value * 2\n"
-                "answer"
-            )
-            correct_answer = str(base_value * 2)
-
-            is_correct = random.random() < accuracy_target
-            skip = False
-            if not is_correct and random.random() < config["skip_rate"]:
-                skip = True
-                status = "skipped"
-                student_answer = None
-                time_spent = random.randint(5, 20)
-            else:
-                status = "correct" if is_correct else "incorrect"
-                student_answer = (
-                    correct_answer if is_correct else str(base_value * 2 + random.randint(1, 3))
-                )
-                time_raw = random.gauss(config["avg_time"], config["time_sd"])
-                if is_correct:
-                    time_raw *= random.uniform(0.85, 1.05)
-                time_spent = max(8, min(240, int(time_raw)))
-
-            attempted_at = start_datetime + timedelta(
-                days=random.randint(0, 45),
-                seconds=random.randint(0, 86_399),
-            )
-            attempted_at = min(attempted_at, _utc_now())
-
-            response = StudentResponse(
+            row = build_response_row(
+                random,
                 user_id=user.id,
-                topic=topic_id,
-                subtopic_type=subtopic,
-                question_code=question_code,
-                student_answer=student_answer,
-                correct_answer=correct_answer,
-                is_correct=is_correct and not skip,
-                status=status,
-                time_spent=time_spent,
-                attempted_at=attempted_at,
+                config=config,
+                accuracy_target=accuracy_target,
+                topic_ids=topic_ids,
+                start_datetime=start_datetime,
+            )
+            topic_id = row["topic"]
+            attempted_at = row["attempted_at"]
+            row["question_id"] = question_repository.get_or_create_id(
+                row.pop("question_code"), row["subtopic_type"], row.pop("correct_answer")
             )
+            response = StudentResponse(**row)
             db.session.add(response)
             responses_created += 1
 
@@ -231,7 +271,7 @@ def seed_realistic_dataset() -> None:
                 },
             )
             summary["attempts"] = int(summary["attempts"]) + 1
-            if is_correct and not skip:
+            if row["is_correct"]:
                 summary["correct"] = int(summary.get("correct", 0)) + 1
             summary["last_accessed"] = max(summary["last_accessed"], attempted_at)
 
@@ -275,6 +315,8 @@ def seed_realistic_dataset() -> None:
             progress.last_accessed = summary["last_accessed"]
 
     db.session.commit()
+    question_stats_repository.rebuild()
+    activity_repository.rebuild()
 
     print(
         f"Seeded realistic dataset: {len(students)} students, "
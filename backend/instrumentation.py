@@ -0,0 +1,260 @@
+"""
+Per-request instrumentation for the BytePath API.
+
+Records latency, SQL statement counts/time and response sizes for every
+request, keyed by blueprint and endpoint, and renders them in the Prometheus
+text exposition format for the ``/metrics`` endpoint.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, Response, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("backend.requests")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+SQL_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+EXTENSION_KEY = "bytepath_metrics"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram matching Prometheus semantics."""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        running = 0
+        rows = []
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            rows.append((_format_bound(bound), running))
+        rows.append(("+Inf", running + self.counts[-1]))
+        return rows
+
+
+class MetricsRegistry:
+    """Thread-safe store of per-endpoint request metrics."""
+
+    HISTOGRAMS = {
+        "bytepath_request_duration_seconds": (
+            LATENCY_BUCKETS,
+            "Request latency in seconds.",
+        ),
+        "bytepath_request_sql_statements": (
+            SQL_COUNT_BUCKETS,
+            "SQL statements executed per request.",
+        ),
+        "bytepath_request_sql_seconds": (
+            SQL_TIME_BUCKETS,
+            "Total SQL execution time per request in seconds.",
+        ),
+        "bytepath_response_size_bytes": (
+            SIZE_BUCKETS,
+            "Response body size in bytes.",
+        ),
+    }
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {
+            name: {} for name in self.HISTOGRAMS
+        }
+        self._requests: Dict[LabelKey, int] = {}
+
+    def observe_request(
+        self,
+        *,
+        blueprint: str,
+        endpoint: str,
+        method: str,
+        status: int,
+        duration: float,
+        sql_count: int,
+        sql_seconds: float,
+        response_size: Optional[int],
+    ) -> None:
+        labels: LabelKey = (
+            ("blueprint", blueprint),
+            ("endpoint", endpoint),
+            ("method", method),
+        )
+        with self._lock:
+            self._observe("bytepath_request_duration_seconds", labels, duration)
+            self._observe("bytepath_request_sql_statements", labels, sql_count)
+            self._observe("bytepath_request_sql_seconds", labels, sql_seconds)
+            if response_size is not None:
+                self._observe("bytepath_response_size_bytes", labels, response_size)
+            counter_key = labels + (("status", str(status)),)
+            self._requests[counter_key] = self._requests.get(counter_key, 0) + 1
+
+    def _observe(self, name: str, labels: LabelKey, value: float) -> None:
+        series = self._histograms[name]
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = Histogram(self.HISTOGRAMS[name][0])
+        histogram.observe(value)
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            lines.append("# HELP bytepath_requests_total Requests handled, by endpoint and status.")
+            lines.append("# TYPE bytepath_requests_total counter")
+            for labels, value in sorted(self._requests.items()):
+                lines.append(f"bytepath_requests_total{_format_labels(labels)} {value}")
+
+            for name, (_, help_text) in self.HISTOGRAMS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    for bound, count in histogram.cumulative():
+                        bucket_labels = labels + (("le", bound),)
+                        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def init_app(app: Flask) -> MetricsRegistry:
+    """Register request hooks and the ``/metrics`` endpoint on ``app``."""
+
+    registry = MetricsRegistry()
+    app.extensions[EXTENSION_KEY] = registry
+    _install_sql_listeners()
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_started = time.perf_counter()
+        g._sql_count = 0
+        g._sql_seconds = 0.0
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop("_metrics_started", None)
+        if started is None:
+            return response
+
+        duration = time.perf_counter() - started
+        sql_count = g.pop("_sql_count", 0)
+        sql_seconds = g.pop("_sql_seconds", 0.0)
+        response_size = None if response.is_streamed else response.calculate_content_length()
+        blueprint = request.blueprint or ""
+        endpoint = request.endpoint or "unmatched"
+
+        registry.observe_request(
+            blueprint=blueprint,
+            endpoint=endpoint,
+            method=request.method,
+            status=response.status_code,
+            duration=duration,
+            sql_count=sql_count,
+            sql_seconds=sql_seconds,
+            response_size=response_size,
+        )
+
+        threshold_ms = app.config.get("SLOW_REQUEST_THRESHOLD_MS")
+        if threshold_ms is not None and duration * 1000 >= threshold_ms:
+            logger.warning(
+                json.dumps(
+                    {
+                        "event": "slow_request",
+                        "method": request.method,
+                        "path": request.path,
+                        "blueprint": blueprint,
+                        "endpoint": endpoint,
+                        "status": response.status_code,
+                        "duration_ms": round(duration * 1000, 2),
+                        "sql_statements": sql_count,
+                        "sql_ms": round(sql_seconds * 1000, 2),
+                        "response_bytes": response_size,
+                    }
+                )
+            )
+        return response
+
+    @app.get("/metrics")
+    def metrics():
+        """Expose request metrics in Prometheus text format."""
+
+        from backend import identity_cache
+
+        body = registry.render_prometheus()
+        cache = identity_cache.get_cache()
+        if cache is not None:
+            body += cache.render_prometheus()
+        return Response(body, mimetype="text/plain; version=0.0.4")
+
+    return registry
+
+
+_listeners_installed = False
+_listeners_lock = threading.Lock()
+
+
+def _install_sql_listeners() -> None:
+    """Attach cursor hooks to every Engine exactly once per process."""
+
+    global _listeners_installed
+    with _listeners_lock:
+        if _listeners_installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listeners_installed = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_bytepath_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_bytepath_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if has_app_context() and "_sql_count" in g:
+        g._sql_count += 1
+        g._sql_seconds += elapsed
+
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    rendered = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + rendered + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_bound(bound: float) -> str:
+    return str(int(bound)) if float(bound).is_integer() else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
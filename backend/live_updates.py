@@ -0,0 +1,160 @@
+"""
+In-process pub/sub behind the live instructor dashboard.
+
+``ResponseService.create_response`` publishes one event per committed
+response; ``GET /api/reports/live`` streams them to dashboards as
+server-sent events. Each event is encoded once and appended to the bounded
+queue of every matching subscriber, so open dashboards cost one fan-out per
+response rather than one overview recompute per poll.
+
+A subscriber that falls ``LIVE_UPDATES_QUEUE_SIZE`` events behind has its
+queue dropped and receives a single ``resync`` event instead: the dashboard
+reloads the overview and carries on from there.
+
+Events only reach dashboards connected to the same process as the write, so
+under several worker processes a dashboard misses the responses the others
+handle. Streams therefore also send a ``resync`` every
+``LIVE_UPDATES_RESYNC_SECONDS``, bounding how far a dashboard drifts from the
+real overview. Each open stream holds a request thread for its lifetime, so
+the stream is off by default (``LIVE_UPDATES_QUEUE_SIZE=0``) and needs a
+threaded worker (``gunicorn --worker-class gthread --threads``) when on.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from typing import Dict, Optional, Set
+
+from flask import Flask, current_app, has_app_context
+
+EXTENSION_KEY = "bytepath_live_updates"
+RESYNC_FRAME = 'event: resync\ndata: {"reason": "subscriber fell behind"}\n\n'
+PERIODIC_RESYNC_FRAME = 'event: resync\ndata: {"reason": "periodic"}\n\n'
+
+
+def format_frame(event: str, data: Dict, event_id: Optional[int] = None) -> str:
+    """One server-sent event; ``data`` is serialised as a single JSON line."""
+
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """One dashboard's bounded queue of encoded frames."""
+
+    def __init__(self, class_id: Optional[int], max_queue: int) -> None:
+        # None: events from every class
+        self.class_id = class_id
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._frames: deque = deque()
+        self._overflowed = False
+        self._ready = threading.Condition()
+
+    def wants(self, class_id: Optional[int]) -> bool:
+        return self.class_id is None or self.class_id == class_id
+
+    def push(self, frame: str) -> None:
+        with self._ready:
+            if len(self._frames) >= self.max_queue:
+                self.dropped += len(self._frames)
+                self._frames.clear()
+                self._overflowed = True
+            self._frames.append(frame)
+            self._ready.notify()
+
+    def next_frame(self, timeout: float) -> Optional[str]:
+        """The next frame, or ``None`` if nothing arrived within ``timeout``."""
+
+        with self._ready:
+            if not self._frames and not self._overflowed:
+                self._ready.wait(timeout)
+            if self._overflowed:
+                self._overflowed = False
+                return RESYNC_FRAME
+            return self._frames.popleft() if self._frames else None
+
+
+class LiveUpdateBroker:
+    """Thread-safe registry of subscriptions with fan-out publishing."""
+
+    def __init__(self, *, max_queue: int = 100, max_subscribers: int = 200) -> None:
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, class_id: Optional[int] = None) -> Optional[Subscription]:
+        """Register a dashboard; ``None`` once ``max_subscribers`` are open."""
+
+        subscription = Subscription(class_id, self.max_queue)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def publish(
+        self,
+        event: str,
+        data: Dict,
+        *,
+        class_id: Optional[int] = None,
+        event_id: Optional[int] = None,
+    ) -> int:
+        """Queue ``data`` for every subscriber of ``class_id``; returns how many."""
+
+        with self._lock:
+            targets = [s for s in self._subscribers if s.wants(class_id)]
+            self.published += 1
+            self.delivered += len(targets)
+        if targets:
+            frame = format_frame(event, data, event_id)
+            for subscription in targets:
+                subscription.push(frame)
+        return len(targets)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            subscribers = list(self._subscribers)
+            published, delivered = self.published, self.delivered
+        return {
+            "subscribers": len(subscribers),
+            "published": published,
+            "delivered": delivered,
+            "dropped": sum(s.dropped for s in subscribers),
+        }
+
+
+def init_app(app: Flask) -> Optional[LiveUpdateBroker]:
+    """Create the broker for ``app`` unless ``LIVE_UPDATES_QUEUE_SIZE`` is 0."""
+
+    max_queue = app.config.get("LIVE_UPDATES_QUEUE_SIZE", 0)
+    if not max_queue:
+        return None
+
+    broker = LiveUpdateBroker(
+        max_queue=max_queue,
+        max_subscribers=app.config.get("LIVE_UPDATES_MAX_SUBSCRIBERS", 8),
+    )
+    app.extensions[EXTENSION_KEY] = broker
+    return broker
+
+
+def get_broker() -> Optional[LiveUpdateBroker]:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get(EXTENSION_KEY)
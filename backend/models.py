@@ -19,6 +19,9 @@ class User(db.Model):
     role = db.Column(db.String(20), nullable=False)  # 'student' or 'instructor'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Roster matching joins on lower(email) on both sides
+    __table_args__ = (db.Index("ix_users_email_lower", db.func.lower(email)),)
+
     # Relationships
     responses = db.relationship("StudentResponse", backref="user", lazy=True)
     progress = db.relationship("StudentProgress", backref="user", lazy=True)
@@ -83,37 +86,90 @@ class Topic(db.Model):
         }
 
 
+class Question(db.Model):
+    """A distinct generated question, shared by every response that answered it."""
+
+    __tablename__ = "questions"
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), unique=True, nullable=False)
+    subtopic_type = db.Column(db.String(100), nullable=False)
+    question_code = db.Column(db.Text, nullable=False)
+    correct_answer = db.Column(db.Text, nullable=False)
+    # question_code with its literals replaced by placeholders; variants of
+    # one generated question share a template_hash (see question_repository)
+    template = db.Column(db.Text)
+    template_hash = db.Column(db.String(64))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.Index("ix_questions_template_hash", "template_hash"),)
+
+    def __repr__(self) -> str:
+        return f"<Question {self.id} {self.subtopic_type}>"
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "subtopic_type": self.subtopic_type,
+            "question_code": self.question_code,
+            "correct_answer": self.correct_answer,
+        }
+
+
 class StudentResponse(db.Model):
     __tablename__ = "student_responses"
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    class_id = db.Column(db.Integer, db.ForeignKey("classes.id"), nullable=False)
+    # Class the student was rostered in when answering (NULL: not rostered)
+    class_id = db.Column(db.Integer, db.ForeignKey("classes.id"), nullable=True)
     topic = db.Column(db.String(100), db.ForeignKey("topics.id"), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey("questions.id"))
     subtopic_type = db.Column(
         db.String(100), nullable=False
     )  # e.g., 'TupleOfIntLength'
-    question_code = db.Column(db.Text, nullable=False)
+    # Copies of the question text, kept only on responses recorded before the
+    # questions table and not yet linked to it; new responses leave them NULL
+    # and read the text through ``question`` (or ``response_repository.question_text``)
+    question_code = db.Column(db.Text)
     student_answer = db.Column(db.Text)
-    correct_answer = db.Column(db.Text, nullable=False)
+    correct_answer = db.Column(db.Text)
     is_correct = db.Column(db.Boolean, nullable=False)
     status = db.Column(db.String(20))  # 'correct', 'incorrect', 'skipped'
     time_spent = db.Column(db.Integer)  # seconds
     attempted_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Serves keyset-paginated history: WHERE user_id = ? ORDER BY attempted_at DESC, id DESC
+    __table_args__ = (
+        db.Index("ix_student_responses_user_attempted", "user_id", "attempted_at", "id"),
+        # Per-question lookups by student
+        db.Index("ix_student_responses_question_user", "question_id", "user_id"),
+        # Class-scoped reports: WHERE class_id = ? [AND attempted_at >= ?]
+        db.Index("ix_student_responses_class_attempted", "class_id", "attempted_at"),
+    )
+
+    question = db.relationship(Question)
+
     def __repr__(self) -> str:
         return f"<Response user={self.user_id} topic={self.topic}>"
 
+    def _question_text(self, name: str):
+        value = getattr(self, name)
+        if value is None and self.question is not None:
+            value = getattr(self.question, name)
+        return value
+
     def to_dict(self) -> dict:
         return {
             "id": self.id,
             "user_id": self.user_id,
             "class_id": self.class_id,
             "topic": self.topic,
+            "question_id": self.question_id,
             "subtopic_type": self.subtopic_type,
-            "question_code": self.question_code,
+            "question_code": self._question_text("question_code"),
             "student_answer": self.student_answer,
-            "correct_answer": self.correct_answer,
+            "correct_answer": self._question_text("correct_answer"),
             "is_correct": self.is_correct,
             "status": self.status,
             "time_spent": self.time_spent,
@@ -121,20 +177,225 @@ class StudentResponse(db.Model):
         }
 
 
+class QuestionStats(db.Model):
+    """
+    Running per-question counters, updated as responses arrive.
+
+    Kept per class like the sketches and activity buckets (``class_id = 0``
+    for responses without one), and split by ``rostered``: whether the
+    student was on that class's active roster when answering. Wider scopes
+    add the rows up at read time.
+
+    ``time_mean``/``time_m2`` follow Welford's online algorithm over the
+    ``time_samples`` non-skipped attempts that reported ``time_spent``; the
+    sample variance is ``time_m2 / (time_samples - 1)``.
+    """
+
+    __tablename__ = "question_stats"
+
+    question_id = db.Column(db.Integer, db.ForeignKey("questions.id"), primary_key=True)
+    topic = db.Column(db.String(100), db.ForeignKey("topics.id"), primary_key=True)
+    class_id = db.Column(db.Integer, primary_key=True, default=0)
+    rostered = db.Column(db.Boolean, primary_key=True, default=False)
+    times_shown = db.Column(db.Integer, nullable=False, default=0)
+    correct_count = db.Column(db.Integer, nullable=False, default=0)
+    incorrect_count = db.Column(db.Integer, nullable=False, default=0)
+    skipped_count = db.Column(db.Integer, nullable=False, default=0)
+    time_samples = db.Column(db.Integer, nullable=False, default=0)
+    time_mean = db.Column(db.Float, nullable=False, default=0.0)
+    time_m2 = db.Column(db.Float, nullable=False, default=0.0)
+    students_who_saw = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Serves topic lookups and the most-shown-first analytics page
+    __table_args__ = (db.Index("ix_question_stats_topic_shown", "topic", "times_shown"),)
+
+    def __repr__(self) -> str:
+        return (
+            f"<QuestionStats question={self.question_id} topic={self.topic} "
+            f"class={self.class_id} rostered={self.rostered}>"
+        )
+
+
+class QuestionViewer(db.Model):
+    """
+    The students behind ``QuestionStats.students_who_saw``, one row per
+    student and counter row. Inserted with ``ON CONFLICT DO NOTHING`` next to
+    the counter update, and only an insert that creates the row counts the
+    student, so concurrent first answers are counted once.
+    """
+
+    __tablename__ = "question_viewers"
+
+    question_id = db.Column(db.Integer, db.ForeignKey("questions.id"), primary_key=True)
+    topic = db.Column(db.String(100), db.ForeignKey("topics.id"), primary_key=True)
+    class_id = db.Column(db.Integer, primary_key=True, default=0)
+    rostered = db.Column(db.Boolean, primary_key=True, default=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+
+    def __repr__(self) -> str:
+        return f"<QuestionViewer question={self.question_id} user={self.user_id}>"
+
+
+class DistinctSketch(db.Model):
+    """
+    A HyperLogLog sketch of the students seen for one report dimension value.
+
+    ``dimension`` is one of ``topic``, ``subtopic``, ``day`` or ``question``;
+    ``key`` is the topic id, ``"<topic>:<subtopic>"``, ISO date or question id.
+    Sketches are kept per class (``class_id = 0`` for responses without one)
+    and merged at read time for wider scopes.
+    """
+
+    __tablename__ = "distinct_sketches"
+
+    dimension = db.Column(db.String(20), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    class_id = db.Column(db.Integer, primary_key=True, default=0)
+    registers = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<DistinctSketch {self.dimension}={self.key} class={self.class_id}>"
+
+
+class ActivityBucket(db.Model):
+    """
+    Per-student response counts for one day (or hour) within one class.
+
+    ``class_id = 0`` holds responses recorded without a class. ``correct``
+    counts ``is_correct`` responses; ``time_spent_total``/``time_samples``
+    cover non-skipped responses that reported a time.
+    """
+
+    __tablename__ = "activity_buckets"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    class_id = db.Column(db.Integer, primary_key=True, default=0)
+    granularity = db.Column(db.String(5), primary_key=True)  # 'day' or 'hour'
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    responses = db.Column(db.Integer, nullable=False, default=0)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    skipped = db.Column(db.Integer, nullable=False, default=0)
+    time_spent_total = db.Column(db.Integer, nullable=False, default=0)
+    time_samples = db.Column(db.Integer, nullable=False, default=0)
+
+    # Class/time-range scans: WHERE granularity = ? AND bucket_start BETWEEN ...
+    __table_args__ = (
+        db.Index("ix_activity_buckets_granularity_start", "granularity", "bucket_start"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ActivityBucket user={self.user_id} {self.granularity}={self.bucket_start}>"
+
+
+class ClassInsight(db.Model):
+    """
+    Precomputed rankings and at-risk list for one class (``class_id = 0``:
+    every rostered student), refreshed by the insights job.
+
+    ``leaderboard`` and ``at_risk_students`` are JSON arrays stored as text.
+    """
+
+    __tablename__ = "class_insights"
+
+    class_id = db.Column(db.Integer, primary_key=True)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    leaderboard = db.Column(db.Text, nullable=False, default="[]")
+    at_risk_students = db.Column(db.Text, nullable=False, default="[]")
+
+    def __repr__(self) -> str:
+        return f"<ClassInsight class={self.class_id} computed_at={self.computed_at}>"
+
+    def to_dict(self) -> dict:
+        import json
+        return {
+            "class_id": self.class_id or None,
+            "computed_at": self.computed_at.isoformat(),
+            "leaderboard": json.loads(self.leaderboard),
+            "at_risk_students": json.loads(self.at_risk_students),
+        }
+
+
+class StudentInsight(db.Model):
+    """Precomputed struggling subtopics and at-risk flag for one student."""
+
+    __tablename__ = "student_insights"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    at_risk = db.Column(db.Boolean, nullable=False, default=False)
+    risk_reasons = db.Column(db.Text, nullable=False, default="[]")  # JSON array
+    struggling_subtopics = db.Column(db.Text, nullable=False, default="[]")  # JSON array
+
+    def __repr__(self) -> str:
+        return f"<StudentInsight user={self.user_id} at_risk={self.at_risk}>"
+
+    def to_dict(self) -> dict:
+        import json
+        return {
+            "user_id": self.user_id,
+            "computed_at": self.computed_at.isoformat(),
+            "at_risk": self.at_risk,
+            "risk_reasons": json.loads(self.risk_reasons),
+            "struggling_subtopics": json.loads(self.struggling_subtopics),
+        }
+
+
+class ServerSession(db.Model):
+    """
+    Server-side Flask session (see ``backend/session_store.py``).
+
+    ``id`` is the SHA-256 of the opaque cookie value, so a copy of this table
+    cannot be replayed as cookies. ``data`` is the session dict as JSON.
+    """
+
+    __tablename__ = "server_sessions"
+
+    id = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=True, index=True)
+    data = db.Column(db.Text, nullable=False, default="{}")
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<ServerSession user={self.user_id} expires_at={self.expires_at}>"
+
+
+class IngestBatch(db.Model):
+    """
+    A journal segment the write-behind ingest buffer has written. Inserted in
+    the same transaction as the segment's responses, so recovery can tell
+    written segments from ones to replay (see ``backend.ingest_buffer``).
+    """
+
+    __tablename__ = "ingest_batches"
+
+    segment = db.Column(db.String(100), primary_key=True)
+    rows = db.Column(db.Integer, nullable=False)
+    written_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<IngestBatch {self.segment} rows={self.rows}>"
+
+
 class StudentProgress(db.Model):
     __tablename__ = "student_progress"
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    class_id = db.Column(db.Integer, db.ForeignKey("classes.id"), nullable=False)
+    class_id = db.Column(db.Integer, db.ForeignKey("classes.id"), nullable=True)
     topic = db.Column(db.String(100), db.ForeignKey("topics.id"), nullable=False)
     subtopics_completed = db.Column(db.Integer, default=0)
     total_subtopics = db.Column(db.Integer)
     questions_answered = db.Column(db.Integer, default=0)
     last_accessed = db.Column(db.DateTime, default=datetime.utcnow)
 
-    # Ensure one progress record per user per topic
-    __table_args__ = (db.UniqueConstraint("user_id", "topic", "class_id", name="_user_topic_uc"),)
+    # Ensure one progress record per user per topic (per class)
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "topic", "class_id", name="_user_topic_uc"),
+        db.Index("ix_student_progress_class_topic", "class_id", "topic"),
+    )
 
     def __repr__(self) -> str:
         return f"<Progress user={self.user_id} topic={self.topic}>"
@@ -233,7 +494,10 @@ class RosterStudent(db.Model):
 
     class_id = db.Column(db.Integer, db.ForeignKey("classes.id"), nullable=True)
 
-    __table_args__ = (db.UniqueConstraint("email", "class_id", name="_roster_email_class_uc"),)
+    __table_args__ = (
+        db.UniqueConstraint("email", "class_id", name="_roster_email_class_uc"),
+        db.Index("ix_roster_students_email_lower", db.func.lower(email)),
+    )
     
     # Upload tracking
     last_updated_via = db.Column(db.String(20), nullable=True)  # 'csv_add', 'csv_drop', 'inline', 'manual'
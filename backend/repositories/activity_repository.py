@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from sqlalchemy import case, func
+
+from backend.models import ActivityBucket, StudentResponse, db
+from backend.repositories.upsert import upsert, upsert_many
+
+NO_CLASS = 0
+STORED_GRANULARITIES = ("day", "hour")
+SERIES_GRANULARITIES = ("hour", "day", "week", "month")
+INSERT_BATCH = 5_000
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Truncate ``moment`` to the start of its ``granularity`` period."""
+
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def record(
+    *,
+    user_id: int,
+    class_id: Optional[int],
+    attempted_at: datetime,
+    is_correct: bool,
+    status: str,
+    time_spent: Optional[int],
+    hourly: bool = False,
+) -> None:
+    """Add one response to the student's day (and optionally hour) bucket."""
+
+    table = ActivityBucket.__table__
+    c = table.c
+    timed = status != "skipped" and time_spent is not None
+    increments = {
+        "responses": 1,
+        "correct": 1 if is_correct else 0,
+        "skipped": 1 if status == "skipped" else 0,
+        "time_spent_total": time_spent if timed else 0,
+        "time_samples": 1 if timed else 0,
+    }
+
+    for granularity in ("day", "hour") if hourly else ("day",):
+        upsert(
+            table,
+            {
+                "user_id": user_id,
+                "class_id": class_id or NO_CLASS,
+                "granularity": granularity,
+                "bucket_start": bucket_start(attempted_at, granularity),
+                **increments,
+            },
+            conflict_columns=("user_id", "class_id", "granularity", "bucket_start"),
+            on_conflict={
+                column: c[column] + amount for column, amount in increments.items() if amount
+            },
+        )
+
+
+def record_many(responses: Sequence[Mapping], hourly: bool = False) -> None:
+    """``record`` for many responses (mappings of its keyword arguments) with one executemany."""
+
+    table = ActivityBucket.__table__
+    c = table.c
+    rows = []
+    for response in responses:
+        status, time_spent = response["status"], response["time_spent"]
+        timed = status != "skipped" and time_spent is not None
+        for granularity in ("day", "hour") if hourly else ("day",):
+            rows.append(
+                {
+                    "user_id": response["user_id"],
+                    "class_id": response["class_id"] or NO_CLASS,
+                    "granularity": granularity,
+                    "bucket_start": bucket_start(response["attempted_at"], granularity),
+                    "responses": 1,
+                    "correct": 1 if response["is_correct"] else 0,
+                    "skipped": 1 if status == "skipped" else 0,
+                    "time_spent_total": time_spent if timed else 0,
+                    "time_samples": 1 if timed else 0,
+                }
+            )
+
+    upsert_many(
+        table,
+        rows,
+        conflict_columns=("user_id", "class_id", "granularity", "bucket_start"),
+        on_conflict=lambda excluded: {
+            column: c[column] + excluded[column]
+            for column in ("responses", "correct", "skipped", "time_spent_total", "time_samples")
+        },
+    )
+
+
+def _bucket_query(
+    granularity: str,
+    user_ids,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    class_ids=None,
+):
+    if granularity not in SERIES_GRANULARITIES:
+        raise ValueError(f"granularity must be one of: {', '.join(SERIES_GRANULARITIES)}")
+    stored = "hour" if granularity == "hour" else "day"
+
+    query = (
+        db.select(
+            ActivityBucket.bucket_start,
+            ActivityBucket.user_id,
+            func.sum(ActivityBucket.responses),
+            func.sum(ActivityBucket.correct),
+            func.sum(ActivityBucket.skipped),
+            func.sum(ActivityBucket.time_spent_total),
+            func.sum(ActivityBucket.time_samples),
+        )
+        .filter(ActivityBucket.granularity == stored)
+        .group_by(ActivityBucket.bucket_start, ActivityBucket.user_id)
+    )
+    if user_ids is not None:
+        query = query.filter(ActivityBucket.user_id.in_(user_ids))
+    if class_ids is not None:
+        query = query.filter(ActivityBucket.class_id.in_(class_ids))
+    if start is not None:
+        query = query.filter(ActivityBucket.bucket_start >= bucket_start(start, stored))
+    if end is not None:
+        query = query.filter(ActivityBucket.bucket_start < end)
+    return query
+
+
+def _new_period() -> Dict:
+    return {
+        "responses": 0,
+        "correct": 0,
+        "skipped": 0,
+        "time_spent_total": 0,
+        "time_samples": 0,
+        "students": set(),
+    }
+
+
+def _add_row(periods: Dict[datetime, Dict], row, granularity: str) -> None:
+    started, user_id, responses, correct, skipped, time_total, samples = row
+    period = periods[bucket_start(started, granularity)]
+    period["responses"] += responses
+    period["correct"] += correct
+    period["skipped"] += skipped
+    period["time_spent_total"] += time_total
+    period["time_samples"] += samples
+    period["students"].add(user_id)
+
+
+def _summaries(periods: Dict[datetime, Dict], granularity: str) -> List[Dict]:
+    return [
+        {
+            "bucket_start": started.date().isoformat()
+            if granularity != "hour"
+            else started.isoformat(),
+            "questions_answered": period["responses"],
+            "correct": period["correct"],
+            "skipped": period["skipped"],
+            "accuracy": round(period["correct"] / period["responses"] * 100, 2),
+            "avg_time": round(period["time_spent_total"] / period["time_samples"], 2)
+            if period["time_samples"]
+            else 0,
+            "active_students": len(period["students"]),
+        }
+        for started, period in sorted(periods.items())
+    ]
+
+
+def series(
+    *,
+    granularity: str = "day",
+    user_ids=None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    class_ids=None,
+) -> List[Dict]:
+    """
+    Activity per period between ``start`` (inclusive) and ``end`` (exclusive).
+
+    ``user_ids`` is an id list or a select of ids; ``None`` means everyone.
+    ``class_ids`` keeps only activity recorded in those classes.
+    Hours come from hourly buckets; days, weeks and months are merged from
+    daily buckets. Each row carries totals plus the distinct active students.
+    """
+
+    periods: Dict[datetime, Dict] = defaultdict(_new_period)
+    for row in db.session.execute(_bucket_query(granularity, user_ids, start, end, class_ids)):
+        _add_row(periods, row, granularity)
+    return _summaries(periods, granularity)
+
+
+def series_by_user(
+    *,
+    granularity: str = "day",
+    user_ids,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict[int, List[Dict]]:
+    """``series`` for each of ``user_ids`` separately, from a single query."""
+
+    by_user: Dict[int, Dict[datetime, Dict]] = defaultdict(lambda: defaultdict(_new_period))
+    for row in db.session.execute(_bucket_query(granularity, user_ids, start, end)):
+        _add_row(by_user[row[1]], row, granularity)
+    return {user_id: _summaries(periods, granularity) for user_id, periods in by_user.items()}
+
+
+def _bucket_expression(granularity: str):
+    if db.session.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(granularity, StudentResponse.attempted_at)
+    fmt = "%Y-%m-%d %H:00:00" if granularity == "hour" else "%Y-%m-%d 00:00:00"
+    return func.strftime(fmt, StudentResponse.attempted_at)
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.fromisoformat(str(value))
+
+
+def rebuild(hourly: bool = False) -> int:
+    """
+    Recompute buckets from ``student_responses`` with one grouped query per
+    stored granularity. Returns the number of buckets written.
+    """
+
+    table = ActivityBucket.__table__
+    db.session.execute(table.delete())
+    timed = case(
+        (
+            (StudentResponse.status != "skipped") & StudentResponse.time_spent.is_not(None),
+            1,
+        ),
+        else_=0,
+    )
+    written = 0
+
+    for granularity in STORED_GRANULARITIES if hourly else ("day",):
+        bucket = _bucket_expression(granularity)
+        class_key = func.coalesce(StudentResponse.class_id, NO_CLASS)
+        query = db.select(
+            StudentResponse.user_id,
+            class_key,
+            bucket,
+            func.count(StudentResponse.id),
+            func.sum(case((StudentResponse.is_correct.is_(True), 1), else_=0)),
+            func.sum(case((StudentResponse.status == "skipped", 1), else_=0)),
+            func.sum(case((timed == 1, StudentResponse.time_spent), else_=0)),
+            func.sum(timed),
+        ).group_by(StudentResponse.user_id, class_key, bucket)
+
+        pending: List[dict] = []
+        for row in db.session.execute(query):
+            user_id, class_id, started, responses, correct, skipped, time_total, samples = row
+            pending.append(
+                {
+                    "user_id": user_id,
+                    "class_id": class_id,
+                    "granularity": granularity,
+                    "bucket_start": _as_datetime(started),
+                    "responses": responses,
+                    "correct": correct,
+                    "skipped": skipped,
+                    "time_spent_total": time_total or 0,
+                    "time_samples": samples,
+                }
+            )
+            if len(pending) >= INSERT_BATCH:
+                db.session.execute(table.insert(), pending)
+                written += len(pending)
+                pending = []
+        if pending:
+            db.session.execute(table.insert(), pending)
+            written += len(pending)
+
+    db.session.commit()
+    return written
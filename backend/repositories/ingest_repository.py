@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, Set
+
+from backend.models import IngestBatch, db
+
+
+def mark_written(segment: str, rows: int) -> None:
+    """Record ``segment`` as written; part of the caller's transaction."""
+
+    db.session.add(IngestBatch(segment=segment, rows=rows, written_at=datetime.utcnow()))
+
+
+def is_written(segment: str) -> bool:
+    return db.session.get(IngestBatch, segment) is not None
+
+
+def written_parts(segment: str) -> Set[str]:
+    """Markers of the rows of ``segment`` written one at a time (``<segment>#<index>``)."""
+
+    return set(
+        db.session.execute(
+            db.select(IngestBatch.segment).where(IngestBatch.segment.startswith(f"{segment}#"))
+        ).scalars()
+    )
+
+
+def forget(segments: Iterable[str]) -> None:
+    """Drop the markers of segments whose files are gone; part of the caller's transaction."""
+
+    segments = list(segments)
+    if segments:
+        db.session.execute(db.delete(IngestBatch).where(IngestBatch.segment.in_(segments)))
+
+
+def prune(keep: Iterable[str], *, before: datetime) -> int:
+    """
+    Delete markers written before ``before`` except those of the segments in
+    ``keep`` (the files still on disk), row markers included. Returns the
+    number deleted.
+    """
+
+    keep = set(keep)
+    stale = [
+        marker
+        for marker in db.session.execute(
+            db.select(IngestBatch.segment).where(IngestBatch.written_at < before)
+        ).scalars()
+        if marker.split("#", 1)[0] not in keep
+    ]
+    forget(stale)
+    db.session.commit()
+    return len(stale)
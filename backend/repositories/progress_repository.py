@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Iterable, Optional
 
 from backend.models import StudentProgress, db
+from backend.repositories import user_repository
 
 
 def get_by_user(user_id: int) -> Iterable[StudentProgress]:
@@ -33,3 +34,20 @@ def save(progress: StudentProgress) -> StudentProgress:
     db.session.flush()
     return progress
 
+
+
+def backfill_class_ids() -> int:
+    """
+    Stamp progress recorded without a class with the class of the student's
+    newest active roster entry. Returns the number of records updated.
+    """
+
+    table = StudentProgress.__table__
+    class_id = user_repository.roster_class_id(table.c.user_id)
+    result = db.session.execute(
+        table.update()
+        .where(table.c.class_id.is_(None), class_id.is_not(None))
+        .values(class_id=class_id)
+    )
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
+
+from backend.models import Question, StudentResponse, db
+
+# Keeps "content_hash IN (...)" well under SQLite's bound-parameter limit
+LOOKUP_CHUNK = 500
+
+QuestionKey = Tuple[str, str, str]
+
+_STRING_LITERAL = re.compile(r"'(?:\\.|[^'\\\n])*'|\"(?:\\.|[^\"\\\n])*\"")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])\d+(?:\.\d+)?(?![\w.])")
+
+
+def content_hash(question_code: str, subtopic_type: str, correct_answer: str) -> str:
+    """Stable identity of a generated question (sha256 hex of its three parts)."""
+
+    digest = hashlib.sha256()
+    for part in (subtopic_type, question_code, correct_answer):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def question_template(question_code: str) -> str:
+    """
+    ``question_code`` with string and number literals replaced by ``<str>``
+    and ``<num>``, so ``s = 'abc'; s[1]`` and ``s = 'xyz'; s[2]`` share a
+    template. Names and operators are kept: ``s[-1]`` stays distinct.
+    """
+
+    template = _STRING_LITERAL.sub("<str>", question_code)
+    return _NUMBER_LITERAL.sub("<num>", template)
+
+
+def template_hash(subtopic_type: str, template: str) -> str:
+    digest = hashlib.sha256()
+    for part in (subtopic_type, template):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _template_columns(question_code: str, subtopic_type: str) -> Dict[str, str]:
+    template = question_template(question_code)
+    return {"template": template, "template_hash": template_hash(subtopic_type, template)}
+
+
+def get_by_id(question_id: int) -> Optional[Question]:
+    return db.session.get(Question, question_id)
+
+
+def get_or_create_id(question_code: str, subtopic_type: str, correct_answer: str) -> int:
+    """Return the id of the matching question, inserting it on first sight."""
+
+    key = content_hash(question_code, subtopic_type, correct_answer)
+    existing = db.session.execute(
+        db.select(Question.id).filter_by(content_hash=key)
+    ).scalar_one_or_none()
+    if existing is not None:
+        return existing
+
+    question = Question(
+        content_hash=key,
+        subtopic_type=subtopic_type,
+        question_code=question_code,
+        correct_answer=correct_answer,
+        **_template_columns(question_code, subtopic_type),
+    )
+    try:
+        with db.session.begin_nested():
+            db.session.add(question)
+    except IntegrityError:
+        # Another request inserted the same question first
+        return db.session.execute(
+            db.select(Question.id).filter_by(content_hash=key)
+        ).scalar_one()
+    return question.id
+
+
+def resolve_ids(rows: Sequence[MutableMapping]) -> None:
+    """
+    Set ``row["question_id"]`` on every response dict in ``rows``.
+
+    Looks hashes up in bulk and inserts unseen questions with one executemany,
+    so it is suitable for generators and backfills working in large batches.
+    """
+
+    keyed: Dict[str, QuestionKey] = {}
+    row_hashes: List[str] = []
+    for row in rows:
+        parts = (row["question_code"], row["subtopic_type"], row["correct_answer"])
+        key = content_hash(*parts)
+        keyed.setdefault(key, parts)
+        row_hashes.append(key)
+
+    ids = _ids_for_hashes(keyed)
+    missing = [key for key in keyed if key not in ids]
+    if missing:
+        db.session.execute(
+            Question.__table__.insert(),
+            [
+                {
+                    "content_hash": key,
+                    "question_code": keyed[key][0],
+                    "subtopic_type": keyed[key][1],
+                    "correct_answer": keyed[key][2],
+                    **_template_columns(keyed[key][0], keyed[key][1]),
+                }
+                for key in missing
+            ],
+        )
+        ids.update(_ids_for_hashes(missing))
+
+    for row, key in zip(rows, row_hashes):
+        row["question_id"] = ids[key]
+
+
+def _ids_for_hashes(hashes: Iterable[str]) -> Dict[str, int]:
+    hashes = list(hashes)
+    found: Dict[str, int] = {}
+    for offset in range(0, len(hashes), LOOKUP_CHUNK):
+        chunk = hashes[offset : offset + LOOKUP_CHUNK]
+        found.update(
+            db.session.execute(
+                db.select(Question.content_hash, Question.id).filter(
+                    Question.content_hash.in_(chunk)
+                )
+            ).all()
+        )
+    return found
+
+
+def backfill_responses(batch_size: int = 5000) -> int:
+    """
+    Point every response without a ``question_id`` at its question row.
+
+    Walks the table in primary-key batches and commits after each one, so it
+    can be interrupted and re-run. Returns the number of responses updated.
+    """
+
+    updated = 0
+    last_id = 0
+    table = StudentResponse.__table__
+    while True:
+        batch: List[Mapping] = (
+            db.session.execute(
+                db.select(
+                    StudentResponse.id,
+                    StudentResponse.question_code,
+                    StudentResponse.subtopic_type,
+                    StudentResponse.correct_answer,
+                )
+                .filter(StudentResponse.question_id.is_(None), StudentResponse.id > last_id)
+                .order_by(StudentResponse.id)
+                .limit(batch_size)
+            )
+            .mappings()
+            .all()
+        )
+        if not batch:
+            return updated
+
+        rows = [dict(row) for row in batch]
+        resolve_ids(rows)
+        db.session.execute(
+            table.update()
+            .where(table.c.id == bindparam("response_id"))
+            .values(question_id=bindparam("new_question_id")),
+            [
+                {"response_id": row["id"], "new_question_id": row["question_id"]}
+                for row in rows
+            ],
+        )
+        db.session.commit()
+        updated += len(rows)
+        last_id = rows[-1]["id"]
+
+
+def backfill_templates(batch_size: int = 5000) -> int:
+    """
+    Fill ``template``/``template_hash`` on questions stored before they
+    existed, in primary-key batches. Returns the number of questions updated.
+    """
+
+    updated = 0
+    last_id = 0
+    table = Question.__table__
+    while True:
+        batch = db.session.execute(
+            db.select(Question.id, Question.question_code, Question.subtopic_type)
+            .filter(Question.template_hash.is_(None), Question.id > last_id)
+            .order_by(Question.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return updated
+
+        params = []
+        for row in batch:
+            template = question_template(row.question_code)
+            params.append(
+                {
+                    "question_id": row.id,
+                    "new_template": template,
+                    "new_hash": template_hash(row.subtopic_type, template),
+                }
+            )
+        db.session.execute(
+            table.update()
+            .where(table.c.id == bindparam("question_id"))
+            .values(template=bindparam("new_template"), template_hash=bindparam("new_hash")),
+            params,
+        )
+        db.session.commit()
+        updated += len(batch)
+        last_id = batch[-1].id
@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import case, func, literal, tuple_
+
+from backend.models import QuestionStats, QuestionViewer, RosterStudent, StudentResponse, User, db
+from backend.repositories.upsert import insert_missing, upsert, upsert_many
+
+KEY_COLUMNS = ("question_id", "topic", "class_id", "rostered")
+
+
+def on_class_roster(user_id_column, class_id_column):
+    """
+    SQL: whether the user is a student on the active roster of the class,
+    the test behind ``QuestionStats.rostered``.
+    """
+
+    return (
+        db.select(literal(1))
+        .select_from(RosterStudent)
+        .join(User, func.lower(User.email) == func.lower(RosterStudent.email))
+        .where(
+            User.id == user_id_column,
+            User.role == "student",
+            RosterStudent.class_id == class_id_column,
+            RosterStudent.deleted_at.is_(None),
+        )
+        .exists()
+    )
+
+
+def _keys(responses: Sequence[Mapping]) -> List[Dict]:
+    """
+    The counter row each response folds into: its ``class_id`` (0 without
+    one) and whether the student is on that class's roster, from one query.
+    """
+
+    pairs = {
+        (response["user_id"], response["class_id"])
+        for response in responses
+        if response.get("class_id") is not None
+    }
+    on_roster: Set[Tuple[int, int]] = set()
+    if pairs:
+        on_roster = set(
+            db.session.execute(
+                db.select(User.id, RosterStudent.class_id)
+                .join(RosterStudent, func.lower(RosterStudent.email) == func.lower(User.email))
+                .filter(
+                    tuple_(User.id, RosterStudent.class_id).in_(pairs),
+                    User.role == "student",
+                    RosterStudent.deleted_at.is_(None),
+                )
+                .distinct()
+            ).all()
+        )
+    return [
+        {
+            "class_id": response.get("class_id") or 0,
+            "rostered": (response["user_id"], response.get("class_id")) in on_roster,
+        }
+        for response in responses
+    ]
+
+
+def _new_viewers(responses: Sequence[Mapping], keys: Sequence[Mapping]) -> List[bool]:
+    """
+    Record who saw each question and return, per response, whether it is
+    the student's first under its counter row. The check is the insert
+    itself, so two concurrent first answers cannot both count.
+    """
+
+    columns = (*KEY_COLUMNS, "user_id")
+    viewers = [
+        tuple({**response, **key}[column] for column in columns)
+        for response, key in zip(responses, keys)
+    ]
+    table = QuestionViewer.__table__
+    c = table.c
+    inserted = {
+        tuple(row)
+        for row in insert_missing(
+            table,
+            [dict(zip(columns, viewer)) for viewer in dict.fromkeys(viewers)],
+            conflict_columns=columns,
+            returning=[c[column] for column in columns],
+        )
+    }
+    first = []
+    for viewer in viewers:
+        first.append(viewer in inserted)
+        inserted.discard(viewer)
+    return first
+
+
+def record(
+    *,
+    question_id: int,
+    topic: str,
+    user_id: int,
+    class_id: Optional[int],
+    status: str,
+    time_spent: Optional[int],
+) -> None:
+    """
+    Fold one response into the question's running stats.
+
+    Runs as a single upsert whose update clause reads the stored row, so
+    concurrent writers never lose increments. The Welford step is written in
+    closed form: with ``n`` prior samples and mean ``m``, adding ``x`` gives
+    ``m + (x - m) / (n + 1)`` and ``M2 + (x - m)^2 * n / (n + 1)``.
+    """
+
+    response = {
+        "question_id": question_id,
+        "topic": topic,
+        "user_id": user_id,
+        "class_id": class_id,
+    }
+    [key] = _keys([response])
+    [new_student] = _new_viewers([response], [key])
+
+    table = QuestionStats.__table__
+    c = table.c
+    now = datetime.utcnow()
+    timed = status != "skipped" and time_spent is not None
+
+    values = {
+        "question_id": question_id,
+        "topic": topic,
+        **key,
+        "times_shown": 1,
+        "correct_count": 1 if status == "correct" else 0,
+        "incorrect_count": 1 if status == "incorrect" else 0,
+        "skipped_count": 1 if status == "skipped" else 0,
+        "time_samples": 1 if timed else 0,
+        "time_mean": float(time_spent) if timed else 0.0,
+        "time_m2": 0.0,
+        "students_who_saw": 1 if new_student else 0,
+        "updated_at": now,
+    }
+    on_conflict = {
+        "times_shown": c.times_shown + 1,
+        "students_who_saw": c.students_who_saw + (1 if new_student else 0),
+        "updated_at": now,
+    }
+    if status in ("correct", "incorrect", "skipped"):
+        column = f"{status}_count"
+        on_conflict[column] = c[column] + 1
+    if timed:
+        x = float(time_spent)
+        delta = x - c.time_mean
+        on_conflict["time_samples"] = c.time_samples + 1
+        on_conflict["time_mean"] = c.time_mean + delta / (c.time_samples + 1.0)
+        on_conflict["time_m2"] = (
+            c.time_m2 + delta * delta * c.time_samples / (c.time_samples + 1.0)
+        )
+
+    upsert(table, values, conflict_columns=KEY_COLUMNS, on_conflict=on_conflict)
+
+
+def record_many(responses: Sequence[Mapping]) -> None:
+    """
+    ``record`` for many responses (mappings of its keyword arguments) with
+    one executemany, after one roster lookup and one viewer insert.
+
+    Each response is merged as a one-sample set with Chan's parallel update:
+    stored ``(n, m, M2)`` and inserted ``(k, x, 0)`` give mean
+    ``m + (x - m) * k / (n + k)`` and ``M2 + (x - m)^2 * n * k / (n + k)``,
+    the same as ``record`` for ``k = 1``.
+    """
+
+    table = QuestionStats.__table__
+    c = table.c
+    now = datetime.utcnow()
+    keys = _keys(responses)
+    new_students = _new_viewers(responses, keys)
+    rows = []
+    for response, key, new_student in zip(responses, keys, new_students):
+        status, time_spent = response["status"], response["time_spent"]
+        timed = status != "skipped" and time_spent is not None
+        rows.append(
+            {
+                "question_id": response["question_id"],
+                "topic": response["topic"],
+                **key,
+                "times_shown": 1,
+                "correct_count": 1 if status == "correct" else 0,
+                "incorrect_count": 1 if status == "incorrect" else 0,
+                "skipped_count": 1 if status == "skipped" else 0,
+                "time_samples": 1 if timed else 0,
+                "time_mean": float(time_spent) if timed else 0.0,
+                "time_m2": 0.0,
+                "students_who_saw": 1 if new_student else 0,
+                "updated_at": now,
+            }
+        )
+
+    def merge(excluded):
+        counters = (
+            "times_shown",
+            "correct_count",
+            "incorrect_count",
+            "skipped_count",
+            "time_samples",
+            "students_who_saw",
+        )
+        delta = excluded.time_mean - c.time_mean
+        samples = c.time_samples + excluded.time_samples * 1.0
+        timed = excluded.time_samples > 0
+        return {
+            **{column: c[column] + excluded[column] for column in counters},
+            "time_mean": case(
+                (timed, c.time_mean + delta * excluded.time_samples / samples),
+                else_=c.time_mean,
+            ),
+            "time_m2": case(
+                (
+                    timed,
+                    c.time_m2
+                    + excluded.time_m2
+                    + delta * delta * c.time_samples * excluded.time_samples / samples,
+                ),
+                else_=c.time_m2,
+            ),
+            "updated_at": excluded.updated_at,
+        }
+
+    upsert_many(table, rows, conflict_columns=KEY_COLUMNS, on_conflict=merge)
+
+
+def pooled_time(samples, mean, m2):
+    """
+    Labelled ``time_samples``/``time_mean``/``time_m2`` aggregates merging
+    grouped rows' Welford states: ``n = sum(n_i)``, ``mean = sum(n_i *
+    mean_i) / n`` and ``M2 = sum(M2_i + n_i * mean_i^2) - (sum(n_i * mean_i))^2 / n``.
+    """
+
+    total_samples = func.sum(samples)
+    time_total = func.sum(samples * mean)
+    return (
+        total_samples.label("time_samples"),
+        case((total_samples > 0, time_total / total_samples), else_=0.0).label("time_mean"),
+        case(
+            (
+                total_samples > 0,
+                func.sum(m2 + samples * mean * mean) - time_total * time_total / total_samples,
+            ),
+            else_=0.0,
+        ).label("time_m2"),
+    )
+
+
+def merged(*criteria):
+    """
+    Grouped select adding up the ``question_stats`` rows matching
+    ``criteria`` per question (same column names, minus ``updated_at`` and
+    the class key). ``students_who_saw`` is summed, so a student counted
+    under two classes counts twice.
+    """
+
+    c = QuestionStats.__table__.c
+    return (
+        db.select(
+            c.question_id,
+            c.topic,
+            *(
+                func.sum(c[column]).label(column)
+                for column in ("times_shown", "correct_count", "incorrect_count", "skipped_count")
+            ),
+            *pooled_time(c.time_samples, c.time_mean, c.time_m2),
+            func.sum(c.students_who_saw).label("students_who_saw"),
+        )
+        .filter(*criteria)
+        .group_by(c.question_id, c.topic)
+    )
+
+
+def _keyed_responses(*criteria):
+    """The responses matching ``criteria`` with their counter key columns."""
+
+    return (
+        db.select(
+            StudentResponse.id,
+            StudentResponse.question_id,
+            StudentResponse.topic,
+            func.coalesce(StudentResponse.class_id, 0).label("class_id"),
+            on_class_roster(StudentResponse.user_id, StudentResponse.class_id).label("rostered"),
+            StudentResponse.user_id,
+            StudentResponse.status,
+            StudentResponse.time_spent,
+        )
+        .filter(StudentResponse.question_id.is_not(None), *criteria)
+        .subquery("keyed_responses")
+    )
+
+
+def aggregate_responses(*criteria):
+    """
+    Grouped select computing every ``question_stats`` column but
+    ``updated_at`` straight from the responses matching ``criteria``, one row
+    per question and counter key; what ``rebuild`` stores.
+    """
+
+    r = _keyed_responses(*criteria).c
+    timed = case((r.status != "skipped", r.time_spent), else_=None)
+    samples = func.count(timed)
+    return db.select(
+        *(r[column] for column in KEY_COLUMNS),
+        func.count(r.id).label("times_shown"),
+        func.sum(case((r.status == "correct", 1), else_=0)).label("correct_count"),
+        func.sum(case((r.status == "incorrect", 1), else_=0)).label("incorrect_count"),
+        func.sum(case((r.status == "skipped", 1), else_=0)).label("skipped_count"),
+        samples.label("time_samples"),
+        func.coalesce(func.avg(timed * 1.0), 0.0).label("time_mean"),
+        # M2 = sum(x^2) - sum(x)^2 / n, matching what the online updates converge to
+        case(
+            (
+                samples > 0,
+                func.sum(timed * timed * 1.0) - func.sum(timed) * func.sum(timed) * 1.0 / samples,
+            ),
+            else_=0.0,
+        ).label("time_m2"),
+        func.count(func.distinct(r.user_id)).label("students_who_saw"),
+    ).group_by(*(r[column] for column in KEY_COLUMNS))
+
+
+def rebuild() -> int:
+    """
+    Recompute every row, and the viewers behind ``students_who_saw``, from
+    ``student_responses`` in one grouped pass each; ``rostered`` follows the
+    roster as it is now.
+
+    Used after bulk loads and backfills that bypass the ingest path, to
+    repair drift, and after roster changes (rows written before a student
+    joined or left a class keep the flag they were written with). Returns
+    the number of counter rows written.
+    """
+
+    source = aggregate_responses().add_columns(literal(datetime.utcnow()))
+    keyed = _keyed_responses().c
+    viewers = db.select(*(keyed[column] for column in (*KEY_COLUMNS, "user_id"))).distinct()
+    columns = [
+        *KEY_COLUMNS,
+        "times_shown",
+        "correct_count",
+        "incorrect_count",
+        "skipped_count",
+        "time_samples",
+        "time_mean",
+        "time_m2",
+        "students_who_saw",
+        "updated_at",
+    ]
+
+    table = QuestionStats.__table__
+    db.session.execute(table.delete())
+    db.session.execute(QuestionViewer.__table__.delete())
+    result = db.session.execute(table.insert().from_select(columns, source))
+    db.session.execute(
+        QuestionViewer.__table__.insert().from_select([*KEY_COLUMNS, "user_id"], viewers)
+    )
+    db.session.commit()
+    return result.rowcount
@@ -1,8 +1,32 @@
 from __future__ import annotations
 
-from typing import Iterable
+from datetime import datetime
+from typing import Iterable, Optional, Sequence, Tuple
 
-from backend.models import StudentResponse, db
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import joinedload
+
+from backend.models import Question, StudentResponse, db
+from backend.repositories import user_repository
+
+# Text stored once per question in ``questions``; responses only keep legacy copies
+QUESTION_TEXT = ("question_code", "correct_answer")
+
+
+def column(name: str):
+    """
+    The selectable for response field ``name``. ``QUESTION_TEXT`` fields
+    read the legacy copy or the linked question, so a query selecting them
+    needs ``with_questions``.
+    """
+
+    if name in QUESTION_TEXT:
+        return func.coalesce(getattr(StudentResponse, name), getattr(Question, name)).label(name)
+    return getattr(StudentResponse, name)
+
+
+def with_questions(query):
+    return query.outerjoin(Question, Question.id == StudentResponse.question_id)
 
 
 def add_response(response: StudentResponse) -> StudentResponse:
@@ -11,10 +35,84 @@ def add_response(response: StudentResponse) -> StudentResponse:
     return response
 
 
+def add_responses(responses: Sequence[StudentResponse]) -> Sequence[StudentResponse]:
+    """Insert ``responses`` with one flush (a single multi-row ``INSERT``)."""
+
+    db.session.add_all(responses)
+    db.session.flush()
+    return responses
+
+
+def backfill_class_ids() -> int:
+    """
+    Stamp responses recorded without a class with the class of the student's
+    newest active roster entry; unrostered students' rows stay ``NULL``.
+    Returns the number of responses updated.
+    """
+
+    table = StudentResponse.__table__
+    class_id = user_repository.roster_class_id(table.c.user_id)
+    result = db.session.execute(
+        table.update()
+        .where(table.c.class_id.is_(None), class_id.is_not(None))
+        .values(class_id=class_id)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def answered_since(user_id: int, since: datetime) -> bool:
+    """Whether ``user_id`` has a response attempted at or after ``since``."""
+
+    return db.session.execute(
+        db.select(StudentResponse.id)
+        .filter(StudentResponse.user_id == user_id, StudentResponse.attempted_at >= since)
+        .limit(1)
+    ).first() is not None
+
+
+def strip_question_text(batch_size: int = 5000) -> int:
+    """
+    Drop the legacy question text from responses linked to a question, in
+    primary-key batches committed one at a time. Returns the number of
+    responses stripped; ``VACUUM`` afterwards to return the space.
+    """
+
+    table = StudentResponse.__table__
+    stripped = 0
+    last_id = 0
+    while True:
+        ids = (
+            db.session.execute(
+                db.select(table.c.id)
+                .where(
+                    table.c.id > last_id,
+                    table.c.question_id.is_not(None),
+                    (table.c.question_code.is_not(None)) | (table.c.correct_answer.is_not(None)),
+                )
+                .order_by(table.c.id)
+                .limit(batch_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            return stripped
+        db.session.execute(
+            table.update()
+            .where(table.c.id.in_(ids))
+            .values(question_code=None, correct_answer=None)
+        )
+        db.session.commit()
+        stripped += len(ids)
+        last_id = ids[-1]
+
+
 def get_by_user(user_id: int) -> Iterable[StudentResponse]:
     return (
         db.session.execute(
             db.select(StudentResponse)
+            .options(joinedload(StudentResponse.question))
             .filter_by(user_id=user_id)
             .order_by(StudentResponse.attempted_at.desc())
         )
@@ -27,6 +125,7 @@ def get_by_user_and_topic(user_id: int, topic_id: str) -> Iterable[StudentRespon
     return (
         db.session.execute(
             db.select(StudentResponse)
+            .options(joinedload(StudentResponse.question))
             .filter_by(user_id=user_id, topic=topic_id)
             .order_by(StudentResponse.attempted_at.desc())
         )
@@ -34,3 +133,55 @@ def get_by_user_and_topic(user_id: int, topic_id: str) -> Iterable[StudentRespon
         .all()
     )
 
+
+def get_page(
+    user_id: int,
+    *,
+    limit: int,
+    before: Optional[Tuple[datetime, int]] = None,
+    topic_id: Optional[str] = None,
+    subtopic_type: Optional[str] = None,
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    columns: Optional[Sequence] = None,
+) -> Sequence:
+    """
+    Return up to ``limit`` of the user's responses, newest first.
+
+    Pagination is keyset-based on ``(attempted_at, id)``: pass the last row's
+    pair as ``before`` to continue. Served by ``ix_student_responses_user_attempted``.
+    When ``columns`` is given only those columns are selected (rows are
+    mappings; build them with ``column``); otherwise full ``StudentResponse``
+    objects are returned, their questions loaded with them.
+    """
+
+    if columns:
+        query = db.select(*columns)
+        if any(getattr(selected, "key", None) in QUESTION_TEXT for selected in columns):
+            query = with_questions(query)
+    else:
+        query = db.select(StudentResponse).options(joinedload(StudentResponse.question))
+    query = query.filter(StudentResponse.user_id == user_id)
+
+    if before is not None:
+        query = query.filter(
+            tuple_(StudentResponse.attempted_at, StudentResponse.id) < tuple_(*before)
+        )
+    if topic_id is not None:
+        query = query.filter(StudentResponse.topic == topic_id)
+    if subtopic_type is not None:
+        query = query.filter(StudentResponse.subtopic_type == subtopic_type)
+    if status is not None:
+        query = query.filter(StudentResponse.status == status)
+    if start is not None:
+        query = query.filter(StudentResponse.attempted_at >= start)
+    if end is not None:
+        query = query.filter(StudentResponse.attempted_at < end)
+
+    query = query.order_by(
+        StudentResponse.attempted_at.desc(), StudentResponse.id.desc()
+    ).limit(limit)
+
+    result = db.session.execute(query)
+    return result.mappings().all() if columns else result.scalars().all()
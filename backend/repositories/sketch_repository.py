@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from itertools import groupby
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, tuple_
+
+from backend.models import DistinctSketch, StudentResponse, db
+from backend.repositories.upsert import upsert
+from backend.sketches import HyperLogLog
+
+NO_CLASS = 0
+INSERT_BATCH = 500
+
+SketchKey = Tuple[str, str]
+
+
+def subtopic_key(topic_id: str, subtopic_type: str) -> str:
+    return f"{topic_id}:{subtopic_type}"
+
+
+def day_key(value) -> str:
+    return value.isoformat() if isinstance(value, (date, datetime)) else str(value)[:10]
+
+
+def response_keys(
+    *,
+    topic: str,
+    subtopic_type: str,
+    question_id: Optional[int],
+    attempted_at: datetime,
+) -> List[SketchKey]:
+    """The (dimension, key) sketches one response contributes to."""
+
+    keys = [
+        ("topic", topic),
+        ("subtopic", subtopic_key(topic, subtopic_type)),
+        ("day", day_key(attempted_at.date())),
+    ]
+    if question_id is not None:
+        keys.append(("question", str(question_id)))
+    return keys
+
+
+def record(
+    *,
+    user_id: int,
+    class_id: Optional[int],
+    topic: str,
+    subtopic_type: str,
+    question_id: Optional[int],
+    attempted_at: datetime,
+) -> None:
+    """
+    Add ``user_id`` to every sketch the response touches.
+
+    Reads the affected rows ``FOR UPDATE`` (a no-op on SQLite, where writers
+    are serialised anyway) and only writes back sketches whose registers
+    changed, which after warm-up is rare.
+    """
+
+    class_key = class_id or NO_CLASS
+    keys = response_keys(
+        topic=topic,
+        subtopic_type=subtopic_type,
+        question_id=question_id,
+        attempted_at=attempted_at,
+    )
+    stored = {
+        (row.dimension, row.key): row.registers
+        for row in db.session.execute(
+            db.select(DistinctSketch.dimension, DistinctSketch.key, DistinctSketch.registers)
+            .filter(
+                DistinctSketch.class_id == class_key,
+                tuple_(DistinctSketch.dimension, DistinctSketch.key).in_(keys),
+            )
+            .with_for_update()
+        )
+    }
+
+    now = datetime.utcnow()
+    for dimension, key in keys:
+        registers = stored.get((dimension, key))
+        sketch = HyperLogLog.from_bytes(registers) if registers else HyperLogLog()
+        if not sketch.add(user_id):
+            continue
+        data = sketch.to_bytes()
+        upsert(
+            DistinctSketch.__table__,
+            {
+                "dimension": dimension,
+                "key": key,
+                "class_id": class_key,
+                "registers": data,
+                "updated_at": now,
+            },
+            conflict_columns=("dimension", "key", "class_id"),
+            on_conflict={"registers": data, "updated_at": now},
+        )
+
+
+def _load(
+    dimension: str, keys: Iterable[str], class_ids: Optional[Sequence[int]]
+) -> Iterable[Tuple[str, bytes]]:
+    query = db.select(DistinctSketch.key, DistinctSketch.registers).filter(
+        DistinctSketch.dimension == dimension, DistinctSketch.key.in_(list(keys))
+    )
+    if class_ids is not None:
+        query = query.filter(DistinctSketch.class_id.in_(list(class_ids)))
+    return db.session.execute(query).all()
+
+
+def estimate_many(
+    dimension: str, keys: Iterable[str], class_ids: Optional[Sequence[int]] = None
+) -> Dict[str, int]:
+    """Approximate distinct students per key, merged over ``class_ids`` (all by default)."""
+
+    merged: Dict[str, HyperLogLog] = {}
+    for key, registers in _load(dimension, keys, class_ids):
+        sketch = HyperLogLog.from_bytes(registers)
+        if key in merged:
+            merged[key].merge(sketch)
+        else:
+            merged[key] = sketch
+    return {key: sketch.count() for key, sketch in merged.items()}
+
+
+def estimate_union(
+    dimension: str, keys: Iterable[str], class_ids: Optional[Sequence[int]] = None
+) -> int:
+    """Approximate distinct students across all ``keys`` together (e.g. a week of days)."""
+
+    union: Optional[HyperLogLog] = None
+    for _, registers in _load(dimension, keys, class_ids):
+        sketch = HyperLogLog.from_bytes(registers)
+        union = sketch if union is None else union.merge(sketch)
+    return union.count() if union else 0
+
+
+_REBUILD_SOURCES: Dict[str, Tuple[tuple, Callable[[tuple], str]]] = {
+    "topic": ((StudentResponse.topic,), lambda row: row[0]),
+    "subtopic": (
+        (StudentResponse.topic, StudentResponse.subtopic_type),
+        lambda row: subtopic_key(row[0], row[1]),
+    ),
+    "day": ((func.date(StudentResponse.attempted_at),), lambda row: day_key(row[0])),
+    "question": ((StudentResponse.question_id,), lambda row: str(row[0])),
+}
+
+
+def rebuild(batch_size: int = 10_000) -> int:
+    """
+    Recompute every sketch from ``student_responses``.
+
+    Streams distinct (key, class, user) triples in key order so only one
+    sketch is held in memory at a time. Returns the number of sketches written.
+    """
+
+    table = DistinctSketch.__table__
+    db.session.execute(table.delete())
+    class_key = func.coalesce(StudentResponse.class_id, NO_CLASS)
+    written = 0
+    now = datetime.utcnow()
+
+    for dimension, (columns, key_of) in _REBUILD_SOURCES.items():
+        query = (
+            db.select(*columns, class_key, StudentResponse.user_id)
+            .distinct()
+            .order_by(*columns, class_key)
+        )
+        if dimension == "question":
+            query = query.filter(StudentResponse.question_id.is_not(None))
+
+        width = len(columns)
+        pending: List[dict] = []
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        for (key, class_id), rows in groupby(
+            result, key=lambda row: (key_of(row[:width]), row[width])
+        ):
+            sketch = HyperLogLog()
+            sketch.update(row[-1] for row in rows)
+            pending.append(
+                {
+                    "dimension": dimension,
+                    "key": key,
+                    "class_id": class_id,
+                    "registers": sketch.to_bytes(),
+                    "updated_at": now,
+                }
+            )
+            if len(pending) >= INSERT_BATCH:
+                db.session.execute(table.insert(), pending)
+                written += len(pending)
+                pending = []
+        if pending:
+            db.session.execute(table.insert(), pending)
+            written += len(pending)
+
+    db.session.commit()
+    return written
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Mapping, Optional, Sequence
+
+from sqlalchemy import ColumnCollection, ColumnElement, Result, Row, Table
+from sqlalchemy.dialects import postgresql, sqlite
+
+from backend.models import db
+
+_DIALECT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def upsert(
+    table: Table,
+    values: Mapping,
+    *,
+    conflict_columns: Sequence[str],
+    on_conflict: Dict,
+    where: Optional[ColumnElement] = None,
+    returning: Sequence = (),
+) -> Result:
+    """
+    ``INSERT ... ON CONFLICT (conflict_columns) DO UPDATE SET on_conflict``.
+
+    ``on_conflict`` values may reference ``table.c.<column>`` for the existing
+    row, which keeps counter updates atomic without a read-modify-write.
+    ``where`` skips the update (and its write) when false; ``returning``
+    columns come back for inserted or updated rows only.
+    """
+
+    statement = _dialect_insert()(table).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(conflict_columns), set_=on_conflict, where=where
+    )
+    if returning:
+        statement = statement.returning(*returning)
+    return db.session.execute(statement)
+
+
+def upsert_many(
+    table: Table,
+    rows: Sequence[Mapping],
+    *,
+    conflict_columns: Sequence[str],
+    on_conflict: Callable[[ColumnCollection], Dict],
+) -> None:
+    """
+    ``upsert`` every mapping in ``rows`` with one executemany.
+
+    ``on_conflict`` receives the ``excluded`` columns (the row being
+    inserted) and returns the update, e.g. ``{"n": table.c.n + excluded.n}``.
+    Rows are applied in order, so later rows see earlier rows' updates.
+    """
+
+    if not rows:
+        return
+    statement = _dialect_insert()(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(conflict_columns), set_=on_conflict(statement.excluded)
+    )
+    db.session.execute(statement, list(rows))
+
+
+def insert_missing(
+    table: Table,
+    rows: Sequence[Mapping],
+    *,
+    conflict_columns: Sequence[str],
+    returning: Sequence,
+) -> List[Row]:
+    """
+    ``INSERT ... ON CONFLICT (conflict_columns) DO NOTHING`` for every
+    mapping in ``rows`` with one executemany; the ``returning`` columns come
+    back for the rows actually inserted. The unique index settles races, so
+    of two concurrent inserts of the same key exactly one is returned.
+    """
+
+    if not rows:
+        return []
+    statement = (
+        _dialect_insert()(table)
+        .on_conflict_do_nothing(index_elements=list(conflict_columns))
+        .returning(*returning)
+    )
+    return db.session.execute(statement, list(rows)).all()
+
+
+def _dialect_insert():
+    dialect = db.session.get_bind().dialect.name
+    try:
+        return _DIALECT_INSERTS[dialect]
+    except KeyError:
+        raise NotImplementedError(f"upsert is not supported on {dialect}") from None
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from typing import Optional
 
-from backend.models import User, db
+from sqlalchemy import Row, and_, case, func, or_
+
+from backend.models import RosterStudent, User, db
+from backend.repositories.upsert import upsert
 
 
 def get_by_id(user_id: int) -> Optional[User]:
@@ -19,3 +22,102 @@ def create_user(email: str, name: str, role: str = "student") -> User:
     db.session.flush()
     return user
 
+
+def roster_entry_value(column, email_lower):
+    """
+    Scalar subquery: ``column`` of the newest active roster entry whose email
+    matches ``email_lower`` (a lower-cased string or SQL expression).
+    """
+
+    return (
+        db.select(column)
+        .where(
+            func.lower(RosterStudent.email) == email_lower,
+            RosterStudent.deleted_at.is_(None),
+        )
+        .order_by(RosterStudent.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def roster_class_id(user_id_column):
+    """Scalar subquery: the class of the newest active roster entry of ``user_id_column``."""
+
+    email = (
+        db.select(func.lower(User.email))
+        .where(User.id == user_id_column)
+        .correlate_except(User)
+        .scalar_subquery()
+    )
+    return roster_entry_value(RosterStudent.class_id, email)
+
+
+def get_identity(user_id: int) -> Optional[Row]:
+    """``(id, email, name, role, class_id)`` for ``user_id``, from one query."""
+
+    return db.session.execute(
+        db.select(
+            User.id,
+            User.email,
+            User.name,
+            User.role,
+            roster_entry_value(RosterStudent.class_id, func.lower(User.email)).label("class_id"),
+        ).where(User.id == user_id)
+    ).first()
+
+
+def upsert_on_login(
+    email: str,
+    *,
+    default_name: str,
+    display_name: Optional[str] = None,
+    instructor: bool = False,
+) -> Row:
+    """
+    Create or reconcile the user signing in as ``email`` in one statement, so
+    concurrent first logins cannot race on the unique email.
+
+    An active roster entry wins for the name and makes the user a student
+    (unless already an instructor); otherwise ``display_name`` (from Google)
+    replaces the stored name. ``instructor`` forces the instructor role. The
+    row is only rewritten when the role or name actually changes. Returns
+    ``(id, email, name, role, class_id)``, ``class_id`` being the class of
+    the newest active roster entry.
+    """
+
+    users = User.__table__
+    roster_name = roster_entry_value(
+        func.trim(RosterStudent.first_name + " " + RosterStudent.last_name), email.lower()
+    )
+    class_id = roster_entry_value(RosterStudent.class_id, email.lower()).label("class_id")
+
+    if instructor:
+        role = "instructor"
+    else:
+        role = case(
+            (and_(roster_name.is_not(None), users.c.role != "instructor"), "student"),
+            else_=users.c.role,
+        )
+    name_rules = [(roster_name != "", roster_name)]
+    if display_name:
+        name_rules.append((roster_name.is_(None), display_name))
+    name = case(*name_rules, else_=users.c.name)
+
+    columns = (users.c.id, users.c.email, users.c.name, users.c.role, class_id)
+    row = upsert(
+        users,
+        {
+            "email": email,
+            "name": func.coalesce(func.nullif(roster_name, ""), default_name),
+            "role": "instructor" if instructor else "student",
+        },
+        conflict_columns=("email",),
+        on_conflict={"role": role, "name": name},
+        where=or_(users.c.role != role, users.c.name != name),
+        returning=columns,
+    ).first()
+    if row is None:
+        # Nothing changed, so ON CONFLICT skipped the update and returned no row
+        row = db.session.execute(db.select(*columns).where(users.c.email == email)).one()
+    return row
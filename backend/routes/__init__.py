@@ -1,18 +1,28 @@
-from backend.routes.auth import auth_bp
-from backend.routes.classes import classes_bp
-from backend.routes.progress import progress_bp
-from backend.routes.reports import reports_bp
-from backend.routes.responses import responses_bp
-from backend.routes.students import students_bp
-from backend.routes.topics import topics_bp
+"""
+Blueprint registry.
 
-__all__ = [
-    "auth_bp",
-    "classes_bp",
-    "responses_bp",
-    "progress_bp",
-    "topics_bp",
-    "reports_bp",
-    "students_bp",
-]
+Blueprints are imported on first access so that importing one route module
+(or the package itself) does not drag in every other route's dependencies.
+"""
 
+from importlib import import_module
+
+BLUEPRINT_MODULES = {
+    "auth_bp": "backend.routes.auth",
+    "classes_bp": "backend.routes.classes",
+    "diagnostics_bp": "backend.routes.diagnostics",
+    "progress_bp": "backend.routes.progress",
+    "reports_bp": "backend.routes.reports",
+    "responses_bp": "backend.routes.responses",
+    "students_bp": "backend.routes.students",
+    "topics_bp": "backend.routes.topics",
+}
+
+__all__ = list(BLUEPRINT_MODULES)
+
+
+def __getattr__(name: str):
+    module_path = BLUEPRINT_MODULES.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module_path), name)
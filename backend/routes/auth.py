@@ -1,16 +1,18 @@
 from __future__ import annotations
 
-import json
 import secrets
+import time
+from functools import wraps
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 
 import flask
 from flask import Blueprint, jsonify, request, session, current_app
-from google_auth_oauthlib.flow import Flow
 
+from backend import session_store
+from backend.identity_cache import Identity
 from backend.models import User
 from backend.services.auth_service import AuthService
+from backend.services.google_oauth_service import GoogleOAuthError, GoogleOAuthService
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/api/auth")
 
@@ -19,6 +21,72 @@ def get_auth_service():
     return current_app.config.get("AUTH_SERVICE", AuthService)
 
 
+def get_google_oauth_service():
+    return current_app.config.get("GOOGLE_OAUTH_SERVICE", GoogleOAuthService)
+
+
+def current_user():
+    """
+    Return the signed-in user, or ``None``.
+
+    The role, name and class cached in the session at login are trusted for
+    ``SESSION_IDENTITY_MAX_AGE_SECONDS``; after that they are re-checked
+    against the auth service and the session snapshot is refreshed.
+    """
+
+    user_id = session.get("user_id")
+    if not user_id:
+        return None
+
+    cached = session.get("identity")
+    max_age = current_app.config.get("SESSION_IDENTITY_MAX_AGE_SECONDS", 60)
+    if (
+        cached
+        and cached.get("id") == user_id
+        and time.time() - cached.get("checked_at", 0) < max_age
+    ):
+        return Identity(
+            id=cached["id"],
+            email=cached["email"],
+            name=cached["name"],
+            role=cached["role"],
+            class_id=cached.get("class_id"),
+        )
+
+    user = get_auth_service().get_user_by_id(user_id)
+    if user is None:
+        session.pop("identity", None)
+    else:
+        _remember_user(user)
+    return user
+
+
+def _remember_user(user) -> None:
+    session["user_id"] = user.id
+    session["identity"] = {
+        **_serialise_user(user),
+        "class_id": getattr(user, "class_id", None),
+        "checked_at": time.time(),
+    }
+
+
+def instructor_required(view):
+    """Reject the request unless the session user is an instructor."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not session.get("user_id"):
+            return jsonify({"error": "Not authenticated"}), 401
+
+        user = current_user()
+        if not user or user.role != "instructor":
+            return jsonify({"error": "Instructor access required"}), 403
+
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
 @auth_bp.post("/login")
 def login():
     """Authenticate or auto-register a user based on email."""
@@ -31,7 +99,8 @@ def login():
 
     service = get_auth_service()
     user = service.login_or_create_user(email)
-    session["user_id"] = user.id
+    session_store.regenerate(session)
+    _remember_user(user)
     return jsonify({"user": _serialise_user(user)})
 
 
@@ -39,12 +108,10 @@ def login():
 def profile():
     """Return the current authenticated user's profile."""
 
-    user_id = session.get("user_id")
-    if not user_id:
+    if not session.get("user_id"):
         return jsonify({"error": "Not authenticated"}), 401
 
-    service = get_auth_service()
-    user = service.get_user_by_id(user_id)
+    user = current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -102,29 +169,14 @@ def google_callback():
     if not code:
         return jsonify({"error": "Missing authorization code"}), 400
 
-    scopes = (current_app.config.get("GOOGLE_OAUTH_SCOPE") or "").split()
-    client_secrets_file = current_app.config.get("GOOGLE_CLIENT_SECRETS_FILE")
-    redirect_uri = current_app.config.get("GOOGLE_REDIRECT_URI")
-
-    flow = Flow.from_client_secrets_file(
-        client_secrets_file,
-        scopes=scopes,
-        state=expected_state,
-    )
-    flow.redirect_uri = redirect_uri
-    flow.fetch_token(code=code)
-
-    credentials = flow.credentials
-    session["google_credentials"] = {
-        "token": credentials.token,
-        "refresh_token": credentials.refresh_token,
-        "granted_scopes": list(credentials.granted_scopes or []),
-        "expires_at": credentials.expiry.isoformat() if credentials.expiry else None,
-    }
+    service = get_google_oauth_service()
+    try:
+        result = service.complete_login(code)
+    except GoogleOAuthError as exc:
+        return jsonify(exc.to_dict()), exc.status_code
 
-    userinfo = _fetch_google_userinfo(credentials.token)
-    if "error" in userinfo:
-        return jsonify(userinfo), 400
+    session["google_credentials"] = result["credentials"]
+    userinfo = result["userinfo"]
 
     email = userinfo.get("email")
     if not email:
@@ -135,7 +187,8 @@ def google_callback():
 
     service = get_auth_service()
     user = service.login_or_create_user(email, display_name=display_name)
-    session["user_id"] = user.id
+    session_store.regenerate(session)
+    _remember_user(user)
 
     frontend_url = current_app.config.get("FRONTEND_URL", "http://localhost:5173")
     return flask.redirect(frontend_url)
@@ -178,14 +231,3 @@ def check_granted_scopes(granted_scopes: list[str]) -> dict:
         "openid": "openid" in scope_set,
     }
 
-
-def _fetch_google_userinfo(token: str) -> dict:
-    request_obj = Request(
-        "https://openidconnect.googleapis.com/v1/userinfo",
-        headers={"Authorization": f"Bearer {token}"},
-    )
-    try:
-        with urlopen(request_obj, timeout=10) as response:
-            return json.loads(response.read().decode("utf-8"))
-    except Exception as exc:  # pragma: no cover - network errors
-        return {"error": "Failed to fetch user info", "details": str(exc)}
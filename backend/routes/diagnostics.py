@@ -0,0 +1,46 @@
+"""
+Instructor-only diagnostics (slow-query log).
+"""
+
+from __future__ import annotations
+
+from flask import Blueprint, jsonify, request
+
+from backend import slow_queries
+from backend.routes.auth import instructor_required
+
+diagnostics_bp = Blueprint("diagnostics", __name__, url_prefix="/api/diagnostics")
+
+
+@diagnostics_bp.get("/slow-queries")
+@instructor_required
+def list_slow_queries():
+    """Return recorded slow statements, newest first."""
+
+    recorder = slow_queries.get_recorder()
+    if recorder is None:
+        return jsonify({"enabled": False, "queries": []}), 200
+
+    limit = request.args.get("limit", default=None, type=int)
+    return (
+        jsonify(
+            {
+                "enabled": True,
+                "threshold_ms": recorder.threshold_ms,
+                "explain_threshold_ms": recorder.explain_threshold_ms,
+                "queries": recorder.entries(limit),
+            }
+        ),
+        200,
+    )
+
+
+@diagnostics_bp.delete("/slow-queries")
+@instructor_required
+def clear_slow_queries():
+    """Empty the in-memory slow-query buffer (the JSONL file is untouched)."""
+
+    recorder = slow_queries.get_recorder()
+    if recorder is not None:
+        recorder.clear()
+    return "", 204
@@ -0,0 +1,58 @@
+"""Query-string parsing shared by the API blueprints."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from flask import request
+
+
+TRUE_VALUES = {"1", "true", "yes"}
+
+
+def parse_bool_arg(name: str) -> bool:
+    """
+    A flag query parameter: true for ``1``, ``true`` or ``yes`` (any case),
+    false when absent or anything else. Flask's ``type=bool`` would make
+    ``?flag=0`` true.
+    """
+
+    return (request.args.get(name) or "").strip().lower() in TRUE_VALUES
+
+
+def parse_int_arg(name: str) -> Optional[int]:
+    """
+    An integer query parameter; ``None`` when absent. Unlike Flask's
+    ``type=int``, a malformed value raises ``ValueError`` instead of being
+    treated as absent, so a bad filter cannot silently widen a query.
+    """
+
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+
+def parse_datetime_arg(name: str, *, end_of_day: bool = False) -> Optional[datetime]:
+    """
+    Parse an ISO date or datetime query parameter; ``None`` when absent.
+
+    With ``end_of_day`` a date-only value is moved to the following midnight,
+    so ``end=2025-01-31`` used as an exclusive bound includes that whole day.
+    Raises ``ValueError`` with a client-facing message on malformed input.
+    """
+
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        value = datetime.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO date or datetime") from None
+    if end_of_day and len(raw) == 10:
+        value += timedelta(days=1)
+    return value
@@ -3,7 +3,8 @@ from __future__ import annotations
 from flask import Blueprint, jsonify, request, current_app
 
 from backend.models import StudentProgress, Topic
-from backend.repositories import topic_repository, user_repository
+from backend.repositories import topic_repository
+from backend.routes.auth import get_auth_service
 from backend.services.progress_service import ProgressService
 
 progress_bp = Blueprint("progress", __name__, url_prefix="/api/progress")
@@ -13,10 +14,6 @@ def get_progress_service():
     return current_app.config.get("PROGRESS_SERVICE", ProgressService)
 
 
-def get_user_repository():
-    return current_app.config.get("USER_REPOSITORY", user_repository)
-
-
 def get_topic_repository():
     return current_app.config.get("TOPIC_REPOSITORY", topic_repository)
 
@@ -25,10 +22,10 @@ def get_topic_repository():
 def get_user_progress(user_id: int):
     """Return progress for all topics for the requested user."""
 
-    users = get_user_repository()
+    auth = get_auth_service()
     topics_repo = get_topic_repository()
 
-    user = users.get_by_id(user_id)
+    user = auth.get_user_by_id(user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -55,10 +52,10 @@ def get_user_progress(user_id: int):
 def get_topic_progress(user_id: int, topic_id: str):
     """Return progress for a specific topic for the requested user."""
 
-    users = get_user_repository()
+    auth = get_auth_service()
     topics_repo = get_topic_repository()
 
-    if not users.get_by_id(user_id):
+    if not auth.get_user_by_id(user_id):
         return jsonify({"error": "User not found"}), 404
 
     topic = topics_repo.get_by_id(topic_id)
@@ -99,10 +96,11 @@ def update_topic_progress(user_id: int, topic_id: str):
     if total_subtopics <= 0:
         return jsonify({"error": "total_subtopics must be greater than 0"}), 400
 
-    users = get_user_repository()
+    auth = get_auth_service()
     topics_repo = get_topic_repository()
 
-    if not users.get_by_id(user_id):
+    user = auth.get_user_by_id(user_id)
+    if not user:
         return jsonify({"error": "User not found"}), 404
 
     topic = topics_repo.get_by_id(topic_id)
@@ -121,6 +119,7 @@ def update_topic_progress(user_id: int, topic_id: str):
             "subtopics_completed": subtopics_completed,
             "total_subtopics": total_subtopics,
         },
+        class_id=getattr(user, "class_id", None),
     )
 
     response_payload = _serialise_progress(progress, topic)
@@ -132,10 +131,11 @@ def update_topic_progress(user_id: int, topic_id: str):
 def increment_questions_answered(user_id: int, topic_id: str):
     """Increment the number of questions answered for a topic."""
 
-    users = get_user_repository()
+    auth = get_auth_service()
     topics_repo = get_topic_repository()
 
-    if not users.get_by_id(user_id):
+    user = auth.get_user_by_id(user_id)
+    if not user:
         return jsonify({"error": "User not found"}), 404
 
     if not topics_repo.get_by_id(topic_id):
@@ -146,7 +146,9 @@ def increment_questions_answered(user_id: int, topic_id: str):
         )
 
     service = get_progress_service()
-    progress = service.increment_questions_answered(user_id=user_id, topic_id=topic_id)
+    progress = service.increment_questions_answered(
+        user_id=user_id, topic_id=topic_id, class_id=getattr(user, "class_id", None)
+    )
     return jsonify(
         {"message": "Progress incremented", "questions_answered": progress.questions_answered}
     ), 200
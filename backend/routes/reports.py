@@ -1,8 +1,15 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request, current_app
+import time
 
+from flask import Blueprint, Response, jsonify, request, current_app
+
+from backend import live_updates
+from backend.routes.auth import current_user, instructor_required
+from backend.routes.params import parse_bool_arg, parse_datetime_arg
+from backend.services.insight_service import InsightService
 from backend.services.report_service import ReportService
+from backend.services.snapshot_service import SnapshotInProgressError, SnapshotService
 
 reports_bp = Blueprint("reports", __name__, url_prefix="/api/reports")
 
@@ -16,10 +23,40 @@ def get_student_report(student_id: int):
     return jsonify(report), 200
 
 
+@reports_bp.get("/students")
+def get_student_reports():
+    """
+    Student reports for a comma-separated ``ids`` list or every rostered
+    student of ``class_id``, built with a fixed number of grouped queries.
+    """
+
+    raw_ids = request.args.get("ids")
+    class_id = request.args.get("class_id", type=int)
+    if raw_ids is None and class_id is None:
+        return jsonify({"error": "Provide ids or class_id"}), 400
+    try:
+        student_ids = (
+            [int(value) for value in raw_ids.split(",") if value.strip()]
+            if raw_ids is not None
+            else None
+        )
+    except ValueError:
+        return jsonify({"error": "ids must be a comma-separated list of integers"}), 400
+
+    service = current_app.config.get("REPORT_SERVICE", ReportService)
+    try:
+        reports = service.get_student_reports(student_ids, class_id=class_id)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(reports), 200
+
+
 @reports_bp.get("/topic/<string:topic_id>")
 def get_topic_report(topic_id: str):
+    """Topic report for all rostered students, or one ``class_id``."""
+
     service = current_app.config.get("REPORT_SERVICE", ReportService)
-    report = service.get_topic_report(topic_id)
+    report = service.get_topic_report(topic_id, class_id=request.args.get("class_id", type=int))
     if not report:
         return jsonify({"error": "Topic not found"}), 404
     return jsonify(report), 200
@@ -33,9 +70,161 @@ def get_class_overview():
     return jsonify(overview), 200
 
 
+@reports_bp.get("/live")
+@instructor_required
+def stream_live_updates():
+    """
+    Server-sent events carrying each new response's deltas to the class
+    overview (``event: response``), for ``class_id`` or every class.
+
+    ``event: resync`` means the dashboard should reload the overview: it
+    fell behind, or ``LIVE_UPDATES_RESYNC_SECONDS`` passed (events only
+    cover responses handled by this worker process). A comment line is sent
+    every ``LIVE_UPDATES_HEARTBEAT_SECONDS`` so proxies keep the stream open.
+    """
+
+    broker = live_updates.get_broker()
+    if broker is None:
+        return jsonify({"error": "Live updates are disabled"}), 503
+    subscription = broker.subscribe(request.args.get("class_id", type=int))
+    if subscription is None:
+        return jsonify({"error": "Too many live dashboards are open"}), 503
+    heartbeat = current_app.config.get("LIVE_UPDATES_HEARTBEAT_SECONDS", 15.0)
+    resync_every = current_app.config.get("LIVE_UPDATES_RESYNC_SECONDS", 60.0)
+
+    def stream():
+        yield "retry: 5000\n\n"
+        resync_at = time.monotonic() + resync_every
+        while True:
+            frame = subscription.next_frame(heartbeat)
+            yield frame if frame is not None else ": keep-alive\n\n"
+            if resync_every and time.monotonic() >= resync_at:
+                yield live_updates.PERIODIC_RESYNC_FRAME
+                resync_at = time.monotonic() + resync_every
+
+    response = Response(stream(), mimetype="text/event-stream")
+    # Also runs when the client disconnects before the first frame
+    response.call_on_close(lambda: broker.unsubscribe(subscription))
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@reports_bp.get("/instructor/rollup")
+@instructor_required
+def get_instructor_rollup():
+    """Overview of each class the signed-in instructor teaches, plus their totals."""
+
+    service = current_app.config.get("REPORT_SERVICE", ReportService)
+    return jsonify(service.get_instructor_rollup(current_user().id)), 200
+
+
+@reports_bp.get("/insights")
+@instructor_required
+def get_class_insights():
+    """Stored leaderboard and at-risk students for ``class_id`` (all students if omitted)."""
+
+    service = current_app.config.get("INSIGHT_SERVICE", InsightService)
+    insight = service.get_class_insight(request.args.get("class_id", type=int))
+    if insight is None:
+        return jsonify({"error": "Insights have not been computed yet"}), 404
+    return jsonify(insight.to_dict()), 200
+
+
+@reports_bp.post("/insights/refresh")
+@instructor_required
+def refresh_class_insights():
+    """Recompute insights now for ``class_id``, or for every class if omitted."""
+
+    service = current_app.config.get("INSIGHT_SERVICE", InsightService)
+    summary = service.compute(class_id=request.args.get("class_id", type=int))
+    return jsonify(summary), 200
+
+
+@reports_bp.get("/activity")
+def get_activity_series():
+    """
+    Activity per ``granularity`` (hour, day, week or month; default day) for a
+    ``student_id``, a ``class_id`` roster, or all rostered students, between
+    optional ``start`` and ``end`` (ISO dates or datetimes, end exclusive).
+    """
+
+    service = current_app.config.get("REPORT_SERVICE", ReportService)
+    try:
+        series = service.get_activity_series(
+            granularity=request.args.get("granularity", "day"),
+            student_id=request.args.get("student_id", type=int),
+            class_id=request.args.get("class_id", type=int),
+            start=parse_datetime_arg("start"),
+            end=parse_datetime_arg("end", end_of_day=True),
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(series), 200
+
+
 @reports_bp.get("/question/<string:topic_id>/analytics")
 def get_question_analytics(topic_id: str):
-    subtopic_type = request.args.get("subtopic_type")
+    """
+    One page of per-question stats for a topic.
+
+    Query params: ``sort`` (``attempts``, ``success_rate`` or ``time``),
+    ``limit`` (default 100, max 500), ``cursor`` (the previous page's
+    ``next_cursor``), ``group_by`` (``question`` or ``template``),
+    ``subtopic_type``, ``class_id`` and ``rostered=1`` (only students on the
+    current roster).
+    """
+
     service = current_app.config.get("REPORT_SERVICE", ReportService)
-    analytics = service.get_question_analytics(topic_id, subtopic_type=subtopic_type)
+    limit = request.args.get("limit", type=int, default=ReportService.DEFAULT_QUESTION_PAGE_SIZE)
+    max_limit = ReportService.MAX_QUESTION_PAGE_SIZE
+    if limit < 1 or limit > max_limit:
+        return jsonify({"error": f"limit must be between 1 and {max_limit}"}), 400
+
+    try:
+        analytics = service.get_question_analytics(
+            topic_id,
+            subtopic_type=request.args.get("subtopic_type"),
+            class_id=request.args.get("class_id", type=int),
+            sort=request.args.get("sort") or "attempts",
+            limit=limit,
+            cursor=request.args.get("cursor") or None,
+            group_by=request.args.get("group_by") or "question",
+            rostered=parse_bool_arg("rostered"),
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     return jsonify(analytics), 200
+
+
+@reports_bp.post("/snapshot")
+@instructor_required
+def create_snapshot():
+    """
+    Export responses, questions, progress and roster added since the last
+    snapshot to ``SNAPSHOT_DIR`` as Parquet or ``.npz`` files. 409 while
+    another snapshot run is writing.
+    """
+
+    service = current_app.config.get("SNAPSHOT_SERVICE", SnapshotService)
+    try:
+        summary = service.create_snapshot(
+            current_app.config["SNAPSHOT_DIR"],
+            export_format=request.args.get("format") or current_app.config["SNAPSHOT_FORMAT"],
+        )
+    except SnapshotInProgressError as exc:
+        return jsonify({"error": str(exc)}), 409
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except RuntimeError as exc:
+        return jsonify({"error": str(exc)}), 501
+    return jsonify(summary), 201
+
+
+@reports_bp.get("/snapshot")
+@instructor_required
+def get_snapshot_status():
+    """Return the snapshot watermark and the history of completed runs."""
+
+    service = current_app.config.get("SNAPSHOT_SERVICE", SnapshotService)
+    return jsonify(service.read_watermark(current_app.config["SNAPSHOT_DIR"])), 200
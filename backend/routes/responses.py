@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
 
-from backend.repositories import topic_repository, user_repository
+from backend import ingest_buffer
+from backend.repositories import topic_repository
+from backend.routes.auth import get_auth_service, instructor_required
+from backend.routes.params import parse_datetime_arg, parse_int_arg
+from backend.services.export_service import ExportService
 from backend.services.progress_service import ProgressService
 from backend.services.response_service import ResponseService
 
@@ -17,8 +21,8 @@ def get_progress_service():
     return current_app.config.get("PROGRESS_SERVICE", ProgressService)
 
 
-def get_user_repository():
-    return current_app.config.get("USER_REPOSITORY", user_repository)
+def get_export_service():
+    return current_app.config.get("EXPORT_SERVICE", ExportService)
 
 
 def get_topic_repository():
@@ -27,7 +31,12 @@ def get_topic_repository():
 
 @responses_bp.post("")
 def create_response():
-    """Persist a new student response and update progress metrics."""
+    """
+    Persist a new student response and update progress metrics.
+
+    With ``INGEST_MODE=buffered`` the response is journaled and written in
+    the background: the reply is 202 with the accepted fields (no ``id``).
+    """
 
     payload = request.get_json(silent=True) or {}
 
@@ -38,10 +47,9 @@ def create_response():
     if not is_valid:
         return jsonify({"error": message}), 400
 
-    users = get_user_repository()
     topics_repo = get_topic_repository()
 
-    user = users.get_by_id(payload["user_id"])
+    user = get_auth_service().get_user_by_id(payload["user_id"])
     if not user:
         return (
             jsonify(
@@ -58,8 +66,25 @@ def create_response():
             is_visible=True,
         )
 
+    # The roster decides the class; a client-sent class_id only counts for
+    # students who are not rostered anywhere
+    class_id = getattr(user, "class_id", None)
+    if class_id is not None:
+        payload["class_id"] = class_id
+
+    buffer = ingest_buffer.get_buffer()
+    if buffer is not None:
+        is_valid, message = response_service.validate_types(payload)
+        if not is_valid:
+            return jsonify({"error": message}), 400
+        row = response_service.buffered_row(payload)
+        if buffer.submit(row):
+            return jsonify({"message": "Response accepted.", "response": row}), 202
+
     response = response_service.create_response(payload)
-    progress_service.increment_questions_answered(user_id=user.id, topic_id=topic.id)
+    progress_service.increment_questions_answered(
+        user_id=user.id, topic_id=topic.id, class_id=payload.get("class_id")
+    )
 
     return (
         jsonify({"message": "Response recorded successfully.", "response": response.to_dict()}),
@@ -69,8 +94,87 @@ def create_response():
 
 @responses_bp.get("/student/<int:student_id>")
 def get_responses_for_student(student_id: int):
-    """Return all responses recorded for a given student."""
+    """
+    Return one page of a student's responses, newest first.
+
+    Query params: ``limit`` (default 100, max 500), ``cursor`` (the previous
+    page's ``next_cursor``), ``topic``, ``subtopic_type``, ``status``,
+    ``start``/``end`` (ISO dates or datetimes) and ``fields`` (comma-separated
+    subset of response keys, e.g. ``fields=id,topic,is_correct``).
+    """
 
     response_service = get_response_service()
-    responses = response_service.get_student_responses(student_id)
-    return jsonify({"responses": [response.to_dict() for response in responses]}), 200
+
+    limit = request.args.get("limit", type=int, default=response_service.DEFAULT_PAGE_SIZE)
+    if limit < 1 or limit > response_service.MAX_PAGE_SIZE:
+        return (
+            jsonify({"error": f"limit must be between 1 and {response_service.MAX_PAGE_SIZE}"}),
+            400,
+        )
+
+    status = request.args.get("status") or None
+    if status is not None and status not in response_service.VALID_STATUSES:
+        return jsonify({"error": "Invalid status value"}), 400
+
+    fields_arg = request.args.get("fields")
+    fields = [name.strip() for name in fields_arg.split(",") if name.strip()] if fields_arg else None
+
+    try:
+        start = parse_datetime_arg("start")
+        end = parse_datetime_arg("end", end_of_day=True)
+        page = response_service.get_student_responses_page(
+            student_id,
+            limit=limit,
+            cursor=request.args.get("cursor") or None,
+            topic_id=request.args.get("topic") or None,
+            subtopic_type=request.args.get("subtopic_type") or None,
+            status=status,
+            start=start,
+            end=end,
+            fields=fields,
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify(page), 200
+
+
+@responses_bp.get("/export")
+@instructor_required
+def export_responses():
+    """
+    Stream responses as NDJSON (default) or CSV.
+
+    Filters: ``student_id``, ``topic``, ``class_id``, ``start``/``end`` (ISO
+    dates or datetimes; a date-only ``end`` includes that whole day).
+    """
+
+    export_format = (request.args.get("format") or "ndjson").lower()
+    service = get_export_service()
+    if export_format not in service.FORMATS:
+        return jsonify({"error": "format must be one of: ndjson, csv"}), 400
+
+    try:
+        student_id = parse_int_arg("student_id")
+        class_id = parse_int_arg("class_id")
+        start = parse_datetime_arg("start")
+        end = parse_datetime_arg("end", end_of_day=True)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    rows = service.iter_responses(
+        student_id=student_id,
+        topic_id=request.args.get("topic") or None,
+        class_id=class_id,
+        start=start,
+        end=end,
+    )
+    response = Response(
+        stream_with_context(service.stream(export_format, rows)),
+        mimetype=service.FORMATS[export_format],
+    )
+    response.headers["Content-Disposition"] = (
+        f"attachment; filename=responses.{export_format}"
+    )
+    return response
+
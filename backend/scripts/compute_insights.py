@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Recompute class leaderboards, at-risk flags and struggling subtopics.
+
+Meant to run nightly from cron; reports serve the stored results until the
+next run (or an instructor's refresh)::
+
+    python -m backend.scripts.compute_insights
+    python -m backend.scripts.compute_insights --class-id 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from backend.app import create_app
+from backend.services.insight_service import InsightService
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--class-id",
+        type=int,
+        default=None,
+        help="Only recompute this class (defaults to every class).",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="SQLAlchemy URL to use (defaults to the configured database).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    # No scheduler thread for a one-shot run
+    overrides = {"INSIGHTS_REFRESH_MINUTES": 0}
+    if args.database_url:
+        overrides["SQLALCHEMY_DATABASE_URI"] = args.database_url
+    app = create_app(overrides=overrides)
+    with app.app_context():
+        started = time.perf_counter()
+        summary = InsightService.compute(class_id=args.class_id)
+        print(
+            f"{summary['classes']} classes, {summary['students']} students "
+            f"({summary['at_risk']} at risk) in {time.perf_counter() - started:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
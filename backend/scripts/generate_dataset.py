@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+High-volume synthetic data generator for load and benchmark testing.
+
+Builds on the archetypes used by ``init_db.seed_realistic_dataset`` but
+streams rows with chunked executemany inserts instead of one ORM add per
+response, and can spread row generation across worker processes. Every row
+is derived from ``--seed`` and the student's index, so the output does not
+depend on the number of workers.
+
+Example::
+
+    python -m backend.scripts.generate_dataset --students 100000 --classes 100 \\
+        --responses-per-student 10 --workers 4 --database-url sqlite:///load.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from flask import current_app
+
+from backend.app import create_app
+from backend.init_db import (
+    ARCHETYPE_CONFIG,
+    STUDENT_PROFILES,
+    _utc_now,
+    build_response_row,
+)
+from backend.models import (
+    Class,
+    RosterStudent,
+    StudentProgress,
+    StudentResponse,
+    User,
+    db,
+)
+from backend.repositories import (
+    activity_repository,
+    question_repository,
+    question_stats_repository,
+    sketch_repository,
+)
+from backend.topic_definitions import TOPIC_DEFINITIONS, TOPIC_META_BY_ID
+
+DEFAULT_EMAIL_DOMAIN = "load.bytepath.dev"
+ARCHETYPE_CYCLE = tuple(archetype for _, _, archetype in STUDENT_PROFILES)
+
+
+@dataclass(frozen=True)
+class BlockTask:
+    """Everything a worker needs to generate rows for a run of students."""
+
+    first_index: int
+    user_ids: Tuple[int, ...]
+    class_ids: Tuple[int, ...]
+    responses_per_student: int
+    days: int
+    seed: int
+    start_datetime: datetime
+
+
+def student_email(index: int, domain: str = DEFAULT_EMAIL_DOMAIN) -> str:
+    return f"student{index:06d}@{domain}"
+
+
+def generate_block(task: BlockTask) -> Tuple[List[dict], List[dict]]:
+    """Return (response rows, progress rows) for one block of students."""
+
+    topic_ids = [topic["id"] for topic in TOPIC_DEFINITIONS]
+    responses: List[dict] = []
+    progress: Dict[Tuple[int, str, int], dict] = {}
+
+    for offset, user_id in enumerate(task.user_ids):
+        index = task.first_index + offset
+        rng = random.Random(f"{task.seed}:{index}")
+        config = ARCHETYPE_CONFIG[ARCHETYPE_CYCLE[index % len(ARCHETYPE_CYCLE)]]
+        accuracy_target = rng.uniform(*config["accuracy"])
+        class_id = task.class_ids[offset]
+
+        for _ in range(task.responses_per_student):
+            row = build_response_row(
+                rng,
+                user_id=user_id,
+                config=config,
+                accuracy_target=accuracy_target,
+                topic_ids=topic_ids,
+                start_datetime=task.start_datetime,
+                days=task.days,
+            )
+            row["class_id"] = class_id
+            responses.append(row)
+
+            summary = progress.setdefault(
+                (user_id, row["topic"], class_id),
+                {"attempts": 0, "correct": 0, "last_accessed": row["attempted_at"]},
+            )
+            summary["attempts"] += 1
+            summary["correct"] += 1 if row["is_correct"] else 0
+            summary["last_accessed"] = max(summary["last_accessed"], row["attempted_at"])
+
+    progress_rows = []
+    for (user_id, topic_id, class_id), summary in progress.items():
+        total_subtopics = TOPIC_META_BY_ID[topic_id]["total_subtopics"]
+        accuracy = summary["correct"] / summary["attempts"]
+        progress_rows.append(
+            {
+                "user_id": user_id,
+                "class_id": class_id,
+                "topic": topic_id,
+                "subtopics_completed": min(total_subtopics, round(total_subtopics * accuracy)),
+                "total_subtopics": total_subtopics,
+                "questions_answered": summary["attempts"],
+                "last_accessed": summary["last_accessed"],
+            }
+        )
+    return responses, progress_rows
+
+
+def _chunks(items: Sequence, size: int) -> Iterator[Sequence]:
+    for offset in range(0, len(items), size):
+        yield items[offset : offset + size]
+
+
+def _create_roster(
+    *, students: int, classes: int, email_domain: str, chunk_size: int
+) -> Tuple[List[int], List[int]]:
+    """Insert the instructor, classes, users and roster; return (user_ids, class_ids)."""
+
+    instructor = User(
+        email=f"instructor@{email_domain}", name="Load Test Instructor", role="instructor"
+    )
+    db.session.add(instructor)
+    db.session.flush()
+
+    sections = [
+        Class(class_name=f"Load Test Section {number}", instructor_id=instructor.id)
+        for number in range(1, classes + 1)
+    ]
+    db.session.add_all(sections)
+    db.session.flush()
+    section_ids = [section.id for section in sections]
+
+    connection = db.session.connection()
+    indices = range(students)
+    for block in _chunks(indices, chunk_size):
+        connection.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "email": student_email(i, email_domain),
+                    "name": f"Load Student {i}",
+                    "role": "student",
+                }
+                for i in block
+            ],
+        )
+        connection.execute(
+            RosterStudent.__table__.insert(),
+            [
+                {
+                    "email": student_email(i, email_domain),
+                    "first_name": "Load",
+                    "last_name": f"Student {i:06d}",
+                    "class_id": section_ids[i % classes],
+                    "last_updated_via": "csv_add",
+                }
+                for i in block
+            ],
+        )
+
+    ids_by_email = dict(
+        connection.execute(
+            db.select(User.email, User.id).filter(User.email.like(f"%@{email_domain}"))
+        ).all()
+    )
+    user_ids = [ids_by_email[student_email(i, email_domain)] for i in indices]
+    class_ids = [section_ids[i % classes] for i in indices]
+    return user_ids, class_ids
+
+
+def generate_dataset(
+    *,
+    students: int,
+    classes: int = 1,
+    days: int = 45,
+    responses_per_student: int = 20,
+    seed: int = 42,
+    workers: int = 1,
+    chunk_size: int = 10_000,
+    email_domain: str = DEFAULT_EMAIL_DOMAIN,
+    verbose: bool = False,
+) -> dict:
+    """
+    Generate ``students`` rostered students spread over ``classes`` sections,
+    each with ``responses_per_student`` responses over the last ``days`` days.
+
+    Must run inside an application context. Returns a summary dict.
+    """
+
+    if classes < 1:
+        raise ValueError("classes must be at least 1")
+
+    existing = db.session.execute(
+        db.select(db.func.count(User.id)).filter(User.email.like(f"%@{email_domain}"))
+    ).scalar_one()
+    if existing:
+        raise RuntimeError(
+            f"{existing} users already exist for @{email_domain}; "
+            "use a fresh database or a different --email-domain."
+        )
+
+    started = time.perf_counter()
+    user_ids, class_ids = _create_roster(
+        students=students, classes=classes, email_domain=email_domain, chunk_size=chunk_size
+    )
+
+    start_datetime = _utc_now() - timedelta(days=days)
+    students_per_block = max(1, chunk_size // max(1, responses_per_student))
+    tasks = [
+        BlockTask(
+            first_index=first,
+            user_ids=tuple(user_ids[first : first + students_per_block]),
+            class_ids=tuple(class_ids[first : first + students_per_block]),
+            responses_per_student=responses_per_student,
+            days=days,
+            seed=seed,
+            start_datetime=start_datetime,
+        )
+        for first in range(0, students, students_per_block)
+    ]
+
+    connection = db.session.connection()
+    response_table = StudentResponse.__table__
+    progress_table = StudentProgress.__table__
+    responses_written = progress_written = 0
+
+    pool: Optional[Pool] = Pool(workers) if workers > 1 else None
+    try:
+        blocks = pool.imap(generate_block, tasks) if pool else map(generate_block, tasks)
+        for response_rows, progress_rows in blocks:
+            question_repository.resolve_ids(response_rows)
+            for row in response_rows:
+                # The text lives in questions; responses only reference it
+                del row["question_code"], row["correct_answer"]
+            for chunk in _chunks(response_rows, chunk_size):
+                connection.execute(response_table.insert(), list(chunk))
+            if progress_rows:
+                connection.execute(progress_table.insert(), progress_rows)
+            responses_written += len(response_rows)
+            progress_written += len(progress_rows)
+            if verbose:
+                elapsed = time.perf_counter() - started
+                print(
+                    f"  {responses_written:,} responses "
+                    f"({responses_written / elapsed:,.0f} rows/s)",
+                    flush=True,
+                )
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    db.session.commit()
+    # Bulk inserts bypass the ingest path that keeps per-question stats current
+    question_stats_repository.rebuild()
+    activity_repository.rebuild(hourly=current_app.config.get("ACTIVITY_HOURLY_BUCKETS", False))
+    if current_app.config.get("DISTINCT_COUNT_MODE") == "approximate":
+        sketch_repository.rebuild()
+
+    return {
+        "students": students,
+        "classes": classes,
+        "responses": responses_written,
+        "progress_records": progress_written,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate a large synthetic BytePath dataset with bulk inserts."
+    )
+    parser.add_argument("--students", type=int, required=True)
+    parser.add_argument("--classes", type=int, default=1)
+    parser.add_argument("--days", type=int, default=45, help="Spread responses over this many days.")
+    parser.add_argument("--responses-per-student", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to generate rows (inserts stay in the main process).",
+    )
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Rows per executemany batch.")
+    parser.add_argument("--email-domain", default=DEFAULT_EMAIL_DOMAIN)
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="SQLAlchemy URL to populate (defaults to the configured database).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    overrides = {"SQLALCHEMY_DATABASE_URI": args.database_url} if args.database_url else None
+    app = create_app(overrides=overrides)
+    with app.app_context():
+        summary = generate_dataset(
+            students=args.students,
+            classes=args.classes,
+            days=args.days,
+            responses_per_student=args.responses_per_student,
+            seed=args.seed,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            email_domain=args.email_domain,
+            verbose=True,
+        )
+
+    print("Done.")
+    print(f"Students: {summary['students']} across {summary['classes']} classes")
+    print(f"Responses: {summary['responses']}")
+    print(f"Progress records: {summary['progress_records']}")
+    print(f"Elapsed: {summary['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
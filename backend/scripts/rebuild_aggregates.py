@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Recompute the precomputed report tables from ``student_responses``.
+
+The ingest path keeps these tables current one response at a time; run this
+after bulk imports, restores, roster changes or manual data fixes, or to repair
+drift::
+
+    python -m backend.scripts.rebuild_aggregates
+    python -m backend.scripts.rebuild_aggregates --only question_stats
+    DISTINCT_COUNT_MODE=approximate python -m backend.scripts.rebuild_aggregates --only distinct_sketches
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Dict
+
+from flask import current_app
+
+from backend.app import create_app
+from backend.repositories import (
+    activity_repository,
+    question_stats_repository,
+    sketch_repository,
+)
+
+AGGREGATES: Dict[str, Callable[[], int]] = {
+    "question_stats": question_stats_repository.rebuild,
+    "distinct_sketches": sketch_repository.rebuild,
+    "activity_buckets": lambda: activity_repository.rebuild(
+        hourly=current_app.config["ACTIVITY_HOURLY_BUCKETS"]
+    ),
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=sorted(AGGREGATES),
+        help="Rebuild only this aggregate (repeatable).",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="SQLAlchemy URL to rebuild (defaults to the configured database).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    overrides = {"SQLALCHEMY_DATABASE_URI": args.database_url} if args.database_url else None
+    app = create_app(overrides=overrides)
+    with app.app_context():
+        for name in args.only or list(AGGREGATES):
+            started = time.perf_counter()
+            rows = AGGREGATES[name]()
+            print(f"{name}: {rows} rows in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy import func
-
-from backend.models import RosterStudent, User, db
+from backend import identity_cache
+from backend.identity_cache import Identity
+from backend.models import User, db
 from backend.repositories import user_repository
 
 
@@ -15,55 +15,54 @@ class AuthService:
     INSTRUCTOR_EMAILS = {"bushj@moravian.edu"}
 
     @staticmethod
-    def login_or_create_user(email: str, display_name: Optional[str] = None) -> User:
-        email_lower = email.lower()
-
-        roster_entry = (
-            db.session.execute(
-                db.select(RosterStudent).filter(
-                    func.lower(RosterStudent.email) == email_lower,
-                    RosterStudent.deleted_at.is_(None),
-                )
-            )
-            .scalars()
-            .first()
-        )
-
-        preferred_name = (
-            f"{roster_entry.first_name} {roster_entry.last_name}".strip()
-            if roster_entry
-            else None
-        )
+    def login_or_create_user(email: str, display_name: Optional[str] = None) -> Identity:
+        """
+        Return the user for ``email``, creating it on first login and syncing
+        role/name with the roster in a single upsert. Repeat logins are
+        answered from the identity cache while nothing about the user or
+        roster has changed.
+        """
 
-        user = user_repository.get_by_email(email)
-        desired_role = (
-            "instructor" if email_lower in AuthService.INSTRUCTOR_EMAILS else "student"
+        email_lower = email.lower()
+        cache = identity_cache.get_cache()
+        if cache is not None:
+            cached = cache.get_by_email(email_lower)
+            if cached is not None and display_name in (None, cached.name):
+                return cached
+
+        row = user_repository.upsert_on_login(
+            email,
+            default_name=display_name or email.split("@")[0].replace(".", " ").title(),
+            display_name=display_name,
+            instructor=email_lower in AuthService.INSTRUCTOR_EMAILS,
         )
+        db.session.commit()
 
-        if not user:
-            name = preferred_name or display_name or email.split("@")[0].replace(".", " ").title()
-            user = user_repository.create_user(email=email, name=name, role=desired_role)
-            db.session.commit()
-        else:
-            if email_lower in AuthService.INSTRUCTOR_EMAILS and user.role != "instructor":
-                user.role = "instructor"
-            elif roster_entry and user.role != "instructor":
-                # Ensure rostered logins are treated as students for reporting
-                user.role = "student"
-
-            if roster_entry and preferred_name and user.name != preferred_name:
-                user.name = preferred_name
-            elif not roster_entry and display_name and user.name != display_name:
-                user.name = display_name
-
-            if db.session.is_modified(user):
-                db.session.commit()
-
-        return user
+        identity = Identity.from_row(row)
+        if cache is not None:
+            cache.put(identity)
+        return identity
 
     @staticmethod
-    def get_user_by_id(user_id: int) -> Optional[User]:
-        return user_repository.get_by_id(user_id)
+    def get_user_by_id(user_id: int) -> Optional[Identity]:
+        """
+        Look up a user, with the class their writes are stamped with, for
+        authorization checks; cached per process.
+        """
+
+        cache = identity_cache.get_cache()
+        if cache is not None:
+            cached = cache.get(user_id)
+            if cached is not None:
+                return cached
+
+        row = user_repository.get_identity(user_id)
+        if row is None:
+            return None
+        identity = Identity.from_row(row)
+        if cache is not None:
+            cache.put(identity)
+        return identity
 
     @staticmethod
     def get_user_by_email(email: str) -> Optional[User]:
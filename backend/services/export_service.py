@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import csv
+import json
+from datetime import datetime
+from io import StringIO
+from typing import Dict, Iterable, Iterator, Optional
+
+from sqlalchemy import func
+
+from backend.models import RosterStudent, StudentResponse, User, db
+from backend.repositories import response_repository
+
+
+class ExportService:
+    """Streams student responses as NDJSON or CSV without materialising them."""
+
+    COLUMNS = (
+        StudentResponse.id,
+        StudentResponse.user_id,
+        StudentResponse.class_id,
+        StudentResponse.topic,
+        StudentResponse.question_id,
+        StudentResponse.subtopic_type,
+        response_repository.column("question_code"),
+        StudentResponse.student_answer,
+        response_repository.column("correct_answer"),
+        StudentResponse.is_correct,
+        StudentResponse.status,
+        StudentResponse.time_spent,
+        StudentResponse.attempted_at,
+    )
+    FIELDNAMES = tuple(column.key for column in COLUMNS)
+    FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+    @classmethod
+    def iter_responses(
+        cls,
+        *,
+        student_id: Optional[int] = None,
+        topic_id: Optional[str] = None,
+        class_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Dict]:
+        """Yield response rows in id order, fetching ``batch_size`` at a time."""
+
+        query = response_repository.with_questions(db.select(*cls.COLUMNS)).order_by(
+            StudentResponse.id
+        )
+
+        if student_id is not None:
+            query = query.filter(StudentResponse.user_id == student_id)
+        if topic_id is not None:
+            query = query.filter(StudentResponse.topic == topic_id)
+        if class_id is not None:
+            class_members = (
+                db.select(User.id)
+                .join(RosterStudent, func.lower(RosterStudent.email) == func.lower(User.email))
+                .filter(RosterStudent.class_id == class_id, RosterStudent.deleted_at.is_(None))
+            )
+            query = query.filter(StudentResponse.user_id.in_(class_members))
+        if start is not None:
+            query = query.filter(StudentResponse.attempted_at >= start)
+        if end is not None:
+            query = query.filter(StudentResponse.attempted_at < end)
+
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        for partition in result.mappings().partitions():
+            for row in partition:
+                yield cls._serialise(row)
+
+    @staticmethod
+    def _serialise(row) -> Dict:
+        data = dict(row)
+        attempted_at = data.get("attempted_at")
+        data["attempted_at"] = attempted_at.isoformat() if attempted_at else None
+        return data
+
+    @staticmethod
+    def stream_ndjson(rows: Iterable[Dict], chunk_rows: int = 500) -> Iterator[str]:
+        buffer = []
+        for row in rows:
+            buffer.append(json.dumps(row))
+            if len(buffer) >= chunk_rows:
+                yield "\n".join(buffer) + "\n"
+                buffer = []
+        if buffer:
+            yield "\n".join(buffer) + "\n"
+
+    @classmethod
+    def stream_csv(cls, rows: Iterable[Dict], chunk_rows: int = 500) -> Iterator[str]:
+        buffer = StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=cls.FIELDNAMES)
+        writer.writeheader()
+        pending = 0
+        for row in rows:
+            writer.writerow(row)
+            pending += 1
+            if pending >= chunk_rows:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    @classmethod
+    def stream(cls, export_format: str, rows: Iterable[Dict]) -> Iterator[str]:
+        if export_format == "csv":
+            return cls.stream_csv(rows)
+        return cls.stream_ndjson(rows)
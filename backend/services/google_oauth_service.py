@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from flask import current_app
+
+GOOGLE_ISSUERS = {"accounts.google.com", "https://accounts.google.com"}
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleOAuthError(Exception):
+    """Raised when the Google sign-in exchange cannot be completed."""
+
+    def __init__(
+        self, message: str, details: Optional[str] = None, *, status_code: int = 400
+    ) -> None:
+        super().__init__(message)
+        self.message = message
+        self.details = details
+        self.status_code = status_code
+
+    def to_dict(self) -> dict:
+        payload = {"error": self.message}
+        if self.details:
+            payload["details"] = self.details
+        return payload
+
+
+class _Deadline:
+    """Split one wall-clock budget across several outbound calls."""
+
+    def __init__(self, total: float, per_call: float) -> None:
+        self.expires = time.monotonic() + total
+        self.per_call = per_call
+
+    def timeout(self) -> float:
+        remaining = self.expires - time.monotonic()
+        if remaining <= 0:
+            raise GoogleOAuthError("Google sign-in timed out", status_code=504)
+        return min(self.per_call, remaining)
+
+
+class GoogleOAuthService:
+    """
+    Authorization-code exchange for Google sign-in.
+
+    All calls share one keep-alive ``requests.Session`` per process, and the
+    ID token returned with the access token is verified locally against
+    Google's signing certificates (cached for their ``Cache-Control``
+    lifetime), so a login normally costs a single round trip to the token
+    endpoint. The userinfo endpoint is only called when the ID token is
+    missing or lacks an email. Every outbound call shares the
+    ``GOOGLE_LOGIN_DEADLINE_SECONDS`` budget.
+    """
+
+    _http = None
+    _http_lock = threading.Lock()
+    _certs: Dict[str, Tuple[Dict[str, str], float]] = {}
+    _certs_lock = threading.Lock()
+
+    @classmethod
+    def complete_login(cls, code: str) -> dict:
+        """
+        Exchange ``code`` and return ``{"credentials", "userinfo"}``, where
+        ``credentials`` is the dict stored in the session.
+        """
+
+        config = current_app.config
+        client = _client_config(config.get("GOOGLE_CLIENT_SECRETS_FILE"))
+        deadline = _Deadline(
+            config.get("GOOGLE_LOGIN_DEADLINE_SECONDS", 8.0),
+            config.get("GOOGLE_HTTP_TIMEOUT_SECONDS", 5.0),
+        )
+
+        token = cls._request_json(
+            "POST",
+            config.get("GOOGLE_TOKEN_URI") or client.get("token_uri"),
+            deadline,
+            "Failed to exchange authorization code",
+            data={
+                "grant_type": "authorization_code",
+                "code": code,
+                "client_id": client["client_id"],
+                "client_secret": client.get("client_secret", ""),
+                "redirect_uri": config.get("GOOGLE_REDIRECT_URI"),
+            },
+        )
+        if "access_token" not in token:
+            raise GoogleOAuthError("Failed to exchange authorization code", token.get("error"))
+
+        claims = {}
+        if token.get("id_token"):
+            claims = cls.verify_id_token(token["id_token"], client["client_id"], deadline)
+        if claims.get("email"):
+            if claims.get("email_verified") is False:
+                raise GoogleOAuthError("Google account email is not verified")
+            userinfo = claims
+        else:
+            userinfo = cls._request_json(
+                "GET",
+                config.get("GOOGLE_USERINFO_URI"),
+                deadline,
+                "Failed to fetch user info",
+                headers={"Authorization": f"Bearer {token['access_token']}"},
+            )
+
+        expires_in = token.get("expires_in")
+        credentials = {
+            "token": token["access_token"],
+            "refresh_token": token.get("refresh_token"),
+            "granted_scopes": (token.get("scope") or "").split(),
+            "expires_at": (datetime.utcnow() + timedelta(seconds=int(expires_in))).isoformat()
+            if expires_in
+            else None,
+        }
+        return {"credentials": credentials, "userinfo": userinfo}
+
+    @classmethod
+    def verify_id_token(cls, id_token: str, audience: str, deadline: _Deadline) -> dict:
+        """Check the ID token's signature, audience, expiry and issuer locally."""
+
+        from google.auth import exceptions, jwt
+
+        certs_url = current_app.config.get("GOOGLE_CERTS_URI")
+        try:
+            key_id = jwt.decode_header(id_token).get("kid")
+        except ValueError as exc:
+            raise GoogleOAuthError("Invalid ID token", str(exc)) from exc
+
+        certs = cls._get_certs(certs_url, deadline)
+        if key_id not in certs:
+            # Google rotates keys; a new kid means our copy is out of date
+            certs = cls._get_certs(certs_url, deadline, refresh=True)
+        try:
+            claims = jwt.decode(id_token, certs=certs, audience=audience, clock_skew_in_seconds=10)
+        except (ValueError, exceptions.GoogleAuthError) as exc:
+            raise GoogleOAuthError("Invalid ID token", str(exc)) from exc
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise GoogleOAuthError("Invalid ID token", f"unexpected issuer {claims.get('iss')!r}")
+        return claims
+
+    @classmethod
+    def _get_certs(cls, url: str, deadline: _Deadline, refresh: bool = False) -> Dict[str, str]:
+        with cls._certs_lock:
+            cached = cls._certs.get(url)
+            if cached and not refresh and cached[1] > time.monotonic():
+                return cached[0]
+
+        response = cls._send("GET", url, deadline, "Failed to fetch Google certificates")
+        certs = response.json()
+        match = _MAX_AGE.search(response.headers.get("Cache-Control", ""))
+        max_age = int(match.group(1)) if match else 3600
+        with cls._certs_lock:
+            cls._certs[url] = (certs, time.monotonic() + max_age)
+        return certs
+
+    @classmethod
+    def _request_json(cls, method: str, url: str, deadline: _Deadline, error: str, **kwargs) -> dict:
+        response = cls._send(method, url, deadline, error, **kwargs)
+        try:
+            return response.json()
+        except ValueError as exc:
+            raise GoogleOAuthError(error, "response was not JSON") from exc
+
+    @classmethod
+    def _send(cls, method: str, url: str, deadline: _Deadline, error: str, **kwargs):
+        import requests
+
+        try:
+            response = cls._session().request(method, url, timeout=deadline.timeout(), **kwargs)
+        except requests.Timeout as exc:
+            raise GoogleOAuthError("Google sign-in timed out", str(exc), status_code=504) from exc
+        except requests.RequestException as exc:
+            raise GoogleOAuthError(error, str(exc), status_code=502) from exc
+        if response.status_code >= 400:
+            raise GoogleOAuthError(error, f"HTTP {response.status_code}: {response.text[:200]}")
+        return response
+
+    @classmethod
+    def _session(cls):
+        if cls._http is None:
+            with cls._http_lock:
+                if cls._http is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    pool_size = current_app.config.get("GOOGLE_HTTP_POOL_SIZE", 10)
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    cls._http = session
+        return cls._http
+
+
+@lru_cache(maxsize=4)
+def _client_config(path: Optional[str]) -> dict:
+    if not path:
+        raise GoogleOAuthError("Google OAuth not configured")
+    try:
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError) as exc:
+        raise GoogleOAuthError("Google OAuth not configured", str(exc)) from exc
+    return data.get("web") or data.get("installed") or data
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from flask import Flask
+from sqlalchemy import case, func
+
+from backend.models import ClassInsight, RosterStudent, StudentInsight, StudentResponse, User, db
+
+ALL_CLASSES = 0
+SCHEDULER_KEY = "bytepath_insights_scheduler"
+
+logger = logging.getLogger(__name__)
+
+
+class InsightService:
+    """
+    Precomputed leaderboards, at-risk flags and struggling subtopics.
+
+    ``compute`` derives everything for every class from three grouped queries
+    and replaces the stored rows, so reports can read a single row instead of
+    re-aggregating responses per request. Run it nightly (CLI or in-process
+    scheduler) or on demand through the refresh endpoint.
+    """
+
+    # Same rules the live student report and class overview apply
+    MIN_RANKED_ANSWERS = 5
+    STRUGGLING_ACCURACY = 60
+    STRUGGLING_MIN_ATTEMPTS = 3
+    STRUGGLING_LIMIT = 5
+    # At-risk thresholds
+    INACTIVE_DAYS = 7
+    LOW_ACCURACY = 50
+
+    @staticmethod
+    def get_class_insight(class_id: Optional[int]) -> Optional[ClassInsight]:
+        return db.session.get(ClassInsight, class_id or ALL_CLASSES)
+
+    @staticmethod
+    def get_student_insight(user_id: int) -> Optional[StudentInsight]:
+        return db.session.get(StudentInsight, user_id)
+
+    @classmethod
+    def compute(cls, class_id: Optional[int] = None) -> Dict:
+        """
+        Recompute insights for one class (and its students), or for every
+        class plus the all-students scope when ``class_id`` is ``None``.
+        """
+
+        now = datetime.utcnow()
+        roster_filter = [User.role == "student", RosterStudent.deleted_at.is_(None)]
+        if class_id is not None:
+            roster_filter.append(RosterStudent.class_id == class_id)
+        roster_users = (
+            db.select(User.id)
+            .join(RosterStudent, func.lower(RosterStudent.email) == func.lower(User.email))
+            .filter(*roster_filter)
+        )
+
+        members: Dict[int, set] = defaultdict(set)
+        names: Dict[int, str] = {}
+        for row in db.session.execute(
+            db.select(
+                RosterStudent.class_id,
+                User.id,
+                User.name,
+                RosterStudent.first_name,
+                RosterStudent.last_name,
+                RosterStudent.email,
+            )
+            .join(User, func.lower(User.email) == func.lower(RosterStudent.email))
+            .filter(*roster_filter)
+        ):
+            members[row.class_id].add(row.id)
+            names[row.id] = (
+                row.name or f"{row.first_name} {row.last_name}".strip() or row.email
+            )
+        if class_id is None:
+            members[ALL_CLASSES] = set(names)
+        else:
+            members.setdefault(class_id, set())
+
+        # Per (student, class), like the live class overview, which only
+        # counts the responses recorded in that class; summed per student
+        # for the all-students scope and the student flags
+        answered = StudentResponse.status != "skipped"
+        class_stats: Dict[int, Dict[int, Dict]] = defaultdict(dict)
+        user_stats: Dict[int, Dict] = {}
+        for row in db.session.execute(
+            db.select(
+                StudentResponse.user_id,
+                StudentResponse.class_id,
+                func.sum(case((answered, 1), else_=0)).label("answered"),
+                func.sum(
+                    case((answered & StudentResponse.is_correct.is_(True), 1), else_=0)
+                ).label("correct"),
+                func.max(StudentResponse.attempted_at).label("last_active"),
+            )
+            .filter(StudentResponse.user_id.in_(roster_users))
+            .group_by(StudentResponse.user_id, StudentResponse.class_id)
+        ):
+            stats = {"answered": row.answered, "correct": row.correct}
+            if row.class_id is not None:
+                class_stats[row.class_id][row.user_id] = stats
+            totals = user_stats.setdefault(
+                row.user_id, {"answered": 0, "correct": 0, "last_active": row.last_active}
+            )
+            totals["answered"] += row.answered
+            totals["correct"] += row.correct
+            totals["last_active"] = max(totals["last_active"], row.last_active)
+
+        struggling: Dict[int, List[Dict]] = defaultdict(list)
+        for row in db.session.execute(
+            db.select(
+                StudentResponse.user_id,
+                StudentResponse.topic,
+                StudentResponse.subtopic_type,
+                func.count(StudentResponse.id).label("attempts"),
+                func.sum(case((StudentResponse.is_correct.is_(True), 1), else_=0)).label("correct"),
+            )
+            .filter(answered, StudentResponse.user_id.in_(roster_users))
+            .group_by(StudentResponse.user_id, StudentResponse.topic, StudentResponse.subtopic_type)
+        ):
+            accuracy = row.correct / row.attempts * 100
+            if accuracy < cls.STRUGGLING_ACCURACY and row.attempts >= cls.STRUGGLING_MIN_ATTEMPTS:
+                struggling[row.user_id].append(
+                    {
+                        "topic": row.topic,
+                        "subtopic_type": row.subtopic_type,
+                        "attempts": row.attempts,
+                        "correct": row.correct,
+                        "accuracy": round(accuracy, 2),
+                    }
+                )
+
+        risk: Dict[int, List[str]] = {}
+        inactive_since = now - timedelta(days=cls.INACTIVE_DAYS)
+        for user_id in names:
+            stats = user_stats.get(user_id)
+            reasons = []
+            if stats is None:
+                reasons.append("not_started")
+            else:
+                if stats["last_active"] < inactive_since:
+                    reasons.append("inactive")
+                if (
+                    stats["answered"] >= cls.MIN_RANKED_ANSWERS
+                    and stats["correct"] / stats["answered"] * 100 < cls.LOW_ACCURACY
+                ):
+                    reasons.append("low_accuracy")
+            risk[user_id] = reasons
+
+        def accuracy_of(stats: Dict) -> float:
+            return stats["correct"] / stats["answered"] * 100
+
+        class_rows = []
+        for scope, user_ids in members.items():
+            scope_stats = user_stats if scope == ALL_CLASSES else class_stats[scope]
+            ranked = sorted(
+                (
+                    user_id
+                    for user_id in user_ids
+                    if user_id in scope_stats
+                    and scope_stats[user_id]["answered"] >= cls.MIN_RANKED_ANSWERS
+                ),
+                key=lambda user_id: (-accuracy_of(scope_stats[user_id]), user_id),
+            )
+            leaderboard = [
+                {
+                    "rank": rank,
+                    "student_id": user_id,
+                    "student_name": names[user_id],
+                    "questions_answered": scope_stats[user_id]["answered"],
+                    "accuracy": round(accuracy_of(scope_stats[user_id]), 2),
+                }
+                for rank, user_id in enumerate(ranked, start=1)
+            ]
+            at_risk = [
+                {
+                    "student_id": user_id,
+                    "student_name": names[user_id],
+                    "reasons": risk[user_id],
+                    "last_active": user_stats[user_id]["last_active"].isoformat()
+                    if user_id in user_stats
+                    else None,
+                }
+                for user_id in sorted(user_ids, key=lambda user_id: names[user_id])
+                if risk[user_id]
+            ]
+            class_rows.append(
+                {
+                    "class_id": scope,
+                    "computed_at": now,
+                    "leaderboard": json.dumps(leaderboard),
+                    "at_risk_students": json.dumps(at_risk),
+                }
+            )
+
+        student_rows = [
+            {
+                "user_id": user_id,
+                "computed_at": now,
+                "at_risk": bool(risk[user_id]),
+                "risk_reasons": json.dumps(risk[user_id]),
+                "struggling_subtopics": json.dumps(
+                    sorted(struggling[user_id], key=lambda item: item["accuracy"])[
+                        : cls.STRUGGLING_LIMIT
+                    ]
+                ),
+            }
+            for user_id in names
+        ]
+
+        if class_id is None:
+            db.session.execute(ClassInsight.__table__.delete())
+            db.session.execute(StudentInsight.__table__.delete())
+        else:
+            db.session.execute(
+                ClassInsight.__table__.delete().where(ClassInsight.class_id == class_id)
+            )
+            db.session.execute(
+                StudentInsight.__table__.delete().where(StudentInsight.user_id.in_(list(names)))
+            )
+        if class_rows:
+            db.session.execute(ClassInsight.__table__.insert(), class_rows)
+        if student_rows:
+            db.session.execute(StudentInsight.__table__.insert(), student_rows)
+        db.session.commit()
+
+        return {
+            "computed_at": now.isoformat(),
+            "classes": len(class_rows),
+            "students": len(student_rows),
+            "at_risk": sum(1 for reasons in risk.values() if reasons),
+        }
+
+
+def start_scheduler(app: Flask) -> Optional[threading.Event]:
+    """
+    Recompute all insights every ``INSIGHTS_REFRESH_MINUTES`` in a daemon
+    thread (first run at start-up). Returns the event that stops the loop, or
+    ``None`` when the interval is unset. Each worker process runs its own
+    loop, so multi-worker deployments should prefer the cron CLI.
+    """
+
+    minutes = app.config.get("INSIGHTS_REFRESH_MINUTES") or 0
+    if minutes <= 0:
+        return None
+
+    stop = threading.Event()
+
+    def run() -> None:
+        while True:
+            with app.app_context():
+                try:
+                    summary = InsightService.compute()
+                    logger.info("insights refreshed", extra={"insights": summary})
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("insights refresh failed")
+            if stop.wait(minutes * 60):
+                return
+
+    threading.Thread(target=run, name="insights-refresh", daemon=True).start()
+    app.extensions[SCHEDULER_KEY] = stop
+    return stop
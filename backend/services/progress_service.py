@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, Mapping, Optional, Tuple
 
 from backend.models import StudentProgress, db
 from backend.repositories import progress_repository
@@ -20,8 +20,17 @@ class ProgressService:
 
     @staticmethod
     def update_or_create_progress(
-        user_id: int, topic_id: str, data: Dict[str, int]
+        user_id: int,
+        topic_id: str,
+        data: Dict[str, int],
+        *,
+        class_id: Optional[int] = None,
     ) -> tuple[StudentProgress, bool]:
+        """
+        ``class_id`` is the student's current class; it is stamped on the
+        record so class reports can filter progress without a roster join.
+        """
+
         subtopics_completed = data["subtopics_completed"]
         total_subtopics = data["total_subtopics"]
 
@@ -31,10 +40,13 @@ class ProgressService:
             progress.subtopics_completed = subtopics_completed
             progress.total_subtopics = total_subtopics
             progress.last_accessed = datetime.utcnow()
+            if class_id is not None:
+                progress.class_id = class_id
             progress_repository.save(progress)
         else:
             progress = StudentProgress(
                 user_id=user_id,
+                class_id=class_id,
                 topic=topic_id,
                 subtopics_completed=subtopics_completed,
                 total_subtopics=total_subtopics,
@@ -49,28 +61,57 @@ class ProgressService:
 
     @staticmethod
     def increment_questions_answered(
-        user_id: int, topic_id: str, *, timestamp: Optional[datetime] = None
+        user_id: int,
+        topic_id: str,
+        *,
+        timestamp: Optional[datetime] = None,
+        class_id: Optional[int] = None,
     ) -> StudentProgress:
         if timestamp is None:
             timestamp = datetime.utcnow()
 
+        progress = ProgressService._add_answered(user_id, topic_id, 1, timestamp, class_id)
+        db.session.commit()
+        return progress
+
+    @staticmethod
+    def add_questions_answered(
+        answered: Mapping[Tuple[int, str], Tuple[int, datetime, Optional[int]]],
+    ) -> None:
+        """
+        Apply many ``increment_questions_answered`` calls at once, without
+        committing: ``answered`` maps ``(user_id, topic_id)`` to the number
+        of answers, the newest answer's timestamp and the class to stamp.
+        """
+
+        for (user_id, topic_id), (count, timestamp, class_id) in answered.items():
+            ProgressService._add_answered(user_id, topic_id, count, timestamp, class_id)
+
+    @staticmethod
+    def _add_answered(
+        user_id: int,
+        topic_id: str,
+        count: int,
+        timestamp: datetime,
+        class_id: Optional[int],
+    ) -> StudentProgress:
         progress = progress_repository.get_by_user_and_topic(user_id, topic_id)
 
         if progress:
-            progress.questions_answered = (progress.questions_answered or 0) + 1
+            progress.questions_answered = (progress.questions_answered or 0) + count
             progress.last_accessed = timestamp
+            if class_id is not None:
+                progress.class_id = class_id
             progress_repository.save(progress)
         else:
             progress = StudentProgress(
                 user_id=user_id,
+                class_id=class_id,
                 topic=topic_id,
                 subtopics_completed=0,
                 total_subtopics=0,
-                questions_answered=1,
+                questions_answered=count,
                 last_accessed=timestamp,
             )
             progress_repository.add_progress(progress)
-
-        db.session.commit()
         return progress
-
@@ -1,87 +1,136 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import json
+import math
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-
-from sqlalchemy import case, func, and_, desc
-
-from backend.models import RosterStudent, StudentProgress, StudentResponse, Topic, User, db
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import case, func, and_, desc, literal, null, or_, tuple_, union_all
+
+from backend.models import (
+    Class,
+    Question,
+    QuestionStats,
+    RosterStudent,
+    StudentInsight,
+    StudentProgress,
+    StudentResponse,
+    Topic,
+    User,
+    db,
+)
+from backend import analytics_engine
+from backend.repositories import activity_repository, question_stats_repository, sketch_repository
+from backend.services.insight_service import InsightService
+
+RANKED_STUDENT_FIELDS = ("student_id", "student_name", "questions_answered", "accuracy")
+
+
+def wilson_interval(successes: int, trials: int, z: float = 1.96) -> Optional[Tuple[float, float]]:
+    """
+    Wilson score interval for a success rate, as percentages (95% by default).
+
+    Unlike the normal approximation it stays inside [0, 100] and is sensible
+    for questions with only a handful of attempts. ``None`` when ``trials`` is 0.
+    """
+
+    if trials <= 0:
+        return None
+    p = successes / trials
+    z2 = z * z
+    centre = (p + z2 / (2 * trials)) / (1 + z2 / trials)
+    margin = z * math.sqrt(p * (1 - p) / trials + z2 / (4 * trials * trials)) / (1 + z2 / trials)
+    return (round(max(0.0, centre - margin) * 100, 2), round(min(1.0, centre + margin) * 100, 2))
 
 
 class ReportService:
     """Service for generating analytics and reports."""
 
+    MAX_BATCH_STUDENTS = 500
+    QUESTION_SORTS = ("attempts", "success_rate", "time")
+    QUESTION_GROUPINGS = ("question", "template")
+    DEFAULT_QUESTION_PAGE_SIZE = 100
+    MAX_QUESTION_PAGE_SIZE = 500
+
     @staticmethod
-    def get_student_report(student_id: int) -> Optional[Dict]:
-        user = db.session.get(User, student_id)
-        if not user:
-            return None
+    def approximate_distinct_counts() -> bool:
+        """Whether distinct-student counts come from HyperLogLog sketches."""
 
-        roster_entry = (
-            db.session.execute(
-                db.select(RosterStudent).filter(
-                    func.lower(RosterStudent.email) == func.lower(user.email),
-                    RosterStudent.deleted_at.is_(None),
-                )
-            )
-            .scalars()
-            .first()
-        )
+        return current_app.config.get("DISTINCT_COUNT_MODE", "exact") == "approximate"
 
-        # Hide analytics for users who are not on the roster
-        if roster_entry is None:
-            return None
+    @staticmethod
+    def get_student_report(student_id: int) -> Optional[Dict]:
+        # Unknown and unrostered students both come back as not_found: hide
+        # analytics for users who are not on the roster
+        reports = ReportService.get_student_reports([student_id])["reports"]
+        return reports[0] if reports else None
 
-        responses: List[StudentResponse] = (
-            db.session.execute(
-                db.select(StudentResponse)
-                .filter_by(user_id=student_id)
-                .order_by(StudentResponse.attempted_at.asc())
+    @staticmethod
+    def get_student_reports(
+        student_ids: Optional[List[int]] = None, *, class_id: Optional[int] = None
+    ) -> Dict:
+        """
+        ``get_student_report`` for many students at once.
+
+        Each report section is one grouped query keyed by ``user_id`` for the
+        whole set, so the query count does not grow with the number of
+        students. Pass ``student_ids`` (reports keep that order) or a
+        ``class_id`` (its rostered students). Ids that are unknown or not on
+        the roster are listed under ``not_found``. Raises ``ValueError`` above
+        ``MAX_BATCH_STUDENTS`` students.
+        """
+
+        requested = list(dict.fromkeys(student_ids)) if student_ids is not None else None
+        # Before any query: an oversized id list is not worth a roster join
+        if requested is not None and len(requested) > ReportService.MAX_BATCH_STUDENTS:
+            raise ValueError(
+                f"At most {ReportService.MAX_BATCH_STUDENTS} students can be reported at once"
             )
-            .scalars()
-            .all()
-        )
-
-        if not responses:
-            return {
-                "student_id": student_id,
-                "student_name": user.name,
-                "student_email": user.email,
-                "overall_stats": {
-                    "total_questions_answered": 0,
-                    "total_correct": 0,
-                    "total_incorrect": 0,
-                    "total_skipped": 0,
-                    "overall_accuracy": 0,
-                    "avg_time_per_question": 0,
-                    "topics_started": 0,
-                    "topics_completed": 0,
-                },
-                "topic_breakdown": [],
-                "performance_over_time": [],
-                "struggling_subtopics": [],
-            }
-
-        total_questions = len(responses)
-        correct = sum(1 for r in responses if r.status == "correct")
-        incorrect = sum(1 for r in responses if r.status == "incorrect")
-        skipped = sum(1 for r in responses if r.status == "skipped")
-
-        non_skipped = [r for r in responses if r.status != "skipped" and r.time_spent]
-        avg_time = (
-            sum(r.time_spent for r in non_skipped) / len(non_skipped) if non_skipped else 0
-        )
 
-        overall_accuracy = (
-            (correct / (correct + incorrect) * 100) if (correct + incorrect) > 0 else 0
+        roster_filter = [RosterStudent.deleted_at.is_(None)]
+        if requested is not None:
+            roster_filter.append(User.id.in_(requested))
+        if class_id is not None:
+            roster_filter.extend([RosterStudent.class_id == class_id, User.role == "student"])
+        users = {
+            row.id: row
+            for row in db.session.execute(
+                db.select(User.id, User.name, User.email)
+                .join(RosterStudent, func.lower(RosterStudent.email) == func.lower(User.email))
+                .filter(*roster_filter)
+                .distinct()
+            )
+        }
+        if requested is not None:
+            ids = [user_id for user_id in requested if user_id in users]
+            not_found = [user_id for user_id in requested if user_id not in users]
+        else:
+            ids = sorted(users)
+            not_found = []
+        if len(ids) > ReportService.MAX_BATCH_STUDENTS:
+            raise ValueError(
+                f"At most {ReportService.MAX_BATCH_STUDENTS} students can be reported at once"
+            )
+        if not ids:
+            return {"reports": [], "not_found": not_found}
+
+        timed = case(
+            (
+                and_(StudentResponse.status != "skipped", StudentResponse.time_spent != 0),
+                StudentResponse.time_spent,
+            ),
+            else_=None,
         )
-
-        topic_stats = (
-            db.session.execute(
+        overall = {
+            row.user_id: row
+            for row in db.session.execute(
                 db.select(
-                    StudentResponse.topic,
-                    Topic.name.label("topic_name"),
-                    func.count(StudentResponse.id).label("questions_answered"),
+                    StudentResponse.user_id,
+                    func.count(StudentResponse.id).label("total"),
                     func.sum(case((StudentResponse.status == "correct", 1), else_=0)).label(
                         "correct"
                     ),
@@ -91,83 +140,62 @@ class ReportService:
                     func.sum(case((StudentResponse.status == "skipped", 1), else_=0)).label(
                         "skipped"
                     ),
-                    func.avg(
-                        case(
-                            (StudentResponse.status != "skipped", StudentResponse.time_spent),
-                            else_=None,
-                        )
-                    ).label("avg_time"),
+                    func.avg(timed).label("avg_time"),
                 )
-                .join(Topic, StudentResponse.topic == Topic.id)
-                .filter(StudentResponse.user_id == student_id)
-                .group_by(StudentResponse.topic, Topic.name)
-            )
-            .mappings()
-            .all()
-        )
-
-        topic_breakdown = []
-        for stat in topic_stats:
-            progress = db.session.execute(
-                db.select(StudentProgress).filter_by(user_id=student_id, topic=stat["topic"])
-            ).scalar_one_or_none()
-
-            answered = stat["correct"] + stat["incorrect"]
-            accuracy = (stat["correct"] / answered * 100) if answered else 0
-
-            topic_breakdown.append(
-                {
-                    "topic": stat["topic"],
-                    "topic_name": stat["topic_name"],
-                    "questions_answered": stat["questions_answered"],
-                    "correct": stat["correct"],
-                    "incorrect": stat["incorrect"],
-                    "skipped": stat["skipped"],
-                    "accuracy": round(accuracy, 2),
-                    "avg_time": round(float(stat["avg_time"]), 2) if stat["avg_time"] else 0,
-                    "completion_percentage": round(
-                        (
-                            progress.subtopics_completed / progress.total_subtopics * 100
-                            if progress
-                            and progress.total_subtopics
-                            and progress.total_subtopics > 0
-                            else 0
-                        ),
-                        2,
-                    ),
-                    "last_accessed": progress.last_accessed.isoformat() if progress else None,
-                }
+                .filter(StudentResponse.user_id.in_(ids))
+                .group_by(StudentResponse.user_id)
             )
+        }
 
-        daily_stats = (
-            db.session.execute(
-                db.select(
-                    func.date(StudentResponse.attempted_at).label("date"),
-                    func.count(StudentResponse.id).label("questions_answered"),
-                    func.avg(
-                        case((StudentResponse.is_correct.is_(True), 100.0), else_=0.0)
-                    ).label("accuracy"),
-                )
-                .filter(StudentResponse.user_id == student_id)
-                .group_by(func.date(StudentResponse.attempted_at))
-                .order_by(func.date(StudentResponse.attempted_at))
+        topic_stats: Dict[int, List] = defaultdict(list)
+        for row in db.session.execute(
+            db.select(
+                StudentResponse.user_id,
+                StudentResponse.topic,
+                Topic.name.label("topic_name"),
+                func.count(StudentResponse.id).label("questions_answered"),
+                func.sum(case((StudentResponse.status == "correct", 1), else_=0)).label("correct"),
+                func.sum(case((StudentResponse.status == "incorrect", 1), else_=0)).label(
+                    "incorrect"
+                ),
+                func.sum(case((StudentResponse.status == "skipped", 1), else_=0)).label("skipped"),
+                func.avg(
+                    case(
+                        (StudentResponse.status != "skipped", StudentResponse.time_spent),
+                        else_=None,
+                    )
+                ).label("avg_time"),
             )
-            .mappings()
-            .all()
-        )
-
-        performance_over_time = [
-            {
-                "date": str(stat["date"]),
-                "questions_answered": stat["questions_answered"],
-                "accuracy": round(float(stat["accuracy"]), 2) if stat["accuracy"] else 0,
-            }
-            for stat in daily_stats
-        ]
-
-        subtopic_stats = (
-            db.session.execute(
+            .join(Topic, StudentResponse.topic == Topic.id)
+            .filter(StudentResponse.user_id.in_(ids))
+            .group_by(StudentResponse.user_id, StudentResponse.topic, Topic.name)
+            .order_by(StudentResponse.user_id, StudentResponse.topic)
+        ):
+            topic_stats[row.user_id].append(row)
+
+        progress: Dict[int, List[StudentProgress]] = defaultdict(list)
+        for record in db.session.execute(
+            db.select(StudentProgress)
+            .filter(StudentProgress.user_id.in_(ids))
+            .order_by(StudentProgress.id)
+        ).scalars():
+            progress[record.user_id].append(record)
+
+        # Merged from the per-day activity buckets maintained at ingest
+        activity = activity_repository.series_by_user(granularity="day", user_ids=ids)
+
+        insights = {
+            insight.user_id: insight
+            for insight in db.session.execute(
+                db.select(StudentInsight).filter(StudentInsight.user_id.in_(ids))
+            ).scalars()
+        }
+        struggling: Dict[int, List[Dict]] = defaultdict(list)
+        live_ids = [user_id for user_id in ids if user_id not in insights]
+        if live_ids:
+            for stat in db.session.execute(
                 db.select(
+                    StudentResponse.user_id,
                     StudentResponse.topic,
                     StudentResponse.subtopic_type,
                     func.count(StudentResponse.id).label("attempts"),
@@ -177,92 +205,172 @@ class ReportService:
                 )
                 .filter(
                     and_(
-                        StudentResponse.user_id == student_id,
+                        StudentResponse.user_id.in_(live_ids),
                         StudentResponse.status != "skipped",
                     )
                 )
-                .group_by(StudentResponse.topic, StudentResponse.subtopic_type)
-            )
-            .mappings()
-            .all()
-        )
-
-        struggling = []
-        for stat in subtopic_stats:
-            accuracy = (stat["correct"] / stat["attempts"] * 100) if stat["attempts"] else 0
-            if accuracy < 60 and stat["attempts"] >= 3:
-                struggling.append(
+                .group_by(
+                    StudentResponse.user_id, StudentResponse.topic, StudentResponse.subtopic_type
+                )
+                .order_by(
+                    StudentResponse.user_id, StudentResponse.topic, StudentResponse.subtopic_type
+                )
+            ):
+                accuracy = (stat.correct / stat.attempts * 100) if stat.attempts else 0
+                if accuracy < 60 and stat.attempts >= 3:
+                    struggling[stat.user_id].append(
+                        {
+                            "topic": stat.topic,
+                            "subtopic_type": stat.subtopic_type,
+                            "attempts": stat.attempts,
+                            "correct": stat.correct,
+                            "accuracy": round(accuracy, 2),
+                        }
+                    )
+        for user_id, insight in insights.items():
+            # Precomputed by InsightService with the same thresholds
+            struggling[user_id] = json.loads(insight.struggling_subtopics)
+
+        reports = []
+        for user_id in ids:
+            user = users[user_id]
+            totals = overall.get(user_id)
+            insight = insights.get(user_id)
+            if totals is None:
+                # Never answered: the not_started at-risk case, so the stored
+                # insight keys are reported here too
+                reports.append(
+                    {
+                        "student_id": user_id,
+                        "student_name": user.name,
+                        "student_email": user.email,
+                        "overall_stats": {
+                            "total_questions_answered": 0,
+                            "total_correct": 0,
+                            "total_incorrect": 0,
+                            "total_skipped": 0,
+                            "overall_accuracy": 0,
+                            "avg_time_per_question": 0,
+                            "topics_started": 0,
+                            "topics_completed": 0,
+                        },
+                        "topic_breakdown": [],
+                        "performance_over_time": [],
+                        "struggling_subtopics": [],
+                        "risk_reasons": json.loads(insight.risk_reasons) if insight else None,
+                        "insights_computed_at": (
+                            insight.computed_at.isoformat() if insight else None
+                        ),
+                    }
+                )
+                continue
+
+            records = progress[user_id]
+            progress_by_topic: Dict[str, StudentProgress] = {}
+            for record in records:
+                progress_by_topic.setdefault(record.topic, record)
+
+            topic_breakdown = []
+            for stat in topic_stats[user_id]:
+                record = progress_by_topic.get(stat.topic)
+                answered = stat.correct + stat.incorrect
+                accuracy = (stat.correct / answered * 100) if answered else 0
+                topic_breakdown.append(
                     {
-                        "topic": stat["topic"],
-                        "subtopic_type": stat["subtopic_type"],
-                        "attempts": stat["attempts"],
-                        "correct": stat["correct"],
+                        "topic": stat.topic,
+                        "topic_name": stat.topic_name,
+                        "questions_answered": stat.questions_answered,
+                        "correct": stat.correct,
+                        "incorrect": stat.incorrect,
+                        "skipped": stat.skipped,
                         "accuracy": round(accuracy, 2),
+                        "avg_time": round(float(stat.avg_time), 2) if stat.avg_time else 0,
+                        "completion_percentage": round(
+                            (
+                                record.subtopics_completed / record.total_subtopics * 100
+                                if record and record.total_subtopics and record.total_subtopics > 0
+                                else 0
+                            ),
+                            2,
+                        ),
+                        "last_accessed": record.last_accessed.isoformat() if record else None,
                     }
                 )
 
-        struggling.sort(key=lambda x: x["accuracy"])
-
-        progress_records: List[StudentProgress] = (
-            db.session.execute(db.select(StudentProgress).filter_by(user_id=student_id))
-            .scalars()
-            .all()
-        )
-        topics_started = len(progress_records)
-        topics_completed = sum(
-            1
-            for record in progress_records
-            if record.total_subtopics and record.subtopics_completed >= record.total_subtopics
-        )
+            answered = totals.correct + totals.incorrect
+            reports.append(
+                {
+                    "student_id": user_id,
+                    "student_name": user.name,
+                    "student_email": user.email,
+                    "overall_stats": {
+                        "total_questions_answered": totals.total,
+                        "total_correct": totals.correct,
+                        "total_incorrect": totals.incorrect,
+                        "total_skipped": totals.skipped,
+                        "overall_accuracy": round(
+                            (totals.correct / answered * 100) if answered else 0, 2
+                        ),
+                        "avg_time_per_question": round(float(totals.avg_time or 0), 2),
+                        "topics_started": len(records),
+                        "topics_completed": sum(
+                            1
+                            for record in records
+                            if record.total_subtopics
+                            and record.subtopics_completed >= record.total_subtopics
+                        ),
+                    },
+                    "topic_breakdown": topic_breakdown,
+                    "performance_over_time": [
+                        {
+                            "date": day["bucket_start"],
+                            "questions_answered": day["questions_answered"],
+                            "accuracy": day["accuracy"],
+                        }
+                        for day in activity.get(user_id, [])
+                    ],
+                    "struggling_subtopics": sorted(
+                        struggling[user_id], key=lambda item: item["accuracy"]
+                    )[:5],
+                    "risk_reasons": json.loads(insight.risk_reasons) if insight else None,
+                    "insights_computed_at": insight.computed_at.isoformat() if insight else None,
+                }
+            )
 
-        return {
-            "student_id": student_id,
-            "student_name": user.name,
-            "student_email": user.email,
-            "overall_stats": {
-                "total_questions_answered": total_questions,
-                "total_correct": correct,
-                "total_incorrect": incorrect,
-                "total_skipped": skipped,
-                "overall_accuracy": round(overall_accuracy, 2),
-                "avg_time_per_question": round(avg_time, 2),
-                "topics_started": topics_started,
-                "topics_completed": topics_completed,
-            },
-            "topic_breakdown": topic_breakdown,
-            "performance_over_time": performance_over_time,
-            "struggling_subtopics": struggling[:5],
-        }
+        return {"reports": reports, "not_found": not_found}
 
     @staticmethod
-    def get_topic_report(topic_id: str) -> Optional[Dict]:
+    def get_topic_report(topic_id: str, class_id: Optional[int] = None) -> Optional[Dict]:
+        """
+        Topic report over every rostered student, or over ``class_id``'s
+        roster and the responses/progress recorded in that class.
+
+        Every figure comes from one ``UNION ALL`` statement (see
+        ``_topic_figures``); with the analytics engine enabled the
+        response-derived parts come from its cached arrays instead.
+        """
+
         topic = db.session.get(Topic, topic_id)
         if not topic:
             return None
 
-        rostered_students_subquery = (
-            db.select(User.id)
-            .select_from(User)
-            .join(
-                RosterStudent,
-                func.lower(RosterStudent.email) == func.lower(User.email),
-            )
-            .filter(User.role == "student", RosterStudent.deleted_at.is_(None))
-            .subquery()
+        # Sketches are kept per topic across all classes; a class slice is
+        # small enough to count exactly
+        approximate = class_id is None and ReportService.approximate_distinct_counts()
+        engine = analytics_engine.get_engine()
+        if engine is not None:
+            # The cached arrays give exact distinct counts cheaply
+            approximate = False
+        figures = ReportService._topic_figures(
+            topic_id, class_id, with_responses=engine is None, approximate=approximate
         )
-
-        responses: List[StudentResponse] = (
-            db.session.execute(
-                db.select(StudentResponse).filter(
-                    StudentResponse.topic == topic_id,
-                    StudentResponse.user_id.in_(rostered_students_subquery),
-                )
-            )
-            .scalars()
-            .all()
+        summary = (
+            engine.topic_summary(topic_id, class_id)
+            if engine is not None
+            else figures["summary"]
         )
 
-        if not responses:
+        if not summary["total_attempts"]:
             return {
                 "topic": topic_id,
                 "topic_name": topic.name,
@@ -278,72 +386,18 @@ class ReportService:
                 "most_missed_questions": [],
             }
 
-        total_students = (
-            db.session.execute(
-                db.select(func.count()).select_from(rostered_students_subquery)
-            ).scalar_one()
-        )
-
-        students_started = db.session.execute(
-            db.select(func.count(func.distinct(StudentResponse.user_id)))
-            .select_from(StudentResponse)
-            .filter(
-                StudentResponse.topic == topic_id,
-                StudentResponse.user_id.in_(rostered_students_subquery),
-            )
-        ).scalar_one()
-
-        students_completed = db.session.execute(
-            db.select(func.count(StudentProgress.id))
-            .select_from(StudentProgress)
-            .filter(
-                and_(
-                    StudentProgress.topic == topic_id,
-                    StudentProgress.total_subtopics > 0,
-                    StudentProgress.subtopics_completed >= StudentProgress.total_subtopics,
-                    StudentProgress.user_id.in_(rostered_students_subquery),
-                )
+        subtopic_stats = summary["subtopic_stats"]
+        if approximate:
+            students_started = sketch_repository.estimate_many("topic", [topic_id]).get(topic_id, 0)
+            unique_by_subtopic = sketch_repository.estimate_many(
+                "subtopic",
+                [
+                    sketch_repository.subtopic_key(topic_id, stat["subtopic_type"])
+                    for stat in subtopic_stats
+                ],
             )
-        ).scalar_one()
-
-        non_skipped = [r for r in responses if r.status != "skipped"]
-        total_attempts = len(responses)
-        correct = sum(1 for r in non_skipped if r.is_correct)
-        avg_accuracy = (correct / len(non_skipped) * 100) if non_skipped else 0
-        avg_time = (
-            sum(r.time_spent for r in non_skipped if r.time_spent) / len(non_skipped)
-            if non_skipped
-            else 0
-        )
-
-        subtopic_stats = (
-            db.session.execute(
-                db.select(
-                    StudentResponse.subtopic_type,
-                    func.count(StudentResponse.id).label("attempts"),
-                    func.count(func.distinct(StudentResponse.user_id)).label("unique_students"),
-                    func.avg(
-                        case((StudentResponse.is_correct.is_(True), 100.0), else_=0.0)
-                    ).label("success_rate"),
-                    func.avg(StudentResponse.time_spent).label("avg_time"),
-                )
-                .filter(
-                    and_(
-                        StudentResponse.topic == topic_id,
-                        StudentResponse.status != "skipped",
-                        StudentResponse.user_id.in_(rostered_students_subquery),
-                    )
-                )
-                .group_by(StudentResponse.subtopic_type)
-                .order_by(
-                    func.avg(
-                        case((StudentResponse.is_correct.is_(True), 100.0), else_=0.0)
-                    ).asc()
-                )
-            )
-            .mappings()
-            .all()
-        )
+        else:
+            students_started = summary["students_started"]
 
         def difficulty(success_rate: float) -> str:
             if success_rate >= 80:
@@ -358,7 +412,13 @@ class ReportService:
             {
                 "subtopic_type": stat["subtopic_type"],
                 "attempts": stat["attempts"],
-                "unique_students": stat["unique_students"],
+                "unique_students": (
+                    unique_by_subtopic.get(
+                        sketch_repository.subtopic_key(topic_id, stat["subtopic_type"]), 0
+                    )
+                    if approximate
+                    else stat["unique_students"]
+                ),
                 "success_rate": round(float(stat["success_rate"]), 2)
                 if stat["success_rate"]
                 else 0,
@@ -368,63 +428,238 @@ class ReportService:
             for stat in subtopic_stats
         ]
 
-        question_stats = (
-            db.session.execute(
-                db.select(
-                    StudentResponse.question_code,
-                    StudentResponse.subtopic_type,
-                    func.count(StudentResponse.id).label("attempts"),
-                    func.avg(
-                        case((StudentResponse.is_correct.is_(True), 100.0), else_=0.0)
-                    ).label("success_rate"),
-                )
-                .filter(
-                    and_(
-                        StudentResponse.topic == topic_id,
-                        StudentResponse.status != "skipped",
-                        StudentResponse.user_id.in_(rostered_students_subquery),
-                    )
-                )
-                .group_by(StudentResponse.question_code, StudentResponse.subtopic_type)
-                .having(func.count(StudentResponse.id) >= 5)
-                .order_by(
-                    func.avg(
-                        case((StudentResponse.is_correct.is_(True), 100.0), else_=0.0)
-                    ).asc()
-                )
-                .limit(10)
-            )
-            .mappings()
-            .all()
-        )
-
         most_missed = [
             {
+                "question_id": stat["question_id"],
                 "question_code": stat["question_code"],
                 "subtopic_type": stat["subtopic_type"],
                 "attempts": stat["attempts"],
-                "success_rate": round(float(stat["success_rate"]), 2)
-                if stat["success_rate"]
-                else 0,
+                "success_rate": round(stat["correct_count"] / stat["attempts"] * 100, 2),
+                "success_rate_ci": wilson_interval(stat["correct_count"], stat["attempts"]),
             }
-            for stat in question_stats
+            for stat in figures["most_missed"]
         ]
 
         return {
             "topic": topic_id,
             "topic_name": topic.name,
             "overall_stats": {
-                "total_students": total_students,
+                "total_students": figures["total_students"],
                 "students_started": students_started or 0,
-                "students_completed": students_completed or 0,
-                "total_attempts": total_attempts,
-                "avg_accuracy": round(avg_accuracy, 2),
-                "avg_time_per_question": round(avg_time, 2),
+                "students_completed": figures["students_completed"],
+                "total_attempts": summary["total_attempts"],
+                "avg_accuracy": round(summary["avg_accuracy"], 2),
+                "avg_time_per_question": round(summary["avg_time"], 2),
             },
             "subtopic_difficulty": subtopic_difficulty,
             "most_missed_questions": most_missed,
         }
 
+    @staticmethod
+    def _rostered_student_ids(class_id: Optional[int] = None):
+        """Select of the students currently on the roster (of ``class_id``)."""
+
+        roster_filter = [User.role == "student", RosterStudent.deleted_at.is_(None)]
+        if class_id is not None:
+            roster_filter.append(RosterStudent.class_id == class_id)
+        return (
+            db.select(User.id)
+            .join(RosterStudent, func.lower(RosterStudent.email) == func.lower(User.email))
+            .filter(*roster_filter)
+        )
+
+    @staticmethod
+    def _question_stats_source(topic_id: str, class_id: Optional[int], rostered: bool = False):
+        """
+        Per-question stats with ``question_stats`` column names, merged from
+        the running counters of every class or of one, and of every student
+        or only those on the roster of the class they answered in.
+        """
+
+        c = QuestionStats.__table__.c
+        criteria = [c.topic == topic_id]
+        if class_id is not None:
+            criteria.append(c.class_id == class_id)
+        if rostered:
+            criteria.append(c.rostered.is_(True))
+        return question_stats_repository.merged(*criteria).subquery()
+
+    @staticmethod
+    def _topic_figures(
+        topic_id: str, class_id: Optional[int], *, with_responses: bool, approximate: bool
+    ) -> Dict:
+        """
+        Everything a topic report reads from the database, in one statement.
+
+        The roster is a CTE referenced by every branch. Each branch of a
+        ``UNION ALL`` emits rows tagged with the level they describe (the
+        ``GROUPING SETS`` emulation): ``overall`` and ``subtopic`` (the
+        response aggregates, only ``with_responses``), ``roster`` (student
+        count), ``completed`` (progress) and ``question`` (the ten
+        most-missed questions). ``approximate`` skips the exact distinct
+        counts that sketches replace.
+        """
+
+        roster = ReportService._rostered_student_ids(class_id).cte("roster")
+        in_roster = db.select(roster.c.id)
+
+        def branch(level: str, **columns):
+            """One ``UNION ALL`` member; unset figure columns are zero."""
+
+            return db.select(
+                literal(level).label("level"),
+                columns.get("subtopic_type", null()).label("subtopic_type"),
+                columns.get("question_id", null()).label("question_id"),
+                columns.get("question_code", null()).label("question_code"),
+                *(
+                    columns.get(name, literal(0)).label(name)
+                    for name in (
+                        "rows", "answered", "correct", "time_total", "time_samples", "students"
+                    )
+                ),
+            )
+
+        branches = []
+        if with_responses:
+            scope = [StudentResponse.topic == topic_id, StudentResponse.user_id.in_(in_roster)]
+            if class_id is not None:
+                scope.append(StudentResponse.class_id == class_id)
+            responses = (
+                db.select(
+                    StudentResponse.user_id,
+                    StudentResponse.subtopic_type,
+                    StudentResponse.status,
+                    StudentResponse.is_correct,
+                    StudentResponse.time_spent,
+                )
+                .filter(*scope)
+                .cte("topic_responses")
+            )
+            r = responses.c
+            answered = r.status != "skipped"
+            correct = func.sum(case((answered & r.is_correct.is_(True), 1), else_=0))
+            branches.append(
+                branch(
+                    "overall",
+                    rows=func.count(),
+                    answered=func.sum(case((answered, 1), else_=0)),
+                    correct=correct,
+                    time_total=func.sum(case((answered, r.time_spent), else_=None)),
+                    time_samples=func.count(case((answered, r.time_spent), else_=None)),
+                    students=(
+                        literal(0) if approximate else func.count(func.distinct(r.user_id))
+                    ),
+                ).select_from(responses)
+            )
+            branches.append(
+                branch(
+                    "subtopic",
+                    subtopic_type=r.subtopic_type,
+                    rows=func.count(),
+                    answered=func.count(),
+                    correct=correct,
+                    time_total=func.sum(r.time_spent),
+                    time_samples=func.count(r.time_spent),
+                    students=(
+                        literal(0) if approximate else func.count(func.distinct(r.user_id))
+                    ),
+                )
+                .select_from(responses)
+                .filter(answered)
+                .group_by(r.subtopic_type)
+            )
+
+        branches.append(branch("roster", rows=func.count()).select_from(roster))
+
+        progress_scope = [
+            StudentProgress.topic == topic_id,
+            StudentProgress.total_subtopics > 0,
+            StudentProgress.subtopics_completed >= StudentProgress.total_subtopics,
+            StudentProgress.user_id.in_(in_roster),
+        ]
+        if class_id is not None:
+            progress_scope.append(StudentProgress.class_id == class_id)
+        branches.append(
+            branch("completed", rows=func.count(StudentProgress.id)).filter(*progress_scope)
+        )
+
+        # Rostered students only, like the other branches, from the per-class counters
+        stats = ReportService._question_stats_source(topic_id, class_id, rostered=True)
+        attempted = stats.c.correct_count + stats.c.incorrect_count
+        missed = (
+            db.select(
+                stats.c.question_id,
+                stats.c.correct_count,
+                attempted.label("attempts"),
+                Question.question_code,
+                Question.subtopic_type,
+            )
+            .join(Question, Question.id == stats.c.question_id)
+            .filter(stats.c.topic == topic_id, attempted >= 5)
+            .order_by((stats.c.correct_count * 1.0 / attempted).asc(), Question.id)
+            .limit(10)
+            .subquery("most_missed")
+        )
+        branches.append(
+            branch(
+                "question",
+                subtopic_type=missed.c.subtopic_type,
+                question_id=missed.c.question_id,
+                question_code=missed.c.question_code,
+                rows=missed.c.attempts,
+                answered=missed.c.attempts,
+                correct=missed.c.correct_count,
+            )
+        )
+
+        figures = {"total_students": 0, "students_completed": 0, "most_missed": []}
+        overall = None
+        subtopic_stats = []
+        for row in db.session.execute(union_all(*branches)):
+            if row.level == "overall":
+                overall = row
+            elif row.level == "subtopic":
+                subtopic_stats.append(
+                    {
+                        "subtopic_type": row.subtopic_type,
+                        "attempts": row.rows,
+                        "unique_students": row.students,
+                        "success_rate": row.correct / row.rows * 100,
+                        "avg_time": row.time_total / row.time_samples if row.time_samples else None,
+                    }
+                )
+            elif row.level == "roster":
+                figures["total_students"] = row.rows
+            elif row.level == "completed":
+                figures["students_completed"] = row.rows
+            else:
+                figures["most_missed"].append(
+                    {
+                        "question_id": row.question_id,
+                        "question_code": row.question_code,
+                        "subtopic_type": row.subtopic_type,
+                        "attempts": row.rows,
+                        "correct_count": row.correct,
+                    }
+                )
+        # UNION ALL keeps no order across branches; restore the branches' own
+        subtopic_stats.sort(key=lambda stat: (stat["success_rate"], stat["subtopic_type"]))
+        figures["most_missed"].sort(
+            key=lambda stat: (stat["correct_count"] / stat["attempts"], stat["question_id"])
+        )
+
+        if overall is not None:
+            answered_count = overall.answered or 0
+            figures["summary"] = {
+                "total_attempts": overall.rows,
+                "students_started": overall.students,
+                "avg_accuracy": overall.correct / answered_count * 100 if answered_count else 0,
+                # Unreported times count as zero in the mean
+                "avg_time": (overall.time_total or 0) / answered_count if answered_count else 0,
+                "subtopic_stats": subtopic_stats,
+            }
+        return figures
+
     @staticmethod
     def get_class_overview(class_id: Optional[int] = None) -> Dict:
         roster_filter = [User.role == "student", RosterStudent.deleted_at.is_(None)]
@@ -469,39 +704,38 @@ class ReportService:
 
         total_students = len(roster_entries)
 
+        # Progress rows carry the class they were recorded in, so a class view
+        # is a range scan on (class_id, topic); the roster semi-join still
+        # drops students who have since left the class
+        progress_scope = [StudentProgress.user_id.in_(rostered_students_subquery)]
+        if class_id is not None:
+            progress_scope.append(StudentProgress.class_id == class_id)
+
         one_week_ago = datetime.utcnow() - timedelta(days=7)
 
-        active_last_week = db.session.execute(
-            db.select(func.count(func.distinct(StudentResponse.user_id)))
-            .select_from(StudentResponse)
-            .filter(
-                StudentResponse.user_id.in_(rostered_students_subquery),
-                StudentResponse.attempted_at >= one_week_ago,
-            )
-        ).scalar_one()
+        insight = InsightService.get_class_insight(class_id)
 
-        total_questions = db.session.execute(
-            db.select(func.count(StudentResponse.id))
-            .select_from(StudentResponse)
-            .filter(
-                StudentResponse.user_id.in_(rostered_students_subquery)
+        engine = analytics_engine.get_engine()
+        if engine is not None:
+            response_stats = engine.class_overview(class_id, since=one_week_ago)
+            ranked = response_stats["top_performers"] + response_stats["struggling_students"]
+            names = dict(
+                db.session.execute(
+                    db.select(User.id, User.name).filter(
+                        User.id.in_({student["id"] for student in ranked})
+                    )
+                ).all()
             )
-        ).scalar_one()
-
-        responses = (
-            db.session.execute(
-                db.select(StudentResponse)
-                .select_from(StudentResponse)
-                .filter(
-                    StudentResponse.status != "skipped",
-                    StudentResponse.user_id.in_(rostered_students_subquery),
-                )
+            for student in ranked:
+                student["name"] = names.get(student["id"])
+        else:
+            response_stats = ReportService._class_response_stats(
+                rostered_students_subquery, class_id, one_week_ago, rankings=insight is None
             )
-            .scalars()
-            .all()
-        )
-        correct = sum(1 for r in responses if r.is_correct)
-        class_avg_accuracy = (correct / len(responses) * 100) if responses else 0
+        active_last_week = response_stats["active_last_week"]
+        total_questions = response_stats["total_questions"]
+        class_avg_accuracy = response_stats["class_avg_accuracy"]
+        topic_stats = response_stats["topic_stats"]
 
         # Get started counts by topic
         started_counts = (
@@ -515,10 +749,7 @@ class ReportService:
                 .select_from(Topic)
                 .join(
                     StudentProgress,
-                    and_(
-                        Topic.id == StudentProgress.topic,
-                        StudentProgress.user_id.in_(rostered_students_subquery)
-                    )
+                    and_(Topic.id == StudentProgress.topic, *progress_scope),
                 )
                 .group_by(Topic.id, Topic.name, Topic.order_index)
             )
@@ -536,28 +767,12 @@ class ReportService:
                 .filter(
                     StudentProgress.subtopics_completed >= StudentProgress.total_subtopics,
                     StudentProgress.total_subtopics > 0,
-                    StudentProgress.user_id.in_(rostered_students_subquery)
+                    *progress_scope,
                 )
                 .group_by(StudentProgress.topic)
             ).all()
         )
 
-        # Get accuracy and time stats by topic
-        topic_stats = {}
-        for row in db.session.execute(
-            db.select(
-                StudentResponse.topic,
-                func.avg(case((StudentResponse.is_correct.is_(True), 100.0), else_=0.0)).label("avg_accuracy"),
-                func.avg(StudentResponse.time_spent).label("avg_time")
-            )
-            .filter(
-                StudentResponse.status != "skipped",
-                StudentResponse.user_id.in_(rostered_students_subquery)
-            )
-            .group_by(StudentResponse.topic)
-        ):
-            topic_stats[row[0]] = (row[1], row[2])
-
         # Combine all the data
         topics_list = []
         for topic in started_counts:
@@ -565,7 +780,7 @@ class ReportService:
             students_started = topic["students_started"] or 0
             students_completed = completed_counts.get(topic_id, 0)
             completion_rate = (students_completed / students_started * 100) if students_started else 0
-            stats = topic_stats.get(topic_id, (0, 0))
+            stats = topic_stats.get(topic_id, (0, 0, 0, 0))
 
             topics_list.append({
                 "topic": topic_id,
@@ -575,6 +790,8 @@ class ReportService:
                 "completion_rate": round(completion_rate, 2),
                 "avg_accuracy": round(float(stats[0]), 2) if stats[0] is not None else 0,
                 "avg_time_per_question": round(float(stats[1]), 2) if stats[1] is not None else 0,
+                "answered": stats[2],
+                "correct": stats[3],
             })
 
         # Sort by topic name
@@ -593,6 +810,147 @@ class ReportService:
             for entry in roster_entries
         ]
 
+        if insight is not None:
+            # Rankings come from the precomputed leaderboard (InsightService)
+            leaderboard = [
+                {key: entry[key] for key in RANKED_STUDENT_FIELDS}
+                for entry in json.loads(insight.leaderboard)
+            ]
+            top_performer_list = leaderboard[:5]
+            struggling_list = leaderboard[::-1][:5]
+        else:
+            top_performer_list = [
+                {
+                    "student_id": performer["id"],
+                    "student_name": performer["name"],
+                    "questions_answered": performer["questions_answered"],
+                    "accuracy": round(float(performer["accuracy"]), 2)
+                    if performer["accuracy"]
+                    else 0,
+                }
+                for performer in response_stats["top_performers"]
+            ]
+
+            struggling_list = [
+                {
+                    "student_id": student["id"],
+                    "student_name": student["name"],
+                    "questions_answered": student["questions_answered"],
+                    "accuracy": round(float(student["accuracy"]), 2)
+                    if student["accuracy"]
+                    else 0,
+                }
+                for student in response_stats["struggling_students"]
+            ]
+
+        recent_activity_list = [
+            {
+                "date": day["bucket_start"],
+                "questions_answered": day["questions_answered"],
+                "active_students": day["active_students"],
+            }
+            for day in activity_repository.series(
+                granularity="day",
+                user_ids=db.select(rostered_students_subquery.c.id),
+                start=one_week_ago,
+                class_ids=[class_id] if class_id is not None else None,
+            )
+        ]
+
+        return {
+            "total_students": total_students,
+            "active_students_last_week": active_last_week or 0,
+            "total_questions_answered": total_questions,
+            "answered_questions": response_stats["answered"],
+            "correct_answers": response_stats["correct"],
+            "class_avg_accuracy": round(class_avg_accuracy, 2),
+            "topics_overview": topics_list,
+            "rostered_students": rostered_student_list,
+            "top_performers": top_performer_list,
+            "struggling_students": struggling_list,
+            "recent_activity": recent_activity_list,
+            "at_risk_students": json.loads(insight.at_risk_students) if insight else [],
+            "insights_computed_at": insight.computed_at.isoformat() if insight else None,
+        }
+
+    @staticmethod
+    def _class_response_stats(
+        rostered_students_subquery,
+        class_id: Optional[int],
+        one_week_ago: datetime,
+        rankings: bool = True,
+    ) -> Dict:
+        """
+        SQL version of ``AnalyticsEngine.class_overview`` (the default path).
+        ``rankings=False`` skips the top/struggling student queries.
+        """
+
+        scope = [StudentResponse.user_id.in_(rostered_students_subquery)]
+        if class_id is not None:
+            scope.append(StudentResponse.class_id == class_id)
+
+        if ReportService.approximate_distinct_counts():
+            # Day-granular: counts anyone active on or after one_week_ago's date
+            last_week_days = [
+                sketch_repository.day_key(one_week_ago.date() + timedelta(days=offset))
+                for offset in range(8)
+            ]
+            active_last_week = sketch_repository.estimate_union(
+                "day", last_week_days, [class_id] if class_id is not None else None
+            )
+        else:
+            active_last_week = db.session.execute(
+                db.select(func.count(func.distinct(StudentResponse.user_id)))
+                .select_from(StudentResponse)
+                .filter(*scope, StudentResponse.attempted_at >= one_week_ago)
+            ).scalar_one()
+
+        total_questions = db.session.execute(
+            db.select(func.count(StudentResponse.id))
+            .select_from(StudentResponse)
+            .filter(*scope)
+        ).scalar_one()
+
+        answered, correct = db.session.execute(
+            db.select(
+                func.count(StudentResponse.id),
+                func.coalesce(
+                    func.sum(case((StudentResponse.is_correct.is_(True), 1), else_=0)), 0
+                ),
+            )
+            .select_from(StudentResponse)
+            .filter(StudentResponse.status != "skipped", *scope)
+        ).one()
+        class_avg_accuracy = (correct / answered * 100) if answered else 0
+
+        # Get accuracy, time and answered/correct counts by topic
+        topic_stats = {}
+        for row in db.session.execute(
+            db.select(
+                StudentResponse.topic,
+                func.avg(case((StudentResponse.is_correct.is_(True), 100.0), else_=0.0)).label("avg_accuracy"),
+                func.avg(StudentResponse.time_spent).label("avg_time"),
+                func.count(StudentResponse.id).label("answered"),
+                func.sum(case((StudentResponse.is_correct.is_(True), 1), else_=0)).label("correct"),
+            )
+            .filter(StudentResponse.status != "skipped", *scope)
+            .group_by(StudentResponse.topic)
+        ):
+            topic_stats[row[0]] = (row[1], row[2], row[3], row[4])
+
+        stats = {
+            "active_last_week": active_last_week,
+            "total_questions": total_questions,
+            "answered": answered,
+            "correct": correct,
+            "class_avg_accuracy": class_avg_accuracy,
+            "topic_stats": topic_stats,
+            "top_performers": [],
+            "struggling_students": [],
+        }
+        if not rankings:
+            return stats
+
         top_performers = (
             db.session.execute(
                 db.select(
@@ -604,13 +962,7 @@ class ReportService:
                     ).label("accuracy"),
                 )
                 .join(StudentResponse, User.id == StudentResponse.user_id)
-                .filter(
-                    and_(
-                        User.role == "student",
-                        User.id.in_(rostered_students_subquery),
-                        StudentResponse.status != "skipped",
-                    )
-                )
+                .filter(User.role == "student", StudentResponse.status != "skipped", *scope)
                 .group_by(User.id, User.name)
                 .having(func.count(StudentResponse.id) >= 5)
                 .order_by(desc("accuracy"))
@@ -620,18 +972,6 @@ class ReportService:
             .all()
         )
 
-        top_performer_list = [
-            {
-                "student_id": performer["id"],
-                "student_name": performer["name"],
-                "questions_answered": performer["questions_answered"],
-                "accuracy": round(float(performer["accuracy"]), 2)
-                if performer["accuracy"]
-                else 0,
-            }
-            for performer in top_performers
-        ]
-
         struggling_students = (
             db.session.execute(
                 db.select(
@@ -643,13 +983,7 @@ class ReportService:
                     ).label("accuracy"),
                 )
                 .join(StudentResponse, User.id == StudentResponse.user_id)
-                .filter(
-                    and_(
-                        User.role == "student",
-                        User.id.in_(rostered_students_subquery),
-                        StudentResponse.status != "skipped",
-                    )
-                )
+                .filter(User.role == "student", StudentResponse.status != "skipped", *scope)
                 .group_by(User.id, User.name)
                 .having(func.count(StudentResponse.id) >= 5)
                 .order_by("accuracy")
@@ -659,110 +993,430 @@ class ReportService:
             .all()
         )
 
-        struggling_list = [
-            {
-                "student_id": student["id"],
-                "student_name": student["name"],
-                "questions_answered": student["questions_answered"],
-                "accuracy": round(float(student["accuracy"]), 2)
-                if student["accuracy"]
-                else 0,
-            }
-            for student in struggling_students
+        stats.update(top_performers=top_performers, struggling_students=struggling_students)
+        return stats
+
+    @staticmethod
+    def get_instructor_rollup(instructor_id: int) -> Dict:
+        """
+        Class overview figures for every class taught by ``instructor_id``,
+        plus their merge under ``totals``.
+
+        Each aggregate is one query grouped by ``class_id`` over the class_id
+        indexes, so the query count does not grow with the number of
+        sections. Per-class numbers match ``get_class_overview(class_id)``
+        (exact distinct counts). Totals add up the per-class counts and
+        recompute the ratios from the sums, so a student rostered in two
+        sections counts in both.
+        """
+
+        classes = db.session.execute(
+            db.select(Class.id, Class.class_name)
+            .filter(Class.instructor_id == instructor_id)
+            .order_by(Class.class_name, Class.id)
+        ).all()
+        class_ids = [row.id for row in classes]
+        parts = {class_id: _new_rollup() for class_id in class_ids}
+        one_week_ago = datetime.utcnow() - timedelta(days=7)
+
+        # (student, class) pairs on an active roster: the per-class semi-join
+        membership = (
+            db.select(User.id, RosterStudent.class_id)
+            .join(RosterStudent, func.lower(RosterStudent.email) == func.lower(User.email))
+            .filter(
+                User.role == "student",
+                RosterStudent.deleted_at.is_(None),
+                RosterStudent.class_id.in_(class_ids),
+            )
+        )
+        response_scope = [
+            StudentResponse.class_id.in_(class_ids),
+            tuple_(StudentResponse.user_id, StudentResponse.class_id).in_(membership),
         ]
+        answered = StudentResponse.status != "skipped"
 
-        recent_activity = (
-            db.session.execute(
-                db.select(
-                    func.date(StudentResponse.attempted_at).label("date"),
-                    func.count(StudentResponse.id).label("questions_answered"),
-                    func.count(func.distinct(StudentResponse.user_id)).label("active_students"),
-                )
-                .filter(
-                    StudentResponse.user_id.in_(rostered_students_subquery),
-                    StudentResponse.attempted_at >= one_week_ago,
-                )
-                .group_by(func.date(StudentResponse.attempted_at))
-                .order_by(func.date(StudentResponse.attempted_at))
+        for row in db.session.execute(
+            db.select(RosterStudent.class_id, func.count(RosterStudent.id))
+            .filter(RosterStudent.class_id.in_(class_ids), RosterStudent.deleted_at.is_(None))
+            .group_by(RosterStudent.class_id)
+        ):
+            parts[row[0]]["students"] = row[1]
+
+        for row in db.session.execute(
+            db.select(
+                StudentResponse.class_id,
+                func.count(StudentResponse.id),
+                func.sum(case((answered, 1), else_=0)),
+                func.sum(case((answered & StudentResponse.is_correct.is_(True), 1), else_=0)),
+                func.count(
+                    func.distinct(
+                        case(
+                            (StudentResponse.attempted_at >= one_week_ago, StudentResponse.user_id)
+                        )
+                    )
+                ),
             )
-            .mappings()
-            .all()
+            .filter(*response_scope)
+            .group_by(StudentResponse.class_id)
+        ):
+            class_id, responses, answered_count, correct, active = row
+            parts[class_id].update(
+                responses=responses,
+                answered=answered_count or 0,
+                correct=correct or 0,
+                active=active,
+            )
+
+        for row in db.session.execute(
+            db.select(
+                StudentResponse.class_id,
+                StudentResponse.topic,
+                func.count(StudentResponse.id),
+                func.sum(case((StudentResponse.is_correct.is_(True), 1), else_=0)),
+                func.sum(StudentResponse.time_spent),
+                func.count(StudentResponse.time_spent),
+            )
+            .filter(answered, *response_scope)
+            .group_by(StudentResponse.class_id, StudentResponse.topic)
+        ):
+            class_id, topic_id, answered_count, correct, time_total, time_samples = row
+            parts[class_id]["topics"][topic_id].update(
+                answered=answered_count,
+                correct=correct or 0,
+                time_total=time_total or 0,
+                time_samples=time_samples,
+            )
+
+        completed = and_(
+            StudentProgress.total_subtopics > 0,
+            StudentProgress.subtopics_completed >= StudentProgress.total_subtopics,
         )
+        for row in db.session.execute(
+            db.select(
+                StudentProgress.class_id,
+                StudentProgress.topic,
+                func.count(func.distinct(StudentProgress.user_id)),
+                func.count(func.distinct(case((completed, StudentProgress.user_id)))),
+            )
+            .join(Topic, Topic.id == StudentProgress.topic)
+            .filter(
+                StudentProgress.class_id.in_(class_ids),
+                tuple_(StudentProgress.user_id, StudentProgress.class_id).in_(membership),
+            )
+            .group_by(StudentProgress.class_id, StudentProgress.topic)
+        ):
+            class_id, topic_id, started, completed_count = row
+            parts[class_id]["topics"][topic_id].update(
+                started=started, completed=completed_count
+            )
 
-        recent_activity_list = [
-            {
-                "date": str(activity["date"]),
-                "questions_answered": activity["questions_answered"],
-                "active_students": activity["active_students"],
-            }
-            for activity in recent_activity
-        ]
+        topic_names = dict(db.session.execute(db.select(Topic.id, Topic.name)).all())
+        totals = _new_rollup()
+        class_summaries = []
+        for row in classes:
+            part = parts[row.id]
+            _merge_rollup(totals, part)
+            class_summaries.append(
+                {
+                    "class_id": row.id,
+                    "class_name": row.class_name,
+                    **_rollup_summary(part, topic_names),
+                }
+            )
 
         return {
-            "total_students": total_students,
-            "active_students_last_week": active_last_week or 0,
-            "total_questions_answered": total_questions,
-            "class_avg_accuracy": round(class_avg_accuracy, 2),
-            "topics_overview": topics_list,
-            "rostered_students": rostered_student_list,
-            "top_performers": top_performer_list,
-            "struggling_students": struggling_list,
-            "recent_activity": recent_activity_list,
+            "instructor_id": instructor_id,
+            "classes": class_summaries,
+            "totals": {"classes": len(classes), **_rollup_summary(totals, topic_names)},
         }
 
     @staticmethod
-    def get_question_analytics(topic_id: str, subtopic_type: Optional[str] = None) -> Dict:
-        query = (
-            db.session.query(
-                StudentResponse.question_code,
-                StudentResponse.subtopic_type,
-                func.count(StudentResponse.id).label("times_shown"),
-                func.sum(case((StudentResponse.status == "correct", 1), else_=0)).label(
-                    "correct_count"
-                ),
-                func.sum(case((StudentResponse.status == "incorrect", 1), else_=0)).label(
-                    "incorrect_count"
-                ),
-                func.sum(case((StudentResponse.status == "skipped", 1), else_=0)).label(
-                    "skipped_count"
-                ),
-                func.avg(
-                    case(
-                        (StudentResponse.status != "skipped", StudentResponse.time_spent),
-                        else_=None,
-                    )
-                ).label("avg_time"),
-                func.count(func.distinct(StudentResponse.user_id)).label("students_who_saw"),
+    def get_activity_series(
+        *,
+        granularity: str = "day",
+        student_id: Optional[int] = None,
+        class_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Dict:
+        """
+        Activity totals per hour/day/week/month for one student, one class's
+        roster, or every rostered student, merged from the activity buckets.
+
+        Raises ``ValueError`` for an unknown granularity, or for ``hour`` when
+        hourly buckets are not being maintained.
+        """
+
+        if granularity == "hour" and not current_app.config.get("ACTIVITY_HOURLY_BUCKETS"):
+            raise ValueError("Hourly activity is not enabled (set ACTIVITY_HOURLY_BUCKETS=true)")
+
+        if student_id is not None:
+            user_ids = [student_id]
+        else:
+            roster_filter = [User.role == "student", RosterStudent.deleted_at.is_(None)]
+            if class_id is not None:
+                roster_filter.append(RosterStudent.class_id == class_id)
+            user_ids = (
+                db.select(User.id)
+                .join(RosterStudent, func.lower(RosterStudent.email) == func.lower(User.email))
+                .filter(*roster_filter)
             )
-            .filter(StudentResponse.topic == topic_id)
-        )
 
-        if subtopic_type:
-            query = query.filter(StudentResponse.subtopic_type == subtopic_type)
+        return {
+            "granularity": granularity,
+            "student_id": student_id,
+            "class_id": class_id,
+            "series": activity_repository.series(
+                granularity=granularity,
+                user_ids=user_ids,
+                start=start,
+                end=end,
+                class_ids=[class_id] if class_id is not None else None,
+            ),
+        }
 
-        results = (
-            query.group_by(StudentResponse.question_code, StudentResponse.subtopic_type)
-            .order_by(func.count(StudentResponse.id).desc())
-            .all()
+    @staticmethod
+    def get_question_analytics(
+        topic_id: str,
+        subtopic_type: Optional[str] = None,
+        class_id: Optional[int] = None,
+        *,
+        sort: str = "attempts",
+        limit: int = DEFAULT_QUESTION_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        group_by: str = "question",
+        rostered: bool = False,
+    ) -> Dict:
+        """
+        One page of per-question stats for a topic, top-K first.
+
+        ``sort`` is ``attempts`` (most shown first), ``success_rate`` (lowest
+        first, never-answered questions last) or ``time`` (slowest mean
+        first); ties break on the question id. Ordering, the limit and the
+        ``cursor`` keyset (the previous page's ``next_cursor``) all run in
+        SQL, so a page never loads the rest of the topic.
+
+        ``class_id`` keeps responses written in that class and ``rostered``
+        those of students on the roster of the class they answered in, both
+        read from the per-class ``question_stats`` counters.
+        ``group_by="template"`` merges questions whose code differs only in
+        literals; a template's ``students_who_saw`` sums its variants', so a
+        student who saw two variants counts twice.
+        """
+
+        if sort not in ReportService.QUESTION_SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(ReportService.QUESTION_SORTS)}")
+        if group_by not in ReportService.QUESTION_GROUPINGS:
+            raise ValueError(
+                f"group_by must be one of: {', '.join(ReportService.QUESTION_GROUPINGS)}"
+            )
+        limit = max(1, min(limit, ReportService.MAX_QUESTION_PAGE_SIZE))
+        after = ReportService.decode_question_cursor(cursor, sort, group_by) if cursor else None
+
+        source = ReportService._question_stats_source(topic_id, class_id, rostered)
+        stats = source.c
+        scope = [stats.topic == topic_id]
+        if subtopic_type:
+            scope.append(Question.subtopic_type == subtopic_type)
+
+        if group_by == "question":
+            rows = db.select(
+                stats.question_id.label("key"),
+                Question.question_code,
+                Question.subtopic_type.label("question_subtopic"),
+                stats.times_shown,
+                stats.correct_count,
+                stats.incorrect_count,
+                stats.skipped_count,
+                stats.time_samples,
+                stats.time_mean,
+                stats.time_m2,
+                stats.students_who_saw,
+            )
+        else:
+            rows = db.select(
+                Question.template_hash.label("key"),
+                Question.template,
+                func.min(Question.question_code).label("question_code"),
+                Question.subtopic_type.label("question_subtopic"),
+                func.count().label("variants"),
+                func.sum(stats.times_shown).label("times_shown"),
+                func.sum(stats.correct_count).label("correct_count"),
+                func.sum(stats.incorrect_count).label("incorrect_count"),
+                func.sum(stats.skipped_count).label("skipped_count"),
+                *question_stats_repository.pooled_time(
+                    stats.time_samples, stats.time_mean, stats.time_m2
+                ),
+                func.sum(stats.students_who_saw).label("students_who_saw"),
+            ).group_by(Question.template_hash, Question.template, Question.subtopic_type)
+        rows = (
+            rows.join(Question, Question.id == stats.question_id)
+            .filter(*scope)
+            .subquery("question_rows")
         )
 
+        r = rows.c
+        attempted = r.correct_count + r.incorrect_count
+        if sort == "attempts":
+            sort_key, descending = r.times_shown, True
+        elif sort == "success_rate":
+            # 2.0 is above every real rate, so unanswered questions come last
+            sort_key = case((attempted > 0, r.correct_count * 1.0 / attempted), else_=2.0)
+            descending = False
+        else:
+            sort_key, descending = r.time_mean, True
+
+        query = db.select(rows, sort_key.label("sort_key"))
+        if after is not None:
+            value, last_key = after
+            beyond = sort_key < value if descending else sort_key > value
+            query = query.filter(or_(beyond, and_(sort_key == value, r.key > last_key)))
+        results = db.session.execute(
+            query.order_by(sort_key.desc() if descending else sort_key.asc(), r.key).limit(
+                limit + 1
+            )
+        ).all()
+
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            next_cursor = ReportService.encode_question_cursor(
+                sort, group_by, last.sort_key, last.key
+            )
+
         analytics = []
-        for result in results:
-            total_non_skipped = result.correct_count + result.incorrect_count
-            success_rate = (result.correct_count / total_non_skipped * 100) if total_non_skipped else 0
+        for stats in results:
+            total_non_skipped = stats.correct_count + stats.incorrect_count
+            success_rate = (stats.correct_count / total_non_skipped * 100) if total_non_skipped else 0
+            time_stddev = (
+                math.sqrt(max(stats.time_m2, 0.0) / (stats.time_samples - 1))
+                if stats.time_samples > 1
+                else 0
+            )
 
-            analytics.append(
+            if group_by == "question":
+                entry = {"question_id": stats.key}
+            else:
+                entry = {
+                    "template_hash": stats.key,
+                    "template": stats.template,
+                    "variants": stats.variants,
+                }
+            entry.update(
                 {
-                    "question_code": result.question_code,
-                    "subtopic_type": result.subtopic_type,
-                    "times_shown": result.times_shown,
-                    "correct_count": result.correct_count,
-                    "incorrect_count": result.incorrect_count,
-                    "skipped_count": result.skipped_count,
+                    "question_code": stats.question_code,
+                    "subtopic_type": stats.question_subtopic,
+                    "times_shown": stats.times_shown,
+                    "correct_count": stats.correct_count,
+                    "incorrect_count": stats.incorrect_count,
+                    "skipped_count": stats.skipped_count,
                     "success_rate": round(success_rate, 2),
-                    "avg_time_spent": round(float(result.avg_time), 2) if result.avg_time else 0,
-                    "students_who_saw": result.students_who_saw,
+                    "success_rate_ci": wilson_interval(stats.correct_count, total_non_skipped),
+                    "avg_time_spent": round(stats.time_mean, 2) if stats.time_samples else 0,
+                    "time_spent_stddev": round(time_stddev, 2),
+                    "students_who_saw": stats.students_who_saw,
                 }
             )
+            analytics.append(entry)
 
-        return {"topic": topic_id, "analytics": analytics}
+        return {
+            "topic": topic_id,
+            "class_id": class_id,
+            "rostered": rostered,
+            "sort": sort,
+            "group_by": group_by,
+            "analytics": analytics,
+            "next_cursor": next_cursor,
+        }
+
+    @staticmethod
+    def encode_question_cursor(sort: str, group_by: str, value, key) -> str:
+        raw = json.dumps([sort, group_by, value, key]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    @staticmethod
+    def decode_question_cursor(cursor: str, sort: str, group_by: str) -> Tuple:
+        """
+        ``(sort value, key)`` of the last row of the previous page. A cursor
+        from a different ``sort`` or ``group_by`` is rejected.
+        """
+
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            cursor_sort, cursor_group_by, value, key = json.loads(raw)
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            raise ValueError("Invalid cursor") from None
+        key_type = int if group_by == "question" else str
+        if (
+            (cursor_sort, cursor_group_by) != (sort, group_by)
+            or isinstance(value, bool)
+            or not isinstance(value, (int, float))
+            or not isinstance(key, key_type)
+        ):
+            raise ValueError("Invalid cursor")
+        return value, key
+
+
+def _new_rollup() -> Dict:
+    return {
+        "students": 0,
+        "active": 0,
+        "responses": 0,
+        "answered": 0,
+        "correct": 0,
+        "topics": defaultdict(
+            lambda: dict.fromkeys(
+                ("started", "completed", "answered", "correct", "time_total", "time_samples"), 0
+            )
+        ),
+    }
+
+
+def _merge_rollup(into: Dict, part: Dict) -> None:
+    for key in ("students", "active", "responses", "answered", "correct"):
+        into[key] += part[key]
+    for topic_id, counts in part["topics"].items():
+        merged = into["topics"][topic_id]
+        for key, value in counts.items():
+            merged[key] += value
+
+
+def _rollup_summary(rollup: Dict, topic_names: Dict[str, str]) -> Dict:
+    """The class-overview headline fields from summed rollup counts."""
+
+    topics = []
+    for topic_id, counts in rollup["topics"].items():
+        if not counts["started"]:
+            # Like the class overview, list topics somebody has started
+            continue
+        topics.append(
+            {
+                "topic": topic_id,
+                "topic_name": topic_names.get(topic_id, topic_id),
+                "students_started": counts["started"],
+                "students_completed": counts["completed"],
+                "completion_rate": round(counts["completed"] / counts["started"] * 100, 2),
+                "avg_accuracy": round(counts["correct"] / counts["answered"] * 100, 2)
+                if counts["answered"]
+                else 0,
+                "avg_time_per_question": round(counts["time_total"] / counts["time_samples"], 2)
+                if counts["time_samples"]
+                else 0,
+                "answered": counts["answered"],
+                "correct": counts["correct"],
+            }
+        )
+    topics.sort(key=lambda topic: topic["topic_name"])
+
+    return {
+        "total_students": rollup["students"],
+        "active_students_last_week": rollup["active"],
+        "total_questions_answered": rollup["responses"],
+        "answered_questions": rollup["answered"],
+        "correct_answers": rollup["correct"],
+        "class_avg_accuracy": round(rollup["correct"] / rollup["answered"] * 100, 2)
+        if rollup["answered"]
+        else 0,
+        "topics_overview": topics,
+    }
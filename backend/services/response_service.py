@@ -1,10 +1,22 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Dict, Iterable, Tuple
+import base64
+import binascii
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
+from flask import current_app
+
+from backend import live_updates
 from backend.models import StudentResponse, db
-from backend.repositories import response_repository
+from backend.repositories import (
+    activity_repository,
+    question_repository,
+    question_stats_repository,
+    response_repository,
+    sketch_repository,
+)
+from backend.services.progress_service import ProgressService
 
 
 class ResponseService:
@@ -19,29 +31,314 @@ class ResponseService:
         "is_correct",
         "status",
     }
+    VALID_STATUSES = {"correct", "incorrect", "skipped"}
+    # JSON types of the payload fields (None allowed for the optional ones),
+    # checked before a response is accepted for a later buffered write
+    FIELD_TYPES = {
+        "user_id": (int,),
+        "class_id": (int, type(None)),
+        "topic": (str,),
+        "subtopic_type": (str,),
+        "question_code": (str,),
+        "student_answer": (str, type(None)),
+        "correct_answer": (str,),
+        "is_correct": (bool,),
+        "status": (str,),
+        "time_spent": (int, float, type(None)),
+    }
+    PROJECTABLE_FIELDS = (
+        "id",
+        "user_id",
+        "class_id",
+        "topic",
+        "question_id",
+        "subtopic_type",
+        "question_code",
+        "student_answer",
+        "correct_answer",
+        "is_correct",
+        "status",
+        "time_spent",
+        "attempted_at",
+    )
+    DEFAULT_PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 500
+    # Window of the class overview's active_students_last_week
+    ACTIVE_WINDOW = timedelta(days=7)
 
     @classmethod
     def create_response(cls, data: Dict) -> StudentResponse:
-        response = StudentResponse(
+        attempted_at = datetime.utcnow()
+        broker = cls._live_broker()
+        newly_active = broker is not None and not response_repository.answered_since(
+            data["user_id"], attempted_at - cls.ACTIVE_WINDOW
+        )
+
+        question_id = question_repository.get_or_create_id(
+            data["question_code"], data["subtopic_type"], data["correct_answer"]
+        )
+        response = cls._record(data, question_id, attempted_at)
+        db.session.commit()
+        if broker is not None:
+            cls.publish_response(broker, response, newly_active=newly_active)
+        return response
+
+    @staticmethod
+    def buffered_row(data: Dict) -> Dict:
+        """
+        The JSON-safe journal entry for a validated payload accepted by the
+        ingest buffer; ``record_batch`` writes it later.
+        """
+
+        return {
+            "user_id": data["user_id"],
+            "class_id": data.get("class_id"),
+            "topic": data["topic"],
+            "subtopic_type": data["subtopic_type"],
+            "question_code": data["question_code"],
+            "student_answer": data.get("student_answer"),
+            "correct_answer": data["correct_answer"],
+            "is_correct": bool(data["is_correct"]),
+            "status": data["status"],
+            "time_spent": data.get("time_spent"),
+            "attempted_at": datetime.utcnow().isoformat(),
+        }
+
+    @classmethod
+    def record_batch(cls, rows: Sequence[Dict]) -> List[StudentResponse]:
+        """
+        Write ``buffered_row`` entries in one transaction: question ids are
+        resolved in bulk and progress is incremented once per student and
+        topic. The caller's pending session changes commit with it.
+        """
+
+        rows = [dict(row, attempted_at=datetime.fromisoformat(row["attempted_at"])) for row in rows]
+        question_repository.resolve_ids(rows)
+        broker = cls._live_broker()
+        active = set()
+        if broker is not None:
+            first_answer: Dict[int, datetime] = {}
+            for row in rows:
+                first_answer.setdefault(row["user_id"], row["attempted_at"])
+            active = {
+                user_id
+                for user_id, attempted_at in first_answer.items()
+                if response_repository.answered_since(user_id, attempted_at - cls.ACTIVE_WINDOW)
+            }
+
+        responses = [cls._build(row, row["question_id"], row["attempted_at"]) for row in rows]
+        response_repository.add_responses(responses)
+
+        answered: Dict[Tuple[int, str], Tuple[int, datetime, Optional[int]]] = {}
+        for row in rows:
+            key = (row["user_id"], row["topic"])
+            count, _, class_id = answered.get(key, (0, None, None))
+            class_id = row.get("class_id") if row.get("class_id") is not None else class_id
+            answered[key] = (count + 1, row["attempted_at"], class_id)
+        question_stats_repository.record_many(rows)
+        activity_repository.record_many(
+            rows, hourly=current_app.config.get("ACTIVITY_HOURLY_BUCKETS", False)
+        )
+        if current_app.config.get("DISTINCT_COUNT_MODE", "exact") == "approximate":
+            for response in responses:
+                cls._record_sketches(response)
+        ProgressService.add_questions_answered(answered)
+        db.session.commit()
+
+        if broker is not None:
+            for response in responses:
+                newly_active = response.user_id not in active
+                active.add(response.user_id)
+                cls.publish_response(broker, response, newly_active=newly_active)
+        return responses
+
+    @staticmethod
+    def _live_broker() -> Optional[live_updates.LiveUpdateBroker]:
+        """The live-update broker, when some dashboard is listening."""
+
+        broker = live_updates.get_broker()
+        if broker is None or not broker.has_subscribers():
+            return None
+        return broker
+
+    @classmethod
+    def _record(cls, data: Dict, question_id: int, attempted_at: datetime) -> StudentResponse:
+        """Add one response and fold it into the running aggregates, uncommitted."""
+
+        response = cls._build(data, question_id, attempted_at)
+        response_repository.add_response(response)
+        question_stats_repository.record(
+            question_id=question_id,
+            topic=response.topic,
+            user_id=response.user_id,
+            class_id=response.class_id,
+            status=response.status,
+            time_spent=response.time_spent,
+        )
+        activity_repository.record(
+            user_id=response.user_id,
+            class_id=response.class_id,
+            attempted_at=response.attempted_at,
+            is_correct=response.is_correct,
+            status=response.status,
+            time_spent=response.time_spent,
+            hourly=current_app.config.get("ACTIVITY_HOURLY_BUCKETS", False),
+        )
+        if current_app.config.get("DISTINCT_COUNT_MODE", "exact") == "approximate":
+            cls._record_sketches(response)
+        return response
+
+    @staticmethod
+    def _build(data: Dict, question_id: int, attempted_at: datetime) -> StudentResponse:
+        return StudentResponse(
             user_id=data["user_id"],
+            class_id=data.get("class_id"),
             topic=data["topic"],
+            question_id=question_id,
             subtopic_type=data["subtopic_type"],
-            question_code=data["question_code"],
             student_answer=data.get("student_answer"),
-            correct_answer=data["correct_answer"],
             is_correct=bool(data["is_correct"]),
             status=data["status"],
             time_spent=data.get("time_spent"),
-            attempted_at=datetime.utcnow(),
+            attempted_at=attempted_at,
+        )
+
+    @staticmethod
+    def _record_sketches(response: StudentResponse) -> None:
+        sketch_repository.record(
+            user_id=response.user_id,
+            class_id=response.class_id,
+            topic=response.topic,
+            subtopic_type=response.subtopic_type,
+            question_id=response.question_id,
+            attempted_at=response.attempted_at,
+        )
+
+    @staticmethod
+    def publish_response(
+        broker: live_updates.LiveUpdateBroker, response: StudentResponse, *, newly_active: bool
+    ) -> None:
+        """
+        Announce a committed response to live dashboards, as the deltas it
+        makes to the class overview they already loaded.
+
+        Accuracy counts only answered (non-skipped) responses, so the deltas
+        carry ``answered_questions``/``correct_answers`` and each topic's
+        ``answered``/``correct``: add them to the overview's counts of the
+        same name and divide to get the new accuracy. A skipped response adds
+        to ``total_questions_answered`` only.
+        """
+
+        answered = int(response.status != "skipped")
+        correct = int(bool(answered and response.is_correct))
+        broker.publish(
+            "response",
+            {
+                "response_id": response.id,
+                "class_id": response.class_id,
+                "user_id": response.user_id,
+                "topic": response.topic,
+                "status": response.status,
+                "attempted_at": response.attempted_at.isoformat(),
+                "deltas": {
+                    "total_questions_answered": 1,
+                    "answered_questions": answered,
+                    "correct_answers": correct,
+                    "active_students_last_week": int(newly_active),
+                    "topic": {"topic": response.topic, "answered": answered, "correct": correct},
+                },
+            },
+            class_id=response.class_id,
+            event_id=response.id,
         )
-        response_repository.add_response(response)
-        db.session.commit()
-        return response
 
     @staticmethod
     def get_student_responses(user_id: int) -> Iterable[StudentResponse]:
         return response_repository.get_by_user(user_id)
 
+    @classmethod
+    def get_student_responses_page(
+        cls,
+        user_id: int,
+        *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        topic_id: Optional[str] = None,
+        subtopic_type: Optional[str] = None,
+        status: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        """
+        Return one page of a student's history (newest first) and the cursor
+        for the next page. ``fields`` restricts the returned keys, e.g. to skip
+        ``question_code`` bodies. Raises ``ValueError`` on a bad cursor/field.
+        """
+
+        limit = max(1, min(limit, cls.MAX_PAGE_SIZE))
+        before = cls.decode_cursor(cursor) if cursor else None
+
+        columns = None
+        if fields:
+            unknown = set(fields) - set(cls.PROJECTABLE_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            # id and attempted_at are always needed to build the next cursor
+            wanted = {"id", "attempted_at", *fields}
+            columns = [
+                response_repository.column(name)
+                for name in cls.PROJECTABLE_FIELDS
+                if name in wanted
+            ]
+
+        rows = response_repository.get_page(
+            user_id,
+            limit=limit + 1,
+            before=before,
+            topic_id=topic_id,
+            subtopic_type=subtopic_type,
+            status=status,
+            start=start,
+            end=end,
+            columns=columns,
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if columns is None:
+            items = [row.to_dict() for row in rows]
+        else:
+            items = []
+            for row in rows:
+                item = {key: row[key] for key in fields}
+                if "attempted_at" in item and item["attempted_at"] is not None:
+                    item["attempted_at"] = item["attempted_at"].isoformat()
+                items.append(item)
+
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            last_at = last.attempted_at if columns is None else last["attempted_at"]
+            last_id = last.id if columns is None else last["id"]
+            next_cursor = cls.encode_cursor(last_at, last_id)
+
+        return {"responses": items, "next_cursor": next_cursor}
+
+    @staticmethod
+    def encode_cursor(attempted_at: datetime, response_id: int) -> str:
+        raw = f"{attempted_at.isoformat()}|{response_id}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            attempted_at, response_id = raw.split("|", 1)
+            return datetime.fromisoformat(attempted_at), int(response_id)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise ValueError("Invalid cursor") from None
+
     @staticmethod
     def get_student_responses_for_topic(user_id: int, topic_id: str) -> Iterable[StudentResponse]:
         return response_repository.get_by_user_and_topic(user_id, topic_id)
@@ -52,8 +349,31 @@ class ResponseService:
         if missing:
             return False, f"Missing required fields: {', '.join(sorted(missing))}"
 
-        if data["status"] not in {"correct", "incorrect", "skipped"}:
+        if data["status"] not in cls.VALID_STATUSES:
             return False, "Invalid status value"
 
         return True, ""
 
+    @classmethod
+    def validate_types(cls, data: Dict) -> Tuple[bool, str]:
+        """
+        Check the field types of a payload that passed ``validate_payload``.
+        The synchronous path fails only its own request on a bad value; a
+        buffered response is answered 202 before it is written, so it is
+        checked up front.
+        """
+
+        wrong = sorted(
+            name
+            for name, types in cls.FIELD_TYPES.items()
+            if name in data
+            and (
+                not isinstance(data[name], types)
+                # JSON true/false are not numbers here
+                or (isinstance(data[name], bool) and bool not in types)
+            )
+        )
+        if wrong:
+            return False, f"Invalid field types: {', '.join(wrong)}"
+        return True, ""
+
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Sequence, Tuple
+
+from backend.models import Question, RosterStudent, StudentProgress, StudentResponse, db
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - Windows has no flock
+    fcntl = None
+
+# Logical column types; each writer maps them onto its own storage types
+INT, FLOAT, BOOL, TEXT, TIMESTAMP = "int", "float", "bool", "text", "timestamp"
+
+Columns = Dict[str, list]
+Schema = Sequence[Tuple[str, str]]
+
+
+class ParquetWriter:
+    """Writes one Parquet file per partition chunk (requires pyarrow)."""
+
+    name = "parquet"
+    extension = ".parquet"
+
+    def __init__(self):
+        import pyarrow  # noqa: F401  (fail fast when unavailable)
+        import pyarrow.parquet  # noqa: F401
+
+    def write(self, path: Path, columns: Columns, schema: Schema) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {
+            INT: pa.int64(),
+            FLOAT: pa.float64(),
+            BOOL: pa.bool_(),
+            TEXT: pa.string(),
+            TIMESTAMP: pa.timestamp("us"),
+        }
+        table = pa.table(
+            {name: pa.array(columns[name], type=types[kind]) for name, kind in schema}
+        )
+        pq.write_table(table, path, compression="zstd")
+
+
+class NpzWriter:
+    """
+    Writes compressed NumPy archives (one array per column).
+
+    NumPy has no nullable ints, so nullable numeric columns are stored as
+    float64 with NaN, missing text as ``""`` and missing timestamps as NaT.
+    """
+
+    name = "npz"
+    extension = ".npz"
+
+    def __init__(self):
+        import numpy  # noqa: F401  (fail fast when unavailable)
+
+    def write(self, path: Path, columns: Columns, schema: Schema) -> None:
+        import numpy as np
+
+        arrays = {}
+        for name, kind in schema:
+            values = columns[name]
+            if kind == INT:
+                if any(value is None for value in values):
+                    arrays[name] = np.array(
+                        [np.nan if value is None else value for value in values], dtype=np.float64
+                    )
+                else:
+                    arrays[name] = np.array(values, dtype=np.int64)
+            elif kind == FLOAT:
+                arrays[name] = np.array(
+                    [np.nan if value is None else value for value in values], dtype=np.float64
+                )
+            elif kind == BOOL:
+                arrays[name] = np.array([bool(value) for value in values], dtype=np.bool_)
+            elif kind == TIMESTAMP:
+                arrays[name] = np.array(
+                    ["NaT" if value is None else value.isoformat() for value in values],
+                    dtype="datetime64[us]",
+                )
+            else:
+                arrays[name] = np.array(["" if value is None else str(value) for value in values])
+        np.savez_compressed(path, **arrays)
+
+
+WRITERS: Dict[str, Callable[[], object]] = {"parquet": ParquetWriter, "npz": NpzWriter}
+
+
+class SnapshotInProgressError(Exception):
+    """Raised when another run holds the output directory's lock."""
+
+
+class SnapshotService:
+    """
+    Incremental columnar snapshots of the analytics tables for offline work.
+
+    Layout under the output directory::
+
+        responses/class_id=<id>/month=<YYYY-MM>/part-<run>-<n>.<ext>
+        questions/part-<run>-<n>.<ext>
+        progress/class_id=<id>/snapshot.<ext>      (rewritten every run)
+        roster/class_id=<id>/snapshot.<ext>        (rewritten every run)
+        _watermark.json
+
+    Responses and questions are append-only, so each run only exports rows
+    with ids above the watermark. Part files from runs that never reached the
+    watermark (e.g. a crash mid-export) are deleted at the start of the next
+    run so nothing is counted twice. As with Hive-style partitioning, the
+    ``class_id`` column lives in the directory name rather than in the files;
+    ``class_id=0`` holds rows without a class.
+
+    A run holds an exclusive lock on ``.lock`` in the output directory, so a
+    second run (the CLI next to the endpoint, say) fails fast instead of
+    deleting the first one's part files as orphans.
+    """
+
+    WATERMARK_FILE = "_watermark.json"
+    LOCK_FILE = ".lock"
+    NO_CLASS = 0
+
+    RESPONSE_SCHEMA: Schema = (
+        ("id", INT),
+        ("user_id", INT),
+        ("class_id", INT),
+        ("topic", TEXT),
+        ("question_id", INT),
+        ("subtopic_type", TEXT),
+        ("is_correct", BOOL),
+        ("status", TEXT),
+        ("time_spent", INT),
+        ("attempted_at", TIMESTAMP),
+    )
+    QUESTION_SCHEMA: Schema = (
+        ("id", INT),
+        ("subtopic_type", TEXT),
+        ("question_code", TEXT),
+        ("correct_answer", TEXT),
+    )
+    PROGRESS_SCHEMA: Schema = (
+        ("id", INT),
+        ("user_id", INT),
+        ("class_id", INT),
+        ("topic", TEXT),
+        ("subtopics_completed", INT),
+        ("total_subtopics", INT),
+        ("questions_answered", INT),
+        ("last_accessed", TIMESTAMP),
+    )
+    ROSTER_SCHEMA: Schema = (
+        ("id", INT),
+        ("class_id", INT),
+        ("email", TEXT),
+        ("first_name", TEXT),
+        ("last_name", TEXT),
+        ("created_at", TIMESTAMP),
+        ("deleted_at", TIMESTAMP),
+    )
+
+    @staticmethod
+    def _file_schema(schema: Schema) -> Schema:
+        return tuple((name, kind) for name, kind in schema if name != "class_id")
+
+    @staticmethod
+    def get_writer(export_format: str = "auto"):
+        """
+        Return a writer for ``export_format`` (``parquet``, ``npz`` or ``auto``,
+        which prefers Parquet). Raises ``RuntimeError`` when the library is
+        missing and ``ValueError`` for an unknown format.
+        """
+
+        if export_format == "auto":
+            for candidate in ("parquet", "npz"):
+                try:
+                    return WRITERS[candidate]()
+                except ImportError:
+                    continue
+            raise RuntimeError("Snapshots need pyarrow (Parquet) or numpy (.npz); install one.")
+        if export_format not in WRITERS:
+            raise ValueError(f"format must be one of: auto, {', '.join(WRITERS)}")
+        try:
+            return WRITERS[export_format]()
+        except ImportError:
+            library = "pyarrow" if export_format == "parquet" else "numpy"
+            raise RuntimeError(f"The {export_format} format needs {library} installed.") from None
+
+    @classmethod
+    def read_watermark(cls, output_dir: os.PathLike) -> Dict:
+        path = Path(output_dir) / cls.WATERMARK_FILE
+        if not path.exists():
+            return {"responses_last_id": 0, "questions_last_id": 0, "runs": []}
+        return json.loads(path.read_text())
+
+    @classmethod
+    def create_snapshot(
+        cls,
+        output_dir: os.PathLike,
+        *,
+        export_format: str = "auto",
+        batch_size: int = 50_000,
+    ) -> Dict:
+        """
+        Export everything new since the last run; return the run summary.
+        Raises ``SnapshotInProgressError`` while another run is writing to
+        ``output_dir``.
+        """
+
+        writer = cls.get_writer(export_format)
+        root = Path(output_dir)
+        root.mkdir(parents=True, exist_ok=True)
+        with cls._run_lock(root):
+            return cls._create_snapshot(root, writer, batch_size)
+
+    @classmethod
+    @contextmanager
+    def _run_lock(cls, root: Path) -> Iterator[None]:
+        with open(root / cls.LOCK_FILE, "a") as handle:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    raise SnapshotInProgressError(
+                        "Another snapshot is being written; try again when it finishes."
+                    ) from None
+            yield
+
+    @classmethod
+    def _create_snapshot(cls, root: Path, writer, batch_size: int) -> Dict:
+        watermark = cls.read_watermark(root)
+        cls._remove_orphaned_parts(root, {run["run_id"] for run in watermark["runs"]})
+
+        run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        started = datetime.utcnow()
+
+        responses, responses_last_id = cls._export_responses(
+            root, writer, run_id, watermark["responses_last_id"], batch_size
+        )
+        questions, questions_last_id = cls._export_questions(
+            root, writer, run_id, watermark["questions_last_id"], batch_size
+        )
+        progress = cls._export_by_class(
+            root / "progress", writer, StudentProgress, cls.PROGRESS_SCHEMA
+        )
+        roster = cls._export_by_class(root / "roster", writer, RosterStudent, cls.ROSTER_SCHEMA)
+
+        summary = {
+            "run_id": run_id,
+            "format": writer.name,
+            "started_at": started.isoformat(),
+            "finished_at": datetime.utcnow().isoformat(),
+            "responses": responses,
+            "questions": questions,
+            "progress": progress,
+            "roster": roster,
+            "responses_last_id": responses_last_id,
+            "questions_last_id": questions_last_id,
+        }
+        watermark.update(
+            responses_last_id=responses_last_id,
+            questions_last_id=questions_last_id,
+            runs=[*watermark["runs"], summary],
+        )
+        temporary = root / (cls.WATERMARK_FILE + ".tmp")
+        temporary.write_text(json.dumps(watermark, indent=2))
+        os.replace(temporary, root / cls.WATERMARK_FILE)
+        return summary
+
+    @classmethod
+    def _export_responses(cls, root, writer, run_id, last_id, batch_size) -> Tuple[int, int]:
+        columns = [getattr(StudentResponse, name) for name, _ in cls.RESPONSE_SCHEMA]
+        names = [name for name, _ in cls.RESPONSE_SCHEMA]
+        written = 0
+        part = 0
+        while True:
+            rows = db.session.execute(
+                db.select(*columns)
+                .filter(StudentResponse.id > last_id)
+                .order_by(StudentResponse.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return written, last_id
+
+            partitions: Dict[Tuple[int, str], Columns] = defaultdict(
+                lambda: {name: [] for name in names}
+            )
+            for row in rows:
+                key = (row.class_id or cls.NO_CLASS, row.attempted_at.strftime("%Y-%m"))
+                bucket = partitions[key]
+                for name, value in zip(names, row):
+                    bucket[name].append(value)
+
+            for (class_id, month), data in sorted(partitions.items()):
+                directory = root / "responses" / f"class_id={class_id}" / f"month={month}"
+                directory.mkdir(parents=True, exist_ok=True)
+                writer.write(
+                    directory / f"part-{run_id}-{part:05d}{writer.extension}",
+                    data,
+                    cls._file_schema(cls.RESPONSE_SCHEMA),
+                )
+                part += 1
+
+            written += len(rows)
+            last_id = rows[-1].id
+
+    @classmethod
+    def _export_questions(cls, root, writer, run_id, last_id, batch_size) -> Tuple[int, int]:
+        columns = [getattr(Question, name) for name, _ in cls.QUESTION_SCHEMA]
+        directory = root / "questions"
+        directory.mkdir(parents=True, exist_ok=True)
+        written = 0
+        part = 0
+        while True:
+            rows = db.session.execute(
+                db.select(*columns)
+                .filter(Question.id > last_id)
+                .order_by(Question.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return written, last_id
+            data = {name: [row[i] for row in rows] for i, (name, _) in enumerate(cls.QUESTION_SCHEMA)}
+            writer.write(
+                directory / f"part-{run_id}-{part:05d}{writer.extension}", data, cls.QUESTION_SCHEMA
+            )
+            part += 1
+            written += len(rows)
+            last_id = rows[-1].id
+
+    @classmethod
+    def _export_by_class(cls, directory: Path, writer, model, schema: Schema) -> int:
+        """Rewrite a small mutable table as one file per class."""
+
+        names = [name for name, _ in schema]
+        rows = db.session.execute(
+            db.select(*[getattr(model, name) for name in names]).order_by(model.id)
+        ).all()
+        partitions: Dict[int, Columns] = defaultdict(lambda: {name: [] for name in names})
+        for row in rows:
+            bucket = partitions[row.class_id or cls.NO_CLASS]
+            for name, value in zip(names, row):
+                bucket[name].append(value)
+
+        staging = directory.with_name(directory.name + ".staging")
+        shutil.rmtree(staging, ignore_errors=True)
+        for class_id, data in partitions.items():
+            target = staging / f"class_id={class_id}"
+            target.mkdir(parents=True, exist_ok=True)
+            writer.write(target / f"snapshot{writer.extension}", data, cls._file_schema(schema))
+        staging.mkdir(parents=True, exist_ok=True)
+        shutil.rmtree(directory, ignore_errors=True)
+        staging.rename(directory)
+        return len(rows)
+
+    @staticmethod
+    def _remove_orphaned_parts(root: Path, completed_runs: set) -> None:
+        for folder in ("responses", "questions"):
+            for path in (root / folder).rglob("part-*"):
+                run_id = path.name[len("part-") :].rsplit("-", 1)[0]
+                if run_id not in completed_runs:
+                    path.unlink()
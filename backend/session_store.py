@@ -0,0 +1,199 @@
+"""
+Server-side session storage.
+
+Flask's default session is a signed cookie holding the whole session dict,
+which for Google sign-ins includes the OAuth token, refresh token and granted
+scopes and therefore rides along on every API request. With
+``SESSION_BACKEND = "server"`` the dict lives in the ``server_sessions``
+table instead and the cookie only carries an opaque random id.
+
+Rows are written only when the session changes or when less than half of
+``PERMANENT_SESSION_LIFETIME`` remains (sliding expiry), so a typical
+authenticated request costs one primary-key lookup. Expired rows are ignored
+on read and deleted lazily, at most once per
+``SESSION_CLEANUP_INTERVAL_SECONDS`` per process.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import secrets
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from flask import Flask, Request, Response
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from backend.models import ServerSession, db
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_KEY = "bytepath_session_store"
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session dict whose contents are stored in ``server_sessions``."""
+
+    def __init__(
+        self,
+        initial: Optional[dict] = None,
+        *,
+        sid: Optional[str] = None,
+        expires_at: Optional[datetime] = None,
+    ) -> None:
+        def on_update(self) -> None:
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.new = sid is None
+        self.modified = False
+        self.stale_sid: Optional[str] = None
+
+    def regenerate(self) -> None:
+        """Issue a fresh id on save (call on login to prevent fixation)."""
+
+        if self.sid is not None:
+            self.stale_sid = self.sid
+            self.sid = None
+        self.modified = True
+
+
+def regenerate(session) -> None:
+    """Rotate the session id if ``session`` is server-side; no-op otherwise."""
+
+    regenerate_id = getattr(session, "regenerate", None)
+    if regenerate_id is not None:
+        regenerate_id()
+
+
+def _key(sid: str) -> str:
+    return hashlib.sha256(sid.encode("utf-8")).hexdigest()
+
+
+class DatabaseSessionInterface(SessionInterface):
+    """Flask session interface backed by the ``server_sessions`` table."""
+
+    def __init__(self, *, cleanup_interval: float = 3600.0) -> None:
+        self.cleanup_interval = cleanup_interval
+        self._next_cleanup = 0.0
+        self._cleanup_lock = threading.Lock()
+
+    def open_session(self, app: Flask, request: Request) -> ServerSideSession:
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            with db.engine.connect() as connection:
+                row = connection.execute(
+                    db.select(ServerSession.data, ServerSession.expires_at).where(
+                        ServerSession.id == _key(sid)
+                    )
+                ).first()
+            if row is not None and row.expires_at > datetime.utcnow():
+                return ServerSideSession(json.loads(row.data), sid=sid, expires_at=row.expires_at)
+        return ServerSideSession()
+
+    def save_session(self, app: Flask, session: ServerSideSession, response: Response) -> None:
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and (session.sid or session.stale_sid):
+                self._delete(session.sid, session.stale_sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        now = datetime.utcnow()
+        lifetime = app.permanent_session_lifetime
+        refresh_due = session.expires_at is not None and session.expires_at - now < lifetime / 2
+        if not (session.modified or refresh_due or session.sid is None):
+            return
+
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+        session.expires_at = now + lifetime
+        values = {
+            "user_id": session.get("user_id"),
+            "data": json.dumps(dict(session), separators=(",", ":")),
+            "expires_at": session.expires_at,
+            "updated_at": now,
+        }
+        key = _key(session.sid)
+        with db.engine.begin() as connection:
+            if session.stale_sid:
+                connection.execute(
+                    ServerSession.__table__.delete().where(
+                        ServerSession.id == _key(session.stale_sid)
+                    )
+                )
+            updated = connection.execute(
+                ServerSession.__table__.update().where(ServerSession.id == key).values(**values)
+            )
+            if not updated.rowcount:
+                connection.execute(ServerSession.__table__.insert().values(id=key, **values))
+        session.stale_sid = None
+
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+        self._maybe_cleanup(now)
+
+    def cleanup(self, now: Optional[datetime] = None) -> int:
+        """Delete expired rows and return how many were removed."""
+
+        with db.engine.begin() as connection:
+            result = connection.execute(
+                ServerSession.__table__.delete().where(
+                    ServerSession.expires_at <= (now or datetime.utcnow())
+                )
+            )
+        return result.rowcount
+
+    def _maybe_cleanup(self, now: datetime) -> None:
+        if not self.cleanup_interval:
+            return
+        with self._cleanup_lock:
+            if time.monotonic() < self._next_cleanup:
+                return
+            self._next_cleanup = time.monotonic() + self.cleanup_interval
+        try:
+            removed = self.cleanup(now)
+        except Exception:  # pragma: no cover - cleanup must never fail a request
+            logger.exception("expired session cleanup failed")
+            return
+        if removed:
+            logger.info("removed %d expired sessions", removed)
+
+    def _delete(self, *sids: Optional[str]) -> None:
+        keys = [_key(sid) for sid in sids if sid]
+        with db.engine.begin() as connection:
+            connection.execute(
+                ServerSession.__table__.delete().where(ServerSession.id.in_(keys))
+            )
+
+
+def init_app(app: Flask) -> Optional[DatabaseSessionInterface]:
+    """Install the database session interface unless ``SESSION_BACKEND`` is "cookie"."""
+
+    if app.config.get("SESSION_BACKEND", "server") != "server":
+        return None
+
+    interface = DatabaseSessionInterface(
+        cleanup_interval=app.config.get("SESSION_CLEANUP_INTERVAL_SECONDS", 3600.0),
+    )
+    app.session_interface = interface
+    app.extensions[EXTENSION_KEY] = interface
+    return interface
@@ -0,0 +1,92 @@
+"""
+HyperLogLog sketches for approximate distinct counts.
+
+A sketch with precision ``p`` keeps ``2**p`` one-byte registers (4 KiB at the
+default ``p = 12``) and estimates the number of distinct values added with a
+relative standard error of ``1.04 / sqrt(2**p)`` -- about 1.6% at ``p = 12``,
+so roughly 95% of estimates land within 3.3% of the true count. Small counts
+fall back to linear counting and are usually exact.
+
+Sketches are mergeable: the union of two sets is estimated by taking the
+register-wise maximum, which is how per-class sketches roll up into totals.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import zlib
+from typing import Hashable, Iterable, Optional
+
+DEFAULT_PRECISION = 12
+_HASH_BITS = 64
+_INVERSE_POWERS = tuple(2.0**-rank for rank in range(_HASH_BITS + 2))
+
+
+class HyperLogLog:
+    """A mergeable approximate distinct counter."""
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytearray] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        size = 1 << precision
+        if registers is None:
+            registers = bytearray(size)
+        elif len(registers) != size:
+            raise ValueError(f"expected {size} registers, got {len(registers)}")
+        self.registers = registers
+
+    @property
+    def standard_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, value: Hashable) -> bool:
+        """Add ``value``; return True if the sketch changed (and needs saving)."""
+
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+        suffix_bits = _HASH_BITS - self.precision
+        index = hashed >> suffix_bits
+        remainder = hashed & ((1 << suffix_bits) - 1)
+        rank = suffix_bits - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def update(self, values: Iterable[Hashable]) -> bool:
+        changed = False
+        for value in values:
+            changed = self.add(value) or changed
+        return changed
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold ``other`` into this sketch (in place) and return self."""
+
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(_INVERSE_POWERS[register] for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def to_bytes(self) -> bytes:
+        # Registers of small sketches are mostly zero, so they compress well
+        return bytes([self.precision]) + zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(data[0], bytearray(zlib.decompress(data[1:])))
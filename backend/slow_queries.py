@@ -0,0 +1,230 @@
+"""
+Slow-query recorder.
+
+Captures SQL statements that exceed a configurable duration together with
+redacted bound parameters and the service/repository method that issued
+them. Statements above a second threshold also get their query plan captured
+(``EXPLAIN QUERY PLAN`` on SQLite). Entries are kept in a bounded in-memory
+buffer for the diagnostics endpoint and can be appended to a rotating JSONL
+file.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+EXTENSION_KEY = "bytepath_slow_queries"
+
+# Frames from these packages are reported as the "origin" of a statement.
+ORIGIN_PREFIXES = ("backend.services.", "backend.repositories.")
+
+
+class SlowQueryRecorder:
+    """Bounded buffer of slow statements with optional JSONL persistence."""
+
+    def __init__(
+        self,
+        *,
+        threshold_ms: float,
+        explain_threshold_ms: Optional[float] = None,
+        buffer_size: int = 200,
+        log_file: Optional[str] = None,
+        log_max_bytes: int = 5 * 1024 * 1024,
+        log_backup_count: int = 3,
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain_threshold_ms = explain_threshold_ms
+        self._entries: deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._file_logger: Optional[logging.Logger] = None
+        if log_file:
+            self._file_logger = _build_file_logger(log_file, log_max_bytes, log_backup_count)
+
+    def record(
+        self,
+        *,
+        statement: str,
+        parameters: Any,
+        duration_ms: float,
+        origin: Optional[str],
+        plan: Optional[List[str]],
+    ) -> Dict[str, Any]:
+        entry = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            "statement": statement,
+            "parameters": redact_parameters(parameters),
+            "origin": origin,
+            "query_plan": plan,
+        }
+        with self._lock:
+            self._entries.append(entry)
+        if self._file_logger is not None:
+            self._file_logger.info(json.dumps(entry))
+        return entry
+
+    def entries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self._entries)
+        items.reverse()  # newest first
+        return items[:limit] if limit else items
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def init_app(app: Flask) -> Optional[SlowQueryRecorder]:
+    """Create the recorder for ``app`` if slow-query logging is enabled."""
+
+    threshold_ms = app.config.get("SLOW_QUERY_THRESHOLD_MS")
+    if threshold_ms is None:
+        return None
+
+    recorder = SlowQueryRecorder(
+        threshold_ms=threshold_ms,
+        explain_threshold_ms=app.config.get("SLOW_QUERY_EXPLAIN_THRESHOLD_MS"),
+        buffer_size=app.config.get("SLOW_QUERY_BUFFER_SIZE", 200),
+        log_file=app.config.get("SLOW_QUERY_LOG_FILE"),
+        log_max_bytes=app.config.get("SLOW_QUERY_LOG_MAX_BYTES", 5 * 1024 * 1024),
+        log_backup_count=app.config.get("SLOW_QUERY_LOG_BACKUP_COUNT", 3),
+    )
+    app.extensions[EXTENSION_KEY] = recorder
+    _install_listeners()
+    return recorder
+
+
+def get_recorder() -> Optional[SlowQueryRecorder]:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get(EXTENSION_KEY)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Replace bound values with their type (and length for strings/bytes)."""
+
+    if parameters is None:
+        return None
+    return _redact_value(parameters)
+
+
+def _redact_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _redact_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_redact_value(item) for item in value]
+    if value is None:
+        return "<null>"
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+_listeners_installed = False
+_listeners_lock = threading.Lock()
+_explaining = threading.local()
+
+
+def _install_listeners() -> None:
+    global _listeners_installed
+    with _listeners_lock:
+        if _listeners_installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listeners_installed = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_bytepath_slow_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_bytepath_slow_query_start")
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    recorder = get_recorder()
+    if recorder is None or duration_ms < recorder.threshold_ms:
+        return
+    if getattr(_explaining, "active", False):
+        return
+
+    plan = None
+    if (
+        recorder.explain_threshold_ms is not None
+        and duration_ms >= recorder.explain_threshold_ms
+        and not executemany
+    ):
+        plan = _explain(conn, cursor, statement, parameters)
+
+    recorder.record(
+        statement=statement,
+        parameters=parameters,
+        duration_ms=duration_ms,
+        origin=_find_origin(),
+        plan=plan,
+    )
+
+
+def _explain(conn, cursor, statement: str, parameters: Any) -> Optional[List[str]]:
+    """Run the dialect's EXPLAIN on a raw DBAPI cursor (bypassing events)."""
+
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    if keyword not in {"SELECT", "WITH"}:
+        return None
+
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    _explaining.active = True
+    try:
+        raw_cursor = cursor.connection.cursor()
+        try:
+            raw_cursor.execute(prefix + statement, parameters or ())
+            rows = raw_cursor.fetchall()
+        finally:
+            raw_cursor.close()
+    except Exception as exc:  # pragma: no cover - plan capture is best effort
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        _explaining.active = False
+
+    if conn.dialect.name == "sqlite":
+        # Rows are (id, parent, notused, detail)
+        return [str(row[-1]) for row in rows]
+    return [" ".join(str(col) for col in row) for row in rows]
+
+
+def _find_origin() -> Optional[str]:
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(ORIGIN_PREFIXES):
+            code = frame.f_code
+            name = getattr(code, "co_qualname", code.co_name)
+            return f"{module}.{name}"
+        frame = frame.f_back
+    return None
+
+
+def _build_file_logger(path: str, max_bytes: int, backup_count: int) -> logging.Logger:
+    file_logger = logging.getLogger(f"backend.slow_queries.{path}")
+    file_logger.setLevel(logging.INFO)
+    file_logger.propagate = False
+    if not file_logger.handlers:
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        file_logger.addHandler(handler)
+    return file_logger
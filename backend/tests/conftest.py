@@ -1,5 +1,9 @@
+import re
 import sys
 import types
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Sequence
 
 import pytest
 
@@ -73,6 +77,7 @@ except ModuleNotFoundError:  # pragma: no cover
     sys.modules["sqlalchemy.exc"] = exc_module
 
 from backend.app import create_app
+from backend.models import Class, RosterStudent, StudentResponse, Topic, User, db
 
 
 @pytest.fixture
@@ -122,6 +127,92 @@ def student2_id(app):
     return app.config["USER_REPOSITORY"].get_by_email("student2@test.com").id
 
 
+@dataclass
+class Section:
+    id: int
+    instructor_id: int
+    student_ids: List[int] = field(default_factory=list)
+
+
+@pytest.fixture
+def make_section(app):
+    """
+    Factory for a class in the real database: ``make_section(n_students)``
+    creates an instructor (unless ``instructor_id`` is given), the class and
+    ``n_students`` students rostered in it, committed. Emails are
+    ``prof@<name>.test`` and ``s<n>@<name>.test``, with ``name`` slugged.
+    ``topics`` are created when missing. Reports read the database, so the
+    fake ``REPORT_SERVICE`` is removed.
+    """
+
+    app.config.pop("REPORT_SERVICE", None)
+
+    def make(
+        n_students: int = 0,
+        *,
+        name: str = "Section 101",
+        instructor_id: Optional[int] = None,
+        topics: Sequence[str] = (),
+    ) -> Section:
+        domain = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") + ".test"
+        with app.app_context():
+            if instructor_id is None:
+                instructor = User(email=f"prof@{domain}", name="Prof", role="instructor")
+                db.session.add(instructor)
+                db.session.flush()
+                instructor_id = instructor.id
+            for topic_id in topics:
+                if db.session.get(Topic, topic_id) is None:
+                    db.session.add(
+                        Topic(id=topic_id, name=topic_id.title(), is_visible=True, order_index=1)
+                    )
+            section = Class(class_name=name, instructor_id=instructor_id)
+            db.session.add(section)
+            db.session.flush()
+            student_ids = []
+            for n in range(n_students):
+                student = User(email=f"s{n}@{domain}", name=f"Student {n}", role="student")
+                db.session.add(student)
+                db.session.add(
+                    RosterStudent(
+                        email=student.email, first_name="S", last_name=str(n), class_id=section.id
+                    )
+                )
+                db.session.flush()
+                student_ids.append(student.id)
+            db.session.commit()
+            return Section(section.id, instructor_id, student_ids)
+
+    return make
+
+
+@pytest.fixture
+def add_response():
+    """
+    ``add_response(user_id=..., **overrides)`` adds one ``StudentResponse``
+    to the session (uncommitted; call inside an app context). Defaults: a
+    correct ``strings``/``StringIndexing`` answer taking 10 seconds, now;
+    ``is_correct`` follows ``status`` unless given.
+    """
+
+    def add(**overrides) -> StudentResponse:
+        status = overrides.get("status", "correct")
+        values = {
+            "topic": "strings",
+            "subtopic_type": "StringIndexing",
+            "status": status,
+            "is_correct": status == "correct",
+            "time_spent": 10,
+            "attempted_at": datetime.utcnow(),
+            **overrides,
+        }
+        response = StudentResponse(**values)
+        db.session.add(response)
+        return response
+
+    return add
+
+
 def _install_fake_auth_service(app):
     """Install a fake auth service to decouple auth tests from the database backend."""
 
@@ -230,7 +321,15 @@ def _install_fake_report_service(app):
                 "performance_over_time": [],
             }
 
-        def get_topic_report(self, topic_id: str):
+        def get_student_reports(self, student_ids=None, class_id=None):
+            ids = student_ids if student_ids is not None else [self.s1_id, self.s2_id]
+            reports = [self.get_student_report(student_id) for student_id in ids]
+            return {
+                "reports": [report for report in reports if report],
+                "not_found": [sid for sid, report in zip(ids, reports) if not report],
+            }
+
+        def get_topic_report(self, topic_id: str, class_id=None):
             if topic_id != self.topic_id:
                 return None
             return {
@@ -248,11 +347,13 @@ def _install_fake_report_service(app):
                 "most_missed_questions": [],
             }
 
-        def get_class_overview(self):
+        def get_class_overview(self, class_id=None):
             return {
                 "total_students": 2,
                 "active_students_last_week": 2,
                 "total_questions_answered": 5,
+                "answered_questions": 5,
+                "correct_answers": 4,
                 "class_avg_accuracy": 80.0,
                 "topics_overview": [
                     {
@@ -263,6 +364,8 @@ def _install_fake_report_service(app):
                         "completion_rate": 0,
                         "avg_accuracy": 80.0,
                         "avg_time_per_question": 12.5,
+                        "answered": 5,
+                        "correct": 4,
                     }
                 ],
                 "rostered_students": [
@@ -282,7 +385,9 @@ def _install_fake_report_service(app):
                 "recent_activity": [],
             }
 
-        def get_question_analytics(self, topic_id: str, subtopic_type=None):
+        def get_question_analytics(
+            self, topic_id: str, subtopic_type=None, class_id=None, **page_options
+        ):
             if topic_id != self.topic_id:
                 return {"topic": topic_id, "analytics": []}
             return {
@@ -334,7 +439,7 @@ def _install_fake_progress_service(app):
         def get_topic_progress(self, user_id: int, topic_id: str):
             return self.records.get((user_id, topic_id))
 
-        def update_or_create_progress(self, user_id: int, topic_id: str, data):
+        def update_or_create_progress(self, user_id: int, topic_id: str, data, class_id=None):
             key = (user_id, topic_id)
             if key in self.records:
                 record = self.records[key]
@@ -353,7 +458,9 @@ def _install_fake_progress_service(app):
                 created = True
             return record, created
 
-        def increment_questions_answered(self, user_id: int, topic_id: str, timestamp=None):
+        def increment_questions_answered(
+            self, user_id: int, topic_id: str, timestamp=None, class_id=None
+        ):
             key = (user_id, topic_id)
             if key not in self.records:
                 self.records[key] = FakeProgress(user_id, topic_id, 0, 0, 0)
@@ -405,6 +512,9 @@ def _install_fake_response_service(app):
             "is_correct",
             "status",
         }
+        VALID_STATUSES = {"correct", "incorrect", "skipped"}
+        DEFAULT_PAGE_SIZE = 100
+        MAX_PAGE_SIZE = 500
 
         def __init__(self, s1_id: int):
             self.s1_id = s1_id
@@ -437,6 +547,12 @@ def _install_fake_response_service(app):
         def get_student_responses_for_topic(self, user_id: int, topic_id: str):
             return [r for r in self.responses.get(user_id, []) if r.topic == topic_id]
 
+        def get_student_responses_page(self, user_id: int, *, limit=100, topic_id=None, **_filters):
+            rows = [
+                r for r in self.responses.get(user_id, []) if topic_id is None or r.topic == topic_id
+            ]
+            return {"responses": [r.to_dict() for r in rows[:limit]], "next_cursor": None}
+
         @classmethod
         def validate_payload(cls, data):
             missing = cls.REQUIRED_FIELDS.difference(data.keys() if data else [])
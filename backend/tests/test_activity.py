@@ -0,0 +1,115 @@
+from datetime import datetime
+
+import pytest
+
+from backend.models import ActivityBucket, StudentResponse, db
+from backend.repositories import activity_repository
+from backend.services.report_service import ReportService
+
+
+@pytest.fixture
+def seeded(app, make_section, add_response):
+    """Two rostered students answering on three days across a month boundary."""
+
+    section = make_section(2, name="Activity 101")
+    ids = section.student_ids
+    answers = [
+        (ids[0], datetime(2025, 1, 30, 9), "correct", 10),
+        (ids[0], datetime(2025, 1, 30, 15), "incorrect", 30),
+        (ids[1], datetime(2025, 1, 31, 10), "skipped", 5),
+        (ids[1], datetime(2025, 2, 3, 11), "correct", 20),
+    ]
+    with app.app_context():
+        for user_id, attempted_at, status, time_spent in answers:
+            add_response(
+                user_id=user_id,
+                class_id=section.id,
+                status=status,
+                time_spent=time_spent,
+                attempted_at=attempted_at,
+            )
+        db.session.commit()
+        activity_repository.rebuild(hourly=True)
+    return ids, section.id
+
+
+def test_rebuild_matches_online_buckets(app, seeded):
+    ids, section_id = seeded
+    with app.app_context():
+        rebuilt = sorted(
+            (b.user_id, b.granularity, b.bucket_start, b.responses, b.correct, b.time_spent_total)
+            for b in db.session.execute(db.select(ActivityBucket)).scalars()
+        )
+        db.session.execute(ActivityBucket.__table__.delete())
+        for response in db.session.execute(db.select(StudentResponse)).scalars():
+            activity_repository.record(
+                user_id=response.user_id,
+                class_id=response.class_id,
+                attempted_at=response.attempted_at,
+                is_correct=response.is_correct,
+                status=response.status,
+                time_spent=response.time_spent,
+                hourly=True,
+            )
+        db.session.commit()
+        online = sorted(
+            (b.user_id, b.granularity, b.bucket_start, b.responses, b.correct, b.time_spent_total)
+            for b in db.session.execute(db.select(ActivityBucket)).scalars()
+        )
+
+    assert online == rebuilt
+    assert (ids[0], "day", datetime(2025, 1, 30), 2, 1, 40) in rebuilt
+    assert sum(1 for row in rebuilt if row[1] == "hour") == 4
+
+
+def test_activity_series_merges_days_into_weeks_and_months(app, seeded):
+    ids, section_id = seeded
+    client = app.test_client()
+
+    weeks = client.get(f"/api/reports/activity?class_id={section_id}&granularity=week").get_json()
+    summary = [(w["bucket_start"], w["questions_answered"], w["active_students"]) for w in weeks["series"]]
+    assert summary == [
+        ("2025-01-27", 3, 2),
+        ("2025-02-03", 1, 1),
+    ]
+
+    months = client.get(
+        f"/api/reports/activity?student_id={ids[0]}&granularity=month"
+        "&start=2025-01-01&end=2025-01-31"
+    ).get_json()["series"]
+    assert months == [
+        {
+            "bucket_start": "2025-01-01",
+            "questions_answered": 2,
+            "correct": 1,
+            "skipped": 0,
+            "accuracy": 50.0,
+            "avg_time": 20.0,
+            "active_students": 1,
+        }
+    ]
+
+
+def test_activity_series_validates_granularity(app, seeded):
+    client = app.test_client()
+
+    assert client.get("/api/reports/activity?granularity=year").status_code == 400
+    assert client.get("/api/reports/activity?granularity=hour").status_code == 400
+
+    app.config["ACTIVITY_HOURLY_BUCKETS"] = True
+    hours = client.get("/api/reports/activity?granularity=hour&start=2025-01-30&end=2025-01-30")
+    assert [h["bucket_start"] for h in hours.get_json()["series"]] == [
+        "2025-01-30T09:00:00",
+        "2025-01-30T15:00:00",
+    ]
+
+
+def test_student_report_reads_performance_from_buckets(app, seeded):
+    ids, _ = seeded
+    with app.app_context():
+        report = ReportService.get_student_report(ids[1])
+
+    assert report["performance_over_time"] == [
+        {"date": "2025-01-31", "questions_answered": 1, "accuracy": 0.0},
+        {"date": "2025-02-03", "questions_answered": 1, "accuracy": 100.0},
+    ]
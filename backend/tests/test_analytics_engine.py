@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend import analytics_engine  # noqa: E402
+from backend.analytics_engine import AnalyticsEngine  # noqa: E402
+from backend.models import RosterStudent, StudentProgress, User, db  # noqa: E402
+from backend.services.report_service import ReportService  # noqa: E402
+
+SUBTOPICS = ("StringIndexing", "StringSlicing", "StringMethods")
+
+
+@pytest.fixture
+def answer(add_response):
+    def answer(user_id, class_id, index, *, attempted_at, topic="strings"):
+        # Student-dependent accuracy and subtopic-dependent difficulty keep the
+        # rankings free of ties, so SQL and NumPy orderings are comparable.
+        subtopic = SUBTOPICS[index % len(SUBTOPICS)]
+        score = (index * (user_id + 2) + SUBTOPICS.index(subtopic)) % 5
+        status = "skipped" if index % 7 == 6 else ("correct" if score < 3 else "incorrect")
+        add_response(
+            user_id=user_id,
+            class_id=class_id,
+            topic=topic,
+            subtopic_type=subtopic,
+            status=status,
+            time_spent=None if index % 4 == 3 else 5 + index,
+            attempted_at=attempted_at,
+        )
+
+    return answer
+
+
+@pytest.fixture
+def seeded(app, make_section, answer):
+    """Six students alternating between two sections, each answering more than the last."""
+
+    sections = [make_section(3, name=f"Engine {n}", topics=("strings",)) for n in (1, 2)]
+    students = [
+        (user_id, section.id)
+        for pair in zip(*(section.student_ids for section in sections))
+        for user_id, section in zip(pair, sections)
+    ]
+    now = datetime.utcnow()
+    with app.app_context():
+        for n, (user_id, class_id) in enumerate(students):
+            db.session.add(
+                StudentProgress(
+                    user_id=user_id,
+                    class_id=class_id,
+                    topic="strings",
+                    subtopics_completed=n % 4,
+                    total_subtopics=3,
+                )
+            )
+            for index in range(6 + n * 3):
+                answer(user_id, class_id, index, attempted_at=now - timedelta(days=index))
+        db.session.commit()
+    return students, [section.id for section in sections]
+
+
+def _reports(class_ids):
+    return (
+        [ReportService.get_class_overview(class_id=class_id) for class_id in [None, *class_ids]],
+        ReportService.get_topic_report("strings"),
+        ReportService.get_topic_report("strings", class_id=class_ids[0]),
+    )
+
+
+def test_engine_matches_sql_reports(app, seeded):
+    _, class_ids = seeded
+    with app.app_context():
+        expected = _reports(class_ids)
+        app.extensions[analytics_engine.EXTENSION_KEY] = AnalyticsEngine()
+        assert _reports(class_ids) == expected
+    assert expected[0][0]["topics_overview"][0]["avg_time_per_question"]
+    assert expected[1]["subtopic_difficulty"][0]["unique_students"] == 6
+
+
+def test_engine_appends_new_responses_and_reloads_on_roster_change(app, seeded, answer):
+    students, class_ids = seeded
+    engine = AnalyticsEngine()
+    with app.app_context():
+        app.extensions[analytics_engine.EXTENSION_KEY] = engine
+        first = engine.frame(class_ids[0])
+        loaded = len(first)
+
+        user_id, class_id = students[0]
+        answer(user_id, class_id, 1, attempted_at=datetime.utcnow())
+        db.session.commit()
+        appended = engine.frame(class_ids[0])
+        # Copy-on-write: a report still reading the old frame keeps its columns
+        assert appended is not first and len(appended) == loaded + 1
+        assert len(first) == len(first.status) == len(first.topic) == loaded
+        assert engine.frame(class_ids[0]) is appended
+
+        db.session.add(
+            RosterStudent(email="late@engine.test", first_name="L", last_name="S", class_id=class_id)
+        )
+        db.session.add(User(email="late@engine.test", name="Late", role="student"))
+        db.session.commit()
+        reloaded = engine.frame(class_ids[0])
+        assert reloaded is not appended and len(reloaded) == loaded + 1
+
+        app.extensions.pop(analytics_engine.EXTENSION_KEY)
+        expected = ReportService.get_class_overview(class_id=class_ids[0])
+        app.extensions[analytics_engine.EXTENSION_KEY] = engine
+        assert ReportService.get_class_overview(class_id=class_ids[0]) == expected
+
+
+def test_engine_requires_opt_in():
+    from backend.app import create_app
+
+    assert analytics_engine.EXTENSION_KEY not in create_app("testing").extensions
+    app = create_app("testing", overrides={"ANALYTICS_ENGINE": "numpy"})
+    assert isinstance(app.extensions[analytics_engine.EXTENSION_KEY], AnalyticsEngine)
@@ -0,0 +1,31 @@
+from backend.benchmarks import run
+
+
+def test_benchmark_suite_runs_at_smoke_scale(tmp_path):
+    results = run.run_suite("smoke", repeat=1, warmup=0, data_dir=tmp_path)
+
+    assert results["scale"]["name"] == "smoke"
+    assert results["scale"]["responses"] == 400
+    for name in (
+        "reports.class_overview",
+        "reports.topic_report",
+        "reports.student_report",
+        "reports.question_analytics",
+        "ingest.post_response",
+        "roster.csv_add_drop",
+    ):
+        assert results["results"][name]["iterations"] == 1
+        assert results["results"][name]["median_ms"] > 0
+
+    # Pristine dataset is cached for the next run; the scratch copy is removed.
+    assert [p.name for p in tmp_path.iterdir()] == ["bench-smoke-seed42.db"]
+
+
+def test_compare_flags_regressions_over_threshold():
+    baseline = {"results": {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}}}
+    current = {"results": {"a": {"median_ms": 13.0}, "b": {"median_ms": 11.0}, "c": {"median_ms": 1.0}}}
+
+    regressions = run.compare(current, baseline, threshold=0.2)
+
+    assert [r["case"] for r in regressions] == ["a"]
+    assert regressions[0]["ratio"] == 1.3
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+import pytest
+
+from backend.models import RosterStudent, StudentProgress, StudentResponse, User, db
+from backend.repositories import progress_repository, response_repository
+from backend.services.report_service import ReportService
+
+
+@pytest.fixture
+def sections(app, make_section):
+    for key in ("AUTH_SERVICE", "RESPONSE_SERVICE", "PROGRESS_SERVICE", "TOPIC_REPOSITORY"):
+        app.config.pop(key)
+    first = make_section(name="Scope 101")
+    second = make_section(name="Scope 102", instructor_id=first.instructor_id)
+    with app.app_context():
+        moved = User(email="moved@scope.test", name="Moved", role="student")
+        stray = User(email="stray@scope.test", name="Stray", role="student")
+        db.session.add_all([moved, stray])
+        db.session.flush()
+        # Dropped from the first section, then enrolled in the second
+        db.session.add_all(
+            [
+                RosterStudent(
+                    email=moved.email,
+                    first_name="Mo",
+                    last_name="Ved",
+                    class_id=first.id,
+                    deleted_at=datetime.utcnow(),
+                ),
+                RosterStudent(
+                    email=moved.email, first_name="Mo", last_name="Ved", class_id=second.id
+                ),
+            ]
+        )
+        db.session.commit()
+        return {"moved": moved.id, "stray": stray.id, "first": first.id, "second": second.id}
+
+
+def _answer(client, user_id, **extra):
+    payload = {
+        "user_id": user_id,
+        "topic": "strings",
+        "subtopic_type": "StringIndexing",
+        "question_code": "s = 'abc'\ns[0]",
+        "student_answer": "a",
+        "correct_answer": "a",
+        "is_correct": True,
+        "status": "correct",
+        "time_spent": 5,
+        **extra,
+    }
+    response = client.post("/api/responses", json=payload)
+    assert response.status_code == 201
+    return response.get_json()["response"]
+
+
+def test_writes_are_stamped_with_the_roster_class(app, sections):
+    ids = sections
+    client = app.test_client()
+
+    # The roster wins over whatever class the client claims
+    assert _answer(client, ids["moved"], class_id=ids["first"])["class_id"] == ids["second"]
+    assert _answer(client, ids["stray"], class_id=ids["first"])["class_id"] == ids["first"]
+    assert _answer(client, ids["stray"], topic="lists")["class_id"] is None
+
+    put = client.put(
+        f"/api/progress/{ids['moved']}/loops",
+        json={"subtopics_completed": 1, "total_subtopics": 4},
+    )
+    assert put.status_code == 200
+
+    with app.app_context():
+        progress = dict(
+            db.session.execute(
+                db.select(StudentProgress.topic, StudentProgress.class_id).filter_by(
+                    user_id=ids["moved"]
+                )
+            ).all()
+        )
+    assert progress == {"strings": ids["second"], "loops": ids["second"]}
+
+
+def test_class_overview_counts_only_that_class(app, sections, add_response):
+    ids = sections
+    with app.app_context():
+        for class_id in (ids["first"], ids["second"], ids["second"]):
+            add_response(
+                user_id=ids["moved"],
+                class_id=class_id,
+                status="correct" if class_id == ids["second"] else "incorrect",
+                time_spent=5,
+            )
+        db.session.commit()
+
+        overview = ReportService.get_class_overview(class_id=ids["second"])
+    assert overview["total_questions_answered"] == 2
+    assert overview["class_avg_accuracy"] == 100
+
+
+def test_backfill_stamps_rows_written_without_a_class(app, sections, add_response):
+    ids = sections
+    with app.app_context():
+        for user_id in (ids["moved"], ids["stray"]):
+            add_response(user_id=user_id)
+            db.session.add(StudentProgress(user_id=user_id, topic="strings"))
+        db.session.commit()
+
+        assert response_repository.backfill_class_ids() == 1
+        assert progress_repository.backfill_class_ids() == 1
+        stamped = db.session.execute(
+            db.select(StudentResponse.user_id, StudentResponse.class_id)
+        ).all()
+    assert dict(stamped) == {ids["moved"]: ids["second"], ids["stray"]: None}
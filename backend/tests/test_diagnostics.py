@@ -0,0 +1,69 @@
+import json
+
+from backend import slow_queries
+from backend.models import Topic, db
+from backend.repositories import topic_repository
+
+
+def _install_probe(app):
+    @app.get("/_slow-probe")
+    def slow_probe():
+        db.session.add(Topic(id="probe-topic", name="Probe", is_visible=True, order_index=99))
+        db.session.flush()
+        topic_repository.get_visible()
+        db.session.rollback()
+        return "ok"
+
+
+def _record_everything(app):
+    recorder = app.extensions[slow_queries.EXTENSION_KEY]
+    recorder.threshold_ms = 0
+    recorder.explain_threshold_ms = 0
+    return recorder
+
+
+def test_slow_queries_capture_origin_redacted_params_and_plan(app):
+    _install_probe(app)
+    _record_everything(app)
+    client = app.test_client()
+
+    client.get("/_slow-probe")
+    client.post("/api/auth/login", json={"email": "instructor@test.com"})
+    response = client.get("/api/diagnostics/slow-queries")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["enabled"] is True
+
+    visible_query = next(
+        entry
+        for entry in data["queries"]
+        if entry["origin"] == "backend.repositories.topic_repository.get_visible"
+    )
+    assert visible_query["statement"].lstrip().upper().startswith("SELECT")
+    assert isinstance(visible_query["parameters"], list)
+    assert visible_query["query_plan"]
+
+    insert = next(e for e in data["queries"] if e["statement"].startswith("INSERT INTO topics"))
+    assert "Probe" not in json.dumps(insert["parameters"])
+    assert "<str:5>" in insert["parameters"]
+    assert insert["query_plan"] is None
+
+
+def test_slow_queries_require_instructor(client):
+    assert client.get("/api/diagnostics/slow-queries").status_code == 401
+
+    client.post("/api/auth/login", json={"email": "student1@test.com"})
+    assert client.get("/api/diagnostics/slow-queries").status_code == 403
+
+
+def test_slow_queries_written_to_jsonl(tmp_path):
+    recorder = slow_queries.SlowQueryRecorder(
+        threshold_ms=0, log_file=str(tmp_path / "slow.jsonl"), log_max_bytes=1024
+    )
+    recorder.record(
+        statement="SELECT 1", parameters=("secret",), duration_ms=12.5, origin=None, plan=None
+    )
+
+    lines = (tmp_path / "slow.jsonl").read_text().splitlines()
+    assert json.loads(lines[-1])["parameters"] == ["<str:6>"]
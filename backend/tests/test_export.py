@@ -0,0 +1,81 @@
+import csv
+import json
+from datetime import datetime
+from io import StringIO
+
+import pytest
+
+from backend.models import User, db
+from backend.services.export_service import ExportService
+
+
+@pytest.fixture
+def seeded(app, make_section, add_response):
+    """A rostered student answering twice and an unrostered one answering once."""
+
+    section = make_section(1, name="Export 101")
+    [rostered] = section.student_ids
+    with app.app_context():
+        stray = User(email="bob@export.test", name="Bob", role="student")
+        db.session.add(stray)
+        db.session.flush()
+        for day, user_id in [(1, rostered), (2, rostered), (3, stray.id)]:
+            add_response(
+                user_id=user_id,
+                class_id=section.id,
+                student_answer="a",
+                attempted_at=datetime(2025, 1, day, 12, 0),
+            )
+        db.session.commit()
+    return rostered, section.id
+
+
+def _login_instructor(client):
+    client.post("/api/auth/login", json={"email": "instructor@test.com"})
+
+
+def test_export_streams_ndjson_with_filters(app, seeded):
+    alice_id, _ = seeded
+    client = app.test_client()
+    _login_instructor(client)
+
+    response = client.get(f"/api/responses/export?student_id={alice_id}&end=2025-01-01")
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row["attempted_at"] for row in rows] == ["2025-01-01T12:00:00"]
+    assert rows[0]["user_id"] == alice_id
+
+
+def test_export_class_scope_as_csv(app, seeded):
+    alice_id, class_id = seeded
+    client = app.test_client()
+    _login_instructor(client)
+
+    response = client.get(f"/api/responses/export?class_id={class_id}&format=csv")
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(StringIO(response.get_data(as_text=True))))
+    assert {int(row["user_id"]) for row in rows} == {alice_id}
+    assert len(rows) == 2
+
+
+def test_export_rejects_bad_arguments_and_non_instructors(client):
+    assert client.get("/api/responses/export").status_code == 401
+
+    _login_instructor(client)
+    assert client.get("/api/responses/export?format=xml").status_code == 400
+    assert client.get("/api/responses/export?start=yesterday").status_code == 400
+    assert client.get("/api/responses/export?student_id=abc").status_code == 400
+    assert client.get("/api/responses/export?class_id=1.5").status_code == 400
+
+
+def test_csv_stream_emits_header_and_chunks():
+    rows = [{name: i for name in ExportService.FIELDNAMES} for i in range(5)]
+
+    chunks = list(ExportService.stream_csv(iter(rows), chunk_rows=2))
+
+    assert len(chunks) == 3
+    assert chunks[0].startswith("id,user_id,class_id,")
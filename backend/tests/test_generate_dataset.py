@@ -0,0 +1,49 @@
+from backend.app import create_app
+from backend.models import RosterStudent, StudentProgress, StudentResponse, User, db
+from backend.scripts.generate_dataset import generate_dataset
+
+
+def _generate(workers: int):
+    app = create_app("testing")
+    with app.app_context():
+        summary = generate_dataset(
+            students=12,
+            classes=3,
+            responses_per_student=5,
+            chunk_size=10,
+            workers=workers,
+        )
+        rows = db.session.execute(
+            db.select(
+                User.email,
+                StudentResponse.class_id,
+                StudentResponse.topic,
+                StudentResponse.subtopic_type,
+                StudentResponse.status,
+                StudentResponse.time_spent,
+            )
+            .join(User, User.id == StudentResponse.user_id)
+            .order_by(StudentResponse.id)
+        ).all()
+        roster = db.session.execute(db.select(db.func.count(RosterStudent.id))).scalar_one()
+        progress_total = db.session.execute(
+            db.select(db.func.sum(StudentProgress.questions_answered))
+        ).scalar_one()
+    return summary, rows, roster, progress_total
+
+
+def test_generator_bulk_inserts_expected_volume():
+    summary, rows, roster, progress_total = _generate(workers=1)
+
+    assert summary["responses"] == 60
+    assert len(rows) == 60
+    assert roster == 12
+    assert progress_total == 60
+    assert {class_id for _, class_id, *_ in rows} == {1, 2, 3}
+
+
+def test_generator_is_deterministic_across_worker_counts():
+    _, serial_rows, _, _ = _generate(workers=1)
+    _, parallel_rows, _, _ = _generate(workers=2)
+
+    assert serial_rows == parallel_rows
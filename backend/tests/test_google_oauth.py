@@ -0,0 +1,181 @@
+import datetime as dt
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+CLIENT_ID = "bytepath-test.apps.googleusercontent.com"
+
+
+def _signing_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "stand-in")])
+    now = dt.datetime.now(dt.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(1)
+        .not_valid_before(now - dt.timedelta(days=1))
+        .not_valid_after(now + dt.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+PRIVATE_PEM, CERT_PEM = _signing_key()
+
+
+class StandInGoogle:
+    """Local token/certs/userinfo endpoints that count their calls."""
+
+    def __init__(self):
+        self.calls = {"/token": 0, "/certs": 0, "/userinfo": 0}
+        self.connections = set()
+        self.include_id_token = True
+        self.audience = CLIENT_ID
+        self.delay = 0.0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self._handle()
+
+            def do_POST(self):
+                self._handle()
+
+            def _handle(self):
+                stand_in.calls[self.path] += 1
+                stand_in.connections.add(self.client_address)
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                time.sleep(stand_in.delay)
+                payload = stand_in.respond(self.path, body)
+                data = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", "public, max-age=600")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def respond(self, path, body):
+        if path == "/certs":
+            return {"stand-in-key": CERT_PEM}
+        if path == "/userinfo":
+            return {"email": "ada@gmail.test", "name": "Ada From Userinfo"}
+        code = parse_qs(body.decode())["code"][0]
+        token = {
+            "access_token": f"access-{code}",
+            "refresh_token": "refresh",
+            "expires_in": 3599,
+            "scope": "openid https://www.googleapis.com/auth/userinfo.email",
+        }
+        if self.include_id_token:
+            signer = crypt.RSASigner.from_string(PRIVATE_PEM, key_id="stand-in-key")
+            now = int(time.time())
+            claims = {
+                "iss": "https://accounts.google.com",
+                "aud": self.audience,
+                "sub": "1234",
+                "email": f"{code}@gmail.test",
+                "email_verified": True,
+                "name": f"Student {code}",
+                "iat": now,
+                "exp": now + 3600,
+            }
+            token["id_token"] = jwt.encode(signer, claims).decode()
+        return token
+
+
+@pytest.fixture
+def google(app, tmp_path):
+    app.config.pop("AUTH_SERVICE")
+    stand_in = StandInGoogle()
+    secrets_file = tmp_path / "client_secret.json"
+    secrets_file.write_text(
+        json.dumps(
+            {
+                "web": {
+                    "client_id": CLIENT_ID,
+                    "client_secret": "shh",
+                    "token_uri": f"{stand_in.url}/token",
+                }
+            }
+        )
+    )
+    app.config.update(
+        GOOGLE_CLIENT_SECRETS_FILE=str(secrets_file),
+        GOOGLE_CERTS_URI=f"{stand_in.url}/certs",
+        GOOGLE_USERINFO_URI=f"{stand_in.url}/userinfo",
+    )
+    yield stand_in
+    stand_in.server.shutdown()
+    stand_in.server.server_close()
+
+
+def _callback(client, code):
+    with client.session_transaction() as sess:
+        sess["google_oauth_state"] = "state-1"
+    return client.get(f"/api/auth/google/callback?state=state-1&code={code}")
+
+
+def test_login_verifies_id_token_locally_over_one_pooled_connection(client, google):
+    for code in ("ada", "grace"):
+        response = _callback(client, code)
+        assert response.status_code == 302
+        profile = client.get("/api/auth/profile").get_json()
+        assert (profile["email"], profile["name"]) == (f"{code}@gmail.test", f"Student {code}")
+
+    assert google.calls == {"/token": 2, "/certs": 1, "/userinfo": 0}
+    assert len(google.connections) == 1
+    stored = client.get("/api/auth/google/complete").get_json()
+    assert stored["scope_status"]["openid"] is True
+
+
+def test_falls_back_to_userinfo_without_id_token(client, google):
+    google.include_id_token = False
+    assert _callback(client, "ada").status_code == 302
+    assert client.get("/api/auth/profile").get_json()["name"] == "Ada From Userinfo"
+    assert google.calls == {"/token": 1, "/certs": 0, "/userinfo": 1}
+
+
+def test_rejects_id_token_for_another_client(client, google):
+    google.audience = "someone-else.apps.googleusercontent.com"
+    response = _callback(client, "ada")
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid ID token"
+    assert client.get("/api/auth/profile").status_code == 401
+
+
+def test_slow_google_is_cut_off_at_the_deadline(app, client, google):
+    app.config.update(GOOGLE_HTTP_TIMEOUT_SECONDS=0.2, GOOGLE_LOGIN_DEADLINE_SECONDS=0.3)
+    google.delay = 1.0
+
+    started = time.monotonic()
+    response = _callback(client, "ada")
+    assert response.status_code == 504
+    assert time.monotonic() - started < 0.9
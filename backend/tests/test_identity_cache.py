@@ -0,0 +1,117 @@
+import pytest
+from sqlalchemy import event, update
+
+from backend import identity_cache
+from backend.identity_cache import Identity, IdentityCache
+from backend.models import RosterStudent, User, db
+from backend.services import student_service
+from backend.services.auth_service import AuthService
+from backend.services.student_service import RosterStudentRow
+
+
+@pytest.fixture
+def real_auth(app, make_section):
+    """The real auth service, with Ada rostered but not yet signed in."""
+
+    app.config.pop("AUTH_SERVICE")
+    section = make_section(name="Cache 101")
+    with app.app_context():
+        db.session.add(
+            RosterStudent(
+                email="ada@cache.test", first_name="Ada", last_name="Lovelace", class_id=section.id
+            )
+        )
+        db.session.commit()
+    return section.id
+
+
+def _count_statements(app, action):
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            result = action()
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+    return result, len(statements)
+
+
+def test_lru_evicts_and_expires_entries():
+    now = [0.0]
+    cache = IdentityCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    for user_id in (1, 2, 3):
+        cache.put(Identity(user_id, f"U{user_id}@Test.com", f"User {user_id}", "student"))
+
+    assert cache.get(1) is None
+    assert cache.get_by_email("u3@test.com").id == 3
+    now[0] = 11
+    assert cache.get(2) is None
+    assert cache.stats() == {
+        "size": 1,
+        "max_entries": 2,
+        "ttl_seconds": 10,
+        "hits": 1,
+        "misses": 2,
+        "hit_ratio": 0.3333,
+        "evictions": 1,
+        "invalidations": 0,
+    }
+
+
+def test_repeat_login_and_session_checks_skip_the_database(app, client, real_auth):
+    first = client.post("/api/auth/login", json={"email": "Ada@cache.test"}).get_json()["user"]
+    assert first["name"] == "Ada Lovelace"
+
+    user, statements = _count_statements(
+        app, lambda: AuthService.login_or_create_user("ada@cache.test")
+    )
+    assert (user.id, statements) == (first["id"], 0)
+    _, statements = _count_statements(app, lambda: AuthService.get_user_by_id(first["id"]))
+    assert statements == 0
+
+    assert client.get("/api/auth/profile").get_json()["name"] == "Ada Lovelace"
+    body = client.get("/metrics").get_data(as_text=True)
+    assert "bytepath_identity_cache_entries 1" in body
+    assert "bytepath_identity_cache_hits_total 2" in body
+
+
+def test_roster_changes_invalidate_cached_identities(app, real_auth):
+    class_id = real_auth
+    with app.app_context():
+        cache = identity_cache.get_cache()
+        ada = AuthService.login_or_create_user("ada@cache.test")
+        grace = AuthService.login_or_create_user("grace@cache.test")
+        assert (ada.name, grace.name) == ("Ada Lovelace", "Grace")
+
+        student_service.drop_students_from_csv(
+            [(1, RosterStudentRow("Ada", "Lovelace", "ada@cache.test"))], "drop.csv"
+        )
+        assert cache.get(ada.id) is None
+        assert cache.get(grace.id) is not None
+
+        db.session.add(
+            RosterStudent(
+                email="grace@cache.test", first_name="Grace", last_name="Hopper", class_id=class_id
+            )
+        )
+        db.session.commit()
+        assert cache.get_by_email("grace@cache.test") is None
+        assert AuthService.login_or_create_user("grace@cache.test").name == "Grace Hopper"
+
+        db.session.execute(update(User).values(role="instructor"))
+        db.session.commit()
+        assert cache.stats()["size"] == 0
+        assert AuthService.get_user_by_id(grace.id).role == "instructor"
+
+
+def test_cache_can_be_disabled(app):
+    app.config["IDENTITY_CACHE_SIZE"] = 0
+    app.extensions.pop(identity_cache.EXTENSION_KEY)
+    assert identity_cache.init_app(app) is None
+    with app.app_context():
+        assert identity_cache.get_cache() is None
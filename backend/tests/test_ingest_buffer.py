@@ -0,0 +1,245 @@
+import json
+from datetime import datetime
+
+from backend import ingest_buffer
+from backend.app import create_app
+from backend.models import (
+    ActivityBucket,
+    IngestBatch,
+    QuestionStats,
+    StudentProgress,
+    StudentResponse,
+    User,
+    db,
+)
+from backend.services.response_service import ResponseService
+
+
+def _buffered_app(tmp_path, **overrides):
+    return create_app(
+        "testing",
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'ingest.db'}",
+            "INGEST_MODE": "buffered",
+            "INGEST_JOURNAL_DIR": str(tmp_path / "journal"),
+            # No flusher thread: the tests flush explicitly
+            "INGEST_FLUSH_INTERVAL_MS": 0,
+            **overrides,
+        },
+    )
+
+
+def _student(app, email="kid@ingest.test"):
+    with app.app_context():
+        student = User(email=email, name="Kid", role="student")
+        db.session.add(student)
+        db.session.commit()
+        return student.id
+
+
+def _payload(user_id, status="correct", code="s[0]"):
+    return {
+        "user_id": user_id,
+        "topic": "strings",
+        "subtopic_type": "StringIndexing",
+        "question_code": code,
+        "student_answer": "a",
+        "correct_answer": "a",
+        "is_correct": status == "correct",
+        "status": status,
+        "time_spent": 4,
+    }
+
+
+def _counts(app):
+    with app.app_context():
+        responses = db.session.execute(db.select(db.func.count(StudentResponse.id))).scalar()
+        answered = db.session.execute(db.select(StudentProgress.questions_answered)).scalars().all()
+        return responses, answered
+
+
+def test_accepted_responses_are_written_in_one_batch(tmp_path):
+    app = _buffered_app(tmp_path)
+    user_id = _student(app)
+    client = app.test_client()
+
+    for status in ("correct", "incorrect", "correct"):
+        posted = client.post("/api/responses", json=_payload(user_id, status))
+        assert posted.status_code == 202
+        assert posted.get_json()["response"]["status"] == status
+    journal = list((tmp_path / "journal").iterdir())
+    assert len(journal) == 1
+    assert _counts(app) == (0, [])
+
+    buffer = app.extensions[ingest_buffer.EXTENSION_KEY]
+    assert buffer.flush() == 3
+    assert _counts(app) == (3, [3])
+    assert list((tmp_path / "journal").iterdir()) == []
+    with app.app_context():
+        stats = db.session.get(QuestionStats, (1, "strings", 0, False))
+        assert (stats.times_shown, stats.correct_count, stats.students_who_saw) == (3, 2, 1)
+        assert db.session.execute(db.select(IngestBatch.segment)).scalars().all() == [
+            journal[0].name
+        ]
+
+    # The next batch drops the marker of the segment already deleted
+    client.post("/api/responses", json=_payload(user_id, code="s[1]"))
+    buffer.flush()
+    with app.app_context():
+        assert db.session.execute(db.select(db.func.count()).select_from(IngestBatch)).scalar() == 1
+    assert buffer.stats()["batches"] == 2
+
+
+def test_full_buffer_falls_back_to_a_synchronous_write(tmp_path):
+    app = _buffered_app(tmp_path, INGEST_MAX_PENDING=1)
+    user_id = _student(app)
+    client = app.test_client()
+
+    assert client.post("/api/responses", json=_payload(user_id)).status_code == 202
+    written = client.post("/api/responses", json=_payload(user_id))
+    assert written.status_code == 201
+    assert written.get_json()["response"]["id"] is not None
+    assert _counts(app) == (1, [1])
+
+
+def test_recovery_replays_unwritten_segments_once(tmp_path):
+    app = _buffered_app(tmp_path)
+    user_id = _student(app)
+    journal = tmp_path / "journal"
+    with app.test_request_context():
+        rows = [ResponseService.buffered_row(_payload(user_id)) for _ in range(2)]
+        db.session.add(IngestBatch(segment="0000000000001-1-written.jsonl", rows=1))
+        db.session.commit()
+
+    # A worker died with two accepted rows and one half-written line
+    lines = [json.dumps(row) + "\n" for row in rows]
+    (journal / "0000000000002-2-crashed.jsonl").write_text("".join(lines) + '{"user_id": 1')
+    # ...and another had written its batch but not yet deleted the segment
+    (journal / "0000000000001-1-written.jsonl").write_text(lines[0])
+
+    restarted = _buffered_app(tmp_path)
+    assert list(journal.iterdir()) == []
+    assert _counts(restarted) == (2, [2])
+    with restarted.app_context():
+        markers = db.session.execute(db.select(IngestBatch.segment)).scalars().all()
+    assert "0000000000002-2-crashed.jsonl" in markers
+
+
+def test_wrongly_typed_fields_are_refused_before_buffering(tmp_path):
+    app = _buffered_app(tmp_path)
+    user_id = _student(app)
+
+    posted = app.test_client().post(
+        "/api/responses", json={**_payload(user_id), "question_code": ["s", "[0]"]}
+    )
+    assert posted.status_code == 400
+    assert posted.get_json()["error"] == "Invalid field types: question_code"
+    assert app.extensions[ingest_buffer.EXTENSION_KEY].stats()["accepted"] == 0
+
+
+def test_rows_failing_in_a_batch_are_dead_lettered(tmp_path):
+    app = _buffered_app(tmp_path)
+    user_id = _student(app)
+    buffer = app.extensions[ingest_buffer.EXTENSION_KEY]
+    with app.test_request_context():
+        bad = ResponseService.buffered_row({**_payload(user_id), "question_code": ["s"]})
+        good = ResponseService.buffered_row(_payload(user_id))
+    buffer.submit(bad)
+    buffer.submit(good)
+
+    # The batch fails on the bad row; the good one behind it is still written
+    assert buffer.flush() == 2
+    assert _counts(app) == (1, [1])
+    journal = tmp_path / "journal"
+    assert [path.name for path in journal.iterdir()] == ["rejected"]
+    (rejected,) = (journal / "rejected").iterdir()
+    assert [json.loads(line) for line in rejected.read_text().splitlines()] == [bad]
+    stats = buffer.stats()
+    assert (stats["pending"], stats["dead_lettered"], stats["failures"]) == (0, 1, 0)
+
+    # Row markers are dropped like segment markers once the file is gone
+    buffer.submit(good)
+    buffer.flush()
+    assert _counts(app) == (2, [2])
+    with app.app_context():
+        markers = db.session.execute(db.select(IngestBatch.segment)).scalars().all()
+    assert len(markers) == 1 and "#" not in markers[0]
+
+
+def test_recovery_survives_a_segment_it_cannot_write(tmp_path):
+    app = _buffered_app(tmp_path)
+    user_id = _student(app)
+    journal = tmp_path / "journal"
+    with app.test_request_context():
+        row = ResponseService.buffered_row(_payload(user_id))
+    (journal / "0000000000001-1-garbled.jsonl").write_text("not json\n")
+    (journal / "0000000000002-2-crashed.jsonl").write_text(json.dumps(row) + "\n")
+
+    restarted = _buffered_app(tmp_path)
+    # The unreadable segment is kept for inspection; the next one still replays
+    assert [path.name for path in journal.iterdir()] == ["0000000000001-1-garbled.jsonl"]
+    assert _counts(restarted) == (1, [1])
+    assert restarted.extensions[ingest_buffer.EXTENSION_KEY].stats()["failures"] == 1
+
+
+def test_batched_stats_match_one_at_a_time(app):
+    from backend.repositories import activity_repository, question_stats_repository
+
+    answers = [
+        ("correct", 4),
+        ("incorrect", 9),
+        ("skipped", None),
+        ("correct", None),
+        ("correct", 2),
+    ]
+    with app.app_context():
+        for status, seconds in answers:
+            question_stats_repository.record(
+                question_id=1,
+                topic="strings",
+                user_id=7,
+                class_id=None,
+                status=status,
+                time_spent=seconds,
+            )
+        question_stats_repository.record_many(
+            [
+                {
+                    "question_id": 2,
+                    "topic": "strings",
+                    "user_id": 7,
+                    "class_id": None,
+                    "status": status,
+                    "time_spent": seconds,
+                }
+                for status, seconds in answers
+            ]
+        )
+        one = db.session.get(QuestionStats, (1, "strings", 0, False))
+        many = db.session.get(QuestionStats, (2, "strings", 0, False))
+        columns = ("times_shown", "correct_count", "skipped_count", "time_samples")
+        counts = [getattr(one, column) for column in columns]
+        assert [getattr(many, column) for column in columns] == counts == [5, 3, 1, 3]
+        assert many.time_mean == one.time_mean == 5.0
+        assert round(many.time_m2, 9) == round(one.time_m2, 9) == 26.0
+        # A student is counted once, however many times they answer, batched or not
+        assert (one.students_who_saw, many.students_who_saw) == (1, 1)
+
+        activity_repository.record_many(
+            [
+                {
+                    "user_id": 7,
+                    "class_id": None,
+                    "attempted_at": datetime(2026, 1, 5, 10, 30),
+                    "is_correct": status == "correct",
+                    "status": status,
+                    "time_spent": seconds,
+                }
+                for status, seconds in answers
+            ],
+            hourly=True,
+        )
+        buckets = db.session.execute(
+            db.select(ActivityBucket.granularity, ActivityBucket.responses, ActivityBucket.correct)
+        ).all()
+    assert sorted(buckets) == [("day", 5, 3), ("hour", 5, 3)]
@@ -0,0 +1,136 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models import ClassInsight, db
+from backend.services import insight_service
+from backend.services.insight_service import InsightService
+from backend.services.report_service import ReportService
+
+
+@pytest.fixture
+def seeded(app, make_section, add_response):
+    """Six students with distinct accuracies; the last one never answers."""
+
+    section = make_section(6, name="Insights 101", topics=("strings",))
+    now = datetime.utcnow()
+    with app.app_context():
+        # Student n answers 6 questions, n of them wrong; student 4 was last seen 10 days ago
+        for n, user_id in enumerate(section.student_ids[:5]):
+            for index in range(6):
+                add_response(
+                    user_id=user_id,
+                    class_id=section.id,
+                    status="incorrect" if index < n else "correct",
+                    attempted_at=now - timedelta(days=10 if n == 4 else 1),
+                )
+        db.session.commit()
+    return section.student_ids, section.id
+
+
+def test_overview_serves_precomputed_rankings(app, seeded):
+    ids, section_id = seeded
+    with app.app_context():
+        live = ReportService.get_class_overview(class_id=section_id)
+        assert live["insights_computed_at"] is None
+
+        summary = InsightService.compute()
+        assert summary == {
+            "computed_at": summary["computed_at"],
+            "classes": 2,  # the section plus the all-students scope
+            "students": 6,
+            "at_risk": 2,
+        }
+        stored = ReportService.get_class_overview(class_id=section_id)
+
+    assert stored["top_performers"] == live["top_performers"]
+    assert stored["struggling_students"] == live["struggling_students"]
+    assert stored["insights_computed_at"] == summary["computed_at"]
+    assert [(s["student_id"], s["reasons"]) for s in stored["at_risk_students"]] == [
+        (ids[4], ["inactive", "low_accuracy"]),
+        (ids[5], ["not_started"]),
+    ]
+
+
+def test_class_leaderboard_counts_only_that_class(app, make_section, add_response):
+    section = make_section(2, name="Leader 101")
+    other = make_section(name="Leader 102", instructor_id=section.instructor_id)
+    first, second = section.student_ids
+    with app.app_context():
+        # In this class the first student trails; elsewhere they ace everything
+        for index in range(6):
+            status = "incorrect" if index else "correct"
+            add_response(user_id=first, class_id=section.id, status=status)
+            add_response(user_id=second, class_id=section.id)
+        for _ in range(20):
+            add_response(user_id=first, class_id=other.id)
+        db.session.commit()
+
+        live = ReportService.get_class_overview(class_id=section.id)
+        InsightService.compute()
+        stored = ReportService.get_class_overview(class_id=section.id)
+
+    assert [s["student_id"] for s in live["top_performers"]] == [second, first]
+    assert stored["top_performers"] == live["top_performers"]
+    assert stored["struggling_students"] == live["struggling_students"]
+
+
+def test_student_report_uses_stored_struggling_subtopics(app, seeded):
+    ids, _ = seeded
+    with app.app_context():
+        live = ReportService.get_student_report(ids[3])
+        InsightService.compute()
+        stored = ReportService.get_student_report(ids[3])
+
+    assert live["struggling_subtopics"] and live["risk_reasons"] is None
+    assert stored["struggling_subtopics"] == live["struggling_subtopics"]
+    assert stored["risk_reasons"] == []
+
+
+def test_student_without_responses_reports_not_started(app, seeded):
+    ids, _ = seeded
+    with app.app_context():
+        live = ReportService.get_student_report(ids[5])
+        InsightService.compute()
+        stored = ReportService.get_student_report(ids[5])
+        answered = ReportService.get_student_report(ids[0])
+
+    assert set(stored) == set(answered)
+    assert live["overall_stats"]["total_questions_answered"] == 0
+    assert (live["risk_reasons"], live["insights_computed_at"]) == (None, None)
+    assert stored["risk_reasons"] == ["not_started"]
+    assert stored["insights_computed_at"] is not None
+
+
+def test_refresh_endpoint_recomputes_one_class(app, client, seeded):
+    ids, section_id = seeded
+    client.post("/api/auth/login", json={"email": "student1@test.com"})
+    assert client.post("/api/reports/insights/refresh").status_code == 403
+
+    client.post("/api/auth/login", json={"email": "instructor@test.com"})
+    assert client.get(f"/api/reports/insights?class_id={section_id}").status_code == 404
+
+    response = client.post(f"/api/reports/insights/refresh?class_id={section_id}")
+    assert response.status_code == 200
+    assert response.get_json()["classes"] == 1
+
+    data = client.get(f"/api/reports/insights?class_id={section_id}").get_json()
+    assert [entry["student_id"] for entry in data["leaderboard"]] == ids[:5]
+    assert [entry["rank"] for entry in data["leaderboard"]] == [1, 2, 3, 4, 5]
+    with app.app_context():
+        assert InsightService.get_class_insight(None) is None
+
+
+def test_scheduler_refreshes_in_background(app, seeded):
+    app.config["INSIGHTS_REFRESH_MINUTES"] = 60
+    stop = insight_service.start_scheduler(app)
+    try:
+        deadline = time.monotonic() + 5
+        with app.app_context():
+            while db.session.get(ClassInsight, 0) is None and time.monotonic() < deadline:
+                db.session.rollback()
+                time.sleep(0.05)
+            assert db.session.get(ClassInsight, 0) is not None
+    finally:
+        stop.set()
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models import RosterStudent, StudentProgress, db
+from backend.repositories import question_repository, question_stats_repository
+from backend.services.report_service import ReportService
+
+OVERVIEW_FIELDS = (
+    "total_students",
+    "active_students_last_week",
+    "total_questions_answered",
+    "class_avg_accuracy",
+    "topics_overview",
+)
+
+
+@pytest.fixture
+def seeded(app, make_section, add_response):
+    """Three sections for one instructor, one for another; a dropped student."""
+
+    first = make_section(4, name="Rollup 1")
+    sections = [first] + [
+        make_section(4, name=f"Rollup {number}", instructor_id=first.instructor_id)
+        for number in (2, 3)
+    ]
+    sections.append(make_section(4, name="Elsewhere"))
+    now = datetime.utcnow()
+    with app.app_context():
+        question_id = question_repository.get_or_create_id("s[0]", "StringIndexing", "a")
+        for index, section in enumerate(sections):
+            for n, user_id in enumerate(section.student_ids):
+                for k in range(3 + n):
+                    add_response(
+                        user_id=user_id,
+                        class_id=section.id,
+                        topic=("strings", "lists")[k % 2],
+                        question_id=question_id,
+                        status=("correct", "incorrect", "skipped")[(k + index) % 3],
+                        time_spent=None if k == 1 else 5 + k + n,
+                        attempted_at=now - timedelta(days=2 * n + k),
+                    )
+                db.session.add(
+                    StudentProgress(
+                        user_id=user_id,
+                        class_id=section.id,
+                        topic="strings",
+                        subtopics_completed=n,
+                        total_subtopics=2,
+                    )
+                )
+        # The last student of section 1 has dropped out
+        dropped = db.session.execute(
+            db.select(RosterStudent).filter_by(class_id=first.id, email="s3@rollup-1.test")
+        ).scalar_one()
+        dropped.deleted_at = now
+        db.session.commit()
+        question_stats_repository.rebuild()
+    return first.instructor_id, [section.id for section in sections]
+
+
+def test_rollup_matches_each_class_overview_and_merges_them(app, seeded):
+    prof_id, section_ids = seeded
+    with app.app_context():
+        rollup = ReportService.get_instructor_rollup(prof_id)
+        overviews = [
+            ReportService.get_class_overview(class_id=class_id) for class_id in section_ids[:3]
+        ]
+
+    assert [entry["class_id"] for entry in rollup["classes"]] == section_ids[:3]
+    for entry, overview in zip(rollup["classes"], overviews):
+        assert {field: entry[field] for field in OVERVIEW_FIELDS} == {
+            field: overview[field] for field in OVERVIEW_FIELDS
+        }
+
+    totals = rollup["totals"]
+    assert totals["classes"] == 3
+    assert totals["total_students"] == sum(o["total_students"] for o in overviews)
+    assert totals["total_questions_answered"] == sum(
+        o["total_questions_answered"] for o in overviews
+    )
+    strings = next(t for t in totals["topics_overview"] if t["topic"] == "strings")
+    assert strings["students_started"] == 11
+    # Two per section finished strings; section 1's second one has dropped
+    assert strings["students_completed"] == 5
+
+
+def test_topic_and_question_reports_scope_to_a_class(app, client, seeded):
+    _, section_ids = seeded
+    with app.app_context():
+        everyone = ReportService.get_topic_report("strings")
+        scoped = ReportService.get_topic_report("strings", class_id=section_ids[1])
+        questions = ReportService.get_question_analytics("strings", class_id=section_ids[1])
+
+    stats = scoped["overall_stats"]
+    assert stats["total_students"] == 4
+    assert 0 < stats["total_attempts"] < everyone["overall_stats"]["total_attempts"]
+    assert stats["students_completed"] == 2
+    [question] = questions["analytics"]
+    assert question["times_shown"] == stats["total_attempts"]
+    assert question["students_who_saw"] == 4
+
+    response = client.get(f"/api/reports/question/strings/analytics?class_id={section_ids[1]}")
+    assert response.status_code == 200
+
+
+def test_rollup_endpoint_is_for_the_signed_in_instructor(app, seeded):
+    prof_id, section_ids = seeded
+    app.config.pop("AUTH_SERVICE")
+    client = app.test_client()
+
+    assert client.get("/api/reports/instructor/rollup").status_code == 401
+    client.post("/api/auth/login", json={"email": "prof@rollup-1.test"})
+    data = client.get("/api/reports/instructor/rollup").get_json()
+
+    assert data["instructor_id"] == prof_id
+    assert [entry["class_id"] for entry in data["classes"]] == section_ids[:3]
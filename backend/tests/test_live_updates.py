@@ -0,0 +1,129 @@
+import json
+
+from backend import live_updates
+from backend.live_updates import LiveUpdateBroker
+from backend.services.report_service import ReportService
+
+
+def _parse(frame):
+    fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_publish_fans_out_by_class_and_resyncs_slow_subscribers():
+    broker = LiveUpdateBroker(max_queue=2, max_subscribers=3)
+    everything = broker.subscribe()
+    first = broker.subscribe(class_id=1)
+    second = broker.subscribe(class_id=2)
+    assert broker.subscribe() is None
+
+    for n in range(3):
+        assert broker.publish("response", {"n": n}, class_id=1, event_id=n) == 2
+
+    # The class 1 queues overflowed on the third event: resync, then the newest
+    assert everything.next_frame(0) == live_updates.RESYNC_FRAME
+    assert _parse(everything.next_frame(0)) == ("response", {"n": 2})
+    assert first.next_frame(0) == live_updates.RESYNC_FRAME
+    assert second.next_frame(0.01) is None
+    assert broker.stats() == {"subscribers": 3, "published": 3, "delivered": 6, "dropped": 4}
+
+    broker.unsubscribe(second)
+    assert broker.stats()["subscribers"] == 2
+
+
+def test_dashboard_stream_receives_response_deltas(app, make_section):
+    for key in ("AUTH_SERVICE", "RESPONSE_SERVICE", "PROGRESS_SERVICE", "TOPIC_REPOSITORY"):
+        app.config.pop(key)
+    app.config.update(LIVE_UPDATES_QUEUE_SIZE=100, LIVE_UPDATES_HEARTBEAT_SECONDS=0.01)
+    live_updates.init_app(app)
+    section = make_section(1, name="Live 101")
+    [student_id], class_id = section.student_ids, section.id
+
+    dashboard = app.test_client()
+    assert dashboard.get("/api/reports/live").status_code == 401
+    dashboard.post("/api/auth/login", json={"email": "prof@live-101.test"})
+    stream = dashboard.get(f"/api/reports/live?class_id={class_id}")
+    assert stream.mimetype == "text/event-stream"
+    frames = (chunk.decode("utf-8") for chunk in stream.response)
+    assert next(frames).startswith("retry:")
+    assert next(frames) == ": keep-alive\n\n"
+
+    answers = app.test_client()
+    for status in ("correct", "incorrect", "skipped"):
+        posted = answers.post(
+            "/api/responses",
+            json={
+                "user_id": student_id,
+                "topic": "strings",
+                "subtopic_type": "StringIndexing",
+                "question_code": "s[0]",
+                "student_answer": "a",
+                "correct_answer": "a",
+                "is_correct": status == "correct",
+                "status": status,
+            },
+        )
+        assert posted.status_code == 201
+
+    first, second, third = (_parse(next(frames)) for _ in range(3))
+    assert first[0] == "response"
+    assert first[1]["class_id"] == class_id
+    assert first[1]["deltas"] == {
+        "total_questions_answered": 1,
+        "answered_questions": 1,
+        "correct_answers": 1,
+        "active_students_last_week": 1,
+        "topic": {"topic": "strings", "answered": 1, "correct": 1},
+    }
+    # Already active this week, and this one was wrong
+    deltas = second[1]["deltas"]
+    assert (deltas["active_students_last_week"], deltas["correct_answers"]) == (0, 0)
+    # Skipped: shown, but outside both accuracy figures
+    deltas = third[1]["deltas"]
+    assert (deltas["total_questions_answered"], deltas["answered_questions"]) == (1, 0)
+    assert deltas["topic"] == {"topic": "strings", "answered": 0, "correct": 0}
+
+    # The deltas add up to the overview's counts, accuracy included
+    with app.app_context():
+        overview = ReportService.get_class_overview(class_id=class_id)
+    events = [first[1]["deltas"], second[1]["deltas"], deltas]
+    totals = {
+        key: sum(event[key] for event in events)
+        for key in ("total_questions_answered", "answered_questions", "correct_answers")
+    }
+    assert totals == {key: overview[key] for key in totals} == {
+        "total_questions_answered": 3,
+        "answered_questions": 2,
+        "correct_answers": 1,
+    }
+    [strings] = [t for t in overview["topics_overview"] if t["topic"] == "strings"]
+    answered = sum(event["topic"]["answered"] for event in events)
+    correct = sum(event["topic"]["correct"] for event in events)
+    assert (strings["answered"], strings["correct"]) == (answered, correct)
+    assert strings["avg_accuracy"] == correct / answered * 100
+
+    stream.close()
+    with app.app_context():
+        assert live_updates.get_broker().stats()["subscribers"] == 0
+
+
+def test_stream_is_off_by_default_and_resyncs_periodically(app, make_section):
+    app.config.pop("AUTH_SERVICE")
+    assert live_updates.EXTENSION_KEY not in app.extensions
+    make_section(0, name="Quiet 101")
+    dashboard = app.test_client()
+    dashboard.post("/api/auth/login", json={"email": "prof@quiet-101.test"})
+    assert dashboard.get("/api/reports/live").status_code == 503
+
+    app.config.update(
+        LIVE_UPDATES_QUEUE_SIZE=100,
+        LIVE_UPDATES_HEARTBEAT_SECONDS=0.01,
+        LIVE_UPDATES_RESYNC_SECONDS=0.01,
+    )
+    live_updates.init_app(app)
+    stream = dashboard.get("/api/reports/live")
+    frames = (chunk.decode("utf-8") for chunk in stream.response)
+    assert next(frames).startswith("retry:")
+    # Nothing published, yet the dashboard is told to reload
+    assert live_updates.PERIODIC_RESYNC_FRAME in [next(frames) for _ in range(3)]
+    stream.close()
@@ -0,0 +1,65 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend import identity_cache
+from backend.app import create_app
+from backend.models import Class, RosterStudent, User, db
+
+STUDENTS = 500
+WORKERS = 50
+# Generous ceiling so slow CI machines do not flake; override to tighten locally.
+P99_BUDGET_SECONDS = float(os.environ.get("BYTEPATH_LOGIN_P99_BUDGET", "3.0"))
+
+
+def test_concurrent_first_logins_create_each_user_once(tmp_path):
+    """500 simultaneous first-time logins by distinct students against file SQLite."""
+
+    # No identity cache, so every login goes through the user upsert
+    app = create_app(
+        "testing",
+        overrides={
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'storm.db'}",
+            "IDENTITY_CACHE_SIZE": 0,
+        },
+    )
+    assert identity_cache.EXTENSION_KEY not in app.extensions
+    emails = [f"storm{n:03d}@students.test" for n in range(STUDENTS)]
+    with app.app_context():
+        instructor = User(email="prof@storm.test", name="Prof", role="instructor")
+        db.session.add(instructor)
+        db.session.flush()
+        section = Class(class_name="Storm 101", instructor_id=instructor.id)
+        db.session.add(section)
+        db.session.flush()
+        # Half the class is rostered, so logins also reconcile names
+        db.session.add_all(
+            RosterStudent(email=email, first_name="Rostered", last_name=str(n), class_id=section.id)
+            for n, email in enumerate(emails[::2])
+        )
+        db.session.commit()
+
+    def login(email):
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.post("/api/auth/login", json={"email": email})
+        return email, response.status_code, response.get_json(), time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(login, emails))
+
+    assert [status for _, status, _, _ in results if status != 200] == []
+    assert len({body["user"]["id"] for _, _, body, _ in results}) == STUDENTS
+
+    latencies = sorted(elapsed for *_, elapsed in results)
+    assert latencies[int(len(latencies) * 0.99) - 1] < P99_BUDGET_SECONDS
+
+    with app.app_context():
+        students = db.session.execute(
+            db.select(User.email, User.name, User.role).filter(User.role == "student")
+        ).all()
+        db.engine.dispose()
+    assert len(students) == STUDENTS
+    names = {email: name for email, name, _ in students}
+    assert names[emails[0]] == "Rostered 0"
+    assert names[emails[1]] == "Storm001"
@@ -0,0 +1,53 @@
+import logging
+
+from backend.models import db
+
+
+def test_metrics_endpoint_reports_latency_histograms(client):
+    """Requests are recorded per blueprint/endpoint in Prometheus format."""
+
+    assert client.get("/health").status_code == 200
+    assert client.get("/api/topics").status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+
+    body = response.get_data(as_text=True)
+    assert "# TYPE bytepath_request_duration_seconds histogram" in body
+    assert (
+        'bytepath_requests_total{blueprint="",endpoint="health_check",method="GET",status="200"} 1'
+        in body
+    )
+    assert (
+        'bytepath_request_duration_seconds_count{blueprint="topics",endpoint="topics.get_topics",method="GET"} 1'
+        in body
+    )
+    assert 'le="+Inf"' in body
+    assert "bytepath_response_size_bytes_sum" in body
+
+
+def test_metrics_count_sql_statements_per_request(app):
+    @app.get("/_sql-probe")
+    def sql_probe():
+        db.session.execute(db.text("SELECT 1"))
+        db.session.execute(db.text("SELECT 2"))
+        return "ok"
+
+    client = app.test_client()
+    client.get("/_sql-probe")
+
+    body = client.get("/metrics").get_data(as_text=True)
+    assert (
+        'bytepath_request_sql_statements_sum{blueprint="",endpoint="sql_probe",method="GET"} 2.0'
+        in body
+    )
+
+
+def test_slow_requests_are_logged(app, caplog):
+    app.config["SLOW_REQUEST_THRESHOLD_MS"] = 0
+
+    with caplog.at_level(logging.WARNING, logger="backend.requests"):
+        app.test_client().get("/health")
+
+    assert any('"event": "slow_request"' in record.getMessage() for record in caplog.records)
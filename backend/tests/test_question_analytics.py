@@ -0,0 +1,156 @@
+import statistics
+
+import pytest
+
+from backend.models import Question, User, db
+from backend.repositories import question_repository, question_stats_repository
+from backend.services.report_service import ReportService
+
+# (question_code, correct, incorrect, skipped, seconds per answer)
+QUESTIONS = [
+    ("s = 'abc'\ns[0]", 4, 0, 0, 3),
+    ("s = 'xyz'\ns[2]", 1, 2, 0, 9),
+    ("s = 'abc'\ns[-1]", 0, 3, 1, 6),
+    ("s = 'hello'\ns[1:3]", 2, 2, 0, 12),
+    ("len('hi')", 0, 0, 2, None),
+]
+
+
+@pytest.fixture
+def seeded(app, make_section, add_response):
+    """Every answer from a rostered student, plus one stray unrostered one."""
+
+    section = make_section(4, name="QA 101")
+    students = section.student_ids
+    with app.app_context():
+        stray = User(email="stray@qa.test", name="Stray", role="student")
+        db.session.add(stray)
+        db.session.flush()
+
+        ids = {}
+        for code, correct, incorrect, skipped, seconds in QUESTIONS:
+            question_id = question_repository.get_or_create_id(code, "StringIndexing", "a")
+            ids[code] = question_id
+            statuses = ["correct"] * correct + ["incorrect"] * incorrect + ["skipped"] * skipped
+            for n, status in enumerate(statuses):
+                add_response(
+                    user_id=students[n % len(students)],
+                    class_id=section.id,
+                    question_id=question_id,
+                    status=status,
+                    time_spent=None if status == "skipped" else seconds + n,
+                )
+        add_response(
+            user_id=stray.id,
+            question_id=ids["s = 'abc'\ns[0]"],
+            status="incorrect",
+            time_spent=30,
+        )
+        db.session.commit()
+        question_stats_repository.rebuild()
+    return ids, section.id
+
+
+def _all_pages(**options):
+    codes, cursor = [], None
+    while True:
+        page = ReportService.get_question_analytics("strings", cursor=cursor, **options)
+        codes.extend(row["question_code"] for row in page["analytics"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return codes
+
+
+def test_templates_ignore_literals_but_keep_structure(app):
+    assert question_repository.question_template("s = 'abc'\ns[0]") == "s = <str>\ns[<num>]"
+    assert question_repository.question_template('x1 = "a\\"b" * 2.5') == "x1 = <str> * <num>"
+
+    with app.app_context():
+        ids = [
+            question_repository.get_or_create_id(code, "StringIndexing", "a")
+            for code in ("s = 'abc'\ns[0]", "s = 'xyz'\ns[2]", "s = 'abc'\ns[-1]")
+        ]
+        hashes = [db.session.get(Question, question_id).template_hash for question_id in ids]
+    assert hashes[0] == hashes[1] != hashes[2]
+
+
+def test_each_sort_pages_through_every_question_once(app, seeded):
+    with app.app_context():
+        by_attempts = _all_pages(sort="attempts", limit=2)
+        by_success = _all_pages(sort="success_rate", limit=2)
+        by_time = _all_pages(sort="time", limit=3)
+        first = ReportService.get_question_analytics("strings", sort="success_rate", limit=1)
+
+    codes = [code for code, *_ in QUESTIONS]
+    # The stray's answer makes s[0] the most shown (5); ties break on question id
+    assert by_attempts == [codes[0], codes[2], codes[3], codes[1], codes[4]]
+    assert by_success == [codes[2], codes[1], codes[3], codes[0], codes[4]]
+    # The stray's 30s answer lifts s[0]'s mean above s[-1]'s
+    assert by_time == [codes[3], codes[1], codes[0], codes[2], codes[4]]
+    assert [row["question_code"] for row in first["analytics"]] == [codes[2]]
+    assert first["next_cursor"]
+
+
+def test_template_grouping_pools_counts_and_times(app, seeded):
+    with app.app_context():
+        page = ReportService.get_question_analytics("strings", group_by="template")
+
+    indexing = next(row for row in page["analytics"] if row["template"] == "s = <str>\ns[<num>]")
+    assert indexing["variants"] == 2
+    assert (indexing["times_shown"], indexing["correct_count"]) == (8, 5)
+    times = [3, 4, 5, 6, 30, 9, 10, 11]
+    assert indexing["avg_time_spent"] == round(statistics.mean(times), 2)
+    assert indexing["time_spent_stddev"] == round(statistics.stdev(times), 2)
+    assert len(page["analytics"]) == 4
+
+
+def test_rostered_scope_drops_unrostered_answers(app, seeded):
+    ids, class_id = seeded
+    with app.app_context():
+        everyone = ReportService.get_question_analytics("strings")
+        rostered = ReportService.get_question_analytics("strings", rostered=True)
+        in_class = ReportService.get_question_analytics(
+            "strings", class_id=class_id, rostered=True, sort="success_rate", limit=1
+        )
+
+    def first_question(page):
+        question_id = ids["s = 'abc'\ns[0]"]
+        return next(row for row in page["analytics"] if row["question_id"] == question_id)
+
+    assert first_question(everyone)["times_shown"] == 5
+    assert first_question(rostered)["times_shown"] == 4
+    assert first_question(rostered)["success_rate"] == 100.0
+    assert in_class["analytics"][0]["question_code"] == "s = 'abc'\ns[-1]"
+
+
+def test_endpoint_validates_paging_options(app, seeded):
+    client = app.test_client()
+    url = "/api/reports/question/strings/analytics"
+
+    page = client.get(f"{url}?sort=time&limit=2").get_json()
+    assert len(page["analytics"]) == 2
+    following = client.get(f"{url}?sort=time&limit=2&cursor={page['next_cursor']}")
+    assert following.status_code == 200
+    assert following.get_json()["analytics"][0]["question_code"] == "s = 'abc'\ns[0]"
+
+    assert client.get(f"{url}?sort=attempts&cursor={page['next_cursor']}").status_code == 400
+    assert client.get(f"{url}?cursor=not-a-cursor").status_code == 400
+    assert client.get(f"{url}?sort=newest").status_code == 400
+    assert client.get(f"{url}?group_by=topic").status_code == 400
+    assert client.get(f"{url}?limit=0").status_code == 400
+
+
+def test_endpoint_parses_the_rostered_flag(app, seeded):
+    ids, _ = seeded
+    client = app.test_client()
+    url = "/api/reports/question/strings/analytics"
+
+    def times_shown(query):
+        rows = client.get(f"{url}{query}").get_json()["analytics"]
+        return next(row for row in rows if row["question_id"] == ids["s = 'abc'\ns[0]"])[
+            "times_shown"
+        ]
+
+    # The stray unrostered answer only counts without the flag
+    assert [times_shown(q) for q in ("", "?rostered=0", "?rostered=false")] == [5, 5, 5]
+    assert [times_shown(q) for q in ("?rostered=1", "?rostered=true", "?rostered=Yes")] == [4, 4, 4]
@@ -0,0 +1,189 @@
+from datetime import datetime
+
+import pytest
+
+from backend.models import Question, QuestionStats, StudentResponse, db
+from backend.repositories import (
+    question_repository,
+    question_stats_repository,
+    response_repository,
+)
+from backend.services.export_service import ExportService
+from backend.services.report_service import ReportService
+from backend.services.response_service import ResponseService
+
+
+@pytest.fixture
+def section(make_section):
+    section = make_section(3, name="Questions 101")
+    return section.student_ids, section.id
+
+
+def _legacy_response(user_id, class_id, code, answer, status="correct"):
+    """A response as written before question ids existed."""
+
+    return StudentResponse(
+        user_id=user_id,
+        class_id=class_id,
+        topic="strings",
+        subtopic_type="StringIndexing",
+        question_code=code,
+        student_answer=answer if status == "correct" else "?",
+        correct_answer=answer,
+        is_correct=status == "correct",
+        status=status,
+        time_spent=20,
+        attempted_at=datetime(2025, 1, 1),
+    )
+
+
+def test_identical_questions_share_one_row(app):
+    with app.app_context():
+        first = question_repository.get_or_create_id("s[0]", "StringIndexing", "a")
+        again = question_repository.get_or_create_id("s[0]", "StringIndexing", "a")
+        other_answer = question_repository.get_or_create_id("s[0]", "StringIndexing", "b")
+
+        rows = [
+            {"question_code": "s[0]", "subtopic_type": "StringIndexing", "correct_answer": "a"},
+            {"question_code": "s[1]", "subtopic_type": "StringIndexing", "correct_answer": "b"},
+            {"question_code": "s[1]", "subtopic_type": "StringIndexing", "correct_answer": "b"},
+        ]
+        question_repository.resolve_ids(rows)
+
+        assert first == again != other_answer
+        assert rows[0]["question_id"] == first
+        assert rows[1]["question_id"] == rows[2]["question_id"] not in (first, other_answer)
+        assert db.session.execute(db.select(db.func.count(Question.id))).scalar_one() == 3
+
+
+def test_create_response_links_question(app, section):
+    student_ids, class_id = section
+    with app.app_context():
+        response = ResponseService.create_response(
+            {
+                "user_id": student_ids[0],
+                "class_id": class_id,
+                "topic": "strings",
+                "subtopic_type": "StringIndexing",
+                "question_code": "s[0]",
+                "correct_answer": "a",
+                "student_answer": "a",
+                "is_correct": True,
+                "status": "correct",
+            }
+        )
+        question = question_repository.get_by_id(response.question_id)
+        assert question.question_code == "s[0]"
+        assert response.to_dict()["question_id"] == question.id
+
+        # The text is stored once, on the question, and read through it
+        stored = db.session.execute(
+            db.select(StudentResponse.question_code, StudentResponse.correct_answer)
+        ).one()
+        assert tuple(stored) == (None, None)
+        db.session.expunge_all()
+        text = {"question_code": "s[0]", "correct_answer": "a"}
+        page = ResponseService.get_student_responses_page(student_ids[0])["responses"]
+        projected = ResponseService.get_student_responses_page(
+            student_ids[0], fields=["question_code", "correct_answer"]
+        )["responses"]
+        [exported] = ExportService.iter_responses(student_id=student_ids[0])
+        for row in (page[0], projected[0], exported):
+            assert {key: row[key] for key in text} == text
+
+
+def test_backfill_then_question_analytics_group_by_id(app, section):
+    student_ids, class_id = section
+    with app.app_context():
+        db.session.add_all(
+            [
+                _legacy_response(student_ids[0], class_id, "s[0]", "a"),
+                _legacy_response(student_ids[1], class_id, "s[0]", "a", status="incorrect"),
+                _legacy_response(student_ids[2], class_id, "s[0]", "a"),
+                _legacy_response(student_ids[0], class_id, "s[1]", "b", status="skipped"),
+            ]
+        )
+        db.session.commit()
+
+        assert question_repository.backfill_responses(batch_size=3) == 4
+        assert question_repository.backfill_responses() == 0
+        # Once linked, the copies on the responses are dropped
+        assert response_repository.strip_question_text(batch_size=3) == 4
+        assert response_repository.strip_question_text() == 0
+        db.session.expunge_all()
+        page = ResponseService.get_student_responses_page(student_ids[0])["responses"]
+        assert sorted(row["question_code"] for row in page) == ["s[0]", "s[1]"]
+        question_stats_repository.rebuild()
+
+        analytics = ReportService.get_question_analytics("strings")["analytics"]
+
+    assert [row["question_code"] for row in analytics] == ["s[0]", "s[1]"]
+    top = analytics[0]
+    assert (top["times_shown"], top["correct_count"], top["incorrect_count"]) == (3, 2, 1)
+    assert top["students_who_saw"] == 3
+    assert top["success_rate"] == 66.67
+    assert analytics[1]["skipped_count"] == 1
+
+
+def test_online_question_stats_match_a_rebuild(app, section):
+    student_ids, class_id = section
+    attempts = [
+        (student_ids[0], "correct", 10),
+        (student_ids[0], "incorrect", 30),
+        (student_ids[1], "correct", 20),
+        (student_ids[2], "skipped", 5),
+        (student_ids[2], "correct", None),
+    ]
+    with app.app_context():
+        for user_id, status, time_spent in attempts:
+            ResponseService.create_response(
+                {
+                    "user_id": user_id,
+                    "class_id": class_id,
+                    "topic": "strings",
+                    "subtopic_type": "StringIndexing",
+                    "question_code": "s[0]",
+                    "correct_answer": "a",
+                    "is_correct": status == "correct",
+                    "status": status,
+                    "time_spent": time_spent,
+                }
+            )
+
+        def snapshot():
+            stats = db.session.execute(db.select(QuestionStats)).scalar_one()
+            db.session.expire(stats)
+            return (
+                stats.times_shown,
+                stats.correct_count,
+                stats.incorrect_count,
+                stats.skipped_count,
+                stats.time_samples,
+                round(stats.time_mean, 6),
+                round(stats.time_m2, 6),
+                stats.students_who_saw,
+            )
+
+        online = snapshot()
+        question_stats_repository.rebuild()
+        rebuilt = snapshot()
+        analytics = ReportService.get_question_analytics("strings")["analytics"]
+
+    # Times 10, 30, 20: mean 20, M2 = 200 (sample stddev 10)
+    assert online == rebuilt == (5, 3, 1, 1, 3, 20.0, 200.0, 3)
+    row = analytics[0]
+    assert row["avg_time_spent"] == 20.0
+    assert row["time_spent_stddev"] == 10.0
+    low, high = row["success_rate_ci"]
+    assert low < row["success_rate"] == 75.0 < high <= 100
+
+
+def test_wilson_interval_bounds():
+    from backend.services.report_service import wilson_interval
+
+    assert wilson_interval(0, 0) is None
+    assert wilson_interval(0, 10)[0] == 0.0
+    assert wilson_interval(10, 10)[1] == 100.0
+    narrow = wilson_interval(500, 1000)
+    wide = wilson_interval(5, 10)
+    assert narrow[1] - narrow[0] < wide[1] - wide[0]
@@ -12,6 +12,17 @@ def test_get_student_report_not_found(client):
     assert response.status_code == 404
 
 
+def test_get_student_reports_batch(client, student1_id, student2_id):
+    response = client.get(f"/api/reports/students?ids={student2_id},99999,{student1_id}")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [report["student_id"] for report in data["reports"]] == [student2_id, student1_id]
+    assert data["not_found"] == [99999]
+
+    assert client.get("/api/reports/students").status_code == 400
+    assert client.get("/api/reports/students?ids=1,x").status_code == 400
+
+
 def test_get_topic_report(client):
     response = client.get("/api/reports/topic/test-topic-1")
     assert response.status_code == 200
@@ -1,3 +1,6 @@
+import pytest
+
+
 def test_submit_response(client, student1_id):
     """Submitting a valid response persists it."""
 
@@ -91,3 +94,73 @@ def test_submit_response_unknown_user(client):
 
     response = client.post("/api/responses", json=payload)
     assert response.status_code == 404
+
+
+@pytest.fixture
+def history(app, make_section, add_response):
+    """Five real responses a day apart; the student's id."""
+
+    from datetime import datetime
+
+    from backend.models import db
+
+    app.config.pop("RESPONSE_SERVICE")
+    section = make_section(1, name="History 101")
+    [student_id] = section.student_ids
+    with app.app_context():
+        for day in range(1, 6):
+            add_response(
+                user_id=student_id,
+                class_id=section.id,
+                topic="strings" if day % 2 else "lists",
+                student_answer="a",
+                status="correct" if day != 2 else "incorrect",
+                attempted_at=datetime(2025, 1, day, 12, 0),
+            )
+        db.session.commit()
+    return student_id
+
+
+def test_student_responses_paginate_with_cursor(app, history):
+    student_id = history
+    client = app.test_client()
+
+    first = client.get(f"/api/responses/student/{student_id}?limit=2").get_json()
+    assert [r["attempted_at"][:10] for r in first["responses"]] == ["2025-01-05", "2025-01-04"]
+    assert first["next_cursor"]
+
+    seen = [r["id"] for r in first["responses"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get(f"/api/responses/student/{student_id}?limit=2&cursor={cursor}").get_json()
+        seen.extend(r["id"] for r in page["responses"])
+        cursor = page["next_cursor"]
+
+    assert len(seen) == len(set(seen)) == 5
+
+
+def test_student_responses_filters_and_projection(app, history):
+    student_id = history
+    client = app.test_client()
+
+    response = client.get(
+        f"/api/responses/student/{student_id}"
+        "?topic=strings&start=2025-01-02&end=2025-01-03&fields=topic,is_correct"
+    )
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "responses": [{"topic": "strings", "is_correct": True}],
+        "next_cursor": None,
+    }
+
+    incorrect = client.get(f"/api/responses/student/{student_id}?status=incorrect").get_json()
+    assert [r["status"] for r in incorrect["responses"]] == ["incorrect"]
+
+
+def test_student_responses_rejects_bad_parameters(app, history):
+    student_id = history
+    client = app.test_client()
+
+    for query in ("limit=0", "limit=501", "status=maybe", "cursor=not-a-cursor", "fields=secret"):
+        response = client.get(f"/api/responses/student/{student_id}?{query}")
+        assert response.status_code == 400, query
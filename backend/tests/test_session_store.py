@@ -0,0 +1,99 @@
+import hashlib
+from datetime import datetime, timedelta
+
+from backend.app import create_app
+from backend.models import ServerSession, db
+
+# Token-shaped, incompressible values so the signed cookie is realistically sized
+_NOISE = "".join(hashlib.sha256(str(n).encode()).hexdigest() for n in range(5))
+GOOGLE_CREDENTIALS = {
+    "token": "ya29." + _NOISE[:180],
+    "refresh_token": "1//" + _NOISE[180:280],
+    "granted_scopes": [
+        "https://www.googleapis.com/auth/userinfo.email",
+        "https://www.googleapis.com/auth/userinfo.profile",
+        "openid",
+    ],
+    "expires_at": "2026-01-01T00:00:00",
+}
+
+
+def _cookie(client):
+    return client.get_cookie("session").value
+
+
+def _rows(app):
+    with app.app_context():
+        return db.session.execute(db.select(ServerSession)).scalars().all()
+
+
+def test_cookie_holds_only_an_opaque_id(app, client):
+    login = client.post("/api/auth/login", json={"email": "student1@test.com"})
+    with client.session_transaction() as sess:
+        sess["google_credentials"] = GOOGLE_CREDENTIALS
+
+    sid = _cookie(client)
+    assert len(sid) == 43
+    assert "HttpOnly" in login.headers["Set-Cookie"]
+    (row,) = _rows(app)
+    assert row.id != sid and len(row.id) == 64
+    assert row.user_id == client.get("/api/auth/profile").get_json()["id"]
+    assert GOOGLE_CREDENTIALS["refresh_token"] in row.data
+    assert (
+        client.get("/api/auth/google/complete").get_json()["granted_scopes"]
+        == GOOGLE_CREDENTIALS["granted_scopes"]
+    )
+
+    cookie_app = create_app("testing", overrides={"SESSION_BACKEND": "cookie"})
+    cookie_client = cookie_app.test_client()
+    with cookie_client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["google_credentials"] = GOOGLE_CREDENTIALS
+    assert len(cookie_client.get_cookie("session").value) > 5 * len(sid)
+
+
+def test_login_rotates_id_and_logout_deletes_row(app, client):
+    client.post("/api/auth/login", json={"email": "student1@test.com"})
+    first = _cookie(client)
+    client.post("/api/auth/login", json={"email": "instructor@test.com"})
+    assert _cookie(client) != first
+    assert len(_rows(app)) == 1
+
+    client.post("/api/auth/logout")
+    assert client.get_cookie("session") is None
+    assert _rows(app) == []
+    assert client.get("/api/auth/profile").status_code == 401
+
+
+def test_role_checks_use_session_snapshot_until_it_ages(app, client):
+    client.post("/api/auth/login", json={"email": "instructor@test.com"})
+    users = app.config["USER_REPOSITORY"]
+    users.get_by_email("instructor@test.com").role = "student"
+
+    assert client.get("/api/reports/insights").status_code == 404
+    assert client.get("/api/auth/profile").get_json()["role"] == "instructor"
+
+    app.config["SESSION_IDENTITY_MAX_AGE_SECONDS"] = 0
+    assert client.get("/api/auth/profile").get_json()["role"] == "student"
+    assert client.get("/api/reports/insights").status_code == 403
+
+
+def test_expired_sessions_are_ignored_and_cleaned_lazily(app, client):
+    client.post("/api/auth/login", json={"email": "student1@test.com"})
+    with app.app_context():
+        db.session.execute(
+            ServerSession.__table__.update().values(
+                expires_at=datetime.utcnow() - timedelta(seconds=1)
+            )
+        )
+        db.session.commit()
+
+    assert client.get("/api/auth/profile").status_code == 401
+    assert len(_rows(app)) == 1
+
+    interface = app.session_interface
+    interface._next_cleanup = 0
+    client.post("/api/auth/login", json={"email": "student2@test.com"})
+    assert [row.user_id for row in _rows(app)] == [
+        app.config["USER_REPOSITORY"].get_by_email("student2@test.com").id
+    ]
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models import DistinctSketch, db
+from backend.repositories import sketch_repository
+from backend.services.report_service import ReportService
+from backend.services.response_service import ResponseService
+from backend.sketches import HyperLogLog
+
+
+def test_hyperloglog_estimates_within_error_bound():
+    sketch = HyperLogLog()
+    sketch.update(range(50_000))
+
+    error = abs(sketch.count() - 50_000) / 50_000
+    assert error < 3 * sketch.standard_error
+
+
+def test_hyperloglog_small_counts_and_merge():
+    evens, odds = HyperLogLog(), HyperLogLog()
+    evens.update(range(0, 200, 2))
+    odds.update(range(1, 200, 2))
+    before = evens.count()
+    assert abs(before - 100) <= 2
+    assert not evens.add(0)
+
+    restored = HyperLogLog.from_bytes(evens.to_bytes())
+    assert abs(restored.merge(odds).count() - 200) <= 4
+    assert evens.count() == before
+
+
+@pytest.fixture
+def two_sections(make_section):
+    """Six students, alternating between two sections; (user_id, class_id) pairs."""
+
+    sections = [make_section(3, name=f"Sketch {n}") for n in (1, 2)]
+    members = [
+        (user_id, section.id)
+        for pair in zip(*(section.student_ids for section in sections))
+        for user_id, section in zip(pair, sections)
+    ]
+    return members, [section.id for section in sections]
+
+
+def _answer(user_id, class_id, subtopic="StringIndexing"):
+    ResponseService.create_response(
+        {
+            "user_id": user_id,
+            "class_id": class_id,
+            "topic": "strings",
+            "subtopic_type": subtopic,
+            "question_code": f"{subtopic}()",
+            "correct_answer": "a",
+            "is_correct": True,
+            "status": "correct",
+            "time_spent": 10,
+        }
+    )
+
+
+def test_approximate_mode_reports_match_exact_counts(app, two_sections):
+    app.config["DISTINCT_COUNT_MODE"] = "approximate"
+    members, section_ids = two_sections
+    with app.app_context():
+        for user_id, class_id in members:
+            _answer(user_id, class_id)
+            _answer(user_id, class_id)
+        _answer(*members[0], subtopic="StringSlicing")
+
+        report = ReportService.get_topic_report("strings")
+        overview = ReportService.get_class_overview(class_id=section_ids[0])
+
+        online = db.session.execute(
+            db.select(db.func.count()).select_from(DistinctSketch)
+        ).scalar_one()
+        assert sketch_repository.rebuild() == online
+
+    assert report["overall_stats"]["students_started"] == 6
+    unique = {row["subtopic_type"]: row["unique_students"] for row in report["subtopic_difficulty"]}
+    assert unique == {"StringIndexing": 6, "StringSlicing": 1}
+    assert overview["active_students_last_week"] == 3
+    assert [day["active_students"] for day in overview["recent_activity"]] == [3]
+
+
+def test_sketches_merge_across_classes_and_days(app, two_sections, add_response):
+    members, section_ids = two_sections
+    today = datetime.utcnow()
+    with app.app_context():
+        for offset, (user_id, class_id) in enumerate(members):
+            add_response(
+                user_id=user_id, class_id=class_id, attempted_at=today - timedelta(days=offset % 3)
+            )
+        db.session.commit()
+        sketch_repository.rebuild()
+
+        days = [sketch_repository.day_key((today - timedelta(days=d)).date()) for d in range(3)]
+        assert sketch_repository.estimate_union("day", days) == 6
+        assert sketch_repository.estimate_union("day", days, [section_ids[1]]) == 3
+        assert sum(sketch_repository.estimate_many("day", days).values()) == 6
@@ -0,0 +1,132 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from backend.models import db
+from backend.services import snapshot_service
+from backend.services.snapshot_service import SnapshotService
+
+
+class JsonWriter:
+    """Dependency-free writer so the partitioning logic runs everywhere."""
+
+    name = "json"
+    extension = ".json"
+
+    def write(self, path, columns, schema):
+        path.write_text(json.dumps({name: columns[name] for name, _ in schema}, default=str))
+
+
+@pytest.fixture
+def json_writer(monkeypatch):
+    monkeypatch.setitem(snapshot_service.WRITERS, "json", JsonWriter)
+
+
+@pytest.fixture
+def seeded(app, make_section, add_response):
+    section = make_section(1, name="Snapshot 101")
+    [student_id] = section.student_ids
+    with app.app_context():
+        for attempted_at in (datetime(2025, 1, 30), datetime(2025, 2, 3)):
+            add_response(user_id=student_id, class_id=section.id, attempted_at=attempted_at)
+        db.session.commit()
+    return student_id, section.id
+
+
+def _parts(root):
+    return sorted(str(path.relative_to(root)) for path in (root / "responses").rglob("part-*"))
+
+
+def test_snapshot_partitions_and_is_incremental(
+    app, tmp_path, json_writer, seeded, add_response
+):
+    student_id, section_id = seeded
+    with app.app_context():
+        first = SnapshotService.create_snapshot(tmp_path, export_format="json")
+        assert first["responses"] == 2
+        parts = _parts(tmp_path)
+        assert [p.split("/")[1:3] for p in parts] == [
+            [f"class_id={section_id}", "month=2025-01"],
+            [f"class_id={section_id}", "month=2025-02"],
+        ]
+        roster = json.loads(
+            (tmp_path / "roster" / f"class_id={section_id}" / "snapshot.json").read_text()
+        )
+        assert roster["email"] == ["s0@snapshot-101.test"]
+        assert "class_id" not in roster
+
+        assert SnapshotService.create_snapshot(tmp_path, export_format="json")["responses"] == 0
+
+        add_response(user_id=student_id, class_id=section_id, attempted_at=datetime(2025, 2, 10))
+        db.session.commit()
+        third = SnapshotService.create_snapshot(tmp_path, export_format="json")
+
+    assert third["responses"] == 1
+    assert len(_parts(tmp_path)) == 3
+    watermark = SnapshotService.read_watermark(tmp_path)
+    assert watermark["responses_last_id"] == third["responses_last_id"]
+    assert [run["responses"] for run in watermark["runs"]] == [2, 0, 1]
+
+
+def test_snapshot_discards_parts_from_unfinished_runs(app, tmp_path, json_writer, seeded):
+    orphan = tmp_path / "responses" / "class_id=1" / "month=2025-01" / "part-crashed-1-00000.json"
+    orphan.parent.mkdir(parents=True)
+    orphan.write_text("{}")
+    with app.app_context():
+        SnapshotService.create_snapshot(tmp_path, export_format="json")
+    assert not orphan.exists()
+    assert len(_parts(tmp_path)) == 2
+
+
+def test_overlapping_snapshot_runs_are_refused(app, client, tmp_path, json_writer, seeded):
+    app.config.update(SNAPSHOT_DIR=str(tmp_path), SNAPSHOT_FORMAT="json")
+    client.post("/api/auth/login", json={"email": "instructor@test.com"})
+    with app.app_context(), SnapshotService._run_lock(tmp_path):
+        with pytest.raises(snapshot_service.SnapshotInProgressError):
+            SnapshotService.create_snapshot(tmp_path, export_format="json")
+        assert client.post("/api/reports/snapshot").status_code == 409
+    assert _parts(tmp_path) == []
+
+    assert client.post("/api/reports/snapshot").status_code == 201
+    assert len(_parts(tmp_path)) == 2
+
+
+def test_snapshot_rejects_unknown_format(app, tmp_path):
+    with app.app_context(), pytest.raises(ValueError):
+        SnapshotService.create_snapshot(tmp_path, export_format="csv")
+
+
+def test_snapshot_npz_round_trip(app, tmp_path, seeded):
+    np = pytest.importorskip("numpy")
+    with app.app_context():
+        SnapshotService.create_snapshot(tmp_path, export_format="npz")
+    first_part = tmp_path / _parts(tmp_path)[0]
+    with np.load(first_part) as data:
+        assert data["attempted_at"].dtype == np.dtype("datetime64[us]")
+        assert data["question_id"].dtype == np.float64  # NULL ids become NaN
+        assert data["is_correct"].tolist() == [True]
+
+
+def test_snapshot_parquet_round_trip(app, tmp_path, seeded):
+    pq = pytest.importorskip("pyarrow.parquet")
+    with app.app_context():
+        SnapshotService.create_snapshot(tmp_path, export_format="parquet")
+    table = pq.read_table(tmp_path / "responses")
+    assert table.num_rows == 2
+    assert table.column("class_id").to_pylist() == [1, 1]
+    assert table.column("question_id").null_count == 2
+
+
+def test_snapshot_endpoints_require_instructor(client):
+    assert client.post("/api/reports/snapshot").status_code == 401
+    client.post("/api/auth/login", json={"email": "student1@test.com"})
+    assert client.get("/api/reports/snapshot").status_code == 403
+
+
+def test_snapshot_status_before_first_run(app, client, tmp_path):
+    app.config["SNAPSHOT_DIR"] = str(tmp_path)
+    client.post("/api/auth/login", json={"email": "instructor@test.com"})
+    response = client.get("/api/reports/snapshot")
+    assert response.status_code == 200
+    assert response.get_json() == {"responses_last_id": 0, "questions_last_id": 0, "runs": []}
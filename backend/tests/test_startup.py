@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Generous ceiling so slow CI machines do not flake; override to tighten locally.
+STARTUP_BUDGET_SECONDS = float(os.environ.get("BYTEPATH_STARTUP_BUDGET", "5.0"))
+
+_PROBE = """
+import json, sys, time
+
+t0 = time.perf_counter()
+import backend
+import backend.app
+t_import = time.perf_counter() - t0
+app_loaded_by_import = "backend.routes.auth" in sys.modules
+
+t1 = time.perf_counter()
+app = backend.create_app("testing")
+response = app.test_client().get("/health")
+t_first_request = time.perf_counter() - t1
+
+print(json.dumps({
+    "import_seconds": t_import,
+    "first_request_seconds": t_first_request,
+    "status": response.status_code,
+    "routes_loaded_by_import": app_loaded_by_import,
+    "application_built": "_application" in vars(backend.app) and backend.app._application is not None,
+    "oauth_loaded": "google_auth_oauthlib" in sys.modules,
+}))
+"""
+
+
+def _run_probe() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_startup_is_lazy_and_within_budget():
+    """Import + first request should not build the WSGI app or load OAuth deps."""
+
+    timings = _run_probe()
+
+    assert timings["status"] == 200
+    assert timings["routes_loaded_by_import"] is False
+    assert timings["application_built"] is False
+    assert timings["oauth_loaded"] is False
+    assert timings["import_seconds"] + timings["first_request_seconds"] < STARTUP_BUDGET_SECONDS
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from backend.models import StudentProgress, db
+from backend.repositories import activity_repository
+from backend.services.report_service import ReportService
+
+
+@pytest.fixture
+def seed(app, make_section, add_response):
+    def seed(students=12):
+        section = make_section(students, name="Batch 101", topics=("strings", "loops"))
+        now = datetime.utcnow()
+        with app.app_context():
+            for n, user_id in enumerate(section.student_ids):
+                db.session.add(
+                    StudentProgress(
+                        user_id=user_id,
+                        class_id=section.id,
+                        topic="strings",
+                        subtopics_completed=n % 3,
+                        total_subtopics=2,
+                    )
+                )
+                for index in range(n % 5 * 2):
+                    add_response(
+                        user_id=user_id,
+                        class_id=section.id,
+                        topic=("strings", "loops")[index % 2],
+                        subtopic_type=f"Sub{index % 3}",
+                        status=("correct", "incorrect", "skipped")[(index + n) % 3],
+                        time_spent=None if index % 4 == 3 else index,
+                        attempted_at=now - timedelta(days=index),
+                    )
+            db.session.commit()
+            activity_repository.rebuild()
+        return section.student_ids, section.id
+
+    return seed
+
+
+def _count_statements(app, action):
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            result = action()
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+    return result, len(statements)
+
+
+def test_batch_reports_match_single_reports(app, seed):
+    ids, section_id = seed()
+    with app.app_context():
+        single = [ReportService.get_student_report(user_id) for user_id in ids]
+        by_ids = ReportService.get_student_reports(list(reversed(ids)) + [424242])
+        by_class = ReportService.get_student_reports(class_id=section_id)
+
+    assert by_ids["reports"] == list(reversed(single))
+    assert by_ids["not_found"] == [424242]
+    assert by_class["reports"] == single
+    assert any(report["topic_breakdown"] for report in single)
+    assert any(not report["topic_breakdown"] for report in single)
+
+
+def test_batch_query_count_does_not_grow_with_students(app, seed):
+    ids, _ = seed(students=20)
+    _, few = _count_statements(app, lambda: ReportService.get_student_reports(ids[:3]))
+    reports, many = _count_statements(app, lambda: ReportService.get_student_reports(ids))
+    assert len(reports["reports"]) == 20
+    assert many == few
+
+
+def test_oversized_id_lists_are_rejected_before_querying(app, client):
+    app.config.pop("REPORT_SERVICE")
+    ids = ",".join(str(n) for n in range(1, 50_001))
+    response, statements = _count_statements(
+        app, lambda: client.get(f"/api/reports/students?ids={ids}")
+    )
+    assert response.status_code == 400
+    assert statements == 0
+
+    # Duplicates count once
+    repeated = [1] * (ReportService.MAX_BATCH_STUDENTS + 1)
+    with app.app_context():
+        assert ReportService.get_student_reports(repeated) == {"reports": [], "not_found": [1]}
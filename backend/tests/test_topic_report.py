@@ -0,0 +1,113 @@
+import pytest
+from sqlalchemy import event
+
+from backend.models import StudentProgress, User, db
+from backend.repositories import question_repository, question_stats_repository
+from backend.services.report_service import ReportService
+
+
+@pytest.fixture
+def seeded(app, make_section, add_response):
+    section = make_section(6, name="Topic 101")
+    with app.app_context():
+        easy = question_repository.get_or_create_id("s[0]", "StringIndexing", "a")
+        hard = question_repository.get_or_create_id("s[-1]", "StringIndexing", "c")
+        for n, user_id in enumerate(section.student_ids):
+            answers = [(easy, "StringIndexing", "correct"), (hard, "StringIndexing", "incorrect")]
+            if n % 2:
+                answers.append((hard, "StringSlicing", "skipped"))
+            for question_id, subtopic, status in answers:
+                add_response(
+                    user_id=user_id,
+                    class_id=section.id,
+                    question_id=question_id,
+                    subtopic_type=subtopic,
+                    status=status,
+                    time_spent=10 if status == "correct" else None,
+                )
+            db.session.add(
+                StudentProgress(
+                    user_id=user_id,
+                    class_id=section.id,
+                    topic="strings",
+                    subtopics_completed=2 if n < 2 else 1,
+                    total_subtopics=2,
+                )
+            )
+        # Someone who left the class (or was never rostered) nailed the hard one
+        stray = User(email="stray@topic.test", name="Stray", role="student")
+        db.session.add(stray)
+        db.session.flush()
+        for _ in range(3):
+            add_response(user_id=stray.id, class_id=section.id, question_id=hard, time_spent=None)
+        db.session.commit()
+        question_stats_repository.rebuild()
+    return easy, hard, section.id
+
+
+def test_topic_report_reads_everything_in_one_statement(app, seeded):
+    easy, hard, class_id = seeded
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", count)
+        try:
+            report = ReportService.get_topic_report("strings")
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count)
+
+    # The topic lookup, then the UNION ALL of every figure
+    assert len(statements) == 2
+    assert report["overall_stats"] == {
+        "total_students": 6,
+        "students_started": 6,
+        "students_completed": 2,
+        "total_attempts": 15,
+        "avg_accuracy": 50.0,
+        "avg_time_per_question": 5.0,
+    }
+    [indexing] = report["subtopic_difficulty"]
+    assert (indexing["attempts"], indexing["unique_students"]) == (12, 6)
+    assert (indexing["success_rate"], indexing["avg_time"]) == (50.0, 10.0)
+    assert [q["question_id"] for q in report["most_missed_questions"]] == [hard, easy]
+    assert report["most_missed_questions"][0]["attempts"] == 6
+
+    # The stray's answers are left out like everywhere else in the report,
+    # whether or not the report is scoped to the class they answered in
+    with app.app_context():
+        scoped = ReportService.get_topic_report("strings", class_id=class_id)
+    for missed in (report["most_missed_questions"], scoped["most_missed_questions"]):
+        assert [(q["attempts"], q["success_rate"]) for q in missed] == [(6, 0.0), (6, 100.0)]
+
+
+def test_most_missed_reads_the_per_class_counters(app, seeded):
+    easy, hard, class_id = seeded
+    with app.app_context():
+        student = db.session.execute(
+            db.select(User.id).filter_by(email="s0@topic-101.test")
+        ).scalar_one()
+        stray = db.session.execute(
+            db.select(User.id).filter_by(email="stray@topic.test")
+        ).scalar_one()
+        # Folded into the counters only, as ingest does; no response rows
+        for user_id in (student, stray):
+            for _ in range(6):
+                question_stats_repository.record(
+                    question_id=easy,
+                    topic="strings",
+                    user_id=user_id,
+                    class_id=class_id,
+                    status="incorrect",
+                    time_spent=None,
+                )
+        db.session.commit()
+        report = ReportService.get_topic_report("strings", class_id=class_id)
+
+    missed = report["most_missed_questions"]
+    assert [(q["question_id"], q["attempts"], q["success_rate"]) for q in missed] == [
+        (hard, 6, 0.0),
+        (easy, 12, 50.0),
+    ]
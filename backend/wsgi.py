@@ -0,0 +1,9 @@
+"""
+WSGI entry point for Gunicorn (``backend.wsgi:application``).
+
+This is the only module that builds an application at import time.
+"""
+
+from backend.app import create_app
+
+application = create_app()
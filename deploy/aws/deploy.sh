@@ -323,6 +323,10 @@ if [ ! -f "$PYTHON_VENV_PATH" ]; then
     PYTHON_VENV_PATH="$BACKEND_DIR/.venv/bin/python3"
 fi
 
+# Threaded workers: a live dashboard stream (LIVE_UPDATES_QUEUE_SIZE > 0 in
+# .env) holds one of a worker's 16 threads rather than the whole process, and
+# --timeout only bounds the worker's heartbeat, not how long a stream stays
+# open. LIVE_UPDATES_MAX_SUBSCRIBERS (default 8) keeps threads free for the API.
 cat > /etc/systemd/system/bytepath-backend.service << EOF
 [Unit]
 Description=BytePath Backend API (Gunicorn)
@@ -338,12 +342,14 @@ EnvironmentFile=$BACKEND_DIR/.env
 ExecStart=$PYTHON_VENV_PATH -m gunicorn \
     --bind 0.0.0.0:$BACKEND_PORT \
     --workers 4 \
+    --worker-class gthread \
+    --threads 16 \
     --timeout 120 \
     --access-logfile - \
     --error-logfile - \
     --log-level info \
     --pythonpath $PROJECT_ROOT \
-    backend.app:application
+    backend.wsgi:application
 Restart=always
 RestartSec=10
 
@@ -41,6 +41,7 @@ export default function InstructorDashboard({ classId }: { classId: number | nul
   const [topicError, setTopicError] = useState<string | null>(null);
   const [selectedQuestion, setSelectedQuestion] = useState<QuestionAnalyticsResponse['analytics'][number] | null>(null);
   const [selectedSubtopic, setSelectedSubtopic] = useState<string | null>(null);
+  const [questionsLoading, setQuestionsLoading] = useState(false);
 
   useEffect(() => {
     loadClassOverview();
@@ -127,13 +128,9 @@ export default function InstructorDashboard({ classId }: { classId: number | nul
     setTopicError(null);
     setTopicLoading(true);
     setSelectedSubtopic(null);
+    setTopicQuestionAnalytics(null);
     try {
-      const [report, analytics] = await Promise.all([
-        reportsService.getTopicReport(topic.topic),
-        reportsService.getQuestionAnalytics(topic.topic),
-      ]);
-      setTopicReport(report);
-      setTopicQuestionAnalytics(analytics);
+      setTopicReport(await reportsService.getTopicReport(topic.topic));
     } catch (error) {
       console.error('Failed to load topic analytics:', error);
       setTopicError('Unable to load topic analytics right now.');
@@ -142,6 +139,26 @@ export default function InstructorDashboard({ classId }: { classId: number | nul
     }
   };
 
+  // Questions are fetched per subtopic, hardest first, across every page
+  const selectSubtopic = async (subtopicType: string) => {
+    if (!selectedTopic) return;
+    setSelectedSubtopic(subtopicType);
+    setQuestionsLoading(true);
+    try {
+      setTopicQuestionAnalytics(
+        await reportsService.getQuestionAnalytics(selectedTopic.topic, {
+          subtopicType,
+          sort: 'success_rate',
+        }),
+      );
+    } catch (error) {
+      console.error('Failed to load question analytics:', error);
+      setTopicError('Unable to load topic analytics right now.');
+    } finally {
+      setQuestionsLoading(false);
+    }
+  };
+
   const handleTopicKey = (
     event: KeyboardEvent<HTMLDivElement>,
     topic: ClassOverview['topics_overview'][number],
@@ -403,11 +420,11 @@ export default function InstructorDashboard({ classId }: { classId: number | nul
                                 className={`ranked-subtopic-row ${isSelected ? 'ranked-subtopic-row--active' : ''}`}
                                 role="button"
                                 tabIndex={0}
-                                onClick={() => setSelectedSubtopic(subtopic.subtopic_type)}
+                                onClick={() => selectSubtopic(subtopic.subtopic_type)}
                                 onKeyDown={(event) => {
                                   if (event.key === 'Enter' || event.key === ' ') {
                                     event.preventDefault();
-                                    setSelectedSubtopic(subtopic.subtopic_type);
+                                    selectSubtopic(subtopic.subtopic_type);
                                   }
                                 }}
                               >
@@ -427,6 +444,8 @@ export default function InstructorDashboard({ classId }: { classId: number | nul
                     <h3>Questions for Selected Subtopic</h3>
                     {!selectedSubtopic ? (
                       <p className="topic-analytics-empty">Select a subtopic to view its questions.</p>
+                    ) : questionsLoading ? (
+                      <p className="topic-analytics-empty">Loading questions…</p>
                     ) : subtopicQuestions.length === 0 ? (
                       <p className="topic-analytics-empty">No question analytics available for this subtopic.</p>
                     ) : (
@@ -34,6 +34,8 @@ export interface ClassOverview {
   total_students: number;
   active_students_last_week: number;
   total_questions_answered: number;
+  answered_questions: number;
+  correct_answers: number;
   class_avg_accuracy: number;
   topics_overview: Array<{
     topic: string;
@@ -41,6 +43,8 @@ export interface ClassOverview {
     students_started: number;
     students_completed: number;
     avg_accuracy: number;
+    answered: number;
+    correct: number;
   }>;
   rostered_students?: Array<{
     student_id: number | null;
@@ -106,8 +110,14 @@ export interface QuestionAnalyticsResponse {
     avg_time_spent: number;
     students_who_saw: number;
   }>;
+  next_cursor: string | null;
 }
 
+export type QuestionSort = 'attempts' | 'success_rate' | 'time';
+
+// The endpoint's maximum page size; fewer round trips for large topics
+const QUESTION_PAGE_SIZE = 500;
+
 export const reportsService = {
   async getStudentReport(studentId: number): Promise<StudentReport> {
     const response = await api.get(`reports/student/${studentId}`);
@@ -125,9 +135,27 @@ export const reportsService = {
     return response.data;
   },
 
-  async getQuestionAnalytics(topicId: string, subtopicType?: string): Promise<QuestionAnalyticsResponse> {
-    const params = subtopicType ? { subtopic_type: subtopicType } : undefined;
-    const response = await api.get(`reports/question/${topicId}/analytics`, { params });
-    return response.data;
+  // Every question matching the filters, following the paging cursor
+  async getQuestionAnalytics(
+    topicId: string,
+    options: { subtopicType?: string; sort?: QuestionSort } = {},
+  ): Promise<QuestionAnalyticsResponse> {
+    const analytics: QuestionAnalyticsResponse['analytics'] = [];
+    let cursor: string | null = null;
+    do {
+      const params: Record<string, string | number> = {
+        limit: QUESTION_PAGE_SIZE,
+        sort: options.sort ?? 'attempts',
+      };
+      if (options.subtopicType) params.subtopic_type = options.subtopicType;
+      if (cursor) params.cursor = cursor;
+      const response = await api.get<QuestionAnalyticsResponse>(
+        `reports/question/${topicId}/analytics`,
+        { params },
+      );
+      analytics.push(...response.data.analytics);
+      cursor = response.data.next_cursor;
+    } while (cursor);
+    return { topic: topicId, analytics, next_cursor: null };
   },
 };
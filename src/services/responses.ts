@@ -28,14 +28,33 @@ export interface StudentResponse {
   attempted_at: string;
 }
 
+interface StudentResponsesPage {
+  responses: StudentResponse[];
+  next_cursor: string | null;
+}
+
+// The endpoint's maximum page size; fewer round trips for long histories
+const RESPONSES_PAGE_SIZE = 500;
+
 export const responsesService = {
   async submitResponse(data: SubmitResponseRequest): Promise<void> {
     await api.post('responses', data);
   },
 
+  // Every response of the student, newest first, following the paging cursor
   async getStudentResponses(studentId: number): Promise<StudentResponse[]> {
-    const response = await api.get(`responses/student/${studentId}`);
-    return response.data.responses;
+    const responses: StudentResponse[] = [];
+    let cursor: string | null = null;
+    do {
+      const params: Record<string, string | number> = { limit: RESPONSES_PAGE_SIZE };
+      if (cursor) params.cursor = cursor;
+      const response = await api.get<StudentResponsesPage>(`responses/student/${studentId}`, {
+        params,
+      });
+      responses.push(...response.data.responses);
+      cursor = response.data.next_cursor;
+    } while (cursor);
+    return responses;
   },
 
   formatResponseData(